@@ -9,7 +9,8 @@ from database import get_db
 from models import User
 from schemas import TokenData
 from config import settings
-from cache_utils import cache
+from cache_utils import async_cache
+from cache_invalidation import invalidation_bus, user_tag
 
 # bcrypt 오류 방지를 위한 안정적인 설정
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
@@ -83,7 +84,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     cache_key = f"user_session:{token_data.email}"
     
     # 캐시에서 사용자 정보 조회 시도
-    cached_user = cache.get(cache_key)
+    cached_user = await async_cache.get(cache_key)
     if cached_user is not None:
         logger.info(f"Cache hit for user session: {cache_key}")
         # 캐시된 데이터를 User 객체로 변환
@@ -109,7 +110,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         "created_at": user.created_at.isoformat() if user.created_at else None,
         "updated_at": user.updated_at.isoformat() if user.updated_at else None
     }
-    cache.set(cache_key, user_dict, expire=1800)
+    await invalidation_bus.set(cache_key, user_dict, expire=1800, tags=[user_tag(user.user_id, "session")])
         
     logger.info(f"사용자 인증 성공: {user.email}")
     return user
@@ -153,7 +154,7 @@ async def get_current_user_optional(request: Request, db: Session = Depends(get_
     cache_key = f"user_session:{token_data.email}"
     
     # 캐시에서 사용자 정보 조회 시도
-    cached_user = cache.get(cache_key)
+    cached_user = await async_cache.get(cache_key)
     if cached_user is not None:
         logger.info(f"Cache hit for user session (선택적): {cache_key}")
         # 캐시된 데이터를 User 객체로 변환
@@ -179,7 +180,7 @@ async def get_current_user_optional(request: Request, db: Session = Depends(get_
         "created_at": user.created_at.isoformat() if user.created_at else None,
         "updated_at": user.updated_at.isoformat() if user.updated_at else None
     }
-    cache.set(cache_key, user_dict, expire=1800)
+    await invalidation_bus.set(cache_key, user_dict, expire=1800, tags=[user_tag(user.user_id, "session")])
         
     logger.info(f"사용자 인증 성공 (선택적): {user.email}")
     return user
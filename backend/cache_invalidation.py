@@ -0,0 +1,205 @@
+"""
+태그 기반 캐시 무효화 버스
+- 캐시 엔트리마다 의존성 태그(user:{id}, region:{r}, place:{table}:{id} ...)를 기록
+- 쓰기 작업 시 태그 단위로 Redis 엔트리를 삭제하고 pub/sub으로 무효화 이벤트 발행
+- 각 워커 프로세스는 이벤트를 구독해 인메모리 캐시에서 해당 엔트리만 제거
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Set, Union
+
+from cache_utils import AsyncRedisCache, async_cache
+
+logger = logging.getLogger(__name__)
+
+# pub/sub 채널 및 태그 인덱스 키
+INVALIDATION_CHANNEL = "cache:invalidate"
+TAG_INDEX_PREFIX = "cache_tag:"
+# 태그 인덱스(SET) 유지 시간 - 가장 긴 캐시 TTL보다 길게
+TAG_INDEX_TTL = int(os.getenv("CACHE_TAG_INDEX_TTL", "86400"))
+
+LocalHandler = Callable[[Set[str]], Union[None, Awaitable[None]]]
+
+
+# ============================================================================
+# 태그 생성 헬퍼 (모든 라우터가 동일한 형식을 사용하도록)
+# ============================================================================
+
+def user_tag(user_id: Any, scope: Optional[str] = None) -> str:
+    """사용자 태그 - scope 지정 시 해당 사용자의 특정 데이터(saved_locations, trips 등)만 가리킴"""
+    return f"user:{user_id}:{scope}" if scope else f"user:{user_id}"
+
+
+def region_tag(region: str) -> str:
+    """지역 태그"""
+    return f"region:{region}"
+
+
+def place_tag(table_name: str, place_id: Any) -> str:
+    """장소 태그 (카테고리 테이블 + ID)"""
+    return f"place:{table_name}:{place_id}"
+
+
+def post_tag(post_id: Any) -> str:
+    """포스트 태그"""
+    return f"post:{post_id}"
+
+
+class CacheInvalidationBus:
+    """
+    태그 기반 캐시 무효화 버스
+
+    사용 예:
+        await invalidation_bus.set(key, value, expire=600, tags=[user_tag(uid)])
+        await invalidation_bus.invalidate(user_tag(uid), reason="bookmark")
+    """
+
+    def __init__(self, cache: AsyncRedisCache = async_cache, channel: str = INVALIDATION_CHANNEL):
+        self.cache = cache
+        self.channel = channel
+        # 자신이 발행한 이벤트를 구분하기 위한 인스턴스 ID
+        self.instance_id = uuid.uuid4().hex
+        self._local_handlers: List[LocalHandler] = []
+        self._listener_task: Optional[asyncio.Task] = None
+        self.stats = {"published": 0, "received": 0, "keys_deleted": 0}
+
+    # ------------------------------------------------------------------
+    # 태그 등록
+    # ------------------------------------------------------------------
+    async def register(self, key: str, tags: Iterable[str]) -> bool:
+        """캐시 키를 태그 인덱스에 등록 (한 번의 파이프라인)"""
+        tags = [tag for tag in tags if tag]
+        if not tags:
+            return True
+        try:
+            async with self.cache.redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    index_key = f"{TAG_INDEX_PREFIX}{tag}"
+                    pipe.sadd(index_key, key)
+                    pipe.expire(index_key, TAG_INDEX_TTL)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache tag register error: {e}")
+            return False
+
+    async def set(self, key: str, value: Any, expire: Optional[int] = None,
+                  tags: Iterable[str] = ()) -> bool:
+        """값 저장 + 태그 등록"""
+        success = await self.cache.set(key, value, expire=expire)
+        if success:
+            await self.register(key, tags)
+        return success
+
+    # ------------------------------------------------------------------
+    # 무효화
+    # ------------------------------------------------------------------
+    async def invalidate(self, *tags: str, reason: str = "") -> int:
+        """
+        태그에 연결된 Redis 엔트리를 삭제하고 무효화 이벤트를 발행
+
+        Returns:
+            삭제된 Redis 키 수
+        """
+        tags = [tag for tag in tags if tag]
+        if not tags:
+            return 0
+
+        deleted = 0
+        try:
+            index_keys = [f"{TAG_INDEX_PREFIX}{tag}" for tag in tags]
+            async with self.cache.redis.pipeline(transaction=False) as pipe:
+                for index_key in index_keys:
+                    pipe.smembers(index_key)
+                members = await pipe.execute()
+
+            keys = {
+                member.decode() if isinstance(member, bytes) else member
+                for key_set in members for member in key_set
+            }
+            # 캐시 엔트리 삭제, 태그 인덱스 삭제, 이벤트 발행을 한 번의 파이프라인으로
+            event = json.dumps({"tags": tags, "origin": self.instance_id, "reason": reason})
+            async with self.cache.redis.pipeline(transaction=False) as pipe:
+                if keys:
+                    pipe.delete(*keys)
+                pipe.delete(*index_keys)
+                pipe.publish(self.channel, event)
+                results = await pipe.execute()
+
+            deleted = results[0] if keys else 0
+            self.stats["keys_deleted"] += deleted
+            self.stats["published"] += 1
+            logger.info(f"🧹 Cache invalidated by tags {tags} ({reason}): {deleted} keys")
+        except Exception as e:
+            logger.error(f"Cache invalidation error for tags {tags}: {e}")
+
+        # 발행한 프로세스의 인메모리 캐시도 즉시 정리 (자신의 이벤트는 구독 시 무시)
+        await self._dispatch_local(set(tags))
+        return deleted
+
+    # ------------------------------------------------------------------
+    # 프로세스 로컬 캐시 구독
+    # ------------------------------------------------------------------
+    def add_local_handler(self, handler: LocalHandler):
+        """무효화 이벤트 수신 시 호출할 핸들러 등록 (인메모리 캐시 정리용)"""
+        self._local_handlers.append(handler)
+
+    async def _dispatch_local(self, tags: Set[str]):
+        for handler in self._local_handlers:
+            try:
+                result = handler(tags)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Local cache invalidation handler failed: {e}")
+
+    async def _listen(self):
+        """pub/sub 채널 구독 루프 (연결 오류 시 재시도)"""
+        while True:
+            pubsub = self.cache.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                logger.info(f"📡 Subscribed to cache invalidation channel: {self.channel}")
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        event = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    if event.get("origin") == self.instance_id:
+                        continue
+                    self.stats["received"] += 1
+                    await self._dispatch_local(set(event.get("tags", [])))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error, retrying: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose() if hasattr(pubsub, "aclose") else await pubsub.close()
+                except Exception:
+                    pass
+
+    async def start(self):
+        """구독 태스크 시작 (앱 시작 시)"""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """구독 태스크 종료 (앱 종료 시)"""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+
+# 전역 무효화 버스 인스턴스
+invalidation_bus = CacheInvalidationBus()
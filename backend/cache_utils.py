@@ -1,23 +1,37 @@
 import redis
-import json
-import pickle
-from typing import Any, Optional, Union
+import redis.asyncio as aioredis
+from typing import Any, Dict, List, Optional, Tuple, Union
 from functools import wraps
 import logging
+import time
 from config import settings
-from datetime import datetime
-import uuid
+from utils.cache_codec import CacheCodec
 
 logger = logging.getLogger(__name__)
 
 # Redis 클라이언트 초기화
 redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+# 코덱으로 인코딩된 바이너리 값 전용 클라이언트 (응답 디코딩 없음)
+redis_binary_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=False)
+
+# 캐시 값 직렬화 코덱 (orjson/msgpack + zstd 압축)
+cache_codec = CacheCodec(
+    format=settings.CACHE_CODEC,
+    compress_threshold=settings.CACHE_COMPRESS_THRESHOLD
+)
+
+# stale-while-revalidate 엔트리 식별용 마커
+SWR_MARKER = "__swr__"
 
 class RedisCache:
     """Redis 캐싱 유틸리티 클래스"""
     
-    def __init__(self, redis_client: redis.Redis = redis_client):
+    def __init__(self, redis_client: redis.Redis = redis_client,
+                 binary_client: redis.Redis = redis_binary_client,
+                 codec: CacheCodec = cache_codec):
         self.redis = redis_client
+        self.binary_redis = binary_client
+        self.codec = codec
     
     def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """
@@ -33,27 +47,15 @@ class RedisCache:
         """
         try:
             if isinstance(value, (dict, list)):
-                # JSON 직렬화를 위한 커스텀 인코더
-                serialized_value = json.dumps(value, ensure_ascii=False, default=self._json_serializer)
-            else:
-                serialized_value = str(value)
-            
-            return self.redis.set(key, serialized_value, ex=expire)
+                # 코덱으로 직렬화 (크기가 크면 압축)
+                return self.binary_redis.set(key, self.codec.encode(value), ex=expire)
+
+            # 스칼라 값은 INCRBY 등과 호환되도록 문자열 그대로 저장
+            return self.redis.set(key, str(value), ex=expire)
         except Exception as e:
             logger.error(f"Redis set error: {e}")
             return False
     
-    def _json_serializer(self, obj):
-        """JSON 직렬화를 위한 커스텀 인코더"""
-        if isinstance(obj, uuid.UUID):
-            return str(obj)
-        elif isinstance(obj, datetime):
-            return obj.isoformat()
-        elif hasattr(obj, '__dict__'):
-            return obj.__dict__
-        else:
-            return str(obj)
-    
     def get(self, key: str) -> Optional[Any]:
         """
         캐시에서 데이터 조회
@@ -65,16 +67,12 @@ class RedisCache:
             저장된 값 또는 None
         """
         try:
-            value = self.redis.get(key)
+            value = self.binary_redis.get(key)
             if value is None:
                 return None
-            
-            # JSON으로 파싱 시도
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                # JSON이 아니면 문자열로 반환
-                return value
+
+            # 코덱 헤더가 있으면 해당 포맷으로, 없으면 JSON 파싱 후 실패 시 문자열로 반환
+            return self.codec.decode(value)
         except Exception as e:
             logger.error(f"Redis get error: {e}")
             return None
@@ -130,9 +128,246 @@ class RedisCache:
             logger.error(f"Redis expire error: {e}")
             return False
 
+    def set_swr(self, key: str, value: Any, soft_ttl: int, grace: int) -> bool:
+        """
+        stale-while-revalidate 엔트리 저장
+
+        soft_ttl 이후에는 '오래된(stale)' 값으로 취급되지만 grace 동안은 계속 제공되고,
+        Redis 키 자체는 soft_ttl + grace (하드 TTL) 후에 만료됩니다.
+
+        Args:
+            key: 캐시 키
+            value: 저장할 값
+            soft_ttl: 신선도 유지 시간 (초)
+            grace: soft_ttl 이후 stale 값을 제공할 유예 시간 (초)
+        """
+        return self.set(key, wrap_swr(value, soft_ttl, grace), expire=soft_ttl + grace)
+
+    def get_swr(self, key: str) -> Tuple[Optional[Any], bool]:
+        """
+        stale-while-revalidate 엔트리 조회
+
+        Returns:
+            (값, stale 여부) - 값이 없으면 (None, False)
+            SWR 형식이 아닌 예전 엔트리는 신선한 값으로 취급합니다.
+        """
+        return unwrap_swr(self.get(key))
+
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """여러 키를 한 번의 MGET으로 조회 (없는 키는 None)"""
+        if not keys:
+            return []
+        try:
+            return [self.codec.decode(value) for value in self.binary_redis.mget(keys)]
+        except Exception as e:
+            logger.error(f"Redis mget error: {e}")
+            return [None] * len(keys)
+
+    def delete_many(self, keys: List[str]) -> int:
+        """여러 키를 한 번의 DEL로 삭제"""
+        if not keys:
+            return 0
+        try:
+            return self.redis.delete(*keys)
+        except Exception as e:
+            logger.error(f"Redis delete error: {e}")
+            return 0
+
+    def try_lock(self, key: str, expire: int) -> bool:
+        """단순 분산 락 획득 (SET NX EX) - 여러 워커의 중복 갱신 방지용"""
+        try:
+            return bool(self.redis.set(f"lock:{key}", "1", nx=True, ex=expire))
+        except Exception as e:
+            logger.error(f"Redis lock error: {e}")
+            return False
+
+    def release_lock(self, key: str) -> bool:
+        """try_lock으로 획득한 락 해제"""
+        return self.delete(f"lock:{key}")
+
+
+class AsyncRedisCache:
+    """
+    asyncio Redis 캐싱 유틸리티 클래스 (RedisCache와 동일한 API, 모든 메서드가 코루틴)
+    - 이벤트 루프를 블로킹하지 않도록 redis.asyncio 클라이언트 사용
+    - 커넥션 풀 공유, MGET/파이프라인 기반 배치 메서드 제공
+    """
+
+    def __init__(self, redis_url: str = settings.REDIS_URL, codec: CacheCodec = cache_codec,
+                 max_connections: int = settings.REDIS_MAX_CONNECTIONS):
+        self.pool = aioredis.ConnectionPool.from_url(redis_url, max_connections=max_connections)
+        # 코덱 값은 바이너리, 그 외 값은 문자열로 다루므로 응답 디코딩 없이 하나의 풀만 사용
+        self.redis = aioredis.Redis(connection_pool=self.pool)
+        self.codec = codec
+
+    def _encode(self, value: Any) -> Union[bytes, str]:
+        """dict/list는 코덱으로 직렬화, 스칼라 값은 INCRBY 등과 호환되도록 문자열 그대로"""
+        return self.codec.encode(value) if isinstance(value, (dict, list)) else str(value)
+
+    async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+        """캐시에 데이터 저장"""
+        try:
+            return bool(await self.redis.set(key, self._encode(value), ex=expire))
+        except Exception as e:
+            logger.error(f"Redis set error: {e}")
+            return False
+
+    async def get(self, key: str) -> Optional[Any]:
+        """캐시에서 데이터 조회"""
+        try:
+            return self.codec.decode(await self.redis.get(key))
+        except Exception as e:
+            logger.error(f"Redis get error: {e}")
+            return None
+
+    async def delete(self, key: str) -> bool:
+        """캐시에서 데이터 삭제"""
+        try:
+            return bool(await self.redis.delete(key))
+        except Exception as e:
+            logger.error(f"Redis delete error: {e}")
+            return False
+
+    async def exists(self, key: str) -> bool:
+        """캐시 키 존재 여부 확인"""
+        try:
+            return bool(await self.redis.exists(key))
+        except Exception as e:
+            logger.error(f"Redis exists error: {e}")
+            return False
+
+    async def set_hash(self, name: str, mapping: dict, expire: Optional[int] = None) -> bool:
+        """해시 형태로 데이터 저장 (HSET + EXPIRE를 한 번의 파이프라인으로)"""
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(name, mapping=mapping)
+                if expire:
+                    pipe.expire(name, expire)
+                results = await pipe.execute()
+            return bool(results[0])
+        except Exception as e:
+            logger.error(f"Redis hset error: {e}")
+            return False
+
+    async def get_hash(self, name: str) -> Optional[dict]:
+        """해시 형태로 데이터 조회"""
+        try:
+            result = await self.redis.hgetall(name)
+            return {k.decode(): v.decode() for k, v in result.items()} or None
+        except Exception as e:
+            logger.error(f"Redis hgetall error: {e}")
+            return None
+
+    async def increment(self, key: str, amount: int = 1) -> Optional[int]:
+        """숫자 값 증가"""
+        try:
+            return await self.redis.incrby(key, amount)
+        except Exception as e:
+            logger.error(f"Redis increment error: {e}")
+            return None
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        """키에 만료 시간 설정"""
+        try:
+            return bool(await self.redis.expire(key, seconds))
+        except Exception as e:
+            logger.error(f"Redis expire error: {e}")
+            return False
+
+    async def set_swr(self, key: str, value: Any, soft_ttl: int, grace: int) -> bool:
+        """stale-while-revalidate 엔트리 저장 (RedisCache.set_swr 참고)"""
+        return await self.set(key, wrap_swr(value, soft_ttl, grace), expire=soft_ttl + grace)
+
+    async def get_swr(self, key: str) -> Tuple[Optional[Any], bool]:
+        """stale-while-revalidate 엔트리 조회 - (값, stale 여부)"""
+        return unwrap_swr(await self.get(key))
+
+    async def get_swr_many(self, keys: List[str]) -> List[Tuple[Optional[Any], bool]]:
+        """여러 SWR 엔트리를 한 번의 MGET으로 조회"""
+        return [unwrap_swr(value) for value in await self.mget(keys)]
+
+    async def try_lock(self, key: str, expire: int) -> bool:
+        """단순 분산 락 획득 (SET NX EX)"""
+        try:
+            return bool(await self.redis.set(f"lock:{key}", "1", nx=True, ex=expire))
+        except Exception as e:
+            logger.error(f"Redis lock error: {e}")
+            return False
+
+    async def release_lock(self, key: str) -> bool:
+        """try_lock으로 획득한 락 해제"""
+        return await self.delete(f"lock:{key}")
+
+    # ------------------------------------------------------------------
+    # 배치 메서드 (요청당 1회 왕복)
+    # ------------------------------------------------------------------
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """여러 키를 한 번의 MGET으로 조회 (없는 키는 None)"""
+        if not keys:
+            return []
+        try:
+            return [self.codec.decode(value) for value in await self.redis.mget(keys)]
+        except Exception as e:
+            logger.error(f"Redis mget error: {e}")
+            return [None] * len(keys)
+
+    async def mset(self, mapping: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """여러 키를 한 번의 파이프라인으로 저장"""
+        if not mapping:
+            return True
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, self._encode(value), ex=expire)
+                results = await pipe.execute()
+            return all(results)
+        except Exception as e:
+            logger.error(f"Redis mset error: {e}")
+            return False
+
+    async def delete_many(self, keys: List[str]) -> int:
+        """여러 키를 한 번의 DEL로 삭제"""
+        if not keys:
+            return 0
+        try:
+            return await self.redis.delete(*keys)
+        except Exception as e:
+            logger.error(f"Redis delete error: {e}")
+            return 0
+
+    async def close(self):
+        """커넥션 풀 정리 (앱 종료 시)"""
+        await self.pool.disconnect()
+
+
+def wrap_swr(value: Any, soft_ttl: int, grace: int) -> dict:
+    """SWR 엔트리 생성 - soft_ttl 이후 stale, soft_ttl + grace 이후 하드 만료"""
+    now = time.time()
+    return {
+        SWR_MARKER: 1,
+        "value": value,
+        "soft_expires_at": now + soft_ttl,
+        "hard_expires_at": now + soft_ttl + grace,
+    }
+
+
+def unwrap_swr(envelope: Any) -> Tuple[Optional[Any], bool]:
+    """SWR 엔트리 해석 - (값, stale 여부), SWR 형식이 아닌 값은 신선한 값으로 취급"""
+    if envelope is None:
+        return None, False
+    if not isinstance(envelope, dict) or SWR_MARKER not in envelope:
+        return envelope, False
+
+    now = time.time()
+    if now >= envelope.get("hard_expires_at", 0):
+        return None, False
+    return envelope.get("value"), now >= envelope.get("soft_expires_at", 0)
+
 
 # 전역 캐시 인스턴스
 cache = RedisCache()
+# 비동기 핸들러용 전역 캐시 인스턴스
+async_cache = AsyncRedisCache()
 
 
 def cached(expire: int = 300, key_prefix: str = ""):
@@ -11,6 +11,11 @@ class Settings(BaseSettings):
 
     # Redis 설정
     REDIS_URL: str = "redis://localhost:6379"
+    # 캐시 직렬화 코덱 (orjson, msgpack, json) 및 zstd 압축 임계값 (바이트)
+    CACHE_CODEC: str = os.getenv("CACHE_CODEC", "orjson")
+    CACHE_COMPRESS_THRESHOLD: int = int(os.getenv("CACHE_COMPRESS_THRESHOLD", "4096"))
+    # 비동기 Redis 커넥션 풀 최대 연결 수
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
 
     # JWT 설정
     SECRET_KEY: str = "your-secret-key-here"
@@ -6,7 +6,6 @@ from typing import Any, Dict, List, Optional, Union, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import time
-import json
 import hashlib
 import asyncio
 from contextlib import asynccontextmanager
@@ -14,6 +13,7 @@ from functools import wraps
 
 # 다양한 캐시 백엔드 지원
 from cachetools import TTLCache, LRUCache, LFUCache
+from utils.cache_codec import CacheCodec, FORMAT_IDS
 try:
     import redis
     REDIS_AVAILABLE = True
@@ -55,7 +55,8 @@ class CacheConfig:
     redis_url: Optional[str] = None
     memcached_servers: List[str] = field(default_factory=list)
     compression_enabled: bool = False
-    serialization_format: str = "json"  # json, pickle, msgpack
+    compress_threshold: int = 4096  # 이 크기(바이트) 이상일 때만 zstd 압축
+    serialization_format: str = "json"  # json, orjson, msgpack
 
 
 @dataclass
@@ -78,6 +79,13 @@ class CacheBackend(ABC):
     def __init__(self, config: CacheConfig):
         self.config = config
         self.stats = CacheStats()
+        serialization_format = config.serialization_format
+        if serialization_format not in FORMAT_IDS:
+            serialization_format = "json"
+        self.codec = CacheCodec(
+            format=serialization_format,
+            compress_threshold=config.compress_threshold if config.compression_enabled else None
+        )
 
     @abstractmethod
     async def get(self, key: str) -> Optional[Any]:
@@ -109,21 +117,13 @@ class CacheBackend(ABC):
         """통계 조회"""
         pass
 
-    def _serialize(self, value: Any) -> str:
-        """직렬화"""
-        if self.config.serialization_format == "json":
-            return json.dumps(value, default=str, ensure_ascii=False)
-        # 다른 형식들 추가 가능
-        return str(value)
+    def _serialize(self, value: Any) -> bytes:
+        """직렬화 (설정된 코덱 사용)"""
+        return self.codec.encode(value)
 
-    def _deserialize(self, data: str) -> Any:
-        """역직렬화"""
-        if self.config.serialization_format == "json":
-            try:
-                return json.loads(data)
-            except json.JSONDecodeError:
-                return data
-        return data
+    def _deserialize(self, data: bytes) -> Any:
+        """역직렬화 (헤더에 기록된 포맷으로 복원, 기존 JSON 문자열도 지원)"""
+        return self.codec.decode(data)
 
 
 class MemoryCacheBackend(CacheBackend):
@@ -211,7 +211,8 @@ class RedisCacheBackend(CacheBackend):
 
         # Redis 연결 설정
         redis_url = config.redis_url or "redis://localhost:6379/0"
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+        # 코덱이 바이너리 값을 다루므로 응답 디코딩 비활성화
+        self.redis_client = redis.from_url(redis_url, decode_responses=False)
         self.default_ttl = config.ttl
 
     async def get(self, key: str) -> Optional[Any]:
@@ -523,7 +524,9 @@ def get_cache_manager() -> CacheManager:
             strategy=CacheStrategy.TTL,
             ttl=3600,  # 1시간
             max_size=2000,
-            redis_url="redis://localhost:6379/1"  # 캐시 전용 DB
+            redis_url="redis://localhost:6379/1",  # 캐시 전용 DB
+            serialization_format="orjson",
+            compression_enabled=True
         )
         _global_cache_manager = CacheManager(config)
 
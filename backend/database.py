@@ -2,6 +2,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
+from utils.json_codec import json_dumps, json_loads
 
 # 데이터베이스 엔진 생성 (연결 풀 최적화)
 engine = create_engine(
@@ -13,7 +14,10 @@ engine = create_engine(
     pool_recycle=3600,      # 1시간마다 연결 재활용 (초단위)
     # 성능 최적화 설정
     echo=False,             # SQL 로그 비활성화 (운영환경)
-    future=True             # SQLAlchemy 2.0 스타일 사용
+    future=True,            # SQLAlchemy 2.0 스타일 사용
+    # JSON/JSONB 컬럼 직렬화 (orjson 사용 가능 시 orjson)
+    json_serializer=json_dumps,
+    json_deserializer=json_loads
 )
 
 # 세션 로컬 클래스
@@ -10,6 +10,10 @@ from database import engine, Base
 # ✅ v2 추천 시스템 사용 (v1 완전 제거)
 from routers import auth, users, posts, attractions, recommendations2, profile, saved_locations, trips, batch_processing, chat
 from config import settings
+from cache_utils import async_cache
+from cache_invalidation import invalidation_bus
+from services.image_embedding import image_embedding_service
+from view_counter import view_counter, trending_score_job
 
 # 로깅 설정
 logging.basicConfig(level=logging.DEBUG)
@@ -24,8 +28,18 @@ async def lifespan(app: FastAPI):
     # 앱 시작 시 데이터베이스 테이블 생성 (OAuth 테이블 추가를 위해 임시 활성화)
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created/updated")
+    # 캐시 무효화 이벤트 구독 시작 (워커 간 인메모리 캐시 동기화)
+    await invalidation_bus.start()
+    # 조회수 배치 반영 및 트렌딩 점수 갱신 작업 시작
+    await view_counter.start()
+    await trending_score_job.start()
     yield
-    # 앱 종료 시 정리 작업 (필요시)
+    # 앱 종료 시 정리 작업 (CLIP 워커/조회수 작업 종료, 무효화 구독 종료 후 비동기 Redis 커넥션 풀 해제)
+    await image_embedding_service.stop()
+    await trending_score_job.stop()
+    await view_counter.stop()
+    await invalidation_bus.stop()
+    await async_cache.close()
 
 
 app = FastAPI(
@@ -0,0 +1,10 @@
+-- 사용자/장소 행동 통계 누적 집계 (batch-processor가 배치마다 기존 값에 더해 갱신)
+-- batch-processor는 DDL을 실행하지 않고 컬럼이 없으면 시작하지 않으므로 배포 전에 반드시 적용
+
+-- 사용자 벡터 누적 평균 가중치 (시간 감쇠 후 새 배치 가중치와 합산)
+ALTER TABLE user_behavior_vectors
+    ADD COLUMN IF NOT EXISTS vector_weight DOUBLE PRECISION NOT NULL DEFAULT 0;
+
+-- 장소별 고유 사용자 HyperLogLog 스케치 (unique_users는 스케치 추정값)
+ALTER TABLE place_vectors
+    ADD COLUMN IF NOT EXISTS unique_users_hll BYTEA;
@@ -0,0 +1,15 @@
+-- 여행/여행 계획 JSON 컬럼을 JSONB로 변환
+
+-- 1. trips.places: JSON 문자열(Text) → JSONB (빈 문자열은 NULL)
+ALTER TABLE trips
+    ALTER COLUMN places TYPE JSONB USING NULLIF(places, '')::jsonb;
+
+-- 2. travel_plans 문서 컬럼: JSON → JSONB
+ALTER TABLE travel_plans
+    ALTER COLUMN itinerary TYPE JSONB USING itinerary::jsonb,
+    ALTER COLUMN places TYPE JSONB USING places::jsonb,
+    ALTER COLUMN parsed_dates TYPE JSONB USING parsed_dates::jsonb,
+    ALTER COLUMN ui_response TYPE JSONB USING ui_response::jsonb;
+
+-- 3. 목록 조회용 인덱스 (사용자별 최신순)
+CREATE INDEX IF NOT EXISTS idx_trips_user_created ON trips(user_id, created_at DESC);
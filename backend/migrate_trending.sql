@@ -0,0 +1,5 @@
+-- 관광지 트렌딩 점수 (최근 조회수 감쇠 합계, view_counter.TrendingScoreJob이 주기적으로 갱신)
+-- 배포 전에 반드시 적용 (TrendingScoreJob은 컬럼이 없으면 시작 시 작업을 중단하고 스키마를 변경하지 않음)
+
+ALTER TABLE place_recommendations
+    ADD COLUMN IF NOT EXISTS trending_score DOUBLE PRECISION NOT NULL DEFAULT 0;
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float
-from sqlalchemy.dialects.postgresql import ARRAY
+from typing import Any, Dict, List
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float, LargeBinary
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
+from utils.json_codec import json_loads
 
 
 class User(Base):
@@ -134,7 +136,7 @@ class Trip(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(String, ForeignKey("users.user_id"), nullable=False)
     title = Column(String, nullable=False)  # 여행 제목
-    places = Column(Text, nullable=True)  # 장소들 (JSON 형태로 저장: [{"name": "장소명", "order": 1, "latitude": "37.5", "longitude": "127.0"}])
+    places = Column(JSONB, nullable=True)  # 장소들 (JSONB: [{"table_name": "nature", "id": "123", "dayNumber": 1, "order": 1, "isLocked": false}])
     start_date = Column(DateTime(timezone=False), nullable=False)  # 시작 날짜
     end_date = Column(DateTime(timezone=False), nullable=False)  # 종료 날짜
     status = Column(String, default='planned')  # planned, active, completed
@@ -147,6 +149,17 @@ class Trip(Base):
     # Relationship to user
     user = relationship("User", back_populates="trips")
 
+    @property
+    def place_list(self) -> List[Dict[str, Any]]:
+        """장소 목록 (JSONB 마이그레이션 이전의 JSON 문자열 값도 허용)"""
+        places = self.places
+        if isinstance(places, str):
+            try:
+                places = json_loads(places)
+            except ValueError:
+                return []
+        return places if isinstance(places, list) else []
+
 
 class UserAction(Base):
     """사용자 행동 데이터 - Collection Server에서 수집된 데이터 저장"""
@@ -191,6 +204,8 @@ class UserBehaviorVector(Base):
     
     # BERT 벡터 (384차원) - PostgreSQL ARRAY 타입
     behavior_vector = Column(ARRAY(Float), nullable=True)
+    # 누적 평균 가중치 (배치마다 시간 감쇠 후 새 배치 가중치와 합산)
+    vector_weight = Column(Float, nullable=False, default=0.0, server_default="0")
     
     # 행동 점수들 (0.0~100.0)
     like_score = Column(Float, default=0.0)              # 좋아요 선호도 점수
@@ -230,7 +245,8 @@ class PlaceVector(Base):
     total_likes = Column(Integer, default=0)
     total_bookmarks = Column(Integer, default=0) 
     total_clicks = Column(Integer, default=0)
-    unique_users = Column(Integer, default=0)               # 고유 사용자 수
+    unique_users = Column(Integer, default=0)               # 고유 사용자 수 (HLL 추정값)
+    unique_users_hll = Column(LargeBinary, nullable=True)   # 고유 사용자 HyperLogLog 스케치 (배치 간 누적)
     avg_dwell_time = Column(Float, default=0.0)             # 평균 체류시간
     
     # 인기도 점수 (0.0~100.0)
@@ -266,14 +282,14 @@ class TravelPlan(Base):
     days_count = Column(Integer, nullable=True)  # 실제 일수
 
     # 여행 계획 데이터 (JSON 형태)
-    itinerary = Column(JSON, nullable=False)  # 일차별 스케줄
-    places = Column(JSON, nullable=True)  # 장소 정보 목록
-    parsed_dates = Column(JSON, nullable=True)  # 파싱된 날짜 정보
+    itinerary = Column(JSONB, nullable=False)  # 일차별 스케줄
+    places = Column(JSONB, nullable=True)  # 장소 정보 목록
+    parsed_dates = Column(JSONB, nullable=True)  # 파싱된 날짜 정보
 
     # 응답 데이터
     raw_response = Column(Text, nullable=True)  # LLM 원본 응답
     formatted_response = Column(Text, nullable=True)  # 포맷된 응답
-    ui_response = Column(JSON, nullable=True)  # UI용 구조화된 응답
+    ui_response = Column(JSONB, nullable=True)  # UI용 구조화된 응답
 
     # 상태 정보
     status = Column(String, default='draft')  # draft, confirmed, modified
@@ -41,6 +41,7 @@ class UnifiedRecommendationConfig:
     similarity_weight: float = 0.5  # 기본 균등 가중치 (동적으로 조정됨)
     popularity_weight: float = 0.5  # 기본 균등 가중치 (동적으로 조정됨)
     min_similarity_threshold: float = 0.1
+    trending_weight: float = 1.0  # 인기 추천: 북마크 수 + trending_weight × 최근 조회수 감쇠 점수
 
     # 액션 가중치
     action_weights: Dict[str, float] = None
@@ -75,6 +76,10 @@ class UnifiedRecommendationConfig:
     place_batch_cache_size: int = 500   # 장소 배치 데이터 캐시
     similarity_cache_size: int = 2000   # 유사도 계산 결과 캐시
 
+    # Stale-while-revalidate (메인 피드 캐시 만료 시 지연 방지)
+    swr_grace_seconds: int = 1800        # soft TTL 이후 stale 응답을 허용하는 유예 시간
+    swr_refresh_lock_seconds: int = 30   # 백그라운드 갱신 중복 방지 락 유지 시간
+
     # 쿼리 성능 최적화 설정 (개선)
     use_prepared_statements: bool = True  # 준비된 쿼리문 사용
     batch_size: int = 100  # 배치 처리 크기 증가 (더 효율적)
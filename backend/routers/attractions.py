@@ -1,10 +1,10 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Dict, List, Optional, Tuple
+from collections import namedtuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func, or_, and_, case
-import math
+from sqlalchemy import desc, func, or_, and_, case, text
 
-from database import get_db
+from database import get_db, SessionLocal
 from models import User
 from models_attractions import Nature, Restaurant, Shopping, Accommodation, Humanities, LeisureSports
 from schemas import UserResponse
@@ -14,7 +14,15 @@ from schemas import UserResponse
 # ✅ v2 추천 시스템 import
 from auth_utils import get_current_user_optional  # 인증 함수는 별도 모듈로 이동
 from vectorization2 import get_engine  # v2 추천 엔진 사용
-from cache_utils import cache, cache_attraction_data, get_cached_attraction_data, increment_view_count, get_view_count
+from cache_utils import cache
+from cache_invalidation import invalidation_bus
+from services.attraction_snapshot import AttractionSnapshotStore
+from services.attraction_search import SEARCH_INDEX_NAME, build_search_index
+from services.spatial_index import SPATIAL_INDEX_NAME, build_spatial_index
+from services.attraction_catalog import CATALOG_INDEX_NAME, build_attraction_catalog
+from services.attraction_details import DETAIL_INDEX_NAME, AttractionDetailStore, detail_response
+from utils.pagination import encode_cursor, decode_cursor
+from view_counter import view_counter
 import logging
 
 router = APIRouter(tags=["attractions"])
@@ -23,9 +31,9 @@ logger = logging.getLogger(__name__)
 
 @router.get("/stats/views/{attraction_id}")
 async def get_attraction_view_count(attraction_id: str):
-    """관광지 조회수 조회 (Redis에서)"""
+    """관광지 조회수 조회 (Redis 누적값 + 아직 반영되지 않은 이 워커의 조회수)"""
     try:
-        view_count = get_view_count(attraction_id)
+        view_count = await view_counter.get_count(attraction_id)
         return {
             "attraction_id": attraction_id,
             "view_count": view_count
@@ -116,160 +124,259 @@ def format_attraction_data(attraction, category: str, table_name: str = None):
     
     return data
 
-def get_approximate_bounds(lat: float, lng: float, radius_km: float = 1.0) -> dict:
-    """대략적인 검색 범위 계산 (PostGIS 없이 성능 최적화용)"""
-    # 위도 1도 ≈ 111km, 경도 1도 ≈ 88km (한국 기준)
-    lat_offset = radius_km / 111.0
-    lng_offset = radius_km / 88.0
-    
-    return {
-        'min_lat': lat - lat_offset,
-        'max_lat': lat + lat_offset,
-        'min_lng': lng - lng_offset,
-        'max_lng': lng + lng_offset
-    }
+def build_attraction_detail(attraction, table_name: str) -> dict:
+    """관광지 상세 응답 (목록용 포맷 + 상세 정보)"""
+    formatted_attraction = format_attraction_data(attraction, get_category_from_table(table_name), table_name)
+    formatted_attraction.update({
+        "city": {
+            "id": attraction.city.lower().replace(" ", "-") if attraction.city else "unknown",
+            "name": attraction.city or "알 수 없음",
+            "region": attraction.region or "알 수 없음"
+        },
+        "detailedInfo": getattr(attraction, 'detailed_info', None),
+        "closedDays": getattr(attraction, 'closed_days', None),
+        "majorCategory": getattr(attraction, 'major_category', None),
+        "middleCategory": getattr(attraction, 'middle_category', None),
+        "minorCategory": getattr(attraction, 'minor_category', None),
+        "imageUrls": attraction.image_urls if attraction.image_urls else [],
+        "createdAt": attraction.created_at.isoformat() if attraction.created_at else None,
+        "updatedAt": attraction.updated_at.isoformat() if attraction.updated_at else None
+    })
+    return formatted_attraction
+
+
+def parse_detail_place_keys(attraction_id: str) -> List[Tuple[str, int]]:
+    """
+    상세 조회 ID → 후보 (테이블명, ID) 목록
+    - table_name_id 형식: 해당 테이블 하나
+    - 숫자만 있는 기존 형식: 모든 카테고리 테이블 (하위 호환성)
+
+    Raises:
+        HTTPException(400): 잘못된 테이블명
+        ValueError: 숫자가 아닌 ID
+    """
+    if "_" not in attraction_id:
+        return [(table_name, int(attraction_id)) for table_name in CATEGORY_TABLES]
+
+    # 테이블명이 여러 단어로 구성된 경우를 고려하여 마지막 _ 기준으로 분리
+    parts = attraction_id.split("_")
+    if parts[-1].isdigit():
+        table_name, original_id = "_".join(parts[:-1]), parts[-1]
+    else:
+        # 마지막 부분이 숫자가 아니면 첫 번째 _ 기준으로 분리
+        table_name, original_id = attraction_id.split("_", 1)
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """두 지점 간의 거리를 계산 (Haversine formula, 단위: km)"""
-    if not all([lat1, lon1, lat2, lon2]):
-        return float('inf')
-    
-    # 지구의 반지름 (km)
-    R = 6371.0
-    
-    # 라디안으로 변환
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    # 차이 계산
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    
-    # Haversine 공식
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
-    
-    return distance
+    if table_name not in CATEGORY_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"잘못된 테이블명: {table_name}"
+        )
+    return [(table_name, int(original_id))]
+
+
+async def resolve_attraction_detail(db: Session, place_keys: List[Tuple[str, int]]) -> Optional[dict]:
+    """상세 문서 조회 (Redis 문서 → 없으면 DB에서 렌더링 후 저장)"""
+    envelope = await attraction_details.get_first(place_keys)
+    if envelope is not None:
+        return envelope
+    loaded = attraction_details.load(db, place_keys)
+    if loaded is None:
+        return None
+    place_key, document = loaded
+    return await attraction_details.put(place_key, document)
+
+
+# 카테고리 섹션 목록용 경량 행 (format_attraction_data가 읽는 컬럼만 조회, ORM 엔티티 생성 생략)
+SECTION_COLUMNS = [
+    "id", "name", "overview", "address", "region", "city", "latitude", "longitude",
+    "phone_number", "parking_available", "image_urls",
+    "business_hours", "signature_menu", "menu", "closed_days",
+    "room_count", "room_type", "check_in", "check_out", "cooking_available", "usage_hours"
+]
+SectionRow = namedtuple("SectionRow", ["table_name", "region_key"] + SECTION_COLUMNS + ["rn", "total_count"])
+
+
+def _section_select_sql(table_name: str, table_model) -> str:
+    """테이블별 섹션 SELECT (없는 컬럼은 NULL, 지역/카테고리별 순번과 전체 개수를 윈도 함수로 계산)"""
+    columns = []
+    for column in SECTION_COLUMNS:
+        if column == "overview":
+            # 설명은 100자 요약만 사용하므로 잘라서 전송
+            columns.append("LEFT(t.overview, 101) AS overview")
+        elif hasattr(table_model, column):
+            columns.append(f"t.{column}")
+        else:
+            columns.append(f"NULL AS {column}")
+    return f"""
+        SELECT '{table_name}' AS table_name, r.region_key, {", ".join(columns)},
+               ROW_NUMBER() OVER (PARTITION BY r.region_key ORDER BY t.id) AS rn,
+               COUNT(*) OVER (PARTITION BY r.region_key) AS total_count
+        FROM {table_name} t
+        JOIN unnest(CAST(:regions AS text[])) AS r(region_key)
+          ON t.region ILIKE '%' || r.region_key || '%'
+    """
+
+
+def fetch_category_sections(
+    db: Session, regions: List[str], limit: int, offset: int = 0
+) -> Dict[str, Dict[str, Tuple[List[SectionRow], int]]]:
+    """
+    여러 지역의 카테고리별 상위 N개 + 전체 개수를 한 번의 쿼리로 조회
+    (UNION ALL + ROW_NUMBER() OVER (PARTITION BY 지역) - 각 UNION 분기가 하나의 카테고리)
+
+    Returns:
+        {지역: {테이블명: (행 목록, 전체 개수)}}
+    """
+    if not regions:
+        return {}
+
+    union_sql = " UNION ALL ".join(
+        _section_select_sql(table_name, table_model)
+        for table_name, table_model in CATEGORY_TABLES.items()
+    )
+    query = text(f"""
+        SELECT * FROM ({union_sql}) ranked
+        WHERE rn > :offset AND rn <= :offset + :limit
+        ORDER BY region_key, table_name, rn
+    """)
+    rows = db.execute(query, {"regions": list(regions), "offset": offset, "limit": limit}).fetchall()
+
+    sections: Dict[str, Dict[str, Tuple[List[SectionRow], int]]] = {region: {} for region in regions}
+    for row in rows:
+        section_row = SectionRow(*row)
+        region_sections = sections[section_row.region_key]
+        section_rows, _ = region_sections.get(section_row.table_name, ([], 0))
+        section_rows.append(section_row)
+        region_sections[section_row.table_name] = (section_rows, section_row.total_count)
+    return sections
+
+
+def format_section_rows(section_rows: List[SectionRow], table_name: str) -> List[dict]:
+    """섹션 행을 응답 형식으로 변환 (city는 객체 형태)"""
+    category = get_category_from_table(table_name)
+    formatted_attractions = []
+    for row in section_rows:
+        formatted_attraction = format_attraction_data(row, category, table_name)
+        formatted_attraction["city"] = {
+            "id": row.city.lower().replace(" ", "-") if row.city else "unknown",
+            "name": row.city or "알 수 없음",
+            "region": row.region or "알 수 없음"
+        }
+        formatted_attractions.append(formatted_attraction)
+    return formatted_attractions
+
+
+# 전체 관광지 스냅샷 (검색 등 인메모리 인덱스의 원본, 'attractions' 태그 무효화 시 재구성)
+attraction_snapshot = AttractionSnapshotStore(
+    CATEGORY_TABLES,
+    formatter=lambda attraction, table_name: format_attraction_data(
+        attraction, get_category_from_table(table_name), table_name
+    ),
+    session_factory=SessionLocal,
+    detail_formatter=build_attraction_detail
+)
+attraction_snapshot.register_index(SEARCH_INDEX_NAME, build_search_index)
+attraction_snapshot.register_index(SPATIAL_INDEX_NAME, build_spatial_index)
+attraction_snapshot.register_index(
+    CATALOG_INDEX_NAME,
+    lambda snapshot: build_attraction_catalog(snapshot, region_sorter=sort_regions_by_priority)
+)
+invalidation_bus.add_local_handler(attraction_snapshot.mark_stale)
+
+# 관광지 상세 문서 저장소 (스냅샷 재구성 시 스냅샷이 렌더링한 문서 중 바뀐 것만 갱신)
+attraction_details = AttractionDetailStore(CATEGORY_TABLES, build_attraction_detail)
+attraction_snapshot.register_index(DETAIL_INDEX_NAME, attraction_details.build_index)
 
 async def get_nearby_attractions(db: Session, selected_places: List[dict], radius_km: float = 1.0, limit: int = 50, category: str = None):
-    """선택한 장소들 기준으로 주변 관광지 검색"""
+    """선택한 장소들 기준으로 주변 관광지 검색 (인메모리 격자 인덱스 - 경유지 전체를 한 번에 질의)"""
     try:
         if not selected_places:
             return []
-        
-        nearby_attractions = []
-        processed_ids = set()  # 중복 방지
 
         # 카테고리 필터에 따른 테이블 선택
-        search_tables = {}
+        search_tables = None
         if category:
-            # 특정 카테고리에 맞는 테이블만 검색
-            for table_name, table_model in CATEGORY_TABLES.items():
-                if get_category_from_table(table_name) == category:
-                    search_tables[table_name] = table_model
-            logger.info(f"카테고리 '{category}' 필터 적용: {list(search_tables.keys())} 테이블에서 검색")
+            search_tables = [
+                table_name for table_name in CATEGORY_TABLES
+                if get_category_from_table(table_name) == category
+            ]
+            logger.info(f"카테고리 '{category}' 필터 적용: {search_tables} 테이블에서 검색")
         else:
-            # 카테고리 필터가 없으면 모든 테이블 검색
-            search_tables = CATEGORY_TABLES
             logger.info("전체 카테고리에서 검색")
 
+        # 좌표가 있는 경유지만 사용
+        waypoints = [
+            place for place in selected_places
+            if place.get('latitude') and place.get('longitude')
+        ]
+        if not waypoints:
+            return []
+
         # 각 경유지마다 균등하게 할당 (최소 10개씩은 보장)
-        places_count = len(selected_places)
-        limit_per_place = max(10, limit // places_count)
+        limit_per_place = max(10, limit // len(selected_places))
+        logger.info(f"경유지별 할당: {len(selected_places)}개 경유지, 각각 최대 {limit_per_place}개씩")
+
+        snapshot = await attraction_snapshot.get()
+        spatial_index = snapshot.indexes[SPATIAL_INDEX_NAME]
+        results_per_waypoint = spatial_index.within_radius_many(
+            [(float(place['latitude']), float(place['longitude'])) for place in waypoints],
+            radius_km,
+            tables=search_tables
+        )
 
-        logger.info(f"경유지별 할당: {places_count}개 경유지, 각각 최대 {limit_per_place}개씩")
+        nearby_attractions = []
+        processed_ids = set()  # 중복 방지
 
-        # 선택한 각 장소를 중심으로 검색
-        for place_index, selected_place in enumerate(selected_places):
-            if not selected_place.get('latitude') or not selected_place.get('longitude'):
-                continue
+        for selected_place, (doc_ids, distances) in zip(waypoints, results_per_waypoint):
+            current_place_count = 0
+            for doc_id, distance in zip(doc_ids.tolist(), distances.tolist()):
+                record = snapshot.records[doc_id]
+                unique_id = record["id"]
 
-            center_lat = float(selected_place['latitude'])
-            center_lng = float(selected_place['longitude'])
+                # 이미 처리된 장소 / 선택한 장소와 같은 장소는 제외
+                if unique_id in processed_ids or unique_id == selected_place.get('id'):
+                    continue
 
-            # 검색 범위 계산 (성능 최적화)
-            bounds = get_approximate_bounds(center_lat, center_lng, radius_km)
+                formatted_attraction = dict(record)
+                formatted_attraction['distance'] = round(distance, 2)  # 거리 정보 추가
+                formatted_attraction['nearbyTo'] = selected_place.get('name', '선택한 장소')  # 어느 장소 근처인지
 
-            # 현재 경유지에서 찾은 장소 수 카운트
-            current_place_count = 0
+                nearby_attractions.append(formatted_attraction)
+                processed_ids.add(unique_id)
+                current_place_count += 1
 
-            # 선택된 카테고리 테이블에서 검색
-            for table_name, table_model in search_tables.items():
+                # 현재 경유지에서 할당량 달성시 중단
                 if current_place_count >= limit_per_place:
                     break
-                try:
-                    # 범위 기반 필터링으로 성능 최적화 - LIMIT 제거로 범위 내 모든 데이터 조회
-                    query = db.query(table_model).filter(
-                        table_model.latitude.isnot(None),
-                        table_model.longitude.isnot(None),
-                        table_model.latitude.between(bounds['min_lat'], bounds['max_lat']),
-                        table_model.longitude.between(bounds['min_lng'], bounds['max_lng'])
-                    )
-                    
-                    attractions = query.all()
-                    logger.info(f"Table {table_name}: found {len(attractions)} attractions in bounds")
-
-                    # 거리 계산하고 정렬해서 가까운 장소부터 처리
-                    attractions_with_distance = []
-                    for attraction in attractions:
-                        distance = calculate_distance(
-                            center_lat, center_lng,
-                            float(attraction.latitude), float(attraction.longitude)
-                        )
-                        if distance <= radius_km:
-                            attractions_with_distance.append((attraction, distance))
-
-                    # 거리순으로 정렬
-                    attractions_with_distance.sort(key=lambda x: x[1])
-
-                except Exception as table_error:
-                    logger.error(f"Error querying table {table_name}: {str(table_error)}")
-                    continue
-                
-                # 거리순으로 정렬된 장소들을 처리
-                for attraction, distance in attractions_with_distance:
-                    # 현재 경유지 할당량 체크
-                    if current_place_count >= limit_per_place:
-                        break
-
-                    # 고유 ID 생성
-                    unique_id = f"{table_name}_{attraction.id}"
-
-                    # 이미 처리된 장소는 스킵
-                    if unique_id in processed_ids:
-                        continue
-
-                    # 선택한 장소와 같은 장소는 제외
-                    if unique_id == selected_place.get('id'):
-                        continue
-
-                    category = get_category_from_table(table_name)
-                    formatted_attraction = format_attraction_data(attraction, category, table_name)
-                    formatted_attraction['distance'] = round(distance, 2)  # 거리 정보 추가
-                    formatted_attraction['nearbyTo'] = selected_place.get('name', '선택한 장소')  # 어느 장소 근처인지
-
-                    nearby_attractions.append(formatted_attraction)
-                    processed_ids.add(unique_id)
-                    current_place_count += 1
-
-                    # 현재 경유지에서 할당량 달성시 중단
-                    if current_place_count >= limit_per_place:
-                        break
-        
+
         # 거리 순으로 정렬
         nearby_attractions.sort(key=lambda x: x['distance'])
-        
+
         return nearby_attractions[:limit]
-        
+
     except Exception as e:
         logger.error(f"Error in get_nearby_attractions: {str(e)}")
         return []
 
-async def get_db_fallback_places(db: Session, region: str, category: str = None, limit: int = 20, page: int = 0, exclude_ids: set = None):
-    """추천 엔진 실패시 DB에서 직접 가져오는 fallback"""
+async def get_db_fallback_places(
+    db: Session,
+    region: str,
+    category: str = None,
+    limit: int = 20,
+    page: int = 0,
+    exclude_ids: set = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    추천 엔진 실패시 DB에서 직접 가져오는 fallback
+
+    테이블 순서 + id 오름차순의 keyset 순서로 조회합니다. cursor 지정 시 (테이블, id) 이후부터 이어서 조회하므로
+    깊은 페이지도 OFFSET 스캔이 없고, 첫 페이지(cursor 없음)도 같은 순서라 발급한 커서가 그 페이지에서 정확히 이어집니다.
+    cursor 없이 page > 0을 지정한 레거시 요청은 테이블별 OFFSET으로 조회하며 커서를 발급하지 않습니다.
+
+    Returns:
+        (장소 목록, 다음 페이지 커서)
+    """
     places = []
     exclude_ids = exclude_ids or set()
     
@@ -282,27 +389,45 @@ async def get_db_fallback_places(db: Session, region: str, category: str = None,
     else:
         search_tables = CATEGORY_TABLES
     
-    for table_name, table_model in search_tables.items():
+    # 커서 위치: 해당 테이블의 마지막 id 이후부터, 앞선 테이블은 건너뜀
+    table_names = list(search_tables)
+    start_index, last_id = 0, None
+    if cursor:
+        position = decode_cursor(cursor, required=("table", "id"))
+        if position["table"] in table_names:
+            start_index, last_id = table_names.index(position["table"]), position["id"]
+    
+    next_cursor = None
+    for table_index in range(start_index, len(table_names)):
         if len(places) >= limit:
             break
+        table_name = table_names[table_index]
+        table_model = search_tables[table_name]
             
-        # 지역으로 필터링
-        if region == "전국":
-            # 전국일 때는 모든 데이터 가져오기
-            query = db.query(table_model).offset(page * limit).limit(limit - len(places))
-        else:
-            query = db.query(table_model).filter(
+        # 지역으로 필터링 (전국일 때는 모든 데이터)
+        query = db.query(table_model)
+        if region != "전국":
+            query = query.filter(
                 or_(
                     table_model.region.ilike(f"%{region}%"),
                     table_model.region == region,
                     table_model.city.ilike(f"%{region}%")
                 )
-            ).offset(page * limit).limit(limit - len(places))
+            )
+        
+        # 항상 id 순서로 조회 (ORDER BY 없이는 페이지 간 순서가 보장되지 않음)
+        query = query.order_by(table_model.id)
+        if cursor:
+            if table_index == start_index and last_id is not None:
+                query = query.filter(table_model.id > last_id)
+        elif page:
+            query = query.offset(page * limit)
         
-        attractions = query.all()
+        attractions = query.limit(limit - len(places)).all()
         table_category = get_category_from_table(table_name)
         
         for attraction in attractions:
+            next_cursor = encode_cursor(table=table_name, id=attraction.id)
             place_id = f"{table_name}_{attraction.id}"
             if place_id not in exclude_ids:
                 formatted_place = format_attraction_data(attraction, table_category, table_name)
@@ -311,54 +436,29 @@ async def get_db_fallback_places(db: Session, region: str, category: str = None,
                 if len(places) >= limit:
                     break
     
-    return places
+    # 모든 테이블을 소진했거나 레거시 OFFSET 페이지면 커서 없음
+    # (테이블별 OFFSET 페이지의 마지막 행은 keyset 순서의 연속 위치가 아님)
+    if len(places) < limit or (not cursor and page):
+        next_cursor = None
+    
+    return places, next_cursor
 
 async def get_attractions_by_city(db: Session, city_name: str, limit: int = 8):
-    """도시별 관광지 조회 - 각 카테고리에서 골고루 가져오기"""
-    attractions = []
-    
-    # 각 카테고리에서 1개씩 가져와서 다양성 확보
-    for table_name, table_model in CATEGORY_TABLES.items():
-        query_result = db.query(table_model).filter(
-            table_model.city.ilike(f"%{city_name}%")
-        ).limit(1).all()  # 각 카테고리에서 1개씩
-        
-        category = get_category_from_table(table_name)
-        for attraction in query_result:
-            attractions.append(format_attraction_data(attraction, category, table_name))
-    
-    # 아직 limit에 도달하지 않았으면 추가로 더 가져오기
-    if len(attractions) < limit:
-        for table_name, table_model in CATEGORY_TABLES.items():
-            if len(attractions) >= limit:
-                break
-            query_result = db.query(table_model).filter(
-                table_model.city.ilike(f"%{city_name}%")
-            ).offset(1).limit(1).all()  # 두 번째부터 가져오기
-            
-            category = get_category_from_table(table_name)
-            for attraction in query_result:
-                attractions.append(format_attraction_data(attraction, category, table_name))
-    
-    return attractions[:limit]  # 최대 limit개까지만
+    """도시별 관광지 조회 - 각 카테고리에서 골고루 가져오기 (카탈로그 기반, DB 조회 없음)"""
+    snapshot = await attraction_snapshot.get()
+    catalog = snapshot.indexes[CATALOG_INDEX_NAME]
+    return [
+        dict(snapshot.records[doc_id])
+        for _, doc_id in catalog.city_sample(city_name, limit)
+    ]
 
 async def get_cities_with_attractions(db: Session, offset: int = 0, limit: int = 3):
     """관광지가 있는 도시들 조회"""
     cities_data = []
     
-    # 모든 테이블에서 도시 정보 수집
-    all_cities = set()
-    for table_model in CATEGORY_TABLES.values():
-        cities = db.query(table_model.city, table_model.region).filter(
-            table_model.city.isnot(None)
-        ).distinct().all()
-        
-        for city, region in cities:
-            if city and city.strip():
-                all_cities.add((city.strip(), region.strip() if region else ""))
-    
-    # 도시 목록 정렬
-    sorted_cities = sorted(list(all_cities))
+    # 카탈로그에서 (도시, 지역) 목록 조회 (정렬 완료 상태)
+    catalog = await attraction_snapshot.get_index(CATALOG_INDEX_NAME)
+    sorted_cities = catalog.cities
     
     # 페이지네이션 적용
     paginated_cities = sorted_cities[offset:offset + limit]
@@ -442,21 +542,9 @@ async def get_nearby_places(
 async def get_regions(db: Session = Depends(get_db)):
     """사용 가능한 지역 목록을 가져옵니다."""
     try:
-        regions = set()
-        
-        # 모든 테이블에서 지역 정보 수집
-        for table_model in CATEGORY_TABLES.values():
-            region_results = db.query(table_model.region).filter(
-                table_model.region.isnot(None),
-                table_model.region != ""
-            ).distinct().all()
-            
-            for (region,) in region_results:
-                if region and region.strip():
-                    regions.add(region.strip())
-        
-        # 지역 목록을 우선순위에 따라 정렬
-        sorted_regions = sort_regions_by_priority(list(regions))
+        # 카탈로그의 지역 목록 (우선순위 정렬 완료 상태)
+        catalog = await attraction_snapshot.get_index(CATALOG_INDEX_NAME)
+        sorted_regions = catalog.regions
         
         return {
             "regions": sorted_regions,
@@ -508,56 +596,33 @@ async def get_filtered_attractions_by_category(
                 detail="지역을 선택해주세요."
             )
         
-        # 카테고리별로 그룹화된 결과
-        category_sections = []
+        # 모든 카테고리의 현재 페이지를 한 번의 쿼리로 조회
+        region_sections = fetch_category_sections(db, [region], limit, offset=page * limit)[region]
         
-        # 각 카테고리별로 데이터 조회
-        for table_name, table_model in CATEGORY_TABLES.items():
+        # 카테고리별로 그룹화된 결과 (결과가 있는 카테고리만 포함)
+        category_sections = []
+        for table_name in CATEGORY_TABLES:
+            if table_name not in region_sections:
+                continue
             category = get_category_from_table(table_name)
-            
-            # 해당 카테고리에서 지역 필터 적용
-            query = db.query(table_model).filter(
-                or_(
-                    table_model.region.ilike(f"%{region}%"),
-                    table_model.region == region
-                )
-            )
-            
-            # 페이지네이션 적용
-            offset = page * limit
-            attractions = query.offset(offset).limit(limit).all()
-            
-            # 결과가 있는 카테고리만 포함
-            if attractions:
-                formatted_attractions = []
-                for attraction in attractions:
-                    formatted_attraction = format_attraction_data(attraction, category, table_name)
-                    formatted_attraction["city"] = {
-                        "id": attraction.city.lower().replace(" ", "-") if attraction.city else "unknown",
-                        "name": attraction.city or "알 수 없음",
-                        "region": attraction.region or "알 수 없음"
-                    }
-                    formatted_attractions.append(formatted_attraction)
-                
-                # 카테고리 섹션 생성
-                category_sections.append({
-                    "category": category,
-                    "categoryName": get_category_korean_name(category),
-                    "attractions": formatted_attractions,
-                    "total": len(formatted_attractions)
-                })
+            formatted_attractions = format_section_rows(region_sections[table_name][0], table_name)
+            category_sections.append({
+                "category": category,
+                "categoryName": get_category_korean_name(category),
+                "attractions": formatted_attractions,
+                "total": len(formatted_attractions)
+            })
         
-        # 카테고리별 총 개수 계산
-        total_by_category = {}
-        for table_name, table_model in CATEGORY_TABLES.items():
-            category = get_category_from_table(table_name)
-            query = db.query(table_model).filter(
-                or_(
-                    table_model.region.ilike(f"%{region}%"),
-                    table_model.region == region
-                )
+        # 카테고리별 총 개수 (윈도 카운트, 현재 페이지가 비어 있는 카테고리는 카탈로그 집계값)
+        catalog = await attraction_snapshot.get_index(CATALOG_INDEX_NAME)
+        table_counts = catalog.table_counts(region)
+        total_by_category = {
+            get_category_from_table(table_name): (
+                region_sections[table_name][1] if table_name in region_sections
+                else table_counts.get(table_name, 0)
             )
-            total_by_category[category] = query.count()
+            for table_name in CATEGORY_TABLES
+        }
         
         return {
             "region": region,
@@ -664,20 +729,9 @@ async def get_cities_by_category(
 ):
     """지역별로 카테고리별 구분된 섹션을 반환합니다."""
     try:
-        # 모든 지역 수집
-        all_regions = set()
-        for table_model in CATEGORY_TABLES.values():
-            region_results = db.query(table_model.region).filter(
-                table_model.region.isnot(None),
-                table_model.region != ""
-            ).distinct().all()
-            
-            for (region,) in region_results:
-                if region and region.strip():
-                    all_regions.add(region.strip())
-        
-        # 지역을 우선순위에 따라 정렬
-        sorted_regions = sort_regions_by_priority(list(all_regions))
+        # 카탈로그의 지역 목록 (우선순위 정렬 완료 상태)
+        catalog = await attraction_snapshot.get_index(CATALOG_INDEX_NAME)
+        sorted_regions = catalog.regions
         
         # 페이지네이션 적용
         offset = page * limit
@@ -685,43 +739,25 @@ async def get_cities_by_category(
         
         cities_data = []
         
+        # 페이지의 모든 지역 × 카테고리를 한 번의 쿼리로 조회 (카테고리별 최대 10개)
+        sections_by_region = fetch_category_sections(db, paginated_regions, limit=10)
+        
         for region in paginated_regions:
-            # 해당 지역의 카테고리별 데이터 조회
-            category_sections = []
+            region_sections = sections_by_region[region]
             
-            for table_name, table_model in CATEGORY_TABLES.items():
+            # 결과가 있는 카테고리만 포함
+            category_sections = []
+            for table_name in CATEGORY_TABLES:
+                if table_name not in region_sections:
+                    continue
                 category = get_category_from_table(table_name)
-                
-                # 해당 카테고리에서 지역 필터 적용
-                query = db.query(table_model).filter(
-                    or_(
-                        table_model.region.ilike(f"%{region}%"),
-                        table_model.region == region
-                    )
-                )
-                
-                # 각 카테고리에서 최대 10개씩 가져오기
-                attractions = query.limit(10).all()
-                
-                # 결과가 있는 카테고리만 포함
-                if attractions:
-                    formatted_attractions = []
-                    for attraction in attractions:
-                        formatted_attraction = format_attraction_data(attraction, category, table_name)
-                        formatted_attraction["city"] = {
-                            "id": attraction.city.lower().replace(" ", "-") if attraction.city else "unknown",
-                            "name": attraction.city or "알 수 없음",
-                            "region": attraction.region or "알 수 없음"
-                        }
-                        formatted_attractions.append(formatted_attraction)
-                    
-                    # 카테고리 섹션 생성
-                    category_sections.append({
-                        "category": category,
-                        "categoryName": get_category_korean_name(category),
-                        "attractions": formatted_attractions,
-                        "total": len(formatted_attractions)
-                    })
+                formatted_attractions = format_section_rows(region_sections[table_name][0], table_name)
+                category_sections.append({
+                    "category": category,
+                    "categoryName": get_category_korean_name(category),
+                    "attractions": formatted_attractions,
+                    "total": len(formatted_attractions)
+                })
             
             # 카테고리가 있는 지역만 포함
             if category_sections:
@@ -846,8 +882,13 @@ async def get_city_details(city_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{table_name}/{attraction_id}")
-async def get_attraction_details_by_table(table_name: str, attraction_id: str, db: Session = Depends(get_db)):
-    """특정 테이블에서 관광지 상세 정보를 가져옵니다."""
+async def get_attraction_details_by_table(
+    table_name: str,
+    attraction_id: str,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """특정 테이블에서 관광지 상세 정보를 가져옵니다. (미리 렌더링된 상세 문서 + ETag)"""
     try:
         # 테이블명 검증
         if table_name not in CATEGORY_TABLES:
@@ -855,40 +896,18 @@ async def get_attraction_details_by_table(table_name: str, attraction_id: str, d
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"잘못된 테이블명: {table_name}"
             )
-        
-        table_model = CATEGORY_TABLES[table_name]
-        attraction = db.query(table_model).filter(
-            table_model.id == int(attraction_id)
-        ).first()
-        
-        if not attraction:
+
+        place_id = int(attraction_id)
+        envelope = await resolve_attraction_detail(db, [(table_name, place_id)])
+        if envelope is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="관광지를 찾을 수 없습니다."
             )
-        
-        category = get_category_from_table(table_name)
-        formatted_attraction = format_attraction_data(attraction, category, table_name)
-        
-        # 추가 상세 정보 포함
-        formatted_attraction.update({
-            "city": {
-                "id": attraction.city.lower().replace(" ", "-") if attraction.city else "unknown",
-                "name": attraction.city or "알 수 없음",
-                "region": attraction.region or "알 수 없음"
-            },
-            "detailedInfo": getattr(attraction, 'detailed_info', None),
-            "closedDays": getattr(attraction, 'closed_days', None),
-            "majorCategory": getattr(attraction, 'major_category', None),
-            "middleCategory": getattr(attraction, 'middle_category', None),
-            "minorCategory": getattr(attraction, 'minor_category', None),
-            "imageUrls": attraction.image_urls if attraction.image_urls else [],
-            "createdAt": attraction.created_at.isoformat() if attraction.created_at else None,
-            "updatedAt": attraction.updated_at.isoformat() if attraction.updated_at else None,
-            "sourceTable": table_name  # 원본 테이블 정보 추가
-        })
-        
-        return formatted_attraction
+
+        # 조회수 증가 (/{attraction_id} 경로와 같은 table_name_id 키로 집계)
+        view_counter.record(f"{table_name}_{place_id}")
+        return detail_response(envelope, if_none_match)
         
     except HTTPException:
         raise
@@ -911,81 +930,38 @@ async def search_attractions(
     region: Optional[str] = Query(None, description="지역 필터"),
     page: int = Query(0, ge=0, description="페이지 번호 (0부터 시작)"),
     limit: int = Query(50, ge=1, le=200, description="페이지당 결과 수"),
+    cursor: Optional[str] = Query(None, description="다음 페이지 커서 (지정 시 page 대신 사용)"),
     db: Session = Depends(get_db)
 ):
-    """관광지 검색 기능"""
+    """관광지 검색 기능 (6개 테이블 통합 인메모리 인덱스 - 전역 랭킹/페이지네이션)"""
     try:
-        results = []
-        
         # 카테고리 필터에 따른 테이블 선택
-        search_tables = {}
+        search_tables = None
         if category:
-            # 카테고리에 맞는 테이블만 검색
-            for table_name, table_model in CATEGORY_TABLES.items():
-                table_category = get_category_from_table(table_name)
-                if table_category == category:
-                    search_tables[table_name] = table_model
-        else:
-            # 모든 테이블 검색
-            search_tables = CATEGORY_TABLES
+            search_tables = [
+                table_name for table_name in CATEGORY_TABLES
+                if get_category_from_table(table_name) == category
+            ]
         
-        # 각 테이블에서 검색
-        seen_attractions = set()  # 중복 방지를 위한 집합
+        # 커서는 랭킹 목록 내 위치 (질의별 랭킹 결과가 캐싱되어 있어 깊은 페이지도 비용 동일)
+        offset = decode_cursor(cursor, required=("offset",))["offset"] if cursor else page * limit
         
-        for table_name, table_model in search_tables.items():
-            query = db.query(table_model)
-            
-            # 검색 키워드 필터
-            search_filter = or_(
-                table_model.name.ilike(f"%{q}%"),
-                table_model.overview.ilike(f"%{q}%"),
-                table_model.address.ilike(f"%{q}%"),
-                table_model.city.ilike(f"%{q}%")
-            )
-            query = query.filter(search_filter)
-            
-            # 지역 필터
-            if region:
-                query = query.filter(table_model.region.ilike(f"%{region}%"))
-            
-            # 총 개수를 먼저 구하기
-            total_count = query.count()
-            
-            # 페이지네이션 적용하여 검색 결과 조회
-            offset = page * limit
-            attractions = query.offset(offset).limit(limit).all()
-            
-            # 결과 포맷팅 및 중복 제거
-            table_category = get_category_from_table(table_name)
-            for attraction in attractions:
-                # 중복 체크: 이름과 주소가 같은 항목은 제외
-                attraction_key = f"{attraction.name}_{attraction.address}"
-                if attraction_key in seen_attractions:
-                    continue
-                seen_attractions.add(attraction_key)
-                
-                formatted_attraction = format_attraction_data(attraction, table_category, table_name)
-                formatted_attraction["city"] = {
-                    "id": attraction.city.lower().replace(" ", "-") if attraction.city else "unknown",
-                    "name": attraction.city or "알 수 없음",
-                    "region": attraction.region or "알 수 없음"
-                }
-                results.append(formatted_attraction)
+        snapshot = await attraction_snapshot.get()
+        doc_ids, total_results = snapshot.indexes[SEARCH_INDEX_NAME].search(
+            q, tables=search_tables, region=region, offset=offset, limit=limit
+        )
+        has_more = offset + limit < total_results
         
-        # 전체 결과 개수 계산 (모든 테이블의 매칭 결과 합계)
-        total_results = 0
-        for table_name, table_model in search_tables.items():
-            query = db.query(table_model)
-            search_filter = or_(
-                table_model.name.ilike(f"%{q}%"),
-                table_model.overview.ilike(f"%{q}%"),
-                table_model.address.ilike(f"%{q}%"),
-                table_model.city.ilike(f"%{q}%")
-            )
-            query = query.filter(search_filter)
-            if region:
-                query = query.filter(table_model.region.ilike(f"%{region}%"))
-            total_results += query.count()
+        results = []
+        for doc_id in doc_ids:
+            formatted_attraction = dict(snapshot.records[doc_id])
+            city = snapshot.cities[doc_id]
+            formatted_attraction["city"] = {
+                "id": city.lower().replace(" ", "-") if city else "unknown",
+                "name": city or "알 수 없음",
+                "region": snapshot.regions[doc_id] or "알 수 없음"
+            }
+            results.append(formatted_attraction)
         
         return {
             "results": results,
@@ -993,13 +969,16 @@ async def search_attractions(
             "totalAvailable": total_results,
             "page": page,
             "limit": limit,
-            "hasMore": (page + 1) * limit < total_results,
+            "hasMore": has_more,
+            "nextCursor": encode_cursor(offset=offset + limit) if has_more else None,
             "query": q,
             "filters": {
                 "category": category,
                 "region": region
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1013,6 +992,7 @@ async def get_filtered_attractions(
     category: Optional[str] = Query(None, description="카테고리 필터"),
     page: int = Query(0, ge=0, description="페이지 번호 (0부터 시작)"),
     limit: int = Query(50, ge=1, le=100, description="페이지당 결과 수"),
+    cursor: Optional[str] = Query(None, description="DB fallback 다음 페이지 커서 (지정 시 page 대신 사용)"),
     current_user = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
@@ -1029,7 +1009,8 @@ async def get_filtered_attractions(
         
         # 캐시 키 생성 (사용자별, 파라미터별)
         user_id = str(current_user.user_id) if current_user and hasattr(current_user, 'user_id') else "anonymous"
-        cache_key = f"filtered_attractions:{user_id}:{region}:{category}:{page}:{limit}"
+        page_key = f"cursor:{cursor}" if cursor else page
+        cache_key = f"filtered_attractions:{user_id}:{region}:{category}:{page_key}:{limit}"
         
         # 캐시에서 조회 시도
         cached_result = cache.get(cache_key)
@@ -1039,8 +1020,12 @@ async def get_filtered_attractions(
         
         results = []
         
+        # 커서는 DB fallback 페이지에서만 발급되므로 추천 엔진을 거치지 않고 같은 keyset으로 이어서 조회
+        if cursor:
+            logger.info("Cursor given - continuing DB fallback keyset pagination")
+
         # 로그인 상태에 따른 추천 알고리즘 적용
-        if current_user and hasattr(current_user, 'user_id'):
+        elif current_user and hasattr(current_user, 'user_id'):
             # 로그인 시: 개인화 추천 + 코사인 유사도 혼합
             user_id = str(current_user.user_id)
             logger.info(f"Personalized recommendations for user: {user_id}")
@@ -1176,31 +1161,30 @@ async def get_filtered_attractions(
                 }
                 results.append(formatted_attraction)
         
-        # v2 추천 엔진이 0개를 반환하면 DB fallback 사용
-        if len(results) == 0:
-            logger.info("v2 추천 엔진이 0개 반환 - DB fallback 사용")
-            fallback_places = await get_db_fallback_places(db, region, category, limit, page)
+        # v2 추천 엔진이 0개를 반환하면 DB fallback 사용 (커서 지정 시에는 항상 DB fallback)
+        next_cursor = None
+        used_fallback = len(results) == 0
+        if used_fallback:
+            logger.info("v2 추천 엔진 미사용/0개 반환 - DB fallback 사용")
+            fallback_places, next_cursor = await get_db_fallback_places(
+                db, region, category, limit, page, cursor=cursor
+            )
             results.extend(fallback_places)
             logger.info(f"DB fallback에서 {len(fallback_places)}개 장소 반환")
         
-        # 전체 결과 수 계산 (페이지네이션 없이)
-        total_available = 0
-        
-        for table_name, table_model in CATEGORY_TABLES.items():
-            query = db.query(table_model)
-            if region and region != '전국':
-                query = query.filter(table_model.region.ilike(f"%{region}%"))
-            if category:
-                table_category = get_category_from_table(table_name)
-                if table_category == category:
-                    count = query.count()
-                    total_available += count
-            else:
-                count = query.count()
-                total_available += count
+        # 전체 결과 수 (카탈로그 집계값 - 매 페이지 테이블별 count() 생략)
+        catalog = await attraction_snapshot.get_index(CATALOG_INDEX_NAME)
+        table_counts = catalog.table_counts("" if region == '전국' else region)
+        total_available = sum(
+            count for table_name, count in table_counts.items()
+            if not category or get_category_from_table(table_name) == category
+        )
         
-        # hasMore 계산
-        has_more = (page + 1) * limit < total_available
+        # hasMore 계산 (keyset DB fallback 페이지는 커서 유무로, 추천 엔진/레거시 page 요청은 전체 결과 수로 판단)
+        if used_fallback and (cursor or not page):
+            has_more = next_cursor is not None
+        else:
+            has_more = (page + 1) * limit < total_available
         
         result = {
             "attractions": results,
@@ -1209,6 +1193,7 @@ async def get_filtered_attractions(
             "page": page,
             "limit": limit,
             "hasMore": has_more,
+            "nextCursor": next_cursor,
             "filters": {
                 "region": region,
                 "category": category
@@ -1231,185 +1216,26 @@ async def get_filtered_attractions(
 
 
 @router.get("/{attraction_id}")
-async def get_attraction_details(attraction_id: str, db: Session = Depends(get_db)):
-    """특정 관광지의 상세 정보를 가져옵니다. (Redis 캐싱 적용)"""
+async def get_attraction_details(
+    attraction_id: str,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """특정 관광지의 상세 정보를 가져옵니다. (미리 렌더링된 상세 문서 + ETag, 304 재검증 지원)"""
     try:
-        # 캐시에서 조회 시도
-        cached_result = get_cached_attraction_data(attraction_id)
-        if cached_result is not None:
-            logger.info(f"Cache hit for attraction: {attraction_id}")
-            # 조회수 증가
-            increment_view_count(attraction_id)
-            return cached_result
-        
-        logger.info(f"Cache miss for attraction: {attraction_id}")
-        # 새로운 ID 형식 처리: table_name_id 형식
-        if "_" in attraction_id:
-            # 테이블명이 여러 단어로 구성된 경우를 고려하여 마지막 _ 기준으로 분리
-            parts = attraction_id.split("_")
-            if len(parts) >= 2:
-                # 마지막 부분이 숫자인지 확인
-                if parts[-1].isdigit():
-                    original_id = parts[-1]
-                    table_name = "_".join(parts[:-1])
-                else:
-                    # 마지막 부분이 숫자가 아니면 첫 번째 _ 기준으로 분리
-                    table_name, original_id = attraction_id.split("_", 1)
-            else:
-                table_name, original_id = attraction_id.split("_", 1)
-            
-            # 테이블명 검증
-            if table_name not in CATEGORY_TABLES:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"잘못된 테이블명: {table_name}"
-                )
-            
-            table_model = CATEGORY_TABLES[table_name]
-            attraction = db.query(table_model).filter(
-                table_model.id == int(original_id)
-            ).first()
-            
-            if not attraction:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="관광지를 찾을 수 없습니다."
-                )
-            
-            category = get_category_from_table(table_name)
-            formatted_attraction = format_attraction_data(attraction, category, table_name)
-            
-            # 추가 상세 정보 포함
-            formatted_attraction.update({
-                "city": {
-                    "id": attraction.city.lower().replace(" ", "-") if attraction.city else "unknown",
-                    "name": attraction.city or "알 수 없음",
-                    "region": attraction.region or "알 수 없음"
-                },
-                "detailedInfo": getattr(attraction, 'detailed_info', None),
-                "closedDays": getattr(attraction, 'closed_days', None),
-                "majorCategory": getattr(attraction, 'major_category', None),
-                "middleCategory": getattr(attraction, 'middle_category', None),
-                "minorCategory": getattr(attraction, 'minor_category', None),
-                "imageUrls": attraction.image_urls if attraction.image_urls else [],
-                "createdAt": attraction.created_at.isoformat() if attraction.created_at else None,
-                "updatedAt": attraction.updated_at.isoformat() if attraction.updated_at else None
-            })
-            
-            # 조회수 증가
-            increment_view_count(attraction_id)
-            
-            # 결과를 캐시에 저장 (2시간)
-            cache_attraction_data(attraction_id, formatted_attraction, expire=7200)
-            
-            return formatted_attraction
-        
-        else:
-            # 기존 ID 형식 (숫자만) - 하위 호환성을 위해 유지
-            matching_attractions = []
-            for table_name, table_model in CATEGORY_TABLES.items():
-                attraction = db.query(table_model).filter(
-                    table_model.id == int(attraction_id)
-                ).first()
-                
-                if attraction:
-                    category = get_category_from_table(table_name)
-                    formatted_attraction = format_attraction_data(attraction, category, table_name)
-                    
-                    # 추가 상세 정보 포함
-                    formatted_attraction.update({
-                        "city": {
-                            "id": attraction.city.lower().replace(" ", "-") if attraction.city else "unknown",
-                            "name": attraction.city or "알 수 없음",
-                            "region": attraction.region or "알 수 없음"
-                        },
-                        "detailedInfo": getattr(attraction, 'detailed_info', None),
-                        "closedDays": getattr(attraction, 'closed_days', None),
-                        "majorCategory": getattr(attraction, 'major_category', None),
-                        "middleCategory": getattr(attraction, 'middle_category', None),
-                        "minorCategory": getattr(attraction, 'minor_category', None),
-                        "imageUrls": attraction.image_urls if attraction.image_urls else [],
-                        "createdAt": attraction.created_at.isoformat() if attraction.created_at else None,
-                        "updatedAt": attraction.updated_at.isoformat() if attraction.updated_at else None
-                    })
-                    
-                    matching_attractions.append((table_name, formatted_attraction))
-            
-            # 매칭된 결과가 있으면 첫 번째 결과 반환
-            if matching_attractions:
-                result = matching_attractions[0][1]
-                
-                # 조회수 증가
-                increment_view_count(attraction_id)
-                
-                # 결과를 캐시에 저장 (2시간)
-                cache_attraction_data(attraction_id, result, expire=7200)
-                
-                return result
-            
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="관광지를 찾을 수 없습니다."
-            )
-        
-    except HTTPException:
-        raise
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="잘못된 관광지 ID입니다."
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"관광지 상세 정보 조회 중 오류 발생: {str(e)}"
-        )
+        # table_name_id 형식 또는 기존 숫자 ID 형식
+        place_keys = parse_detail_place_keys(attraction_id)
 
-
-@router.get("/{table_name}/{attraction_id}")
-async def get_attraction_details_by_table(table_name: str, attraction_id: str, db: Session = Depends(get_db)):
-    """특정 테이블에서 관광지 상세 정보를 가져옵니다."""
-    try:
-        # 테이블명 검증
-        if table_name not in CATEGORY_TABLES:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"잘못된 테이블명: {table_name}"
-            )
-        
-        table_model = CATEGORY_TABLES[table_name]
-        attraction = db.query(table_model).filter(
-            table_model.id == int(attraction_id)
-        ).first()
-        
-        if not attraction:
+        envelope = await resolve_attraction_detail(db, place_keys)
+        if envelope is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="관광지를 찾을 수 없습니다."
             )
-        
-        category = get_category_from_table(table_name)
-        formatted_attraction = format_attraction_data(attraction, category, table_name)
-        
-        # 추가 상세 정보 포함
-        formatted_attraction.update({
-            "city": {
-                "id": attraction.city.lower().replace(" ", "-") if attraction.city else "unknown",
-                "name": attraction.city or "알 수 없음",
-                "region": attraction.region or "알 수 없음"
-            },
-            "detailedInfo": getattr(attraction, 'detailed_info', None),
-            "closedDays": getattr(attraction, 'closed_days', None),
-            "majorCategory": getattr(attraction, 'major_category', None),
-            "middleCategory": getattr(attraction, 'middle_category', None),
-            "minorCategory": getattr(attraction, 'minor_category', None),
-            "imageUrls": attraction.image_urls if attraction.image_urls else [],
-            "createdAt": attraction.created_at.isoformat() if attraction.created_at else None,
-            "updatedAt": attraction.updated_at.isoformat() if attraction.updated_at else None,
-            "sourceTable": table_name  # 원본 테이블 정보 추가
-        })
-        
-        return formatted_attraction
+
+        # 조회수 증가 (304 재검증도 상세 조회로 집계)
+        view_counter.record(attraction_id)
+        return detail_response(envelope, if_none_match)
         
     except HTTPException:
         raise
@@ -1423,6 +1249,3 @@ async def get_attraction_details_by_table(table_name: str, attraction_id: str, d
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"관광지 상세 정보 조회 중 오류 발생: {str(e)}"
         )
-
-
-
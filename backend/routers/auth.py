@@ -6,9 +6,10 @@ import logging
 import uuid
 from datetime import datetime
 from database import get_db
-from models import User, OAuthAccount
+from models import User, OAuthAccount, UserPreference
 from schemas import UserCreate, UserResponse, Token
 from auth_utils import verify_password, get_password_hash, create_access_token, get_current_user
+from user_preference_cache import user_preference_cache
 
 # 로깅 설정
 logging.basicConfig(level=logging.DEBUG)
@@ -18,6 +19,15 @@ router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
+async def warm_preference_cache(db: Session, user_id: str):
+    """로그인 시 여행 취향 캐시 채우기 (이후 추천 피드 캐시 키 생성 시 DB 조회 생략)"""
+    try:
+        preference = db.query(UserPreference).filter(UserPreference.user_id == user_id).first()
+        await user_preference_cache.set(user_id, preference)
+    except Exception as e:
+        logger.warning(f"Preference cache warm-up failed for {user_id}: {e}")
+
+
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate, db: Session = Depends(get_db)):
     logger.info(f"Register request received: email={user.email}, name={user.name}")
@@ -127,6 +137,7 @@ async def login(request: Request, db: Session = Depends(get_db)):
         # 토큰 생성
         logger.info("Step 13: Creating access token...")
         access_token = create_access_token(data={"sub": user.email})
+        await warm_preference_cache(db, user.user_id)
         logger.info(f"Step 14: Login successful for user: {user.email}")
         return {"access_token": access_token, "token_type": "bearer"}
         
@@ -178,6 +189,7 @@ async def nextauth_callback(request: Request, db: Session = Depends(get_db)):
             # 기존 OAuth 계정이 있으면 해당 사용자로 로그인
             user = existing_oauth.user
             access_token = create_access_token(data={"sub": user.email})
+            await warm_preference_cache(db, user.user_id)
             logger.info(f"Existing OAuth user login: {user.email}")
             return {"access_token": access_token, "token_type": "bearer", "user": user}
         
@@ -200,6 +212,7 @@ async def nextauth_callback(request: Request, db: Session = Depends(get_db)):
             db.commit()
             
             access_token = create_access_token(data={"sub": existing_user.email})
+            await warm_preference_cache(db, existing_user.user_id)
             logger.info(f"OAuth account linked to existing user: {existing_user.email}")
             return {"access_token": access_token, "token_type": "bearer", "user": existing_user}
         
@@ -3,6 +3,7 @@ AWS Batch 처리 관련 API 엔드포인트
 - 배치 작업 완료 webhook 처리
 - 사용자 행동 벡터 업데이트
 - 장소 벡터 업데이트
+- 관광지 데이터 적재 완료 알림 (캐시 무효화)
 - 배치 작업 상태 조회
 """
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, status
@@ -18,6 +19,8 @@ from botocore.exceptions import ClientError
 from database import get_db
 from models import User, UserAction, UserBehaviorVector, PlaceVector
 from auth_utils import get_current_user
+from cache_invalidation import invalidation_bus, user_tag, place_tag
+from services.attraction_snapshot import ATTRACTIONS_TAG
 import os
 
 # 로깅 설정
@@ -74,6 +77,11 @@ class PlaceVectorUpdate(BaseModel):
     popularity_score: float = 0.0
     engagement_score: float = 0.0
 
+class AttractionDataUpdate(BaseModel):
+    """관광지 데이터 적재/수정 완료 알림 (places 미지정 시 전체 갱신)"""
+    source: str
+    places: List[str] = []  # "{table_name}:{place_id}" 형식
+
 class BatchProcessingStatus(BaseModel):
     """배치 처리 상태 정보"""
     total_unprocessed_actions: int
@@ -254,6 +262,13 @@ async def batch_vector_updates_webhook(
         # 모든 변경사항 커밋
         db.commit()
         
+        # 벡터가 갱신된 사용자/장소의 캐시만 태그 단위로 무효화 (모든 워커에 전파)
+        await invalidation_bus.invalidate(
+            *[user_tag(update.user_id) for update in user_updates],
+            *[place_tag(update.place_category, update.place_id) for update in place_updates],
+            reason="batch_vector_update"
+        )
+        
         logger.info(f"✅ Vector updates completed: {updated_users} users, {updated_places} places")
         
         return {
@@ -271,6 +286,28 @@ async def batch_vector_updates_webhook(
             detail=f"Vector updates failed: {str(e)}"
         )
 
+@router.post("/webhook/attractions-updated")
+async def attractions_updated_webhook(update: AttractionDataUpdate):
+    """
+    관광지 카테고리 테이블 적재/수정 작업 완료 시 호출되는 webhook
+    - attractions 태그: 관광지 스냅샷/상세 문서/장소 요약 캐시를 다음 조회 시 재구성
+    - place 태그: 변경된 장소가 포함된 추천 캐시 엔트리 삭제
+    """
+    tags = [ATTRACTIONS_TAG]
+    for place in update.places:
+        table_name, _, place_id = place.partition(":")
+        if table_name and place_id:
+            tags.append(place_tag(table_name, place_id))
+
+    deleted = await invalidation_bus.invalidate(*tags, reason=f"attractions_update:{update.source}")
+    logger.info(f"✅ Attraction data update from {update.source}: {len(update.places)} places, {deleted} cache keys")
+    return {
+        "success": True,
+        "invalidated_tags": len(tags),
+        "deleted_keys": deleted,
+        "timestamp": datetime.now().isoformat()
+    }
+
 # ============= 배치 처리 관리 엔드포인트 =============
 
 @router.get("/status", response_model=BatchProcessingStatus)
@@ -1,28 +1,30 @@
 import os
+import asyncio
 import base64
 import uuid
 import json
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import boto3
 from botocore.exceptions import ClientError
 import logging
 from PIL import Image
 import io
-import torch
-from transformers import CLIPProcessor, CLIPModel
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
+from sqlalchemy import desc, tuple_
 from pydantic import BaseModel
 
-from database import get_db
+from database import get_db, SessionLocal
 from models import Post, User, OAuthAccount, PostLike
 from schemas import PostCreate, PostResponse, PostListResponse
 from config import settings
 from auth_utils import get_current_user
 from cache_utils import cache, cached
+from cache_invalidation import invalidation_bus, post_tag
+from utils.pagination import encode_cursor, decode_cursor, cursor_datetime, cached_count
+from services.image_embedding import image_embedding_service
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -50,57 +52,43 @@ s3_client = boto3.client('s3', **s3_client_config)
 CLIP_MODEL_NAME = os.getenv('CLIP_MODEL_NAME', 'ViT-B-32')
 CLIP_CHECKPOINT = os.getenv('CLIP_CHECKPOINT', 'laion2b_s34b_b79k')
 IMAGE_VECTOR_DIM = int(os.getenv('IMAGE_VECTOR_DIM', '512'))
+# true면 포스트를 먼저 저장해 바로 응답하고, 이미지 벡터는 백그라운드에서 채움
+POST_VECTOR_BACKFILL = os.getenv('POST_VECTOR_BACKFILL', 'false').lower() == 'true'
 
-# CLIP 모델 초기화 (이미지 벡터화용)
-clip_model = None
-clip_processor = None
-
-def get_clip_model():
-    """CLIP 모델을 로드합니다 (지연 로딩)"""
-    global clip_model, clip_processor
-    if clip_model is None:
-        logger.info(f"Loading CLIP model: openai/clip-vit-base-patch32")
-        clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-        clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-        logger.info("CLIP model loaded successfully")
-    return clip_model, clip_processor
-
-def vectorize_image(base64_data: str) -> List[float]:
-    """Base64 이미지 데이터를 CLIP을 사용해 벡터로 변환합니다."""
+# 백그라운드 벡터 백필 태스크 참조 유지 (GC로 인한 취소 방지)
+_backfill_tasks = set()
+
+
+def decode_image_upload(base64_data: str) -> Tuple[bytes, Image.Image, str]:
+    """
+    Base64 업로드 데이터를 한 번만 디코딩
+
+    Returns:
+        (원본 바이트, CLIP 입력용 RGB 이미지, 원본 이미지 포맷)
+    """
     try:
-        # Base64 헤더 제거
+        # Base64 헤더 제거 (data:image/jpeg;base64, 등)
         if ',' in base64_data:
             base64_data = base64_data.split(',')[1]
-
-        # Base64를 이미지로 디코딩
         image_bytes = base64.b64decode(base64_data)
         image = Image.open(io.BytesIO(image_bytes))
+        image_format = image.format or 'JPEG'
 
-        # RGB로 변환 (CLIP은 RGB 이미지를 기대)
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-
-        # CLIP 모델로 이미지 벡터화
-        model, processor = get_clip_model()
-
-        # 이미지를 CLIP 모델로 처리
-        inputs = processor(images=image, return_tensors="pt")
-
-        # 이미지 특성 추출
-        with torch.no_grad():
-            image_features = model.get_image_features(**inputs)
-            # 벡터를 정규화
-            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+        # RGB로 변환 (CLIP은 RGB 이미지를 기대) - convert가 픽셀 디코딩까지 수행
+        image = image.convert('RGB') if image.mode != 'RGB' else image.copy()
+        return image_bytes, image, image_format
 
-        # numpy 배열로 변환하고 리스트로 변환
-        vector = image_features.squeeze().cpu().numpy().tolist()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"이미지 처리 중 오류 발생: {str(e)}"
+        )
 
-        # 벡터 차원 확인 및 조정
-        if len(vector) > IMAGE_VECTOR_DIM:
-            vector = vector[:IMAGE_VECTOR_DIM]  # 설정된 차원으로 트리밍
-        elif len(vector) < IMAGE_VECTOR_DIM:
-            vector = vector + [0.0] * (IMAGE_VECTOR_DIM - len(vector))  # 제로 패딩
 
+async def vectorize_image(image: Image.Image) -> List[float]:
+    """RGB 이미지를 CLIP 임베딩 워커에서 벡터로 변환합니다 (오류 시 제로 벡터)."""
+    try:
+        vector = await image_embedding_service.embed(image)
         logger.info(f"Generated image vector with {len(vector)} dimensions (target: {IMAGE_VECTOR_DIM})")
         return vector
 
@@ -111,29 +99,22 @@ def vectorize_image(base64_data: str) -> List[float]:
         return [0.0] * IMAGE_VECTOR_DIM
 
 
-def save_image_to_s3(base64_data: str, filename: str) -> str:
-    """Base64 데이터를 S3에 업로드하고 URL을 반환합니다."""
+def save_image_to_s3(image_bytes: bytes, filename: str, content_type: str = 'image/jpeg') -> str:
+    """디코딩된 이미지 바이트를 S3에 업로드하고 URL을 반환합니다."""
     try:
-        # Base64 헤더 제거 (data:image/jpeg;base64, 등)
-        if ',' in base64_data:
-            base64_data = base64_data.split(',')[1]
-        
-        # Base64 디코딩
-        image_data = base64.b64decode(base64_data)
-        
         # S3에 업로드
         s3_client.put_object(
             Bucket=settings.S3_BUCKET_NAME,
             Key=f"posts/{filename}",
-            Body=image_data,
-            ContentType='image/jpeg'
+            Body=image_bytes,
+            ContentType=content_type
             # ACL 제거: 버킷에서 ACL이 비활성화되어 있음
         )
-        
+
         # S3 URL 반환
         s3_url = f"https://{settings.S3_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/posts/{filename}"
         return s3_url
-        
+
     except ClientError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -146,6 +127,28 @@ def save_image_to_s3(base64_data: str, filename: str) -> str:
         )
 
 
+def _store_image_vector(post_id: int, image_vector_json: str):
+    """백필된 이미지 벡터 저장 (요청 세션과 분리된 세션 사용)"""
+    db = SessionLocal()
+    try:
+        db.query(Post).filter(Post.id == post_id).update(
+            {Post.image_vector: image_vector_json}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _backfill_image_vector(post_id: int, image: Image.Image):
+    """포스트 저장 후 이미지 벡터를 계산해 채움"""
+    try:
+        image_vector = await vectorize_image(image)
+        await asyncio.to_thread(_store_image_vector, post_id, json.dumps(image_vector))
+        logger.info(f"Image vector backfilled for post {post_id}")
+    except Exception as e:
+        logger.error(f"❌ Image vector backfill failed for post {post_id}: {e}")
+
+
 @router.post("/", response_model=PostResponse)
 async def create_post(
     post_data: PostCreate,
@@ -157,29 +160,24 @@ async def create_post(
         # JWT 토큰에서 가져온 현재 사용자 사용
         user = current_user
         logger.info(f"Creating post for user: {user.user_id} ({user.email})")
-        
-        # 이미지 형식 감지 및 고유한 파일명 생성
-        image_bytes = base64.b64decode(post_data.image_data.split(',')[1] if ',' in post_data.image_data else post_data.image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-        image_format = image.format or 'JPEG'
+
+        # 이미지 디코딩 (한 번만) 및 고유한 파일명 생성
+        image_bytes, image, image_format = await asyncio.to_thread(decode_image_upload, post_data.image_data)
         file_extension = 'jpg' if image_format.upper() == 'JPEG' else image_format.lower()
         filename = f"{uuid.uuid4()}.{file_extension}"
+        content_type = Image.MIME.get(image_format.upper(), 'image/jpeg')
 
-        # 이미지 저장
-        image_url = save_image_to_s3(post_data.image_data, filename)
-
-        # 이미지 벡터화 (CLIP)
-        logger.info(f"Generating image vector using CLIP (target dimension: {IMAGE_VECTOR_DIM})...")
-        image_vector = vectorize_image(post_data.image_data)
-
-        # 벡터화 결과 처리 (이제 항상 벡터가 반환됨)
-        if image_vector is not None:
+        upload = asyncio.to_thread(save_image_to_s3, image_bytes, filename, content_type)
+        if POST_VECTOR_BACKFILL:
+            # 업로드만 기다리고 벡터는 저장 후 백그라운드에서 계산
+            image_url = await upload
+            image_vector_json = None
+        else:
+            # S3 업로드와 CLIP 추론을 동시에 수행
+            logger.info(f"Generating image vector using CLIP (target dimension: {IMAGE_VECTOR_DIM})...")
+            image_url, image_vector = await asyncio.gather(upload, vectorize_image(image))
             image_vector_json = json.dumps(image_vector)
             logger.info(f"Image vector generated successfully: {len(image_vector)} dimensions")
-        else:
-            # 이론적으로 도달하지 않음 (vectorize_image가 항상 벡터 반환)
-            logger.error("Unexpected: image_vector is None")
-            image_vector_json = json.dumps([0.0] * IMAGE_VECTOR_DIM)
 
         # 포스트 생성
         db_post = Post(
@@ -193,16 +191,25 @@ async def create_post(
         db.add(db_post)
         db.commit()
         db.refresh(db_post)
+
+        if POST_VECTOR_BACKFILL:
+            task = asyncio.create_task(_backfill_image_vector(db_post.id, image))
+            _backfill_tasks.add(task)
+            task.add_done_callback(_backfill_tasks.discard)
         
         # 캐시 무효화: 포스트 목록 캐시 삭제
         cache.delete("posts:list:0:10")  # 기본 페이지
         cache.delete("posts:list:0:20")  # 다른 페이지도 삭제 가능
+        cache.delete("posts:count")  # 전체 개수 캐시
         
         # 사용자 정보와 함께 반환
         post_with_user = db.query(Post).options(joinedload(Post.user)).filter(Post.id == db_post.id).first()
         
         return post_with_user
-        
+
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -215,31 +222,44 @@ async def create_post(
 async def get_posts(
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """포스트 목록을 가져옵니다."""
+    """포스트 목록을 가져옵니다. (cursor 지정 시 keyset 페이지네이션, skip 무시)"""
     try:
         # 최신 순으로 포스트 조회 (OAuth 계정 정보도 함께 로드)
-        posts = (
+        query = (
             db.query(Post)
             .options(
                 joinedload(Post.user).joinedload(User.oauth_accounts)
             )
-            .order_by(desc(Post.created_at))
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .order_by(desc(Post.created_at), desc(Post.id))
         )
+        if cursor:
+            position = decode_cursor(cursor, required=("created_at", "id"))
+            query = query.filter(
+                tuple_(Post.created_at, Post.id) < (cursor_datetime(position["created_at"]), position["id"])
+            )
+        else:
+            query = query.offset(skip)
+        posts = query.limit(limit).all()
 
-        total = db.query(Post).count()
+        # 전체 개수는 짧게 캐싱 (매 페이지 count() 생략)
+        total = await cached_count("posts:count", lambda: db.query(Post).count())
 
         # 각 포스트에 기본 좋아요 상태 추가
         for post in posts:
             post.is_liked = False
 
-        result = PostListResponse(posts=posts, total=total)
+        next_cursor = None
+        if len(posts) == limit:
+            next_cursor = encode_cursor(created_at=posts[-1].created_at, id=posts[-1].id)
+
+        result = PostListResponse(posts=posts, total=total, next_cursor=next_cursor)
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -320,6 +340,7 @@ async def get_post(
     }
     
     cache.set(cache_key, post_dict, expire=600)
+    await invalidation_bus.register(cache_key, [post_tag(post_id)])
     
     return post
 
@@ -360,6 +381,9 @@ async def like_post(
     post.likes_count += 1
     db.commit()
 
+    # 좋아요 수가 바뀐 포스트 상세 캐시 무효화
+    await invalidation_bus.invalidate(post_tag(post_id), reason="post_like")
+
     return {"message": "좋아요가 추가되었습니다.", "likes_count": post.likes_count}
 
 
@@ -395,6 +419,9 @@ async def unlike_post(
         post.likes_count -= 1
     db.commit()
 
+    # 좋아요 수가 바뀐 포스트 상세 캐시 무효화
+    await invalidation_bus.invalidate(post_tag(post_id), reason="post_unlike")
+
     return {"message": "좋아요가 제거되었습니다.", "likes_count": post.likes_count}
 
 
@@ -489,6 +516,7 @@ async def delete_post(
         cache.delete(f"post:detail:{post_id}")  # 해당 포스트 상세 캐시 삭제
         cache.delete("posts:list:0:10")  # 포스트 목록 캐시 삭제
         cache.delete("posts:list:0:20")
+        cache.delete("posts:count")
         
         logger.info(f"포스트 삭제 완료: {post_id} by {current_user.user_id}")
         return {"message": "포스트가 삭제되었습니다."}
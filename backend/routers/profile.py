@@ -23,6 +23,8 @@ from schemas import (
 from config import settings
 from auth_utils import get_current_user, get_current_user_optional
 from cache_utils import cache
+from cache_invalidation import invalidation_bus, user_tag
+from user_preference_cache import user_preference_cache
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -400,33 +402,16 @@ async def update_profile_preferences(
         logger.info(f"여행 취향 업데이트 성공: {{user_id: '{current_user.user_id}', email: '{current_user.email}', name: '{current_user.name}', persona: '{user_preference.persona}', priority: '{user_preference.priority}', accommodation: '{user_preference.accommodation}', exploration: '{user_preference.exploration}', updated_at: '{user_preference.updated_at}'}}")
 
         # 캐시 무효화 - 사용자 취향 변경 시 추천 캐시 삭제
-        user_id = str(current_user.user_id)
-
-        # 개인화 추천 캐시 삭제 (모든 우선순위 태그 조합 포함) - 개선됨
-        cache_patterns = [
-            f"personalized:{user_id}:*",
-            f"recommendations:{user_id}",
-            f"user:{user_id}",
-            f"rec_main:user_{user_id}:*",           # 메인 페이지 개인화 추천 (모든 우선순위 태그)
-            f"main_personalized:user_{user_id}:*", # 메인 페이지 전체 응답 (모든 우선순위 태그)
-            f"main_explore:user_{user_id}:*",      # 메인 페이지 탐색 섹션 (모든 우선순위 태그)
-            f"explore_feed_v3:{user_id}:*",        # 탐색 피드 v3 (모든 우선순위 태그)
-            f"explore_section:user_{user_id}:*"    # 개별 섹션 캐시 (모든 우선순위 태그)
-        ]
-
-        # Redis SCAN을 사용하여 패턴 매칭 키들 삭제
-        try:
-            import redis
-            redis_client = cache.redis
-
-            for pattern in cache_patterns:
-                for key in redis_client.scan_iter(match=pattern):
-                    redis_client.delete(key)
-                    logger.info(f"Deleted cache key: {key}")
-
-            logger.info(f"Cache invalidated for user preferences update: {user_id}")
-        except Exception as cache_error:
-            logger.warning(f"Cache invalidation failed: {cache_error}")
+        # (rec_main/main_personalized/main_explore/explore_section 엔트리는 user 태그로 등록되어 있어
+        #  SCAN 없이 태그 인덱스로 삭제되고, 다른 워커의 인메모리 엔진 캐시도 pub/sub으로 정리됨)
+        await invalidation_bus.invalidate(
+            user_tag(current_user.user_id),
+            user_tag(current_user.user_id, "session"),
+            user_tag(current_user.user_id, "preferences"),
+            reason="preferences"
+        )
+        # 새 취향으로 취향 캐시 다시 채우기 (다음 피드 요청의 캐시 키 생성에 사용)
+        await user_preference_cache.set(current_user.user_id, user_preference)
 
         logger.info(f"Profile preferences updated for user: {current_user.user_id}")
         return user
@@ -1,12 +1,13 @@
 # 파일명: recommendation2.py (완성된 개선 버전)
 
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import asyncio
 import logging
 from asyncio import Semaphore
 import hashlib
 import json
+import time
 
 # 통합된 임포트 (backend 환경에 맞게 수정)
 try:
@@ -15,23 +16,31 @@ try:
     import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-    from vectorization2 import get_engine, close_engine
+    from vectorization2 import get_engine, close_engine, get_engine_if_initialized
     from auth_utils import get_current_user_optional
     from recommendation_config import EXPLORE_REGIONS, EXPLORE_CATEGORIES, config
-    from cache_utils import cache, cached  # Redis 캐싱 유틸리티 추가
+    from cache_utils import cache, async_cache, cached  # Redis 캐싱 유틸리티 추가
+    from utils.cache_codec import project_payload
+    from cache_invalidation import invalidation_bus, user_tag, region_tag, place_tag
+    from user_preference_cache import user_preference_cache
 except ImportError:
     try:
         # 상대 임포트 시도
-        from ..vectorization2 import get_engine, close_engine
+        from ..vectorization2 import get_engine, close_engine, get_engine_if_initialized
         from ..auth_utils import get_current_user_optional
         from ..recommendation_config import EXPLORE_REGIONS, EXPLORE_CATEGORIES, config
-        from ..cache_utils import cache, cached  # Redis 캐싱 유틸리티 추가
+        from ..cache_utils import cache, async_cache, cached  # Redis 캐싱 유틸리티 추가
+        from ..utils.cache_codec import project_payload
+        from ..cache_invalidation import invalidation_bus, user_tag, region_tag, place_tag
+        from ..user_preference_cache import user_preference_cache
     except ImportError:
         # 개발용 Mock
         async def get_engine():
             return None
         async def close_engine():
             pass
+        def get_engine_if_initialized():
+            return None
         def get_current_user_optional():
             return None
         EXPLORE_REGIONS = ["서울특별시", "부산광역시"]
@@ -42,11 +51,41 @@ except ImportError:
         class MockCache:
             def get(self, key): return None
             def set(self, key, value, expire=None): return True
+            def get_swr(self, key): return None, False
+        class MockAsyncCache:
+            async def get(self, key): return None
+            async def set(self, key, value, expire=None): return True
+            async def get_swr(self, key): return None, False
+            async def get_swr_many(self, keys): return [(None, False)] * len(keys)
+            async def set_swr(self, key, value, soft_ttl, grace): return True
+            async def try_lock(self, key, expire): return True
+            async def release_lock(self, key): return True
         cache = MockCache()
+        async_cache = MockAsyncCache()
         def cached(expire=300, key_prefix=""):
             def decorator(func):
                 return func
             return decorator
+        def project_payload(value, drop_fields=None):
+            return value
+
+        # Mock invalidation bus
+        class MockInvalidationBus:
+            async def register(self, key, tags): return True
+            async def invalidate(self, *tags, reason=""): return 0
+            def add_local_handler(self, handler): pass
+        invalidation_bus = MockInvalidationBus()
+        def user_tag(user_id, scope=None):
+            return f"user:{user_id}:{scope}" if scope else f"user:{user_id}"
+        def region_tag(region):
+            return f"region:{region}"
+        def place_tag(table_name, place_id):
+            return f"place:{table_name}:{place_id}"
+
+        # Mock preference cache
+        class MockPreferenceCache:
+            async def get_priority_tag(self, user_id, loader=None): return None
+        user_preference_cache = MockPreferenceCache()
 
 logger = logging.getLogger(__name__)
 
@@ -62,11 +101,59 @@ RECOMMENDATION_TIMEOUT = config.recommendation_timeout if config else 3.0
 # 병렬 요청 제한 (벡터화 엔진의 DB 풀 보호)
 REQUEST_SEMAPHORE = Semaphore(MAX_PARALLEL_REQUESTS)
 
+# Stale-while-revalidate 설정 (캐시 만료 경계에서 지연/빈 응답 방지)
+SWR_GRACE_SECONDS = config.swr_grace_seconds if config else 1800
+SWR_REFRESH_LOCK_SECONDS = config.swr_refresh_lock_seconds if config else 30
+# 백그라운드 갱신은 사용자 응답과 무관하므로 더 넉넉한 타임아웃 사용
+BACKGROUND_REFRESH_TIMEOUT = config.detail_timeout if config else 5.0
+
+# 실행 중인 백그라운드 갱신 태스크 (GC로 인한 조기 종료 방지)
+_background_refreshes: set = set()
+
+# stale-while-revalidate 메트릭 (헬스체크에서 노출)
+swr_metrics: Dict[str, Any] = {
+    "fresh_hits": 0,
+    "stale_hits": 0,
+    "misses": 0,
+    "refreshes": 0,
+    "refresh_failures": 0,
+    "refresh_skipped": 0,
+    "refresh_latency_ms_last": 0.0,
+    "refresh_latency_ms_avg": 0.0,
+    "refresh_latency_ms_max": 0.0,
+}
+
 
 # ============================================================================
 # 🔧 Redis 캐싱 유틸리티 함수들
 # ============================================================================
 
+async def _load_user_preferences(user_id: str) -> Optional[Dict[str, Any]]:
+    """취향 캐시 미스 시 DB 조회"""
+    engine = await get_engine()
+    return await engine.get_user_preference_tags(user_id)
+
+
+async def resolve_user_priority_tag(user_id: Optional[str], timeout: float = 2.0) -> str:
+    """
+    캐시 키 생성용 사용자 우선순위 태그 조회
+    - 취향 캐시(로컬 → Redis) 우선, 미스일 때만 DB 조회 → 캐시된 피드 요청은 DB를 거치지 않음
+    """
+    if not user_id:
+        return "none"
+    try:
+        priority = await asyncio.wait_for(
+            user_preference_cache.get_priority_tag(user_id, loader=_load_user_preferences),
+            timeout=timeout
+        )
+        return priority or "none"
+    except asyncio.TimeoutError:
+        logger.warning(f"Timeout getting user priority for {user_id}")
+    except Exception as e:
+        logger.warning(f"Failed to get user priority for cache key: {e}")
+    return "none"
+
+
 def generate_cache_key(prefix: str, user_id: Optional[str], region: Optional[str], 
                       category: Optional[str], limit: int, **kwargs) -> str:
     """
@@ -100,10 +187,29 @@ def generate_cache_key(prefix: str, user_id: Optional[str], region: Optional[str
     
     return f"{prefix}:{user_part}:{priority_tag}:{param_hash}"
 
-def get_recommendations_cache(cache_key: str) -> Optional[List[Dict[str, Any]]]:
+def generate_recommendations_cache_key(
+    user_id: Optional[str],
+    region: Optional[str],
+    category: Optional[str],
+    limit: int,
+    fast_mode: bool,
+    priority_tag: Optional[str]
+) -> str:
+    """추천 결과(rec_main) 캐시 키 생성 - 개별 조회와 일괄 조회가 동일한 키를 사용"""
+    return generate_cache_key(
+        prefix="rec_main",
+        user_id=user_id,
+        region=region,
+        category=category,
+        limit=limit,
+        fast_mode=fast_mode,
+        priority_tag=priority_tag or "none"
+    )
+
+async def get_recommendations_cache(cache_key: str) -> Optional[List[Dict[str, Any]]]:
     """캐시에서 추천 데이터 조회 (복원됨)"""
     try:
-        cached_data = cache.get(cache_key)
+        cached_data, _ = await async_cache.get_swr(cache_key)
         if cached_data:
             logger.info(f"✅ Cache hit: {cache_key}")
             return cached_data
@@ -113,18 +219,163 @@ def get_recommendations_cache(cache_key: str) -> Optional[List[Dict[str, Any]]]:
         logger.error(f"❌ Cache get error: {e}")
         return None
 
-def set_recommendations_cache(cache_key: str, data: List[Dict[str, Any]], expire: int = 900) -> bool:
-    """캐시에 추천 데이터 저장 (기본 15분) - 복원됨"""
+def recommendation_cache_tags(user_id: Optional[str], *regions: Optional[str]) -> List[str]:
+    """추천 캐시 엔트리의 의존성 태그 (사용자 + 지역)"""
+    tags = [user_tag(user_id)] if user_id else []
+    tags.extend(region_tag(region) for region in regions if region)
+    return tags
+
+
+def recommendation_place_tags(data: Any) -> List[str]:
+    """
+    캐싱할 추천 결과에 포함된 장소 태그 (place:{table}:{id})
+    - 추천 목록, 피드 응답(featured/feed), 탐색 응답(data.{region}.{category}) 모두 재귀적으로 수집
+    - 비로그인/인기 추천처럼 사용자 태그가 없는 엔트리도 장소 변경 시 무효화되도록 등록
+    """
+    tags = set()
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if value.get('table_name') and value.get('place_id') is not None:
+                tags.add(place_tag(value['table_name'], value['place_id']))
+            stack.extend(item for item in value.values() if isinstance(item, (dict, list)))
+        elif isinstance(value, list):
+            stack.extend(item for item in value if isinstance(item, (dict, list)))
+    return sorted(tags)
+
+
+async def set_recommendations_cache(
+    cache_key: str,
+    data: List[Dict[str, Any]],
+    expire: int = 900,
+    tags: List[str] = ()
+) -> bool:
+    """캐시에 추천 데이터 저장 (기본 15분, 이후 SWR 유예 시간 동안 stale 제공) + 무효화 태그(결과 장소 포함) 등록"""
     try:
-        success = cache.set(cache_key, data, expire=expire)
+        success = await async_cache.set_swr(cache_key, data, soft_ttl=expire, grace=SWR_GRACE_SECONDS)
         if success:
-            logger.info(f"💾 Cache set: {cache_key} (expire: {expire}s)")
+            await invalidation_bus.register(cache_key, [*tags, *recommendation_place_tags(data)])
+            logger.info(f"💾 Cache set: {cache_key} (soft: {expire}s, hard: {expire + SWR_GRACE_SECONDS}s)")
         return success
     except Exception as e:
         logger.error(f"❌ Cache set error: {e}")
         return False
 
 
+def _record_refresh_latency(elapsed_ms: float):
+    """백그라운드 갱신 지연 시간 메트릭 갱신"""
+    completed = swr_metrics["refreshes"] + swr_metrics["refresh_failures"]
+    previous_avg = swr_metrics["refresh_latency_ms_avg"]
+    swr_metrics["refresh_latency_ms_last"] = round(elapsed_ms, 1)
+    swr_metrics["refresh_latency_ms_avg"] = round(
+        previous_avg + (elapsed_ms - previous_avg) / max(completed, 1), 1
+    )
+    swr_metrics["refresh_latency_ms_max"] = round(max(swr_metrics["refresh_latency_ms_max"], elapsed_ms), 1)
+
+
+async def _refresh_cache_entry(
+    cache_key: str,
+    compute: Callable[[], Awaitable[Any]],
+    soft_ttl: int,
+    tags: List[str]
+):
+    """stale 엔트리를 백그라운드에서 재계산하여 교체 (실패 시 stale 값 유지)"""
+    start_time = time.perf_counter()
+    try:
+        result = await compute()
+        if result:
+            await set_recommendations_cache(cache_key, result, expire=soft_ttl, tags=tags)
+            swr_metrics["refreshes"] += 1
+        else:
+            # 빈 결과로 기존 stale 값을 덮어쓰지 않음
+            swr_metrics["refresh_failures"] += 1
+            logger.warning(f"⚠️ Background refresh returned empty result: {cache_key}")
+    except Exception as e:
+        swr_metrics["refresh_failures"] += 1
+        logger.error(f"❌ Background refresh failed: {cache_key}, error={e}")
+    finally:
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        _record_refresh_latency(elapsed_ms)
+        await async_cache.release_lock(cache_key)
+        logger.info(f"🔄 Background refresh finished: {cache_key} ({elapsed_ms:.1f}ms)")
+
+
+async def _schedule_refresh(
+    cache_key: str,
+    compute: Callable[[], Awaitable[Any]],
+    soft_ttl: int,
+    tags: List[str]
+):
+    """워커 간 락을 잡은 경우에만 백그라운드 갱신 태스크 등록"""
+    if not await async_cache.try_lock(cache_key, SWR_REFRESH_LOCK_SECONDS):
+        swr_metrics["refresh_skipped"] += 1
+        return
+
+    task = asyncio.create_task(_refresh_cache_entry(cache_key, compute, soft_ttl, tags))
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+async def get_or_revalidate(
+    cache_key: str,
+    compute: Callable[[], Awaitable[Any]],
+    soft_ttl: int,
+    refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+    prefetched: Optional[Tuple[Any, bool]] = None,
+    tags: List[str] = (),
+    revalidate: bool = False
+) -> Any:
+    """
+    stale-while-revalidate 캐시 조회
+    - 신선한 값: 그대로 반환
+    - stale 값 (유예 시간 내): 즉시 반환하고 백그라운드에서 갱신
+    - 값 없음: 동기적으로 계산 후 저장 (빈 결과는 저장하지 않음)
+
+    Args:
+        compute: 캐시 미스 시 호출할 코루틴 팩토리
+        soft_ttl: 신선도 유지 시간 (초)
+        refresh: 백그라운드 갱신용 팩토리 (미지정 시 compute 사용)
+        prefetched: MGET 등으로 미리 조회한 (값, stale 여부) - 지정 시 GET 생략
+        tags: 캐시 무효화 태그 (user:{id}, region:{r} 등)
+        revalidate: 캐시를 읽지 않고 refresh로 다시 계산해 저장 (상위 캐시의 백그라운드 갱신이
+            stale 하위 엔트리를 그대로 재사용하지 않도록 할 때 사용)
+    """
+    if revalidate:
+        result = await (refresh or compute)()
+        if result:
+            await set_recommendations_cache(cache_key, result, expire=soft_ttl, tags=tags)
+        return result
+
+    cached_value, is_stale = prefetched if prefetched is not None else await async_cache.get_swr(cache_key)
+    if cached_value is not None:
+        if is_stale:
+            swr_metrics["stale_hits"] += 1
+            logger.info(f"♻️ Stale cache hit, revalidating: {cache_key}")
+            await _schedule_refresh(cache_key, refresh or compute, soft_ttl, tags)
+        else:
+            swr_metrics["fresh_hits"] += 1
+            logger.info(f"✅ Cache hit: {cache_key}")
+        return cached_value
+
+    swr_metrics["misses"] += 1
+    logger.debug(f"🔍 Cache miss: {cache_key}")
+    result = await compute()
+    if result:
+        await set_recommendations_cache(cache_key, result, expire=soft_ttl, tags=tags)
+    return result
+
+
+def _drop_engine_caches(tags: set):
+    """무효화 이벤트 수신 시 추천 엔진의 인메모리 캐시에서 해당 엔트리 제거"""
+    engine = get_engine_if_initialized()
+    if engine is not None:
+        engine.drop_cached_entries(tags)
+
+
+invalidation_bus.add_local_handler(_drop_engine_caches)
+
+
 # ============================================================================
 # 🔧 안전한 추천 데이터 조회 유틸리티 함수들 (캐싱 적용)
 # ============================================================================
@@ -135,57 +386,55 @@ async def fetch_recommendations_with_fallback(
     category: Optional[str],
     limit: int,
     fast_mode: bool = False,  # 메인 페이지용 고속 모드
-    priority_tag: Optional[str] = None  # 사용자 우선순위 태그
+    priority_tag: Optional[str] = None,  # 사용자 우선순위 태그
+    prefetched: Optional[Tuple[Any, bool]] = None,  # 일괄 조회된 캐시 엔트리
+    revalidate: bool = False  # 상위 응답 캐시의 백그라운드 갱신 중이면 캐시를 거치지 않고 재계산
 ) -> List[Dict[str, Any]]:
     """
     안전한 추천 데이터 조회 (통합 엔진 사용) - Redis 캐싱 적용
     """
     # 캐시 키 생성 (우선순위 태그 포함)
-    cache_key = generate_cache_key(
-        prefix="rec_main",
-        user_id=user_id,
-        region=region,
-        category=category,
-        limit=limit,
-        fast_mode=fast_mode,
-        priority_tag=priority_tag or "none"
-    )
-    
-    # 캐시에서 조회 시도 (복원됨)
-    cached_result = get_recommendations_cache(cache_key)
-    if cached_result is not None:
-        return cached_result
-    
-    async with REQUEST_SEMAPHORE:
-        try:
-            # 통합 엔진 인스턴스 획득
-            engine = await get_engine()
+    cache_key = generate_recommendations_cache_key(user_id, region, category, limit, fast_mode, priority_tag)
 
-            # 타임아웃과 함께 추천 조회
-            result = await asyncio.wait_for(
-                engine.get_recommendations(
-                    user_id=user_id,
-                    region=region,
-                    category=category,
-                    limit=limit,
-                    fast_mode=fast_mode  # fast_mode 전달
-                ),
-                timeout=RECOMMENDATION_TIMEOUT
-            )
-            
-            # 결과가 있으면 캐시에 저장 (메인페이지는 1시간, 일반은 15분) - 복원됨
-            if result:
-                expire_time = 3600 if fast_mode else 900  # 1시간 or 15분
-                set_recommendations_cache(cache_key, result, expire=expire_time)
-            
-            return result if result else []
+    async def compute(timeout: float = RECOMMENDATION_TIMEOUT) -> List[Dict[str, Any]]:
+        async with REQUEST_SEMAPHORE:
+            try:
+                # 통합 엔진 인스턴스 획득
+                engine = await get_engine()
 
-        except asyncio.TimeoutError:
-            logger.warning(f"Timeout for recommendations: user={user_id}, region={region}, category={category}")
-            return []
-        except Exception as e:
-            logger.error(f"Failed to get recommendations: user={user_id}, region={region}, category={category}, error={e}")
-            return []
+                # 타임아웃과 함께 추천 조회
+                result = await asyncio.wait_for(
+                    engine.get_recommendations(
+                        user_id=user_id,
+                        region=region,
+                        category=category,
+                        limit=limit,
+                        fast_mode=fast_mode  # fast_mode 전달
+                    ),
+                    timeout=timeout
+                )
+                # 캐싱/응답 전에 벡터 등 불필요한 필드 제거 (Redis 메모리 및 직렬화 비용 절감)
+                return project_payload(result) if result else []
+
+            except asyncio.TimeoutError:
+                logger.warning(f"Timeout for recommendations: user={user_id}, region={region}, category={category}")
+                return []
+            except Exception as e:
+                logger.error(f"Failed to get recommendations: user={user_id}, region={region}, category={category}, error={e}")
+                return []
+
+    # 결과가 있으면 캐시에 저장 (메인페이지는 1시간, 일반은 15분) - 만료 후에는 stale 제공 + 백그라운드 갱신
+    expire_time = 3600 if fast_mode else 900  # 1시간 or 15분
+    result = await get_or_revalidate(
+        cache_key,
+        compute,
+        soft_ttl=expire_time,
+        refresh=lambda: compute(timeout=BACKGROUND_REFRESH_TIMEOUT),
+        prefetched=prefetched,
+        tags=recommendation_cache_tags(user_id, region),
+        revalidate=revalidate
+    )
+    return result if result else []
 
 
 async def fetch_explore_data_parallel(
@@ -193,23 +442,35 @@ async def fetch_explore_data_parallel(
     regions: List[str],
     categories: List[str],
     fast_mode: bool = True,  # explore는 기본적으로 fast_mode
-    priority_tag: Optional[str] = None  # 사용자 우선순위 태그
+    priority_tag: Optional[str] = None,  # 사용자 우선순위 태그
+    revalidate: bool = False  # 섹션 캐시를 거치지 않고 모두 재계산
 ) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
     """
     탐색 데이터를 병렬로 안전하게 조회
+    - 모든 섹션의 캐시 엔트리를 한 번의 MGET으로 먼저 조회하고, 미스인 섹션만 계산
+    - revalidate: 모든 섹션을 다시 계산해 섹션 캐시도 함께 갱신 (MGET 생략)
     """
+    section_limit = 5  # 성능 개선을 위해 감소
+    sections = [(region, category) for region in regions for category in categories]
+    cache_keys = [
+        generate_recommendations_cache_key(user_id, region, category, section_limit, fast_mode, priority_tag)
+        for region, category in sections
+    ]
+    prefetched_entries = [None] * len(cache_keys) if revalidate else await async_cache.get_swr_many(cache_keys)
+
     # 작업 정의 (키-값 매핑으로 순서 보장)
     tasks = {
         f"{region}:{category}": fetch_recommendations_with_fallback(
             user_id=user_id,
             region=region,
             category=category,
-            limit=5,  # 성능 개선을 위해 감소
+            limit=section_limit,
             fast_mode=fast_mode,  # fast_mode 전달
-            priority_tag=priority_tag or "none"
+            priority_tag=priority_tag or "none",
+            prefetched=prefetched,
+            revalidate=revalidate
         )
-        for region in regions
-        for category in categories
+        for (region, category), prefetched in zip(sections, prefetched_entries)
     }
 
     logger.info(f"Starting {len(tasks)} parallel recommendation requests")
@@ -243,6 +504,105 @@ async def fetch_explore_data_parallel(
 # 🚀 메인 페이지를 위한 API 엔드포인트들
 # ============================================================================
 
+async def _build_personalized_feed(
+    user_id: Optional[str],
+    region: Optional[str],
+    limit: int,
+    user_priority_tag: str,
+    revalidate: bool = False
+) -> Optional[Dict[str, Any]]:
+    """개인화 피드 응답 생성 (추천이 없으면 None, revalidate면 하위 추천 캐시도 재계산)"""
+    logger.info(f"🔍 Getting personalized feed for user: {user_id}, priority_tag: {user_priority_tag}, limit: {limit}")
+
+    # experience 사용자는 별도 처리 (폴백 포함)
+    if user_priority_tag == "experience":
+        logger.info(f"🎯 Processing experience user with fallback")
+        # 먼저 개인화 추천 시도
+        recommendations = await fetch_recommendations_with_fallback(
+            user_id=user_id,
+            region=region,
+            category=None,
+            limit=limit,
+            fast_mode=True,
+            priority_tag=user_priority_tag,
+            revalidate=revalidate
+        )
+        # 개인화 추천이 실패하면 experience 카테고리의 인기 추천으로 폴백
+        if not recommendations:
+            logger.info(f"🎯 Fallback to popular experience recommendations")
+            # experience 카테고리별로 인기 추천 가져오기
+            experience_recommendations = []
+            experience_categories = ["nature", "humanities", "leisure_sports"]
+            for category in experience_categories:
+                category_recs = await fetch_recommendations_with_fallback(
+                    user_id=None,  # 인기 추천을 위해 None
+                    region=None,
+                    category=category,
+                    limit=limit // len(experience_categories) + 2,
+                    fast_mode=True,
+                    priority_tag="none",  # 인기 추천이므로 우선순위 태그 없음
+                    revalidate=revalidate
+                )
+                if category_recs:
+                    experience_recommendations.extend(category_recs)
+
+            # 점수순으로 정렬하고 제한
+            if experience_recommendations:
+                experience_recommendations.sort(key=lambda x: x.get('final_score', 0), reverse=True)
+                recommendations = experience_recommendations[:limit]
+                logger.info(f"🎯 Fallback returned {len(recommendations)} experience recommendations")
+    else:
+        # 일반 사용자는 기존 로직
+        recommendations = await fetch_recommendations_with_fallback(
+            user_id=user_id,
+            region=region,  # 지역 필터 적용
+            category=None,
+            limit=limit,
+            fast_mode=True,  # 메인 피드는 항상 고속 모드
+            priority_tag=user_priority_tag,
+            revalidate=revalidate
+        )
+
+    logger.info(f"🔍 Initial recommendations count: {len(recommendations) if recommendations else 0}")
+
+    if not recommendations:
+        return None
+
+    # 체험 우선순위 사용자에게는 체험 관련 카테고리만 필터링
+    if user_priority_tag == "experience":
+        experience_categories = ["nature", "humanities", "leisure_sports"]
+        logger.info(f"🎯 Experience user - filtering to experience categories: {experience_categories}")
+        recommendations = [
+            rec for rec in recommendations
+            if rec.get('table_name') in experience_categories
+        ]
+        logger.info(f"🎯 Filtered recommendations count: {len(recommendations)}")
+
+    # 응답 데이터에 category 필드 추가
+    processed_recommendations = []
+    for rec in recommendations:
+        processed_rec = dict(rec)  # 딕셔너리 복사
+        # table_name을 category로 매핑
+        table_name = rec.get('table_name', '')
+        category_mapping = {
+            'accommodation': 'accommodation',
+            'restaurants': 'restaurants',
+            'shopping': 'shopping',
+            'nature': 'nature',
+            'humanities': 'culture',
+            'leisure_sports': 'leisure'
+        }
+        processed_rec['category'] = category_mapping.get(table_name, table_name)
+        processed_recommendations.append(processed_rec)
+
+    # 응답 데이터 구성
+    return {
+        "featured": processed_recommendations[0] if processed_recommendations else None,
+        "feed": processed_recommendations[1:] if len(processed_recommendations) > 1 else [],
+        "total_count": len(processed_recommendations)
+    }
+
+
 @router.get("/main-feed/personalized", response_model=dict)
 async def get_main_personalized_feed(
     current_user=Depends(get_current_user_optional),
@@ -250,22 +610,15 @@ async def get_main_personalized_feed(
     region: Optional[str] = Query(None, description="지역 필터 (선택사항)")
 ):
     """
-    메인 상단 'For You' 섹션 - 개인화 추천 (Redis 캐싱 적용)
+    메인 상단 'For You' 섹션 - 개인화 추천 (Redis SWR 캐싱 적용)
     - 로그인: 개인화 추천 (지역/카테고리 무관, 균등 가중치 50:50)
     - 비로그인: 인기 추천 (bookmark_cnt 기준)
     """
     try:
         user_id = str(current_user.user_id) if current_user else None
 
-        # priority_tag 가져오기 (캐시 키에 포함하기 위해 먼저 조회)
-        user_priority_tag = "none"
-        if user_id:
-            try:
-                engine = await get_engine()
-                priority = await engine.get_user_priority_tag(user_id)
-                user_priority_tag = priority or "none"
-            except Exception as e:
-                logger.warning(f"Failed to get user priority for cache key: {e}")
+        # priority_tag 가져오기 (캐시 키에 포함하기 위해 먼저 조회 - 취향 캐시 사용)
+        user_priority_tag = await resolve_user_priority_tag(user_id)
 
         # 전체 응답 캐싱을 위한 캐시 키 생성 (우선순위 태그 포함)
         response_cache_key = generate_cache_key(
@@ -276,111 +629,24 @@ async def get_main_personalized_feed(
             limit=limit,
             priority_tag=user_priority_tag  # 우선순위 태그 추가
         )
-        
-        # 캐시된 응답 조회 (복원됨)
-        cached_response = cache.get(response_cache_key)
-        if cached_response is not None:
-            logger.info(f"🚀 Main personalized feed cache hit: {response_cache_key}")
-            return cached_response
-
-        # user_priority_tag는 이미 위에서 조회됨
-
-        logger.info(f"🔍 Getting personalized feed for user: {user_id}, priority_tag: {user_priority_tag}, limit: {limit}")
-        print(f"🔍 DEBUG: user_id={user_id}, priority_tag={user_priority_tag}")
-
-        # experience 사용자는 별도 처리 (폴백 포함)
-        if user_priority_tag == "experience":
-            logger.info(f"🎯 Processing experience user with fallback")
-            # 먼저 개인화 추천 시도
-            recommendations = await fetch_recommendations_with_fallback(
-                user_id=user_id,
-                region=region,
-                category=None,
-                limit=limit,
-                fast_mode=True,
-                priority_tag=user_priority_tag
-            )
-            # 개인화 추천이 실패하면 experience 카테고리의 인기 추천으로 폴백
-            if not recommendations:
-                logger.info(f"🎯 Fallback to popular experience recommendations")
-                # experience 카테고리별로 인기 추천 가져오기
-                experience_recommendations = []
-                experience_categories = ["nature", "humanities", "leisure_sports"]
-                for category in experience_categories:
-                    category_recs = await fetch_recommendations_with_fallback(
-                        user_id=None,  # 인기 추천을 위해 None
-                        region=None,
-                        category=category,
-                        limit=limit // len(experience_categories) + 2,
-                        fast_mode=True,
-                        priority_tag="none"  # 인기 추천이므로 우선순위 태그 없음
-                    )
-                    if category_recs:
-                        experience_recommendations.extend(category_recs)
-
-                # 점수순으로 정렬하고 제한
-                if experience_recommendations:
-                    experience_recommendations.sort(key=lambda x: x.get('final_score', 0), reverse=True)
-                    recommendations = experience_recommendations[:limit]
-                    logger.info(f"🎯 Fallback returned {len(recommendations)} experience recommendations")
-        else:
-            # 일반 사용자는 기존 로직
-            recommendations = await fetch_recommendations_with_fallback(
-                user_id=user_id,
-                region=region,  # 지역 필터 적용
-                category=None,
-                limit=limit,
-                fast_mode=True,  # 메인 피드는 항상 고속 모드
-                priority_tag=user_priority_tag
-            )
 
-        logger.info(f"🔍 Initial recommendations count: {len(recommendations) if recommendations else 0}")
+        # 1시간 동안 신선, 이후 유예 시간 동안 stale 응답 + 백그라운드 갱신
+        response_data = await get_or_revalidate(
+            response_cache_key,
+            lambda: _build_personalized_feed(user_id, region, limit, user_priority_tag),
+            soft_ttl=3600,
+            # 백그라운드 갱신은 하위 추천 캐시(stale일 수 있음)를 거치지 않고 다시 계산
+            refresh=lambda: _build_personalized_feed(user_id, region, limit, user_priority_tag, revalidate=True),
+            tags=recommendation_cache_tags(user_id, region)
+        )
 
-        if not recommendations:
+        if not response_data:
             return {
                 "featured": None,
                 "feed": [],
                 "message": "추천할 콘텐츠가 없습니다."
             }
 
-        # 체험 우선순위 사용자에게는 체험 관련 카테고리만 필터링
-        if user_priority_tag == "experience":
-            experience_categories = ["nature", "humanities", "leisure_sports"]
-            logger.info(f"🎯 Experience user - filtering to experience categories: {experience_categories}")
-            recommendations = [
-                rec for rec in recommendations
-                if rec.get('table_name') in experience_categories
-            ]
-            logger.info(f"🎯 Filtered recommendations count: {len(recommendations)}")
-
-        # 응답 데이터에 category 필드 추가
-        processed_recommendations = []
-        for rec in recommendations:
-            processed_rec = dict(rec)  # 딕셔너리 복사
-            # table_name을 category로 매핑
-            table_name = rec.get('table_name', '')
-            category_mapping = {
-                'accommodation': 'accommodation',
-                'restaurants': 'restaurants',
-                'shopping': 'shopping',
-                'nature': 'nature',
-                'humanities': 'culture',
-                'leisure_sports': 'leisure'
-            }
-            processed_rec['category'] = category_mapping.get(table_name, table_name)
-            processed_recommendations.append(processed_rec)
-
-        # 응답 데이터 구성
-        response_data = {
-            "featured": processed_recommendations[0] if processed_recommendations else None,
-            "feed": processed_recommendations[1:] if len(processed_recommendations) > 1 else [],
-            "total_count": len(processed_recommendations)
-        }
-        
-        # 결과를 캐시에 저장 (1시간 캐싱) - 복원됨
-        cache.set(response_cache_key, response_data, expire=3600)
-        logger.info(f"🚀 Main personalized feed cached: {response_cache_key}")
-        
         return response_data
 
     except Exception as e:
@@ -391,6 +657,68 @@ async def get_main_personalized_feed(
         )
 
 
+async def _build_explore_feed(
+    user_id: Optional[str],
+    regions: Optional[List[str]],
+    categories: Optional[List[str]],
+    user_priority_tag: str = "none",
+    revalidate: bool = False
+) -> Dict[str, Any]:
+    """탐색 피드 응답 생성 (revalidate면 섹션 캐시도 재계산)"""
+    # 동적 지역/카테고리 순서 결정 (하드코딩 제거)
+    if not regions or not categories:
+        engine = await get_engine()
+        popular_data = await engine.get_popular_regions_and_categories()
+
+        target_regions = regions or popular_data['regions']
+        target_categories = categories or popular_data['categories']
+    else:
+        target_regions = regions
+        target_categories = categories
+
+    logger.info(f"Getting explore feed for user: {user_id}")
+    logger.info(f"Dynamic regions: {target_regions[:3]}... ({len(target_regions)} total)")
+    logger.info(f"Dynamic categories: {target_categories[:3]}... ({len(target_categories)} total)")
+
+    # 성능을 위해 일부 카테고리만 사용, 지역은 모두 포함
+    limited_regions = target_regions  # 모든 지역 포함
+
+    # 체험 우선순위 사용자에게는 체험 관련 카테고리만 제공
+    if user_priority_tag == "experience":
+        limited_categories = ["nature", "humanities", "leisure_sports"]
+        logger.info(f"🎯 Experience user - showing only experience categories: {limited_categories}")
+    else:
+        limited_categories = target_categories[:6]  # 상위 6개 카테고리 (요청사항 반영)
+
+    # 병렬로 제한된 섹션 데이터 조회
+    explore_data = await fetch_explore_data_parallel(
+        user_id=user_id,
+        regions=limited_regions,
+        categories=limited_categories,
+        priority_tag=user_priority_tag,
+        revalidate=revalidate
+    )
+
+    # 응답에 메타데이터 추가
+    total_sections = len(target_regions) * len(target_categories)
+    non_empty_sections = sum(
+        1 for region_data in explore_data.values()
+        for category_data in region_data.values()
+        if category_data
+    )
+
+    return {
+        "data": explore_data,
+        "metadata": {
+            "total_sections": total_sections,
+            "non_empty_sections": non_empty_sections,
+            "regions": target_regions,
+            "categories": target_categories,
+            "ordering": "dynamic_popularity"  # 동적 인기순 표시
+        }
+    }
+
+
 @router.get("/main-feed/explore", response_model=dict)
 async def get_main_explore_feed(
     current_user=Depends(get_current_user_optional),
@@ -398,7 +726,7 @@ async def get_main_explore_feed(
     categories: Optional[List[str]] = Query(None, description="요청할 카테고리 목록 (미지정시 인기순)")
 ):
     """
-    메인 하단 '탐색' 섹션 - 동적 인기순 지역별/카테고리별 추천 (Redis 캐싱 적용)
+    메인 하단 '탐색' 섹션 - 동적 인기순 지역별/카테고리별 추천 (Redis SWR 캐싱 적용)
     - 지역: 북마크 총합 기준 인기순
     - 카테고리: 북마크 총합 기준 인기순
     - 장소: bookmark_cnt 기준 인기순
@@ -406,10 +734,13 @@ async def get_main_explore_feed(
     try:
         user_id = str(current_user.user_id) if current_user else None
 
+        # 🔑 사용자 우선순위 태그 (카테고리 필터링에 쓰이므로 캐시 키에도 포함)
+        user_priority_tag = await resolve_user_priority_tag(user_id)
+
         # 전체 응답 캐싱을 위한 캐시 키 생성
         regions_str = ",".join(sorted(regions)) if regions else "default"
         categories_str = ",".join(sorted(categories)) if categories else "default"
-        
+
         explore_cache_key = generate_cache_key(
             prefix="main_explore",
             user_id=user_id,
@@ -417,97 +748,19 @@ async def get_main_explore_feed(
             category=categories_str,
             limit=50,  # 기본 limit
             regions_count=len(regions) if regions else 0,
-            categories_count=len(categories) if categories else 0
-        )
-        
-        # 캐시된 응답 조회 (복원됨)
-        cached_response = cache.get(explore_cache_key)
-        if cached_response is not None:
-            logger.info(f"🚀 Main explore feed cache hit: {explore_cache_key}")
-            return cached_response
-
-        # 동적 지역/카테고리 순서 결정 (하드코딩 제거)
-        if not regions or not categories:
-            engine = await get_engine()
-            popular_data = await engine.get_popular_regions_and_categories()
-
-            target_regions = regions or popular_data['regions']
-            target_categories = categories or popular_data['categories']
-        else:
-            target_regions = regions
-            target_categories = categories
-
-        logger.info(f"Getting explore feed for user: {user_id}")
-        logger.info(f"Dynamic regions: {target_regions[:3]}... ({len(target_regions)} total)")
-        logger.info(f"Dynamic categories: {target_categories[:3]}... ({len(target_categories)} total)")
-
-        # 🔑 사용자 우선순위 태그 조회 (카테고리 필터링용)
-        user_priority_tag = "none"
-        if user_id:
-            try:
-                engine = await get_engine()
-                priority = await engine.get_user_priority_tag(user_id)
-                user_priority_tag = priority or "none"
-            except Exception as e:
-                logger.warning(f"Failed to get user priority for cache key: {e}")
-
-        # 성능을 위해 일부 카테고리만 사용, 지역은 모두 포함
-        limited_regions = target_regions  # 모든 지역 포함
-
-        # 체험 우선순위 사용자에게는 체험 관련 카테고리만 제공
-        if user_priority_tag == "experience":
-            limited_categories = ["nature", "humanities", "leisure_sports"]
-            logger.info(f"🎯 Experience user - showing only experience categories: {limited_categories}")
-        else:
-            limited_categories = target_categories[:6]  # 상위 6개 카테고리 (요청사항 반영)
-
-        # 🚀 Redis 캐시 키 생성 (우선순위 태그 포함) - v3 (체험 우선순위 필터링 수정)
-        cache_key = f"explore_feed_v3:{user_id or 'anonymous'}:{user_priority_tag}:{':'.join(sorted(limited_regions))}:{':'.join(sorted(limited_categories))}"
-
-        logger.info(f"🔑 Cache key generated: {cache_key}")
-
-        # 캐시에서 조회 시도 (주석처리)
-        # from cache_utils import cache
-        # cached_result = cache.get(cache_key)
-        # if cached_result is not None:
-        #     logger.info(f"🎯 Cache hit for explore feed: {cache_key}")
-        #     return cached_result
-        # else:
-        #     logger.info(f"🔍 Cache miss for explore feed: {cache_key}")
-
-        # 병렬로 제한된 섹션 데이터 조회
-        explore_data = await fetch_explore_data_parallel(
-            user_id=user_id,
-            regions=limited_regions,
-            categories=limited_categories,
+            categories_count=len(categories) if categories else 0,
             priority_tag=user_priority_tag
         )
 
-        # 응답에 메타데이터 추가
-        total_sections = len(target_regions) * len(target_categories)
-        non_empty_sections = sum(
-            1 for region_data in explore_data.values()
-            for category_data in region_data.values()
-            if category_data
+        # 🚀 1시간 동안 신선, 이후 유예 시간 동안 stale 응답 + 백그라운드 갱신
+        return await get_or_revalidate(
+            explore_cache_key,
+            lambda: _build_explore_feed(user_id, regions, categories, user_priority_tag),
+            soft_ttl=3600,
+            refresh=lambda: _build_explore_feed(user_id, regions, categories, user_priority_tag, revalidate=True),
+            tags=recommendation_cache_tags(user_id, *(regions or []))
         )
 
-        result = {
-            "data": explore_data,
-            "metadata": {
-                "total_sections": total_sections,
-                "non_empty_sections": non_empty_sections,
-                "regions": target_regions,
-                "categories": target_categories,
-                "ordering": "dynamic_popularity"  # 동적 인기순 표시
-            }
-        }
-
-        # 🚀 응답을 새로운 캐시 키로 저장 (1시간 TTL - 메인페이지용 최적화) - 복원됨
-        cache.set(explore_cache_key, result, expire=3600)
-        logger.info(f"🚀 Main explore feed cached: {explore_cache_key}")
-
-        return result
-
     except Exception as e:
         logger.error(f"Error in get_main_explore_feed: {e}")
         raise HTTPException(
@@ -535,6 +788,9 @@ async def get_explore_section(
     try:
         user_id = str(current_user.user_id) if current_user else None
 
+        # 사용자 우선순위 태그 (취향 캐시) - 섹션 카테고리를 바꾸므로 캐시 키에 포함
+        user_priority_tag = await resolve_user_priority_tag(user_id)
+
         # 개별 섹션 캐시 키 생성
         section_cache_key = generate_cache_key(
             prefix="explore_section",
@@ -542,11 +798,12 @@ async def get_explore_section(
             region=region,
             category=category,
             limit=limit,
-            offset=offset
+            offset=offset,
+            priority_tag=user_priority_tag
         )
         
         # 캐시된 응답 조회 (복원됨)
-        cached_section = cache.get(section_cache_key)
+        cached_section = await async_cache.get(section_cache_key)
         if cached_section is not None:
             logger.info(f"🚀 Explore section cache hit: {section_cache_key}")
             return cached_section
@@ -555,24 +812,9 @@ async def get_explore_section(
 
         # 🎯 로그인된 사용자의 경우 우선순위 태그 기반으로 카테고리 결정 (안전한 처리)
         target_category = category
-        user_priority = None  # 기본값 설정
+        user_priority = user_priority_tag if user_priority_tag != "none" else None
         if current_user and user_id:
             try:
-                engine = await get_engine()
-
-                # 사용자 우선순위 태그 조회 (추가 보호)
-                try:
-                    user_priority = await asyncio.wait_for(
-                        engine.get_user_priority_tag(user_id),
-                        timeout=2.0  # 2초 타임아웃
-                    )
-                except asyncio.TimeoutError:
-                    logger.warning(f"Timeout getting user priority for {user_id}")
-                    user_priority = None
-                except Exception as priority_e:
-                    logger.warning(f"Error getting user priority for {user_id}: {priority_e}")
-                    user_priority = None
-
                 if user_priority:
                     logger.info(f"User {user_id} priority tag: {user_priority}")
 
@@ -664,7 +906,11 @@ async def get_explore_section(
         }
         
         # 결과를 캐시에 저장 (개별 섹션은 15분 캐싱) - 복원됨
-        cache.set(section_cache_key, section_response, expire=900)
+        await async_cache.set(section_cache_key, section_response, expire=900)
+        await invalidation_bus.register(
+            section_cache_key,
+            [*recommendation_cache_tags(user_id, region), *recommendation_place_tags(paginated_recommendations)]
+        )
         logger.info(f"🚀 Explore section cached: {section_cache_key}")
         
         return section_response
@@ -737,6 +983,7 @@ async def health_check():
             "engine_responsive": True,
             "cache_status": cache_status,
             "cache_info": cache_info,
+            "swr_metrics": {**swr_metrics, "refreshes_in_flight": len(_background_refreshes)},
             "test_response_time_ms": response_time,
             "cache_working": response_time < 100,  # 100ms 이하면 캐시에서 응답
             "timestamp": asyncio.get_event_loop().time(),
@@ -771,6 +1018,19 @@ async def clear_cache():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.delete("/cache/invalidate")
+async def invalidate_cache_tags(
+    tags: List[str] = Query(..., description="무효화할 태그 목록 (예: user:123, region:서울특별시)")
+):
+    """태그 단위 캐시 무효화 (전체 삭제 대신 영향받는 엔트리만 삭제)"""
+    try:
+        deleted = await invalidation_bus.invalidate(*tags, reason="manual")
+        return {"invalidated_tags": tags, "deleted_keys": deleted}
+    except Exception as e:
+        logger.error(f"❌ Cache invalidate error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ============================================================================
 # 📝 설정 정보 조회 API (디버깅/모니터링용)
 # ============================================================================
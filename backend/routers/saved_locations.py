@@ -1,14 +1,17 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, text
+from sqlalchemy import desc, tuple_
 
 from database import get_db
 from models import SavedLocation, User
 from schemas import SavedLocationCreate, SavedLocationResponse, SavedLocationListResponse
 from auth_utils import get_current_user, get_current_user_optional
-from cache_utils import cache
+from cache_utils import async_cache
+from cache_invalidation import invalidation_bus, user_tag, place_tag
+from utils.pagination import encode_cursor, decode_cursor, cursor_datetime, cached_count
+from services.place_resolver import place_resolver, parse_place_ref, unknown_place
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -16,40 +19,13 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["saved-locations"])
 
 
-def get_place_info(db: Session, table_name: str, place_id: str):
-    """테이블명과 ID를 통해 장소 정보를 조회"""
-    try:
-        # 안전한 테이블명 검증 (SQL 인젝션 방지)
-        valid_tables = ['accommodation', 'humanities', 'leisure_sports', 'nature', 'restaurants', 'shopping']
-        if table_name not in valid_tables:
-            return {"name": "Unknown Place", "image": None, "address": None}
-        
-        # 동적 쿼리 실행 - 이름, 이미지, 주소 조회
-        query = text(f"SELECT name, image_urls, address FROM {table_name} WHERE id = :place_id")
-        result = db.execute(query, {"place_id": place_id}).fetchone()
-        
-        if result:
-            # image_urls가 JSON 배열인 경우 첫 번째 이미지 사용
-            image_url = None
-            if result[1]:
-                try:
-                    import json
-                    image_urls = json.loads(result[1]) if isinstance(result[1], str) else result[1]
-                    if isinstance(image_urls, list) and len(image_urls) > 0:
-                        image_url = image_urls[0]
-                except:
-                    image_url = result[1]  # 문자열인 경우 그대로 사용
-            
-            return {
-                "name": result[0] or "Unknown Place",
-                "image": image_url,
-                "address": result[2]
-            }
-        else:
-            return {"name": "Unknown Place", "image": None, "address": None}
-    except Exception as e:
-        print(f"Error getting place info: {e}")
-        return {"name": "Unknown Place", "image": None, "address": None}
+def saved_location_tags(user_id: str, places: str = None) -> List[str]:
+    """저장 장소 변경 시 무효화할 태그 (사용자 추천/저장 목록 + 해당 장소)"""
+    tags = [user_tag(user_id), user_tag(user_id, "saved_locations")]
+    if places and ":" in places:
+        table_name, place_id = places.split(":", 1)
+        tags.append(place_tag(table_name, place_id))
+    return tags
 
 
 @router.post("/", response_model=SavedLocationResponse)
@@ -86,9 +62,11 @@ async def create_saved_location(
         db.commit()
         db.refresh(db_location)
         
-        # 캐시 무효화: 해당 사용자의 저장된 장소 목록 캐시 삭제
-        cache.delete(f"saved_locations:list:{current_user.user_id}:0:20")
-        cache.delete(f"saved_locations:list:{current_user.user_id}:0:10")
+        # 캐시 무효화: 해당 사용자의 저장 목록/추천 캐시 + 장소 태그
+        await invalidation_bus.invalidate(
+            *saved_location_tags(current_user.user_id, db_location.places),
+            reason="saved_location_create"
+        )
         
         logger.info(f"저장된 장소 생성: {db_location.places} for user {current_user.user_id}")
         return db_location
@@ -106,16 +84,18 @@ async def create_saved_location(
 async def get_saved_locations(
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """현재 사용자의 저장된 장소 목록을 가져옵니다."""
+    """현재 사용자의 저장된 장소 목록을 가져옵니다. (cursor 지정 시 keyset 페이지네이션, skip 무시)"""
     try:
         # 캐시 키 생성 (사용자별로 캐시)
-        cache_key = f"saved_locations:list:{current_user.user_id}:{skip}:{limit}"
+        page_key = f"cursor:{cursor}" if cursor else skip
+        cache_key = f"saved_locations:list:{current_user.user_id}:{page_key}:{limit}"
         
         # 캐시에서 조회 시도
-        cached_result = cache.get(cache_key)
+        cached_result = await async_cache.get(cache_key)
         if cached_result is not None:
             logger.info(f"Cache hit for saved locations: {cache_key}")
             return SavedLocationListResponse(**cached_result)
@@ -123,28 +103,45 @@ async def get_saved_locations(
         logger.info(f"Cache miss for saved locations: {cache_key}")
         
         # 최신 순으로 저장된 장소 조회
-        locations = (
+        query = (
             db.query(SavedLocation)
             .filter(SavedLocation.user_id == current_user.user_id)
-            .order_by(desc(SavedLocation.created_at))
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .order_by(desc(SavedLocation.created_at), desc(SavedLocation.id))
         )
+        if cursor:
+            position = decode_cursor(cursor, required=("created_at", "id"))
+            query = query.filter(
+                tuple_(SavedLocation.created_at, SavedLocation.id)
+                < (cursor_datetime(position["created_at"]), position["id"])
+            )
+        else:
+            query = query.offset(skip)
+        locations = query.limit(limit).all()
         
-        total = (
-            db.query(SavedLocation)
-            .filter(SavedLocation.user_id == current_user.user_id)
-            .count()
+        # 전체 개수는 캐싱 (저장/삭제 시 saved_locations 태그로 무효화)
+        total = await cached_count(
+            f"saved_locations:count:{current_user.user_id}",
+            lambda: db.query(SavedLocation).filter(SavedLocation.user_id == current_user.user_id).count(),
+            expire=600,
+            tags=[user_tag(current_user.user_id, "saved_locations")]
         )
         
-        result = SavedLocationListResponse(locations=locations, total=total)
+        next_cursor = None
+        if len(locations) == limit:
+            next_cursor = encode_cursor(created_at=locations[-1].created_at, id=locations[-1].id)
+        
+        result = SavedLocationListResponse(locations=locations, total=total, next_cursor=next_cursor)
         
         # 결과를 캐시에 저장 (10분)
-        cache.set(cache_key, result.dict(), expire=600)
+        await invalidation_bus.set(
+            cache_key, result.dict(), expire=600,
+            tags=[user_tag(current_user.user_id, "saved_locations")]
+        )
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"저장된 장소 조회 중 오류: {str(e)}")
         raise HTTPException(
@@ -164,7 +161,7 @@ async def get_saved_location(
     cache_key = f"saved_location:detail:{current_user.user_id}:{location_id}"
     
     # 캐시에서 조회 시도
-    cached_result = cache.get(cache_key)
+    cached_result = await async_cache.get(cache_key)
     if cached_result is not None:
         logger.info(f"Cache hit for saved location: {cache_key}")
         return SavedLocationResponse(**cached_result)
@@ -194,7 +191,10 @@ async def get_saved_location(
         "created_at": location.created_at.isoformat() if location.created_at else None,
         "updated_at": location.updated_at.isoformat() if location.updated_at else None
     }
-    cache.set(cache_key, location_dict, expire=900)
+    await invalidation_bus.set(
+        cache_key, location_dict, expire=900,
+        tags=[user_tag(current_user.user_id, "saved_locations")]
+    )
     
     return location
 
@@ -230,10 +230,11 @@ async def update_saved_location(
         db.commit()
         db.refresh(location)
         
-        # 캐시 무효화
-        cache.delete(f"saved_location:detail:{current_user.user_id}:{location_id}")
-        cache.delete(f"saved_locations:list:{current_user.user_id}:0:20")
-        cache.delete(f"saved_locations:list:{current_user.user_id}:0:10")
+        # 캐시 무효화 (상세/목록/공개 목록은 사용자 saved_locations 태그로 함께 삭제)
+        await invalidation_bus.invalidate(
+            *saved_location_tags(current_user.user_id, location.places),
+            reason="saved_location_update"
+        )
         
         logger.info(f"저장된 장소 수정: {location.places} for user {current_user.user_id}")
         return location
@@ -275,10 +276,11 @@ async def delete_saved_location(
         db.delete(location)
         db.commit()
         
-        # 캐시 무효화
-        cache.delete(f"saved_location:detail:{current_user.user_id}:{location_id}")
-        cache.delete(f"saved_locations:list:{current_user.user_id}:0:20")
-        cache.delete(f"saved_locations:list:{current_user.user_id}:0:10")
+        # 캐시 무효화 (상세/목록/공개 목록은 사용자 saved_locations 태그로 함께 삭제)
+        await invalidation_bus.invalidate(
+            *saved_location_tags(current_user.user_id, location.places),
+            reason="saved_location_delete"
+        )
         
         logger.info(f"저장된 장소 삭제: {location.places} for user {current_user.user_id}")
         return {"message": "저장된 장소가 삭제되었습니다."}
@@ -335,7 +337,7 @@ async def get_user_saved_locations(
     cache_key = f"saved_locations:public:{user_id}:{page}:{limit}"
     
     # 캐시에서 조회 시도
-    cached_result = cache.get(cache_key)
+    cached_result = await async_cache.get(cache_key)
     if cached_result is not None:
         logger.info(f"Cache hit for public saved locations: {cache_key}")
         return SavedLocationListResponse(**cached_result)
@@ -361,28 +363,19 @@ async def get_user_saved_locations(
     # 총 개수 조회
     total = db.query(SavedLocation).filter(SavedLocation.user_id == user_id).count()
     
-    # 응답 데이터 구성
+    # 응답 데이터 구성 (장소 정보는 테이블당 한 번의 쿼리로 일괄 조회)
+    place_refs = [parse_place_ref(location.places) for location in locations]
+    summaries = place_resolver.resolve(db, [ref for ref in place_refs if ref])
     location_list = []
-    for location in locations:
-        # places 필드에서 테이블명과 ID 추출
-        place_info = location.places
-        place_name = "Unknown Place"
-        
-        if place_info and ":" in place_info:
-            table_name, place_id = place_info.split(":", 1)
-            place_data = get_place_info(db, table_name, place_id)
-            place_name = place_data["name"]
-            place_image = place_data["image"]
-            place_address = place_data["address"]
-            logger.info(f"Place info: {place_info}, table: {table_name}, id: {place_id}, name: {place_name}")
-        
+    for location, ref in zip(locations, place_refs):
+        place_data = summaries[ref] if ref else unknown_place()
         location_dict = {
             "id": location.id,
             "user_id": location.user_id,
-            "places": place_info,  # 기존 형식 유지
-            "place_name": place_name,  # 장소명 추가
-            "place_image": place_image if 'place_image' in locals() else None,  # 장소 이미지 추가
-            "place_address": place_address if 'place_address' in locals() else None,  # 장소 주소 추가
+            "places": location.places,  # 기존 형식 유지
+            "place_name": place_data["name"],  # 장소명 추가
+            "place_image": place_data["image"],  # 장소 이미지 추가
+            "place_address": place_data["address"],  # 장소 주소 추가
             "created_at": location.created_at.isoformat() if location.created_at else None,
             "updated_at": location.updated_at.isoformat() if location.updated_at else None
         }
@@ -397,6 +390,6 @@ async def get_user_saved_locations(
     }
     
     # 결과를 캐시에 저장 (5분 - 다른 사용자 데이터이므로 짧게)
-    cache.set(cache_key, result, expire=300)
+    await invalidation_bus.set(cache_key, result, expire=300, tags=[user_tag(user_id, "saved_locations")])
     
     return SavedLocationListResponse(**result)
\ No newline at end of file
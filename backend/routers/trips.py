@@ -1,36 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.orm import Session, load_only
 from typing import List, Optional
 from datetime import datetime
-import json
 
 from database import get_db
 from models import Trip, User
 from schemas import TripCreate, TripResponse, TripListResponse, TripStatus, TripCopyRequest
 from routers.auth import get_current_user
 from auth_utils import get_current_user_optional
-from cache_utils import cache
+from cache_utils import async_cache
+from cache_invalidation import invalidation_bus, user_tag
+from services.place_resolver import place_resolver
+from utils.json_codec import FastJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
-
-def get_place_name(db: Session, table_name: str, place_id: str):
-    """테이블명과 ID를 통해 장소명을 조회"""
-    try:
-        # 안전한 테이블명 검증 (SQL 인젝션 방지)
-        valid_tables = ['accommodation', 'humanities', 'leisure_sports', 'nature', 'restaurants', 'shopping']
-        if table_name not in valid_tables:
-            return "Unknown Place"
-        
-        # 동적 쿼리 실행
-        query = text(f"SELECT name FROM {table_name} WHERE id = :place_id")
-        result = db.execute(query, {"place_id": place_id}).fetchone()
-        
-        return result[0] if result else "Unknown Place"
-    except Exception as e:
-        print(f"Error getting place name: {e}")
-        return "Unknown Place"
+# 목록 응답에 필요한 컬럼만 조회 (예산/커버 이미지 등은 상세/수정 화면에서만 사용)
+# places는 목록 카드(순서/장소명)와 편집 화면 이동(dayNumber/isLocked)에 모두 쓰이므로 전체를 읽음
+TRIP_LIST_COLUMNS = (
+    Trip.id, Trip.title, Trip.description, Trip.places,
+    Trip.start_date, Trip.end_date, Trip.status, Trip.created_at
+)
 
 
 def get_status_display(status: str):
@@ -56,11 +46,11 @@ async def get_user_trips(
     cache_key = f"trips:list:{current_user.user_id}:{status_filter.value if status_filter else 'all'}:{offset}:{limit}"
     
     # 캐시에서 조회 시도
-    cached_result = cache.get(cache_key)
+    cached_result = await async_cache.get(cache_key)
     if cached_result is not None:
         return cached_result
     
-    query = db.query(Trip).filter(Trip.user_id == current_user.user_id)
+    query = db.query(Trip).options(load_only(*TRIP_LIST_COLUMNS)).filter(Trip.user_id == current_user.user_id)
     
     if status_filter:
         query = query.filter(Trip.status == status_filter.value)
@@ -70,16 +60,10 @@ async def get_user_trips(
     
     # trips를 dict로 변환하여 반환
     trips_list = []
-    for trip in trips:
-        places = []
-        if trip.places:
-            places_data = json.loads(trip.places)
-            # 각 장소에 대해 실제 장소명을 조회하여 추가
-            for place in places_data:
-                place_name = get_place_name(db, place.get('table_name', ''), place.get('id', ''))
-                place['name'] = place_name
-                places.append(place)
-        
+    places_by_trip = [[dict(place) for place in trip.place_list] for trip in trips]
+    # 모든 여행의 장소명을 테이블당 한 번의 쿼리로 조회하여 추가
+    place_resolver.attach_names(db, places_by_trip)
+    for trip, places in zip(trips, places_by_trip):
         trips_list.append({
             "id": trip.id,
             "title": trip.title,
@@ -95,7 +79,7 @@ async def get_user_trips(
     result = {"trips": trips_list, "total": total}
     
     # 결과를 캐시에 저장 (15분)
-    cache.set(cache_key, result, expire=900)
+    await invalidation_bus.set(cache_key, result, expire=900, tags=[user_tag(current_user.user_id, "trips")])
     
     return result
 
@@ -114,7 +98,7 @@ async def get_user_public_trips(
     cache_key = f"trips:public:{user_id}:{status_filter.value if status_filter else 'all'}:{offset}:{limit}"
     
     # 캐시에서 조회 시도
-    cached_result = cache.get(cache_key)
+    cached_result = await async_cache.get(cache_key)
     if cached_result is not None:
         return cached_result
     
@@ -126,7 +110,7 @@ async def get_user_public_trips(
             detail="사용자를 찾을 수 없습니다."
         )
     
-    query = db.query(Trip).filter(Trip.user_id == user_id)
+    query = db.query(Trip).options(load_only(*TRIP_LIST_COLUMNS)).filter(Trip.user_id == user_id)
     
     if status_filter:
         query = query.filter(Trip.status == status_filter.value)
@@ -136,16 +120,10 @@ async def get_user_public_trips(
     
     # trips를 dict로 변환하여 반환
     trips_list = []
-    for trip in trips:
-        places = []
-        if trip.places:
-            places_data = json.loads(trip.places)
-            # 각 장소에 대해 실제 장소명을 조회하여 추가
-            for place in places_data:
-                place_name = get_place_name(db, place.get('table_name', ''), place.get('id', ''))
-                place['name'] = place_name
-                places.append(place)
-        
+    places_by_trip = [[dict(place) for place in trip.place_list] for trip in trips]
+    # 모든 여행의 장소명을 테이블당 한 번의 쿼리로 조회하여 추가
+    place_resolver.attach_names(db, places_by_trip)
+    for trip, places in zip(trips, places_by_trip):
         trips_list.append({
             "id": trip.id,
             "title": trip.title,
@@ -161,7 +139,7 @@ async def get_user_public_trips(
     result = {"trips": trips_list, "total": total}
     
     # 결과를 캐시에 저장 (5분 - 다른 사용자 데이터이므로 짧게)
-    cache.set(cache_key, result, expire=300)
+    await invalidation_bus.set(cache_key, result, expire=300, tags=[user_tag(user_id, "trips")])
     
     return result
 
@@ -177,7 +155,7 @@ async def get_trip(
     cache_key = f"trip:detail:{current_user.user_id}:{trip_id}"
     
     # 캐시에서 조회 시도
-    cached_result = cache.get(cache_key)
+    cached_result = await async_cache.get(cache_key)
     if cached_result is not None:
         return cached_result
     
@@ -193,14 +171,9 @@ async def get_trip(
         )
     
     # places JSON 필드 파싱 및 장소명 조회
-    places = []
-    if trip.places:
-        places_data = json.loads(trip.places)
-        # 각 장소에 대해 실제 장소명을 조회하여 추가
-        for place in places_data:
-            place_name = get_place_name(db, place.get('table_name', ''), place.get('id', ''))
-            place['name'] = place_name
-            places.append(place)
+    places = [dict(place) for place in trip.place_list]
+    # 장소명 일괄 조회하여 추가
+    place_resolver.attach_names(db, [places])
     
     result = {
         "id": trip.id,
@@ -215,7 +188,7 @@ async def get_trip(
     }
     
     # 결과를 캐시에 저장 (20분)
-    cache.set(cache_key, result, expire=1200)
+    await invalidation_bus.set(cache_key, result, expire=1200, tags=[user_tag(current_user.user_id, "trips")])
     
     return result
 
@@ -268,7 +241,7 @@ async def create_trip(
                 }
                 simplified_places.append(simplified_place)
         
-        places_json = json.dumps(simplified_places) if simplified_places else None
+        trip_places = simplified_places or None
         
         # 날짜 문자열을 datetime으로 변환 (프론트엔드에서 camelCase로 보냄)
         start_date = None
@@ -283,7 +256,7 @@ async def create_trip(
         trip = Trip(
             user_id=current_user.user_id,
             title=trip_data.get("title", ""),
-            places=places_json,
+            places=trip_places,
             start_date=start_date,
             end_date=end_date,
             status="planned",  # 기본 상태 (프론트엔드와 매칭)
@@ -297,8 +270,7 @@ async def create_trip(
         db.refresh(trip)
         
         # 캐시 무효화: 해당 사용자의 여행 목록 캐시 삭제
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:20")
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:10")
+        await invalidation_bus.invalidate(user_tag(current_user.user_id, "trips"), reason="trip_write")
         
         # 성공 응답 반환
         return {
@@ -375,7 +347,7 @@ async def update_trip(
                 }
                 simplified_places.append(simplified_place)
         
-        places_json = json.dumps(simplified_places) if simplified_places else None
+        trip_places = simplified_places or None
         
         # 날짜 문자열을 datetime으로 변환 (프론트엔드에서 camelCase로 보냄)
         start_date = None
@@ -388,7 +360,7 @@ async def update_trip(
         
         # Trip 정보 업데이트
         trip.title = trip_data.get("title", trip.title)
-        trip.places = places_json
+        trip.places = trip_places
         trip.start_date = start_date if start_date else trip.start_date
         trip.end_date = end_date if end_date else trip.end_date
         trip.total_budget = trip_data.get("total_budget", trip.total_budget)
@@ -399,9 +371,7 @@ async def update_trip(
         db.refresh(trip)
         
         # 캐시 무효화
-        cache.delete(f"trip:detail:{current_user.user_id}:{trip_id}")
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:20")
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:10")
+        await invalidation_bus.invalidate(user_tag(current_user.user_id, "trips"), reason="trip_write")
         
         # 성공 응답 반환 (POST와 유사한 형식)
         return {
@@ -441,9 +411,7 @@ async def delete_trip(
         db.commit()
         
         # 캐시 무효화
-        cache.delete(f"trip:detail:{current_user.user_id}:{trip_id}")
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:20")
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:10")
+        await invalidation_bus.invalidate(user_tag(current_user.user_id, "trips"), reason="trip_write")
         
         return {"message": "여행이 삭제되었습니다."}
     
@@ -480,9 +448,7 @@ async def update_trip_status(
         db.refresh(trip)
         
         # 캐시 무효화
-        cache.delete(f"trip:detail:{current_user.user_id}:{trip_id}")
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:20")
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:10")
+        await invalidation_bus.invalidate(user_tag(current_user.user_id, "trips"), reason="trip_write")
         
         return {"message": f"여행 상태가 {status.value}로 변경되었습니다."}
     
@@ -519,27 +485,14 @@ async def copy_trip(
         # 새로운 제목 설정 (기본값: "복사본 - 원본제목")
         new_title = copy_request.new_title or f"복사본 - {original_trip.title}"
         
-        # places 필드 처리 (JSON 문자열인 경우 파싱)
-        places_data = original_trip.places
-        logger.info(f"원본 places 데이터 타입: {type(places_data)}, 값: {places_data}")
-        if isinstance(places_data, str):
-            try:
-                places_data = json.loads(places_data)
-                logger.info(f"JSON 파싱 성공: {places_data}")
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON 파싱 실패: {e}")
-                places_data = []
-        
-        # places_data가 리스트인 경우 JSON 문자열로 변환
-        if isinstance(places_data, list):
-            places_data = json.dumps(places_data)
-            logger.info(f"places 데이터를 JSON 문자열로 변환: {places_data}")
+        # places 필드 복사 (JSONB 목록 그대로 사용)
+        places_data = [dict(place) for place in original_trip.place_list] or None
         
         # 새로운 여행 일정 생성
         new_trip = Trip(
             user_id=current_user.user_id,
             title=new_title,
-            places=places_data,  # 파싱된 JSON 데이터
+            places=places_data,  # 원본 장소 목록
             start_date=original_trip.start_date,
             end_date=original_trip.end_date,
             status="planned",  # 복사된 일정은 항상 계획 상태로 시작
@@ -555,8 +508,7 @@ async def copy_trip(
         logger.info(f"새 일정 생성 완료 - id: {new_trip.id}")
         
         # 캐시 무효화
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:20")
-        cache.delete(f"trips:list:{current_user.user_id}:all:0:10")
+        await invalidation_bus.invalidate(user_tag(current_user.user_id, "trips"), reason="trip_write")
         
         return new_trip
         
@@ -7,7 +7,8 @@ from database import get_db
 from models import User, UserPreference, UserPreferenceTag
 from schemas import UserResponse, UserPreferencesBasic
 from auth_utils import get_current_user
-from cache_utils import cache
+from cache_invalidation import invalidation_bus, user_tag
+from user_preference_cache import user_preference_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -132,34 +133,15 @@ async def save_user_preferences(
     # 저장된 여행 취향 정보 로그 출력
     logger.info(f"여행 취향 업데이트 성공: {{user_id: '{current_user.user_id}', email: '{current_user.email}', name: '{current_user.name}', persona: '{db_prefs.persona}', priority: '{db_prefs.priority}', accommodation: '{db_prefs.accommodation}', exploration: '{db_prefs.exploration}', saved_tags: {len(unique_tags)}, updated_at: '{db_prefs.updated_at}'}}")
     
-    # 캐시 무효화 - 사용자 취향 변경 시 추천 캐시 삭제
-    user_id = str(current_user.user_id)
-    
-    # 개인화 추천 캐시 삭제 (모든 우선순위 태그 조합 포함) - 개선됨
-    cache_patterns = [
-        f"personalized:{user_id}:*",
-        f"recommendations:{user_id}",
-        f"user:{user_id}",
-        f"rec_main:user_{user_id}:*",           # 메인 페이지 개인화 추천 (모든 우선순위 태그)
-        f"main_personalized:user_{user_id}:*", # 메인 페이지 전체 응답 (모든 우선순위 태그)
-        f"main_explore:user_{user_id}:*",      # 메인 페이지 탐색 섹션 (모든 우선순위 태그)
-        f"explore_feed_v3:{user_id}:*",        # 탐색 피드 v3 (모든 우선순위 태그)
-        f"explore_section:user_{user_id}:*"    # 개별 섹션 캐시 (모든 우선순위 태그)
-    ]
-    
-    # Redis SCAN을 사용하여 패턴 매칭 키들 삭제
-    try:
-        import redis
-        redis_client = cache.redis
-        
-        for pattern in cache_patterns:
-            for key in redis_client.scan_iter(match=pattern):
-                redis_client.delete(key)
-                logger.info(f"Deleted cache key: {key}")
-                
-        logger.info(f"Cache invalidated for user preferences update: {user_id}")
-    except Exception as cache_error:
-        logger.warning(f"Cache invalidation failed: {cache_error}")
+    # 캐시 무효화 - 사용자 취향 변경 시 추천/세션/취향 캐시 삭제 (태그 기반, 모든 워커에 전파)
+    await invalidation_bus.invalidate(
+        user_tag(current_user.user_id),
+        user_tag(current_user.user_id, "session"),
+        user_tag(current_user.user_id, "preferences"),
+        reason="preferences"
+    )
+    # 새 취향으로 취향 캐시 다시 채우기
+    await user_preference_cache.set(current_user.user_id, db_prefs)
     
     # Return the saved preferences
     return UserPreferencesBasic(
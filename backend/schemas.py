@@ -66,6 +66,7 @@ class PostResponse(PostBase):
 class PostListResponse(BaseModel):
     posts: List[PostResponse]
     total: int
+    next_cursor: Optional[str] = None  # 다음 페이지 커서 (keyset 페이지네이션)
 
 
 # Recommendation schemas
@@ -189,6 +190,7 @@ class SavedLocationResponse(SavedLocationBase):
 class SavedLocationListResponse(BaseModel):
     locations: List[SavedLocationResponse]
     total: int
+    next_cursor: Optional[str] = None  # 다음 페이지 커서 (keyset 페이지네이션)
 
 
 # Trip status enum
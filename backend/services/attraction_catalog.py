@@ -0,0 +1,100 @@
+"""
+관광지 지역/도시 카탈로그
+- 스냅샷에서 지역 → 도시 → 카테고리 테이블 → 장소 목록 구조를 미리 계산
+- 지역/도시 목록, 카테고리별 개수, 도시별 대표 장소를 테이블 재조회 없이 제공
+"""
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_INDEX_NAME = "catalog"
+
+
+class AttractionCatalog:
+    """
+    지역/도시 카탈로그
+
+    Attributes:
+        regions: 정렬된 지역 목록 (region_sorter 기준)
+        cities: (도시, 지역) 튜플의 정렬된 목록
+    """
+
+    def __init__(self, tables: List[str], regions: List[str], cities: List[str],
+                 region_sorter: Optional[Callable[[List[str]], List[str]]] = None):
+        # 지역 → 도시 → 테이블 → 문서 번호 (스냅샷 순서 = 테이블 기본 조회 순서)
+        self.tree: Dict[str, Dict[str, Dict[str, List[int]]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(list))
+        )
+        # 도시명 → 테이블 → 문서 번호 (지역 구분 없이, 조회 시 도시명 부분 일치로 합침)
+        self.city_docs: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self.region_table_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+        city_pairs = set()
+        for doc_id, (table, region, city) in enumerate(zip(tables, regions, cities)):
+            region = region.strip()
+            city = city.strip()
+            if region:
+                self.tree[region][city][table].append(doc_id)
+                self.region_table_counts[region][table] += 1
+            if city:
+                self.city_docs[city][table].append(doc_id)
+                city_pairs.add((city, region))
+
+        region_names = list(self.tree.keys())
+        self.regions: List[str] = region_sorter(region_names) if region_sorter else sorted(region_names)
+        self.cities: List[Tuple[str, str]] = sorted(city_pairs)
+        self.table_order = list(dict.fromkeys(tables))
+
+    def table_counts(self, region_query: str) -> Dict[str, int]:
+        """지역명 부분 일치(기존 region ILIKE '%q%', 대소문자 무시)에 해당하는 테이블별 장소 수"""
+        counts = {table: 0 for table in self.table_order}
+        query = region_query.strip().casefold()
+        for region, table_counts in self.region_table_counts.items():
+            if query in region.casefold():
+                for table, count in table_counts.items():
+                    counts[table] += count
+        return counts
+
+    def city_docs_matching(self, city_query: str) -> Dict[str, List[int]]:
+        """
+        도시명 부분 일치(기존 city ILIKE '%q%', 대소문자 무시) 장소의 테이블별 문서 번호
+
+        "서울"로 "서울특별시"를 찾는 것처럼 짧은 도시명으로도 조회됩니다. 문서 번호는 스냅샷 순서로 정렬됩니다.
+        """
+        query = city_query.strip().casefold()
+        if not query:
+            return {}
+        matched: Dict[str, List[int]] = defaultdict(list)
+        for city, docs_by_table in self.city_docs.items():
+            if query in city.casefold():
+                for table, doc_ids in docs_by_table.items():
+                    matched[table].extend(doc_ids)
+        return {table: sorted(doc_ids) for table, doc_ids in matched.items()}
+
+    def city_sample(self, city: str, limit: int) -> List[Tuple[str, int]]:
+        """도시별 대표 장소 (도시명 부분 일치) - 테이블마다 한 개씩 번갈아 뽑아 카테고리 다양성 확보"""
+        docs_by_table = self.city_docs_matching(city)
+        sample = []
+        depth = 0
+        while len(sample) < limit:
+            added = False
+            for table in self.table_order:
+                doc_ids = docs_by_table.get(table, [])
+                if depth < len(doc_ids):
+                    sample.append((table, doc_ids[depth]))
+                    added = True
+                    if len(sample) >= limit:
+                        break
+            if not added:
+                break
+            depth += 1
+        return sample
+
+
+def build_attraction_catalog(snapshot, region_sorter=None) -> AttractionCatalog:
+    """AttractionSnapshotStore 파생 인덱스 빌더"""
+    catalog = AttractionCatalog(snapshot.tables, snapshot.regions, snapshot.cities, region_sorter)
+    logger.info(f"🗺️ Attraction catalog built: {len(catalog.regions)} regions, {len(catalog.cities)} cities")
+    return catalog
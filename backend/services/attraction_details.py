@@ -0,0 +1,207 @@
+"""
+관광지 상세 문서 저장소
+- 상세 응답 JSON을 장소별로 미리 렌더링해 Redis에 보관 (키: attraction_detail:{table}_{id})
+- 스냅샷 (재)구성 시 스냅샷이 함께 렌더링한 문서로 일괄 갱신 (여러 워커 중 하나만 - Redis 락)
+  내용(ETag)이 바뀐 문서만 다시 쓰고, 그대로인 문서는 TTL만 연장, 사라진 장소의 문서는 삭제
+- 문서 내용 해시를 ETag로 제공 → If-None-Match 일치 시 304 응답
+- 문서가 없는 장소(신규/만료)는 요청 시 한 번 렌더링해 저장 (write-through)
+"""
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Response
+
+from cache_utils import AsyncRedisCache, RedisCache, async_cache, cache
+from cache_invalidation import CacheInvalidationBus, invalidation_bus
+from services.attraction_snapshot import ATTRACTIONS_TAG
+from utils.json_codec import FastJSONResponse, json_dumps
+
+logger = logging.getLogger(__name__)
+
+DETAIL_INDEX_NAME = "details"
+DETAIL_KEY_PREFIX = "attraction_detail:"
+# 스냅샷 TTL보다 충분히 길게 유지 (재구성 때마다 갱신됨)
+DETAIL_TTL = int(os.getenv("ATTRACTION_DETAIL_TTL", "172800"))
+# 클라이언트/CDN 캐시 유지 시간 (이후에는 ETag로 재검증)
+DETAIL_MAX_AGE = int(os.getenv("ATTRACTION_DETAIL_MAX_AGE", "300"))
+PUBLISH_LOCK_KEY = "attraction_details_publish"
+PUBLISH_LOCK_TTL = int(os.getenv("ATTRACTION_DETAIL_PUBLISH_INTERVAL", "1200"))
+PUBLISH_BATCH_SIZE = 500
+
+PlaceKey = Tuple[str, int]
+DetailRenderer = Callable[[Any, str], Dict[str, Any]]
+
+
+def content_etag(document: Dict[str, Any]) -> str:
+    """문서 내용 해시 기반 강한 ETag"""
+    return '"' + hashlib.sha1(json_dumps(document).encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 ETag와 일치하는지 (약한 비교, 여러 값/와일드카드 허용)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return etag in candidates
+
+
+def detail_response(envelope: Dict[str, Any], if_none_match: Optional[str] = None) -> Response:
+    """상세 문서 응답 (ETag 일치 시 본문 없이 304)"""
+    headers = {"ETag": envelope["etag"], "Cache-Control": f"public, max-age={DETAIL_MAX_AGE}"}
+    if etag_matches(if_none_match, envelope["etag"]):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content=envelope["doc"], headers=headers)
+
+
+class DetailPublishResult:
+    """스냅샷 파생 인덱스로 보관되는 일괄 생성 결과"""
+
+    def __init__(self, published: int, skipped: bool = False, unchanged: int = 0, removed: int = 0):
+        self.published = published
+        self.skipped = skipped
+        self.unchanged = unchanged
+        self.removed = removed
+        self.published_at = time.time()
+
+
+class AttractionDetailStore:
+    """
+    관광지 상세 문서 저장소
+
+    Args:
+        category_tables: {테이블명: ORM 모델}
+        renderer: (ORM 객체, 테이블명) -> 상세 응답 dict (요청 시 렌더링용,
+            스냅샷의 detail_formatter와 같은 함수여야 함)
+    """
+
+    def __init__(self, category_tables: Dict[str, Any], renderer: DetailRenderer,
+                 sync_cache: RedisCache = cache, cache: AsyncRedisCache = async_cache,
+                 bus: CacheInvalidationBus = invalidation_bus):
+        self.category_tables = category_tables
+        self.renderer = renderer
+        self.sync_cache = sync_cache
+        self.cache = cache
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+        # 이 워커가 마지막으로 발행한 문서 ETag (변경된 문서만 다시 쓰기 위함)
+        self._published_etags: Dict[PlaceKey, str] = {}
+        bus.add_local_handler(self._on_invalidate)
+
+    @staticmethod
+    def key(place_key: PlaceKey) -> str:
+        table_name, place_id = place_key
+        return f"{DETAIL_KEY_PREFIX}{table_name}_{place_id}"
+
+    @staticmethod
+    def envelope(document: Dict[str, Any]) -> Dict[str, Any]:
+        return {"etag": content_etag(document), "doc": document}
+
+    # ------------------------------------------------------------------
+    # 일괄 생성 (스냅샷 재구성 스레드에서 실행)
+    # ------------------------------------------------------------------
+    def publish(self, snapshot, force: bool = False) -> DetailPublishResult:
+        """
+        스냅샷의 상세 문서를 파이프라인으로 저장 (다른 워커가 최근에 생성했으면 생략)
+
+        이전 발행과 ETag가 같은 문서는 본문 없이 TTL만 연장하고, 스냅샷에서 사라진 장소의 문서는 삭제합니다.
+        """
+        if snapshot.details is None:
+            return DetailPublishResult(0, skipped=True)
+        if not force and not self.sync_cache.try_lock(PUBLISH_LOCK_KEY, expire=PUBLISH_LOCK_TTL):
+            logger.info("📄 Attraction detail documents recently published by another worker, skipping")
+            return DetailPublishResult(0, skipped=True)
+
+        start_time = time.perf_counter()
+        published = unchanged = 0
+        etags: Dict[PlaceKey, str] = {}
+        try:
+            pipe = self.sync_cache.binary_redis.pipeline(transaction=False)
+            pending = 0
+            for table_name, place_id, document in zip(snapshot.tables, snapshot.ids, snapshot.details):
+                place_key = (table_name, place_id)
+                envelope = self.envelope(document)
+                etags[place_key] = envelope["etag"]
+                if self._published_etags.get(place_key) == envelope["etag"]:
+                    pipe.expire(self.key(place_key), DETAIL_TTL)
+                    unchanged += 1
+                else:
+                    pipe.set(self.key(place_key), self.sync_cache.codec.encode(envelope), ex=DETAIL_TTL)
+                    published += 1
+                pending += 1
+                if pending >= PUBLISH_BATCH_SIZE:
+                    pipe.execute()
+                    pending = 0
+
+            removed = [self.key(place_key) for place_key in self._published_etags.keys() - etags.keys()]
+            for start in range(0, len(removed), PUBLISH_BATCH_SIZE):
+                pipe.delete(*removed[start:start + PUBLISH_BATCH_SIZE])
+                pending += 1
+            if pending:
+                pipe.execute()
+        except Exception:
+            # 다음 재구성에서 다시 시도할 수 있도록 락 해제 (전체를 다시 쓰도록 발행 기록도 초기화)
+            self._published_etags = {}
+            self.sync_cache.release_lock(PUBLISH_LOCK_KEY)
+            raise
+
+        self._published_etags = etags
+        logger.info(
+            f"📄 Attraction detail documents published: {published} changed, {unchanged} unchanged, "
+            f"{len(removed)} removed ({time.perf_counter() - start_time:.2f}s)"
+        )
+        return DetailPublishResult(published, unchanged=unchanged, removed=len(removed))
+
+    def build_index(self, snapshot) -> DetailPublishResult:
+        """AttractionSnapshotStore 파생 인덱스 빌더 (스냅샷과 같은 시점의 데이터로 문서 갱신)"""
+        try:
+            return self.publish(snapshot)
+        except Exception as e:
+            logger.error(f"❌ Attraction detail publish failed (serving on-demand documents): {e}")
+            return DetailPublishResult(0, skipped=True)
+
+    async def _on_invalidate(self, tags: Set[str]):
+        """관광지 데이터 변경 시 다음 재구성에서 즉시 다시 생성, 개별 장소 태그는 해당 문서만 제거"""
+        if ATTRACTIONS_TAG in tags:
+            await self.cache.release_lock(PUBLISH_LOCK_KEY)
+        keys = []
+        for tag in tags:
+            parts = tag.split(":", 2)
+            if parts[0] == "place" and len(parts) == 3 and parts[2].isdigit():
+                place_key = (parts[1], int(parts[2]))
+                # 삭제된 문서는 다음 발행에서 내용이 같아도 다시 쓰도록 발행 기록에서도 제거
+                self._published_etags.pop(place_key, None)
+                keys.append(self.key(place_key))
+        await self.cache.delete_many(keys)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    async def get_first(self, place_keys: Iterable[PlaceKey]) -> Optional[Dict[str, Any]]:
+        """후보 장소들 중 문서가 있는 첫 번째 장소의 문서 (한 번의 MGET)"""
+        place_keys = list(place_keys)
+        envelopes = await self.cache.mget([self.key(place_key) for place_key in place_keys])
+        for envelope in envelopes:
+            if isinstance(envelope, dict) and "etag" in envelope:
+                self.stats["hits"] += 1
+                return envelope
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, place_key: PlaceKey, document: Dict[str, Any]) -> Dict[str, Any]:
+        """요청 시 렌더링한 문서 저장 후 envelope 반환"""
+        envelope = self.envelope(document)
+        await self.cache.set(self.key(place_key), envelope, expire=DETAIL_TTL)
+        return envelope
+
+    def load(self, db, place_keys: List[PlaceKey]) -> Optional[Tuple[PlaceKey, Dict[str, Any]]]:
+        """문서가 없을 때 DB에서 후보 순서대로 조회해 렌더링 (첫 번째로 존재하는 장소)"""
+        for table_name, place_id in place_keys:
+            table_model = self.category_tables[table_name]
+            row = db.query(table_model).filter(table_model.id == place_id).first()
+            if row is not None:
+                return (table_name, place_id), self.renderer(row, table_name)
+        return None
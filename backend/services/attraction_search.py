@@ -0,0 +1,170 @@
+"""
+관광지 통합 검색 인덱스 (인메모리 문자 bigram 역색인)
+- 6개 카테고리 테이블 전체를 하나의 인덱스로 검색 → 전역 랭킹 / 테이블 간 페이지네이션 / 단일 카운트
+- 한국어는 띄어쓰기 단위 토큰화가 부정확하므로 문자 2-gram으로 후보를 좁힌 뒤
+  부분 문자열 검사로 기존 ILIKE '%q%'와 동일한 매칭 결과를 보장
+"""
+import logging
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_NAME = "search"
+
+# 매칭 필드별 랭킹 (작을수록 상위)
+RANK_NAME_EXACT = 0
+RANK_NAME_PREFIX = 1
+RANK_NAME = 2
+RANK_CITY = 3
+RANK_ADDRESS = 4
+RANK_OVERVIEW = 5
+
+QUERY_CACHE_SIZE = 512
+
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class AttractionSearchIndex:
+    """
+    bigram → 문서 번호(np.int32, 오름차순) 역색인
+
+    문서 번호는 AttractionSnapshot의 레코드 순서와 동일합니다.
+    """
+
+    def __init__(self, names: Sequence[str], cities: Sequence[str], addresses: Sequence[str],
+                 overviews: Sequence[str], regions: Sequence[str], tables: Sequence[str]):
+        self.names = [name.lower() for name in names]
+        self.cities = [city.lower() for city in cities]
+        self.addresses = [address.lower() for address in addresses]
+        self.overviews = [overview.lower() for overview in overviews]
+        self.regions = [region.lower() for region in regions]
+        # 중복 제거 키 (기존 검색과 동일하게 이름 + 주소)
+        self.dedupe_keys = [f"{name}_{address}" for name, address in zip(names, addresses)]
+
+        self.table_names = sorted(set(tables))
+        table_codes = {table: code for code, table in enumerate(self.table_names)}
+        self.table_codes = np.array([table_codes[table] for table in tables], dtype=np.int8)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for doc_id, fields in enumerate(zip(self.names, self.cities, self.addresses, self.overviews)):
+            grams = set()
+            for field in fields:
+                grams |= _bigrams(field)
+            for gram in grams:
+                postings[gram].append(doc_id)
+        self.postings: Dict[str, np.ndarray] = {
+            gram: np.array(doc_ids, dtype=np.int32) for gram, doc_ids in postings.items()
+        }
+        self.size = len(self.names)
+        self._query_cache: "OrderedDict[tuple, List[int]]" = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _candidates(self, query: str) -> np.ndarray:
+        """bigram 교집합으로 후보 문서 추출 (1글자 질의는 전체 문서)"""
+        grams = _bigrams(query)
+        if not grams:
+            return np.arange(self.size, dtype=np.int32)
+
+        lists = []
+        for gram in grams:
+            doc_ids = self.postings.get(gram)
+            if doc_ids is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(doc_ids)
+
+        lists.sort(key=len)
+        candidates = lists[0]
+        for doc_ids in lists[1:]:
+            candidates = np.intersect1d(candidates, doc_ids, assume_unique=True)
+            if candidates.size == 0:
+                break
+        return candidates
+
+    def _rank(self, doc_id: int, query: str) -> Optional[int]:
+        """매칭 필드에 따른 랭크 (매칭되지 않으면 None - bigram 후보의 오탐 제거)"""
+        name = self.names[doc_id]
+        if query in name:
+            if name == query:
+                return RANK_NAME_EXACT
+            return RANK_NAME_PREFIX if name.startswith(query) else RANK_NAME
+        if query in self.cities[doc_id]:
+            return RANK_CITY
+        if query in self.addresses[doc_id]:
+            return RANK_ADDRESS
+        if query in self.overviews[doc_id]:
+            return RANK_OVERVIEW
+        return None
+
+    def _ranked_matches(self, query: str, tables: Optional[Tuple[str, ...]], region: Optional[str]) -> List[int]:
+        cache_key = (query, tables, region)
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            self._query_cache.move_to_end(cache_key)
+            return cached
+
+        candidates = self._candidates(query)
+        if tables is not None and candidates.size:
+            codes = [self.table_names.index(table) for table in tables if table in self.table_names]
+            candidates = candidates[np.isin(self.table_codes[candidates], codes)]
+
+        scored = []
+        for doc_id in candidates.tolist():
+            if region and region not in self.regions[doc_id]:
+                continue
+            rank = self._rank(doc_id, query)
+            if rank is not None:
+                scored.append((rank, len(self.names[doc_id]), doc_id))
+        scored.sort()
+
+        seen = set()
+        matches = []
+        for _, _, doc_id in scored:
+            key = self.dedupe_keys[doc_id]
+            if key in seen:
+                continue
+            seen.add(key)
+            matches.append(doc_id)
+
+        self._query_cache[cache_key] = matches
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return matches
+
+    def search(self, query: str, tables: Optional[Iterable[str]] = None, region: Optional[str] = None,
+               offset: int = 0, limit: int = 50) -> Tuple[List[int], int]:
+        """
+        통합 검색
+
+        Args:
+            query: 검색어 (이름/도시/주소/설명 부분 일치, 대소문자 무시)
+            tables: 검색할 카테고리 테이블 (None이면 전체)
+            region: 지역 부분 일치 필터
+
+        Returns:
+            (전역 랭킹 기준 offset~offset+limit 구간의 문서 번호, 중복 제거 후 전체 매칭 수)
+        """
+        query = query.strip().lower()
+        if not query:
+            return [], 0
+        tables = tuple(sorted(tables)) if tables is not None else None
+        region = region.strip().lower() if region else None
+
+        matches = self._ranked_matches(query, tables, region)
+        return matches[offset:offset + limit], len(matches)
+
+
+def build_search_index(snapshot) -> AttractionSearchIndex:
+    """AttractionSnapshotStore 파생 인덱스 빌더"""
+    index = AttractionSearchIndex(
+        snapshot.names, snapshot.cities, snapshot.addresses,
+        snapshot.overviews, snapshot.regions, snapshot.tables
+    )
+    logger.info(f"🔎 Attraction search index built: {index.size} docs, {len(index.postings)} bigrams")
+    return index
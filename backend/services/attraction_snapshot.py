@@ -0,0 +1,169 @@
+"""
+관광지 스냅샷 저장소
+- 6개 카테고리 테이블을 한 번에 읽어 포맷된 레코드를 메모리에 보관
+- 검색/공간/카탈로그 인덱스는 스냅샷에서 파생되어 함께 교체됨 (항상 같은 버전)
+- TTL 경과 시 백그라운드 스레드에서 재구성하고, 그동안은 기존 스냅샷으로 응답
+- 'attractions' 태그 무효화 이벤트 수신 시 다음 요청에서 재구성
+- 상세 문서도 같은 읽기에서 렌더링해 파생 인덱스(상세 문서 발행)에 넘기고, 구성이 끝나면 버림
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 관광지 데이터 변경 시 발행하는 무효화 태그
+ATTRACTIONS_TAG = "attractions"
+SNAPSHOT_TTL = int(os.getenv("ATTRACTION_SNAPSHOT_TTL", "1800"))
+
+IndexBuilder = Callable[["AttractionSnapshot"], Any]
+
+
+class AttractionSnapshot:
+    """
+    특정 시점의 전체 관광지 데이터
+
+    records[i]는 format_attraction_data 결과이며, tables/ids/regions/cities는 같은 순서의 병렬 리스트입니다.
+    details는 재구성 중에만 채워지는 상세 문서 목록입니다 (detail_formatter 미지정 시 None).
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], tables: List[str], names: List[str],
+                 addresses: List[str], regions: List[str], cities: List[str], overviews: List[str],
+                 version: int, ids: Optional[List[int]] = None,
+                 details: Optional[List[Dict[str, Any]]] = None):
+        self.records = records
+        self.tables = tables
+        self.ids = ids if ids is not None else []
+        self.names = names
+        self.addresses = addresses
+        self.regions = regions
+        self.cities = cities
+        self.overviews = overviews
+        self.version = version
+        self.details = details
+        self.built_at = time.time()
+        self.indexes: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class AttractionSnapshotStore:
+    """
+    관광지 스냅샷 + 파생 인덱스 관리자
+
+    Args:
+        category_tables: {테이블명: ORM 모델}
+        formatter: (ORM 객체, 테이블명) -> 응답용 dict
+        session_factory: 스냅샷 로딩용 세션 생성 함수 (요청 세션과 분리)
+        detail_formatter: (ORM 객체, 테이블명) -> 상세 응답 dict (지정 시 같은 읽기에서 함께 렌더링)
+    """
+
+    def __init__(self, category_tables: Dict[str, Any], formatter: Callable[[Any, str], Dict[str, Any]],
+                 session_factory: Callable[[], Any], ttl: int = SNAPSHOT_TTL,
+                 detail_formatter: Optional[Callable[[Any, str], Dict[str, Any]]] = None):
+        self.category_tables = category_tables
+        self.formatter = formatter
+        self.detail_formatter = detail_formatter
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self._builders: Dict[str, IndexBuilder] = {}
+        self._snapshot: Optional[AttractionSnapshot] = None
+        self._version = 0
+        self._stale = False
+        self._build_lock = threading.RLock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def register_index(self, name: str, builder: IndexBuilder):
+        """스냅샷 재구성 시 함께 만들 파생 인덱스 등록"""
+        self._builders[name] = builder
+        if self._snapshot is not None:
+            self._snapshot.indexes[name] = builder(self._snapshot)
+
+    def mark_stale(self, tags=None):
+        """무효화 버스 핸들러 - 관광지 태그가 포함되면 다음 조회 시 재구성"""
+        if tags is None or ATTRACTIONS_TAG in tags:
+            self._stale = True
+
+    # ------------------------------------------------------------------
+    # 구성
+    # ------------------------------------------------------------------
+    def _load(self) -> AttractionSnapshot:
+        records, tables, names, addresses, regions, cities, overviews = [], [], [], [], [], [], []
+        ids = []
+        details = [] if self.detail_formatter is not None else None
+        db = self.session_factory()
+        try:
+            for table_name, table_model in self.category_tables.items():
+                for row in db.query(table_model).yield_per(2000):
+                    records.append(self.formatter(row, table_name))
+                    if details is not None:
+                        details.append(self.detail_formatter(row, table_name))
+                    tables.append(table_name)
+                    ids.append(row.id)
+                    names.append(row.name or "")
+                    addresses.append(row.address or "")
+                    regions.append(row.region or "")
+                    cities.append(row.city or "")
+                    overviews.append(row.overview or "")
+        finally:
+            db.close()
+
+        self._version += 1
+        return AttractionSnapshot(records, tables, names, addresses, regions, cities, overviews, self._version,
+                                  ids=ids, details=details)
+
+    def rebuild(self) -> AttractionSnapshot:
+        """스냅샷과 모든 파생 인덱스를 재구성한 뒤 한 번에 교체 (동시 재구성은 하나만 수행)"""
+        with self._build_lock:
+            start_time = time.perf_counter()
+            # 구성 중 들어온 무효화는 다음 재구성에 반영되도록 먼저 해제
+            self._stale = False
+            snapshot = self._load()
+            for name, builder in self._builders.items():
+                snapshot.indexes[name] = builder(snapshot)
+            # 상세 문서는 발행에만 쓰므로 스냅샷에 보관하지 않음 (메모리 절약)
+            snapshot.details = None
+            self._snapshot = snapshot
+            logger.info(
+                f"🗂️ Attraction snapshot v{snapshot.version} built: {len(snapshot)} places, "
+                f"indexes={list(snapshot.indexes)} ({time.perf_counter() - start_time:.2f}s)"
+            )
+            return snapshot
+
+    def _build_initial(self) -> AttractionSnapshot:
+        """최초 구성 - 동시에 들어온 요청들은 락을 기다린 뒤 먼저 만들어진 스냅샷을 공유"""
+        with self._build_lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            return self.rebuild()
+
+    def _needs_refresh(self) -> bool:
+        return self._stale or time.time() - self._snapshot.built_at > self.ttl
+
+    async def _refresh_in_background(self):
+        try:
+            await asyncio.to_thread(self.rebuild)
+        except Exception as e:
+            logger.error(f"❌ Attraction snapshot refresh failed (serving previous version): {e}")
+
+    async def get(self) -> AttractionSnapshot:
+        """
+        현재 스냅샷 반환
+        - 최초 호출: 스레드에서 구성 완료까지 대기
+        - 만료/무효화: 기존 스냅샷으로 응답하고 백그라운드에서 재구성
+        """
+        if self._snapshot is None:
+            return await asyncio.to_thread(self._build_initial)
+
+        if self._needs_refresh() and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
+        return self._snapshot
+
+    async def get_index(self, name: str) -> Any:
+        """파생 인덱스 조회"""
+        snapshot = await self.get()
+        return snapshot.indexes[name]
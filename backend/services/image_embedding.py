@@ -0,0 +1,182 @@
+"""
+이미지 임베딩 서비스 (CLIP 전용 워커 스레드 + 동적 마이크로 배칭)
+- 모델 추론을 이벤트 루프 밖의 단일 워커 스레드에서 수행 → 업로드 중에도 다른 API 응답 지연 없음
+- 동시에 들어온 업로드 이미지를 최대 CLIP_BATCH_SIZE개까지, CLIP_BATCH_WAIT_MS 동안 모아 한 번에 추론
+- 요청 측은 asyncio Future로 결과를 기다림 (워커에서 call_soon_threadsafe로 전달)
+"""
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+
+try:
+    import torch
+    from transformers import CLIPModel, CLIPProcessor
+    CLIP_AVAILABLE = True
+except ImportError:
+    CLIP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CLIP_HF_MODEL = os.getenv("CLIP_HF_MODEL", "openai/clip-vit-base-patch32")
+IMAGE_VECTOR_DIM = int(os.getenv("IMAGE_VECTOR_DIM", "512"))
+# 한 번에 추론할 최대 이미지 수 / 첫 요청 이후 배치를 채우기 위해 기다리는 최대 시간
+CLIP_BATCH_SIZE = int(os.getenv("CLIP_BATCH_SIZE", "8"))
+CLIP_BATCH_WAIT_MS = int(os.getenv("CLIP_BATCH_WAIT_MS", "15"))
+# 워커의 torch 연산 스레드 수 (0이면 torch 기본값)
+CLIP_NUM_THREADS = int(os.getenv("CLIP_NUM_THREADS", "0"))
+
+# (RGB 이미지, 요청 이벤트 루프, 결과 Future)
+_Job = Tuple[object, asyncio.AbstractEventLoop, asyncio.Future]
+_STOP = None
+
+
+def _fit_dimension(vector: List[float], dim: int) -> List[float]:
+    """설정된 차원으로 트리밍 / 제로 패딩"""
+    if len(vector) > dim:
+        return vector[:dim]
+    if len(vector) < dim:
+        return vector + [0.0] * (dim - len(vector))
+    return vector
+
+
+def _resolve(future: asyncio.Future, result=None, error: Optional[BaseException] = None):
+    """이벤트 루프 스레드에서 실행 - 요청이 이미 취소된 경우 무시"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _deliver(loop: asyncio.AbstractEventLoop, future: asyncio.Future, result=None,
+             error: Optional[BaseException] = None):
+    """워커 스레드 → 요청 이벤트 루프로 결과 전달 (루프가 이미 닫힌 경우 무시)"""
+    try:
+        loop.call_soon_threadsafe(_resolve, future, result, error)
+    except RuntimeError:
+        pass
+
+
+class ImageEmbeddingService:
+    """
+    CLIP 이미지 임베딩 워커
+
+    모델은 워커 스레드에서 최초 요청 시 로드되며, 이후 모든 추론은 같은 스레드에서 직렬로 수행됩니다.
+    """
+
+    def __init__(self, model_name: str = CLIP_HF_MODEL, max_batch_size: int = CLIP_BATCH_SIZE,
+                 max_wait_ms: int = CLIP_BATCH_WAIT_MS, vector_dim: int = IMAGE_VECTOR_DIM):
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self.vector_dim = vector_dim
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._model = None
+        self._processor = None
+
+    # ------------------------------------------------------------------
+    # 요청 측 (이벤트 루프)
+    # ------------------------------------------------------------------
+    def start(self):
+        """워커 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="clip-embedding-worker", daemon=True)
+            self._thread.start()
+            logger.info(
+                f"🖼️ Image embedding worker started (batch≤{self.max_batch_size}, wait={self.max_wait * 1000:.0f}ms)"
+            )
+
+    async def stop(self):
+        """대기 중인 요청을 처리한 뒤 워커 종료"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        await asyncio.to_thread(self._thread.join, 30)
+        self._thread = None
+
+    async def embed(self, image) -> List[float]:
+        """
+        RGB PIL 이미지 → 정규화된 CLIP 벡터 (vector_dim 차원)
+
+        Raises:
+            RuntimeError: CLIP 의존성이 설치되지 않은 경우
+            Exception: 모델 로드/추론 실패 (호출 측에서 대체값 처리)
+        """
+        if not CLIP_AVAILABLE:
+            raise RuntimeError("torch/transformers not installed")
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((image, loop, future))
+        return await future
+
+    # ------------------------------------------------------------------
+    # 워커 스레드
+    # ------------------------------------------------------------------
+    def _load_model(self):
+        if self._model is None:
+            logger.info(f"Loading CLIP model: {self.model_name}")
+            if CLIP_NUM_THREADS > 0:
+                torch.set_num_threads(CLIP_NUM_THREADS)
+            self._model = CLIPModel.from_pretrained(self.model_name)
+            self._model.eval()
+            self._processor = CLIPProcessor.from_pretrained(self.model_name)
+            logger.info("CLIP model loaded successfully")
+        return self._model, self._processor
+
+    def _collect_batch(self, first: _Job) -> Tuple[List[_Job], bool]:
+        """첫 요청 이후 max_wait 동안 최대 max_batch_size개까지 추가로 수집"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _infer(self, images: List[object]) -> List[List[float]]:
+        model, processor = self._load_model()
+        inputs = processor(images=images, return_tensors="pt")
+        with torch.no_grad():
+            features = model.get_image_features(**inputs)
+            features = features / features.norm(dim=-1, keepdim=True)
+        return [_fit_dimension(vector, self.vector_dim) for vector in features.cpu().numpy().tolist()]
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            batch, stopping = self._collect_batch(job)
+
+            start_time = time.perf_counter()
+            try:
+                vectors = self._infer([image for image, _, _ in batch])
+                for (_, loop, future), vector in zip(batch, vectors):
+                    _deliver(loop, future, vector)
+                logger.info(
+                    f"🖼️ CLIP batch of {len(batch)} image(s) embedded in {time.perf_counter() - start_time:.3f}s"
+                )
+            except Exception as e:
+                logger.error(f"❌ CLIP batch inference failed ({len(batch)} images): {e}")
+                for _, loop, future in batch:
+                    _deliver(loop, future, None, e)
+
+
+# 전역 이미지 임베딩 서비스 인스턴스
+image_embedding_service = ImageEmbeddingService()
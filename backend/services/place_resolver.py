@@ -0,0 +1,183 @@
+"""
+장소 요약 일괄 조회기 (place resolver)
+- 응답에 포함된 (테이블명, ID) 쌍을 모아 테이블당 한 번의 `id = ANY(:ids)` 쿼리로 조회
+- 조회한 이름/대표 이미지/주소는 프로세스 공유 LRU에 보관 → 여행/저장 장소 목록이 같은 장소를 재사용
+- 장소/관광지 태그 무효화 이벤트 수신 시 해당 엔트리 제거
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from cache_invalidation import CacheInvalidationBus, invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+# 조회 허용 테이블 (SQL 인젝션 방지 - 테이블명은 쿼리에 직접 삽입됨)
+PLACE_TABLES = ('accommodation', 'humanities', 'leisure_sports', 'nature', 'restaurants', 'shopping')
+UNKNOWN_PLACE_NAME = "Unknown Place"
+PLACE_CACHE_SIZE = int(os.getenv("PLACE_RESOLVER_CACHE_SIZE", "20000"))
+PLACE_CACHE_TTL = int(os.getenv("PLACE_RESOLVER_CACHE_TTL", "3600"))
+
+PlaceKey = Tuple[str, str]
+
+
+def unknown_place() -> Dict[str, Any]:
+    return {"name": UNKNOWN_PLACE_NAME, "image": None, "address": None}
+
+
+def parse_place_ref(place_ref: Optional[str]) -> Optional[PlaceKey]:
+    """'table_name:id' 형식의 장소 참조 파싱 (형식이 아니면 None)"""
+    if not place_ref or ":" not in place_ref:
+        return None
+    table_name, place_id = place_ref.split(":", 1)
+    return table_name, place_id
+
+
+def _first_image(image_urls: Any) -> Optional[str]:
+    """image_urls가 JSON 배열인 경우 첫 번째 이미지 사용 (문자열이면 그대로)"""
+    if not image_urls:
+        return None
+    try:
+        urls = json.loads(image_urls) if isinstance(image_urls, str) else image_urls
+        if isinstance(urls, list):
+            return urls[0] if urls else None
+        return image_urls
+    except (TypeError, ValueError):
+        return image_urls
+
+
+class PlaceResolver:
+    """
+    장소 요약(name / image / address) 일괄 조회 + 공유 LRU
+
+    존재하지 않는 장소도 Unknown Place로 캐싱하여 같은 응답 재구성 시 재조회하지 않습니다.
+    """
+
+    def __init__(self, bus: CacheInvalidationBus = invalidation_bus,
+                 max_size: int = PLACE_CACHE_SIZE, ttl: int = PLACE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache: "OrderedDict[PlaceKey, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "queries": 0}
+        bus.add_local_handler(self._on_invalidate)
+
+    # ------------------------------------------------------------------
+    # LRU
+    # ------------------------------------------------------------------
+    def _get_cached(self, key: PlaceKey) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        summary, stored_at = entry
+        if time.time() - stored_at > self.ttl:
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return summary
+
+    def _store(self, key: PlaceKey, summary: Dict[str, Any]):
+        self._cache[key] = (summary, time.time())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def _on_invalidate(self, tags: Set[str]):
+        """place:{table}:{id} 태그는 해당 장소만, attractions 태그는 전체 제거"""
+        with self._lock:
+            for tag in tags:
+                if tag == "attractions":
+                    self._cache.clear()
+                    return
+                parts = tag.split(":", 2)
+                if parts[0] == "place" and len(parts) == 3:
+                    self._cache.pop((parts[1], parts[2]), None)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _fetch_table(self, db: Session, table_name: str, place_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """한 테이블의 여러 장소를 한 번에 조회 (숫자가 아닌 ID는 조회 없이 제외)"""
+        numeric_ids = sorted({int(place_id) for place_id in place_ids if place_id.isdigit()})
+        if not numeric_ids:
+            return {}
+        query = text(f"SELECT id, name, image_urls, address FROM {table_name} WHERE id = ANY(:ids)")
+        rows = db.execute(query, {"ids": numeric_ids}).fetchall()
+        self.stats["queries"] += 1
+        return {
+            str(row[0]): {
+                "name": row[1] or UNKNOWN_PLACE_NAME,
+                "image": _first_image(row[2]),
+                "address": row[3]
+            }
+            for row in rows
+        }
+
+    def resolve(self, db: Session, pairs: Iterable[Tuple[str, Any]]) -> Dict[PlaceKey, Dict[str, Any]]:
+        """
+        (테이블명, ID) 쌍들의 장소 요약 일괄 조회
+
+        Returns:
+            {(테이블명, str(ID)): {"name", "image", "address"}} - 조회 실패/미존재 장소는 Unknown Place
+        """
+        keys = list(dict.fromkeys((table_name or "", str(place_id)) for table_name, place_id in pairs))
+        result: Dict[PlaceKey, Dict[str, Any]] = {}
+        missing: Dict[str, List[str]] = defaultdict(list)
+
+        with self._lock:
+            for key in keys:
+                summary = self._get_cached(key)
+                if summary is not None:
+                    result[key] = summary
+                    self.stats["hits"] += 1
+                elif key[0] in PLACE_TABLES:
+                    missing[key[0]].append(key[1])
+                    self.stats["misses"] += 1
+                else:
+                    result[key] = unknown_place()
+
+        for table_name, place_ids in missing.items():
+            try:
+                fetched = self._fetch_table(db, table_name, place_ids)
+            except Exception as e:
+                # 캐싱하지 않고 이번 응답만 Unknown Place로 대체
+                logger.error(f"Error resolving places from {table_name}: {e}")
+                for place_id in place_ids:
+                    result[(table_name, place_id)] = unknown_place()
+                continue
+
+            with self._lock:
+                for place_id in place_ids:
+                    summary = fetched.get(place_id) or unknown_place()
+                    self._store((table_name, place_id), summary)
+                    result[(table_name, place_id)] = summary
+
+        return result
+
+    def resolve_one(self, db: Session, table_name: str, place_id: Any) -> Dict[str, Any]:
+        """단일 장소 요약 조회"""
+        return self.resolve(db, [(table_name, place_id)])[(table_name or "", str(place_id))]
+
+    def attach_names(self, db: Session, places_lists: Iterable[List[Dict[str, Any]]]):
+        """여러 장소 목록(여행 places JSON 등)의 각 항목에 'name'을 한 번의 일괄 조회로 채움"""
+        places_lists = list(places_lists)
+        pairs = [
+            (place.get('table_name', ''), place.get('id', ''))
+            for places in places_lists for place in places
+        ]
+        summaries = self.resolve(db, pairs)
+        for places in places_lists:
+            for place in places:
+                key = (place.get('table_name', '') or "", str(place.get('id', '')))
+                place['name'] = summaries[key]["name"]
+
+
+# 전역 장소 조회기 인스턴스
+place_resolver = PlaceResolver()
@@ -0,0 +1,131 @@
+"""
+관광지 공간 인덱스 (인메모리 위경도 격자 + NumPy 벡터화 haversine)
+- 스냅샷의 모든 장소를 고정 크기 격자 셀에 배치
+- 반경/최근접 질의는 주변 셀 후보만 모아 한 번의 벡터 연산으로 거리 계산
+- 여러 경유지를 한 번에 질의하는 배치 API 제공
+"""
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPATIAL_INDEX_NAME = "spatial"
+EARTH_RADIUS_KM = 6371.0
+# 격자 셀 크기 (도) - 약 5.5km, /nearby 최대 반경(10km)에서 주변 3~5칸만 확인
+DEFAULT_CELL_DEG = 0.05
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """한 지점에서 여러 지점까지의 거리 (km, 벡터화)"""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs) - math.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialGridIndex:
+    """
+    위경도 격자 인덱스
+
+    문서 번호는 AttractionSnapshot의 레코드 순서와 동일하며,
+    좌표가 없는 장소는 인덱스에서 제외됩니다.
+    """
+
+    def __init__(self, latitudes: Sequence[Optional[float]], longitudes: Sequence[Optional[float]],
+                 tables: Sequence[str], cell_deg: float = DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.lats = np.array([lat if lat is not None else np.nan for lat in latitudes], dtype=np.float64)
+        self.lngs = np.array([lng if lng is not None else np.nan for lng in longitudes], dtype=np.float64)
+
+        self.table_names = sorted(set(tables))
+        table_codes = {table: code for code, table in enumerate(self.table_names)}
+        self.table_codes = np.array([table_codes[table] for table in tables], dtype=np.int8)
+
+        valid = np.flatnonzero(~(np.isnan(self.lats) | np.isnan(self.lngs)))
+        cell_ys = np.floor(self.lats[valid] / cell_deg).astype(np.int64)
+        cell_xs = np.floor(self.lngs[valid] / cell_deg).astype(np.int64)
+        cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for doc_id, cell_y, cell_x in zip(valid.tolist(), cell_ys.tolist(), cell_xs.tolist()):
+            cells[(cell_y, cell_x)].append(doc_id)
+        self.cells: Dict[Tuple[int, int], np.ndarray] = {
+            cell: np.array(doc_ids, dtype=np.int32) for cell, doc_ids in cells.items()
+        }
+        self.size = int(valid.size)
+
+    def _table_mask_codes(self, tables: Optional[Iterable[str]]) -> Optional[List[int]]:
+        if tables is None:
+            return None
+        return [self.table_names.index(table) for table in tables if table in self.table_names]
+
+    def _cell_candidates(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """반경을 덮는 격자 셀의 문서 번호"""
+        lat_span = radius_km / 111.0
+        lng_span = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        min_y = math.floor((lat - lat_span) / self.cell_deg)
+        max_y = math.floor((lat + lat_span) / self.cell_deg)
+        min_x = math.floor((lng - lng_span) / self.cell_deg)
+        max_x = math.floor((lng + lng_span) / self.cell_deg)
+
+        chunks = [
+            self.cells[(cell_y, cell_x)]
+            for cell_y in range(min_y, max_y + 1)
+            for cell_x in range(min_x, max_x + 1)
+            if (cell_y, cell_x) in self.cells
+        ]
+        if not chunks:
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate(chunks)
+
+    def within_radius(self, lat: float, lng: float, radius_km: float,
+                      tables: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        반경 내 장소 (가까운 순)
+
+        Returns:
+            (문서 번호 배열, 거리(km) 배열)
+        """
+        candidates = self._cell_candidates(lat, lng, radius_km)
+        codes = self._table_mask_codes(tables)
+        if codes is not None and candidates.size:
+            candidates = candidates[np.isin(self.table_codes[candidates], codes)]
+        if candidates.size == 0:
+            return candidates, np.empty(0, dtype=np.float64)
+
+        distances = haversine_km(lat, lng, self.lats[candidates], self.lngs[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def nearest(self, lat: float, lng: float, k: int, tables: Optional[Iterable[str]] = None,
+                max_radius_km: float = 50.0) -> Tuple[np.ndarray, np.ndarray]:
+        """k-최근접 장소 (반경을 두 배씩 넓혀가며 k개 이상 찾으면 중단)"""
+        radius_km = self.cell_deg * 111.0
+        while True:
+            doc_ids, distances = self.within_radius(lat, lng, radius_km, tables)
+            if doc_ids.size >= k or radius_km >= max_radius_km:
+                return doc_ids[:k], distances[:k]
+            radius_km = min(radius_km * 2, max_radius_km)
+
+    def within_radius_many(self, points: Sequence[Tuple[float, float]], radius_km: float,
+                           tables: Optional[Iterable[str]] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """여러 경유지에 대한 반경 질의 (경유지 순서대로 결과 반환)"""
+        tables = list(tables) if tables is not None else None
+        return [self.within_radius(lat, lng, radius_km, tables) for lat, lng in points]
+
+
+def build_spatial_index(snapshot) -> SpatialGridIndex:
+    """AttractionSnapshotStore 파생 인덱스 빌더"""
+    index = SpatialGridIndex(
+        [record.get("latitude") for record in snapshot.records],
+        [record.get("longitude") for record in snapshot.records],
+        snapshot.tables
+    )
+    logger.info(f"📍 Attraction spatial index built: {index.size} located places, {len(index.cells)} cells")
+    return index
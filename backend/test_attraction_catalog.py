@@ -0,0 +1,32 @@
+from services.attraction_catalog import AttractionCatalog
+
+TABLES = ["nature", "nature", "restaurants", "restaurants", "nature", "shopping"]
+REGIONS = ["서울특별시", "서울특별시", "서울특별시", "부산광역시", " 부산광역시 ", ""]
+CITIES = ["서울특별시", "강남구", "서울특별시", "해운대구", "해운대구", "제주시"]
+
+
+def build_catalog(region_sorter=None):
+    return AttractionCatalog(TABLES, REGIONS, CITIES, region_sorter)
+
+
+def test_catalog_counts_places_by_region_and_table():
+    catalog = build_catalog()
+    assert catalog.table_counts("서울") == {"nature": 2, "restaurants": 1, "shopping": 0}
+    # 지역명 부분 일치, 앞뒤 공백은 무시
+    assert catalog.table_counts("광역") == {"nature": 1, "restaurants": 1, "shopping": 0}
+    assert catalog.table_counts("제주") == {"nature": 0, "restaurants": 0, "shopping": 0}
+
+
+def test_catalog_lists_regions_and_cities():
+    catalog = build_catalog(region_sorter=lambda regions: sorted(regions, reverse=True))
+    assert catalog.regions == ["서울특별시", "부산광역시"]
+    assert ("제주시", "") in catalog.cities
+    assert ("해운대구", "부산광역시") in catalog.cities
+
+
+def test_city_sample_alternates_tables():
+    catalog = build_catalog()
+    assert catalog.city_docs_matching("서울") == {"nature": [0], "restaurants": [2]}
+    assert catalog.city_sample("해운대", limit=5) == [("nature", 4), ("restaurants", 3)]
+    assert catalog.city_sample("서울", limit=1) == [("nature", 0)]
+    assert catalog.city_docs_matching(" ") == {}
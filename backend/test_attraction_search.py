@@ -0,0 +1,45 @@
+from services.attraction_search import AttractionSearchIndex
+
+# (이름, 도시, 주소, 설명, 지역, 테이블)
+PLACES = [
+    ("해운대 해수욕장", "부산", "부산 해운대구 우동", "넓은 백사장", "부산광역시", "nature"),
+    ("해운대", "부산", "부산 해운대구", "바다 전망", "부산광역시", "nature"),
+    ("광안리 횟집", "부산", "부산 수영구 해운대로 1", "회 전문점", "부산광역시", "restaurants"),
+    ("경복궁", "서울", "서울 종로구", "조선 왕궁, 해운대와 무관", "서울특별시", "humanities"),
+    ("해운대", "부산", "부산 해운대구", "중복 항목", "부산광역시", "nature"),
+    ("Seoul Tower", "서울", "서울 용산구", "N Seoul tower", "서울특별시", "leisure_sports"),
+]
+
+
+def build_index():
+    names, cities, addresses, overviews, regions, tables = zip(*PLACES)
+    return AttractionSearchIndex(names, cities, addresses, overviews, regions, tables)
+
+
+def test_search_ranks_by_matched_field_and_dedupes():
+    doc_ids, total = build_index().search("해운대")
+    # 이름 일치 → 이름 접두 → 주소 → 설명 순, 같은 이름+주소(4번)는 한 번만
+    assert doc_ids == [1, 0, 2, 3]
+    assert total == 4
+
+
+def test_search_matches_substrings_like_ilike():
+    index = build_index()
+    # bigram 후보 중 실제 부분 문자열이 아닌 문서는 제외
+    assert index.search("해수")[0] == [0]
+    assert index.search("운대해")[0] == []
+    # 대소문자 무시, 1글자 질의는 전체 문서에서 부분 일치
+    assert index.search("seoul TOWER")[0] == [5]
+    assert index.search("궁")[0] == [3]
+    assert index.search("  ") == ([], 0)
+
+
+def test_search_filters_tables_and_region_and_pages():
+    index = build_index()
+    assert index.search("해운대", tables=["restaurants"]) == ([2], 1)
+    assert index.search("해운대", region="서울")[0] == [3]
+
+    first_page, total = index.search("해운대", offset=0, limit=2)
+    second_page, _ = index.search("해운대", offset=2, limit=2)
+    assert first_page + second_page == index.search("해운대")[0]
+    assert total == 4
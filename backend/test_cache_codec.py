@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from utils.cache_codec import (
+    COMPRESSION_NONE, COMPRESSION_ZSTD, HEADER_MAGIC, ZSTD_AVAILABLE, CacheCodec, project_payload
+)
+
+PAYLOAD = {"places": [{"place_id": i, "name": f"장소 {i}", "score": i / 10} for i in range(200)]}
+
+
+@pytest.mark.parametrize("format", ["json", "orjson", "msgpack"])
+def test_codec_round_trip_with_header(format):
+    codec = CacheCodec(format=format, compress_threshold=None)
+    encoded = codec.encode(PAYLOAD)
+    assert encoded[:1] == HEADER_MAGIC
+    assert encoded[2:3] == COMPRESSION_NONE
+    assert codec.decode(encoded) == PAYLOAD
+    # 헤더에 포맷이 기록되므로 다른 설정의 코덱으로도 복원
+    assert CacheCodec(format="json").decode(encoded) == PAYLOAD
+
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_codec_compresses_large_payloads_only():
+    codec = CacheCodec(compress_threshold=1024)
+    large = codec.encode(PAYLOAD)
+    small = codec.encode({"place_id": 1})
+
+    assert large[2:3] == COMPRESSION_ZSTD
+    assert len(large) < len(json.dumps(PAYLOAD, ensure_ascii=False).encode("utf-8"))
+    assert codec.decode(large) == PAYLOAD
+    assert small[2:3] == COMPRESSION_NONE
+    assert codec.decode(small) == {"place_id": 1}
+
+
+def test_codec_reads_legacy_entries_without_header():
+    codec = CacheCodec()
+    assert codec.decode(json.dumps({"a": 1})) == {"a": 1}
+    assert codec.decode(b'[1, 2]') == [1, 2]
+    assert codec.decode("plain text") == "plain text"
+    assert codec.decode(None) is None
+
+
+def test_codec_serializes_non_json_types():
+    codec = CacheCodec(format="json")
+    moment = datetime(2026, 10, 18, 12, 0)
+    assert codec.decode(codec.encode({"at": moment, 1: "int key"})) == {"at": moment.isoformat(), "1": "int key"}
+
+
+def test_project_payload_drops_vectors_recursively():
+    payload = {"feed": [{"place_id": 1, "vector": [0.1, 0.2], "total_likes": 3, "name": "a"}], "vector": []}
+    assert project_payload(payload) == {"feed": [{"place_id": 1, "name": "a"}]}
+    # 원본은 수정하지 않음
+    assert payload["feed"][0]["vector"] == [0.1, 0.2]
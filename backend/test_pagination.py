@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from main import app
+from utils.pagination import cursor_datetime, decode_cursor, encode_cursor
+
+client = TestClient(app)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 12, 30, 15, 123456)
+    token = encode_cursor(created_at=created_at, id=42, table="nature")
+
+    # URL에 그대로 넣을 수 있는 토큰 (패딩 없음)
+    assert "=" not in token and "/" not in token and "+" not in token
+    position = decode_cursor(token, required=("created_at", "id"))
+    assert position == {"created_at": created_at.isoformat(), "id": 42, "table": "nature"}
+    assert cursor_datetime(position["created_at"]) == created_at
+    assert cursor_datetime(None) is None
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor!", "bm90IGpzb24", encode_cursor(id=1), "WzEsMl0"])
+def test_decode_cursor_rejects_malformed_tokens(token):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(token, required=("created_at", "id"))
+    assert exc_info.value.status_code == 400
+
+
+def test_search_returns_400_on_bad_cursor():
+    response = client.get("/api/v1/attractions/search", params={"q": "바다", "cursor": "not-a-cursor!"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "잘못된 페이지 커서입니다."
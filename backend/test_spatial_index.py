@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from services.spatial_index import SpatialGridIndex, haversine_km
+
+# 서울시청 기준 동쪽으로 약 0.9km, 4.4km, 그리고 부산
+CITY_HALL = (37.5663, 126.9779)
+POINTS = [
+    (37.5663, 126.9779, "humanities"),
+    (37.5663, 126.9879, "restaurants"),
+    (37.5663, 127.0279, "nature"),
+    (35.1796, 129.0756, "nature"),
+    (None, None, "shopping"),
+]
+
+
+def build_index(cell_deg=0.05):
+    lats, lngs, tables = zip(*POINTS)
+    return SpatialGridIndex(lats, lngs, tables, cell_deg=cell_deg)
+
+
+def test_haversine_matches_known_distance():
+    seoul_to_busan = haversine_km(*CITY_HALL, np.array([35.1796]), np.array([129.0756]))[0]
+    assert seoul_to_busan == pytest.approx(325, rel=0.02)
+
+
+@pytest.mark.parametrize("cell_deg", [0.01, 0.05, 1.0])
+def test_radius_query_matches_brute_force(cell_deg):
+    index = build_index(cell_deg)
+    assert index.size == 4
+
+    doc_ids, distances = index.within_radius(*CITY_HALL, radius_km=5.0)
+    assert doc_ids.tolist() == [0, 1, 2]
+    assert distances.tolist() == sorted(distances.tolist())
+    assert distances[1] == pytest.approx(0.88, abs=0.02)
+
+    doc_ids, _ = index.within_radius(*CITY_HALL, radius_km=1.0)
+    assert doc_ids.tolist() == [0, 1]
+
+
+def test_radius_query_filters_tables_and_batches_points():
+    index = build_index()
+    assert index.within_radius(*CITY_HALL, radius_km=5.0, tables=["nature"])[0].tolist() == [2]
+    assert index.within_radius(*CITY_HALL, radius_km=5.0, tables=["unknown"])[0].size == 0
+
+    results = index.within_radius_many([CITY_HALL, (35.1796, 129.0756)], radius_km=1.0)
+    assert [doc_ids.tolist() for doc_ids, _ in results] == [[0, 1], [3]]
+
+
+def test_nearest_expands_radius_until_k_found():
+    index = build_index()
+    doc_ids, distances = index.nearest(*CITY_HALL, k=3)
+    assert doc_ids.tolist() == [0, 1, 2]
+    # 최대 반경 안에 k개가 없으면 찾은 만큼만
+    assert index.nearest(*CITY_HALL, k=10, max_radius_km=50.0)[0].tolist() == [0, 1, 2]
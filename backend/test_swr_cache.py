@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import pytest
+
+import routers.recommendations2 as recommendations
+from cache_utils import unwrap_swr, wrap_swr
+
+
+class FakeAsyncCache:
+    """SWR 엔트리를 메모리에 보관하는 async_cache 대역"""
+
+    def __init__(self):
+        self.entries = {}
+        self.locks = set()
+
+    async def get_swr(self, key):
+        return unwrap_swr(self.entries.get(key))
+
+    async def set_swr(self, key, value, soft_ttl, grace):
+        self.entries[key] = wrap_swr(value, soft_ttl, grace)
+        return True
+
+    async def try_lock(self, key, expire):
+        if key in self.locks:
+            return False
+        self.locks.add(key)
+        return True
+
+    async def release_lock(self, key):
+        self.locks.discard(key)
+        return True
+
+    def age(self, key, seconds):
+        entry = self.entries[key]
+        entry["soft_expires_at"] -= seconds
+        entry["hard_expires_at"] -= seconds
+
+
+class FakeBus:
+    def __init__(self):
+        self.registered = {}
+
+    async def register(self, key, tags):
+        self.registered[key] = list(tags)
+        return True
+
+
+@pytest.fixture
+def swr_cache(monkeypatch):
+    fake_cache = FakeAsyncCache()
+    monkeypatch.setattr(recommendations, "async_cache", fake_cache)
+    monkeypatch.setattr(recommendations, "invalidation_bus", FakeBus())
+    return fake_cache
+
+
+def counter(*values):
+    calls = []
+
+    async def compute():
+        calls.append(len(calls))
+        return values[min(len(calls) - 1, len(values) - 1)]
+    return compute, calls
+
+
+async def drain_refreshes():
+    await asyncio.gather(*list(recommendations._background_refreshes))
+
+
+def test_swr_entry_soft_and_hard_expiry():
+    entry = wrap_swr({"a": 1}, soft_ttl=60, grace=300)
+    assert unwrap_swr(entry) == ({"a": 1}, False)
+
+    entry["soft_expires_at"] = time.time() - 1
+    assert unwrap_swr(entry) == ({"a": 1}, True)
+
+    entry["hard_expires_at"] = time.time() - 1
+    assert unwrap_swr(entry) == (None, False)
+    # SWR 형식이 아닌 예전 엔트리는 신선한 값
+    assert unwrap_swr([1, 2]) == ([1, 2], False)
+    assert unwrap_swr(None) == (None, False)
+
+
+def test_get_or_revalidate_serves_stale_and_refreshes_in_background(swr_cache):
+    compute, calls = counter(["v1"], ["v2"])
+
+    async def scenario():
+        assert await recommendations.get_or_revalidate("k", compute, soft_ttl=60) == ["v1"]
+        assert await recommendations.get_or_revalidate("k", compute, soft_ttl=60) == ["v1"]
+        assert len(calls) == 1
+
+        swr_cache.age("k", 61)
+        # soft TTL 경과: stale 값을 즉시 반환하고 백그라운드에서 갱신
+        assert await recommendations.get_or_revalidate("k", compute, soft_ttl=60) == ["v1"]
+        await drain_refreshes()
+        assert await recommendations.get_or_revalidate("k", compute, soft_ttl=60) == ["v2"]
+        assert len(calls) == 2
+        assert "k" not in swr_cache.locks
+
+    asyncio.run(scenario())
+
+
+def test_get_or_revalidate_recomputes_after_hard_expiry(swr_cache):
+    compute, calls = counter(["v1"], ["v2"])
+
+    async def scenario():
+        await recommendations.get_or_revalidate("k", compute, soft_ttl=60)
+        swr_cache.age("k", 60 + recommendations.SWR_GRACE_SECONDS + 1)
+        assert await recommendations.get_or_revalidate("k", compute, soft_ttl=60) == ["v2"]
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_get_or_revalidate_keeps_stale_value_on_empty_refresh(swr_cache):
+    compute, _ = counter(["v1"], [])
+
+    async def scenario():
+        await recommendations.get_or_revalidate("k", compute, soft_ttl=60)
+        swr_cache.age("k", 61)
+        await recommendations.get_or_revalidate("k", compute, soft_ttl=60)
+        await drain_refreshes()
+        assert await swr_cache.get_swr("k") == (["v1"], True)
+
+    asyncio.run(scenario())
+
+
+def test_revalidate_bypasses_fresh_entry(swr_cache):
+    compute, calls = counter(["v1"], ["v2"])
+
+    async def scenario():
+        await recommendations.get_or_revalidate("k", compute, soft_ttl=60)
+        # 상위 캐시의 백그라운드 갱신: 신선한 하위 엔트리도 다시 계산해 저장
+        assert await recommendations.get_or_revalidate("k", compute, soft_ttl=60, revalidate=True) == ["v2"]
+        assert await swr_cache.get_swr("k") == (["v2"], False)
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+
+def test_cached_recommendations_register_place_tags(swr_cache):
+    feed = {"featured": {"table_name": "nature", "place_id": 1}, "feed": [{"table_name": "restaurants", "place_id": 2}]}
+
+    async def scenario():
+        await recommendations.set_recommendations_cache("k", feed, tags=["user:u1"])
+
+    asyncio.run(scenario())
+    assert recommendations.invalidation_bus.registered["k"] == ["user:u1", "place:nature:1", "place:restaurants:2"]
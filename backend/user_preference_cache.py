@@ -0,0 +1,133 @@
+"""
+사용자 여행 취향 캐시 (read-through)
+- priority / accommodation / exploration / persona 태그를 사용자별로 보관
+- 추천 캐시 키 생성 전에 조회하므로 캐시된 피드 요청은 Postgres를 거치지 않음
+- 로그인/취향 저장 시 채우고, 취향 변경 시 무효화 버스로 모든 워커에서 제거
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from cache_utils import AsyncRedisCache, async_cache
+from cache_invalidation import CacheInvalidationBus, invalidation_bus, user_tag
+
+logger = logging.getLogger(__name__)
+
+PREFERENCE_FIELDS = ("priority", "accommodation", "exploration", "persona")
+PREFERENCE_CACHE_PREFIX = "user_pref:"
+# 취향은 명시적으로 무효화되므로 Redis에는 길게 보관
+PREFERENCE_CACHE_TTL = int(os.getenv("USER_PREFERENCE_CACHE_TTL", "86400"))
+# 워커 로컬 캐시 (Redis 왕복도 생략) - pub/sub 유실 대비로 짧게 유지
+LOCAL_CACHE_TTL = int(os.getenv("USER_PREFERENCE_LOCAL_TTL", "300"))
+LOCAL_CACHE_SIZE = int(os.getenv("USER_PREFERENCE_LOCAL_SIZE", "10000"))
+
+PreferenceLoader = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def preferences_to_dict(preference: Any) -> Dict[str, Optional[str]]:
+    """UserPreference 모델/DB 레코드/dict를 캐시용 dict로 변환 (취향 미설정 사용자는 모두 None)"""
+    if preference is None:
+        return {field: None for field in PREFERENCE_FIELDS}
+    if hasattr(preference, "get"):
+        return {field: preference.get(field) for field in PREFERENCE_FIELDS}
+    return {field: getattr(preference, field, None) for field in PREFERENCE_FIELDS}
+
+
+class UserPreferenceCache:
+    """
+    사용자 취향 read-through 캐시 (워커 로컬 LRU → Redis → loader)
+
+    취향이 없는 사용자도 None 값으로 캐싱하여 매 요청 DB 조회를 막습니다.
+    """
+
+    def __init__(self, cache: AsyncRedisCache = async_cache, bus: CacheInvalidationBus = invalidation_bus):
+        self.cache = cache
+        self.bus = bus
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+        bus.add_local_handler(self._on_invalidate)
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"{PREFERENCE_CACHE_PREFIX}{user_id}"
+
+    def _get_local(self, user_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._local.get(user_id)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if time.time() - stored_at > LOCAL_CACHE_TTL:
+            self._local.pop(user_id, None)
+            return None
+        self._local.move_to_end(user_id)
+        return value
+
+    def _set_local(self, user_id: str, value: Dict[str, Any]):
+        self._local[user_id] = (value, time.time())
+        self._local.move_to_end(user_id)
+        while len(self._local) > LOCAL_CACHE_SIZE:
+            self._local.popitem(last=False)
+
+    def _on_invalidate(self, tags: Set[str]):
+        """무효화 이벤트 수신 시 해당 사용자의 로컬 엔트리 제거"""
+        for tag in tags:
+            parts = tag.split(":")
+            if parts[0] == "user" and len(parts) >= 2 and (len(parts) == 2 or parts[2] == "preferences"):
+                self._local.pop(parts[1], None)
+
+    async def get(self, user_id: str, loader: Optional[PreferenceLoader] = None) -> Optional[Dict[str, Any]]:
+        """
+        사용자 취향 조회 (캐시 미스 시 loader로 DB 조회 후 저장)
+
+        Returns:
+            PREFERENCE_FIELDS 키를 가진 dict, 캐시 미스이고 loader가 없거나 실패하면 None
+        """
+        user_id = str(user_id)
+        value = self._get_local(user_id)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+
+        value = await self.cache.get(self._key(user_id))
+        if isinstance(value, dict):
+            self.stats["redis_hits"] += 1
+            self._set_local(user_id, value)
+            return value
+
+        self.stats["misses"] += 1
+        if loader is None:
+            return None
+        try:
+            loaded = await loader(user_id)
+        except Exception as e:
+            logger.warning(f"Failed to load preferences for {user_id}: {e}")
+            return None
+        value = preferences_to_dict(loaded)
+        await self.set(user_id, value)
+        return value
+
+    async def get_priority_tag(self, user_id: str, loader: Optional[PreferenceLoader] = None) -> Optional[str]:
+        """우선순위 태그만 조회"""
+        preferences = await self.get(user_id, loader)
+        return preferences.get("priority") if preferences else None
+
+    async def set(self, user_id: str, preferences: Any) -> bool:
+        """취향 저장 (로그인/취향 저장 시 write-through)"""
+        user_id = str(user_id)
+        value = preferences_to_dict(preferences)
+        self._set_local(user_id, value)
+        return await self.bus.set(
+            self._key(user_id), value, expire=PREFERENCE_CACHE_TTL,
+            tags=[user_tag(user_id, "preferences")]
+        )
+
+    async def invalidate(self, user_id: str) -> int:
+        """취향 변경 시 모든 워커의 캐시에서 제거"""
+        self._local.pop(str(user_id), None)
+        return await self.bus.invalidate(user_tag(user_id, "preferences"), reason="preferences")
+
+
+# 전역 취향 캐시 인스턴스
+user_preference_cache = UserPreferenceCache()
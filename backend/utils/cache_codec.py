@@ -0,0 +1,175 @@
+"""
+캐시 페이로드 직렬화 코덱
+- JSON / orjson / msgpack 중 선택 가능한 플러그형 코덱
+- 임계값 이상 크기의 페이로드는 zstd 압축 (선택)
+- 추천 페이로드에서 벡터 등 응답에 불필요한 필드를 제거하는 프로젝션
+"""
+import json
+import uuid
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 선택적 의존성 (설치되지 않은 경우 JSON으로 폴백)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# 코덱 헤더: 0xC1은 UTF-8 텍스트와 msgpack 모두에서 쓰이지 않는 바이트이므로
+# 헤더가 없는 값은 기존 JSON 문자열 엔트리로 판별할 수 있습니다.
+HEADER_MAGIC = b"\xc1"
+FORMAT_IDS = {"json": b"j", "orjson": b"o", "msgpack": b"m"}
+COMPRESSION_NONE = b"-"
+COMPRESSION_ZSTD = b"z"
+
+# 추천 응답 캐싱 시 제거할 필드 (프론트엔드에서 사용하지 않는 벡터/내부 집계값)
+RECOMMENDATION_DROP_FIELDS = frozenset({
+    "vector",
+    "text_vector",
+    "image_vector",
+    "embedding_vector",
+    "total_likes",
+    "total_bookmarks",
+    "total_clicks",
+    "unique_users",
+    "engagement_score",
+    "popularity_score",
+})
+
+
+def _default(obj: Any) -> Any:
+    """기본 타입이 아닌 값 변환 (기존 RedisCache._json_serializer와 동일한 규칙)"""
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, "tolist"):
+        # numpy 배열/스칼라
+        return obj.tolist()
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    return str(obj)
+
+
+class CacheCodec:
+    """
+    캐시 값 인코더/디코더
+
+    Args:
+        format: "json" | "orjson" | "msgpack" (라이브러리가 없으면 json으로 폴백)
+        compress_threshold: 이 크기(바이트) 이상이면 zstd 압축, None이면 압축 안 함
+        compression_level: zstd 압축 레벨
+    """
+
+    def __init__(self, format: str = "orjson", compress_threshold: Optional[int] = 4096,
+                 compression_level: int = 3):
+        if format == "orjson" and not ORJSON_AVAILABLE:
+            logger.warning("⚠️ orjson not available - falling back to json codec")
+            format = "json"
+        elif format == "msgpack" and not MSGPACK_AVAILABLE:
+            logger.warning("⚠️ msgpack not available - falling back to json codec")
+            format = "json"
+        if format not in FORMAT_IDS:
+            raise ValueError(f"Unknown cache codec format: {format}")
+
+        self.format = format
+        self.compress_threshold = compress_threshold if ZSTD_AVAILABLE else None
+        self._compressor = zstandard.ZstdCompressor(level=compression_level) if ZSTD_AVAILABLE else None
+        self._decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+
+    # ------------------------------------------------------------------
+    # 인코딩
+    # ------------------------------------------------------------------
+    def encode(self, value: Any) -> bytes:
+        """값을 헤더가 붙은 바이트열로 변환"""
+        body = self._dumps(self.format, value)
+        compression = COMPRESSION_NONE
+        if self.compress_threshold is not None and len(body) >= self.compress_threshold:
+            body = self._compressor.compress(body)
+            compression = COMPRESSION_ZSTD
+        return HEADER_MAGIC + FORMAT_IDS[self.format] + compression + body
+
+    @staticmethod
+    def _dumps(format: str, value: Any) -> bytes:
+        if format == "orjson":
+            # dict의 int 키 허용 (표준 json과 동일하게 문자열 키로 저장)
+            return orjson.dumps(value, default=_default,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        if format == "msgpack":
+            return msgpack.packb(value, default=_default, use_bin_type=True)
+        return json.dumps(value, ensure_ascii=False, default=_default).encode("utf-8")
+
+    # ------------------------------------------------------------------
+    # 디코딩
+    # ------------------------------------------------------------------
+    def decode(self, data: Any) -> Any:
+        """
+        바이트열을 값으로 변환
+        - 헤더가 있으면 기록된 포맷/압축에 따라 복원 (현재 설정과 무관)
+        - 헤더가 없으면 기존 JSON 문자열 엔트리로 간주하고, JSON이 아니면 문자열 그대로 반환
+        """
+        if data is None:
+            return None
+
+        if isinstance(data, (bytes, bytearray)) and data[:1] == HEADER_MAGIC and len(data) >= 3:
+            format_id, compression, body = data[1:2], data[2:3], bytes(data[3:])
+            if compression == COMPRESSION_ZSTD:
+                if self._decompressor is None:
+                    raise RuntimeError("zstandard is required to decode compressed cache entries")
+                body = self._decompressor.decompress(body)
+            return self._loads(format_id, body)
+
+        text = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return text
+
+    @staticmethod
+    def _loads(format_id: bytes, body: bytes) -> Any:
+        if format_id == FORMAT_IDS["orjson"]:
+            if ORJSON_AVAILABLE:
+                return orjson.loads(body)
+            return json.loads(body)
+        if format_id == FORMAT_IDS["msgpack"]:
+            if not MSGPACK_AVAILABLE:
+                raise RuntimeError("msgpack is required to decode this cache entry")
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        return json.loads(body)
+
+
+def project_payload(value: Any, drop_fields: Iterable[str] = RECOMMENDATION_DROP_FIELDS) -> Any:
+    """
+    캐싱 전 프로젝션: dict/list를 재귀적으로 순회하며 drop_fields 키를 제거
+    (원본은 수정하지 않고 새 객체를 반환)
+    """
+    drop = drop_fields if isinstance(drop_fields, (set, frozenset)) else frozenset(drop_fields)
+    if isinstance(value, dict):
+        return {k: project_payload(v, drop) for k, v in value.items() if k not in drop}
+    if isinstance(value, list):
+        return [project_payload(item, drop) for item in value]
+    return value
+
+
+# 기본 코덱 (orjson + 4KB 이상 zstd 압축, 라이브러리 미설치 시 자동 폴백)
+default_codec = CacheCodec()
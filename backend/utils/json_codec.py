@@ -0,0 +1,34 @@
+"""
+JSON 직렬화 헬퍼 (orjson 우선, 미설치 시 표준 json)
+- SQLAlchemy JSON/JSONB 컬럼 직렬화 (database.py 엔진 설정)
+- API 응답 클래스 (큰 문서를 반환하는 라우터의 default_response_class)
+"""
+import json
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+# 선택적 의존성 (설치되지 않은 경우 JSON으로 폴백)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_dumps(value: Any) -> str:
+    """JSON 문자열로 직렬화 (dict의 int 키 허용 - 표준 json과 동일)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """JSON 문자열/바이트 역직렬화"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# API 응답 클래스 (FastAPI의 ORJSONResponse는 orjson이 없으면 렌더링 시 실패하므로 선택)
+FastJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
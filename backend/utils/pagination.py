@@ -0,0 +1,77 @@
+"""
+커서(keyset) 페이지네이션 유틸리티
+- 마지막 행의 정렬 키를 불투명한 토큰으로 인코딩 → OFFSET 없이 다음 페이지 조회
+- 전체 개수는 매 페이지 count() 대신 짧은 TTL로 캐싱
+"""
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi import HTTPException, status
+
+from cache_utils import async_cache
+from cache_invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+# 캐싱된 전체 개수 유지 시간 (초) - 무한 스크롤의 총 개수 표시는 근사값이어도 충분
+COUNT_CACHE_TTL = 60
+
+
+def encode_cursor(**values: Any) -> str:
+    """정렬 키 값들을 URL-safe 토큰으로 인코딩 (datetime은 ISO 문자열로 저장)"""
+    payload = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, required: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    커서 토큰 디코딩
+
+    Raises:
+        HTTPException(400): 형식이 잘못되었거나 필수 키가 없는 경우
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, dict) or any(key not in payload for key in required):
+            raise ValueError("missing cursor fields")
+        return payload
+    except (ValueError, TypeError, UnicodeError) as e:
+        logger.warning(f"Invalid pagination cursor: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="잘못된 페이지 커서입니다."
+        )
+
+
+def cursor_datetime(value: Optional[str]) -> Optional[datetime]:
+    """커서에 저장된 ISO 문자열을 datetime으로 복원"""
+    return datetime.fromisoformat(value) if value else None
+
+
+async def cached_count(cache_key: str, compute: Callable[[], int], expire: int = COUNT_CACHE_TTL,
+                       tags: Iterable[str] = ()) -> int:
+    """
+    전체 개수 캐싱 조회 (미스 시 compute() 실행 후 저장)
+
+    Args:
+        compute: 동기 count 함수 (SQLAlchemy 세션 쿼리)
+        tags: 무효화 태그 (쓰기 시 즉시 갱신이 필요한 경우)
+    """
+    cached = await async_cache.get(cache_key)
+    if cached is not None:
+        try:
+            return int(cached)
+        except (TypeError, ValueError):
+            pass
+
+    total = compute()
+    await invalidation_bus.set(cache_key, total, expire=expire, tags=tags)
+    return total
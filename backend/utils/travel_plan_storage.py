@@ -3,12 +3,15 @@
 """
 from typing import Dict, Optional, List
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy.exc import SQLAlchemyError
 
 from models import TravelPlan
 from database import get_db
 
+# 워크플로우(travel_plan_to_dict)에서 사용하지 않는 대용량 응답 컬럼
+RESPONSE_DOCUMENT_COLUMNS = (TravelPlan.raw_response, TravelPlan.formatted_response, TravelPlan.ui_response)
+
 
 def save_travel_plan(
     db: Session,
@@ -108,7 +111,8 @@ def save_travel_plan(
         # DB에 저장
         db.add(travel_plan_obj)
         db.commit()
-        db.refresh(travel_plan_obj)
+        # 호출 측은 ID/제목만 사용하므로 방금 쓴 일정/응답 문서를 다시 읽지 않음
+        db.refresh(travel_plan_obj, attribute_names=["id", "title"])
 
         # ID를 미리 저장 (세션이 닫히기 전에)
         plan_id = travel_plan_obj.id
@@ -139,7 +143,11 @@ def get_latest_travel_plan(db: Session, user_id: str, session_id: Optional[str]
         최신 TravelPlan 객체 또는 None
     """
     try:
-        query = db.query(TravelPlan).filter(TravelPlan.user_id == user_id)
+        query = (
+            db.query(TravelPlan)
+            .options(*(defer(column) for column in RESPONSE_DOCUMENT_COLUMNS))
+            .filter(TravelPlan.user_id == user_id)
+        )
 
         if session_id:
             query = query.filter(TravelPlan.session_id == session_id)
@@ -292,4 +300,4 @@ def travel_plan_to_dict(travel_plan: TravelPlan) -> Dict:
         'confirmed_at': travel_plan.confirmed_at.isoformat() if travel_plan.confirmed_at else None,
         'created_at': travel_plan.created_at.isoformat(),
         'updated_at': travel_plan.updated_at.isoformat() if travel_plan.updated_at else None
-    }
\ No newline at end of file
+    }
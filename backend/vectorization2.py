@@ -42,6 +42,7 @@ except ImportError:
             similarity_weight: float = 0.5
             popularity_weight: float = 0.5
             min_similarity_threshold: float = 0.1
+            trending_weight: float = 1.0
             vector_cache_size: int = 1000
             cache_ttl_seconds: int = 300
             action_weights: Dict[str, float] = None
@@ -64,10 +65,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
 # ============================================================================
 # 🔧 유틸리티 함수들
 # ============================================================================
 
+def popular_order_sql(alias: str = "pr") -> str:
+    """인기 정렬식 (북마크 수 + 최근 조회수 트렌딩 점수)"""
+    return (
+        f"(COALESCE({alias}.bookmark_cnt, 0) + "
+        f"{float(getattr(CONFIG, 'trending_weight', 1.0))} * COALESCE({alias}.trending_score, 0))"
+    )
+
+
+def popular_score(place: Dict[str, Any]) -> float:
+    """인기 점수 (popular_order_sql과 동일한 식)"""
+    return (
+        float(place.get('bookmark_cnt') or 0)
+        + float(getattr(CONFIG, 'trending_weight', 1.0)) * float(place.get('trending_score') or 0)
+    )
+
+
 def safe_cosine_similarity(X: np.ndarray, Y: np.ndarray, use_ann: bool = False, faiss_manager=None) -> np.ndarray:
     """안전한 코사인 유사도 계산 (ANN 지원 버전)"""
     try:
@@ -802,6 +820,39 @@ class UnifiedRecommendationEngine:
         cache[cache_key] = data
         timestamps[cache_key] = time.time()
 
+    def drop_cached_entries(self, tags: set) -> int:
+        """
+        캐시 무효화 태그에 해당하는 인메모리 캐시 엔트리 제거
+        - user:{id}: 사용자 통합 데이터/행동 벡터/유사도 결과
+        - region:{r}, place:{table}:{id}: 장소 배치 데이터 (해당 지역 + 전체 지역)
+        """
+        user_ids = {tag.split(':')[1] for tag in tags if tag.startswith('user:') and tag.count(':') == 1}
+        regions = {tag.split(':', 1)[1] for tag in tags if tag.startswith('region:')}
+        place_changed = any(tag.startswith('place:') for tag in tags)
+
+        removed = 0
+        caches = [
+            (self.vector_cache, self.cache_timestamps),
+            (self.user_data_cache, self.user_data_timestamps),
+            (self.similarity_cache, self.similarity_timestamps),
+            (self.place_batch_cache, self.place_batch_timestamps),
+        ]
+        for cache, timestamps in caches:
+            for key in list(cache.keys()):
+                parts = key.split(':')
+                if len(parts) < 2:
+                    continue
+                is_place_batch = parts[0] == 'fast_places'
+                if (not is_place_batch and parts[1] in user_ids) or \
+                        (is_place_batch and (place_changed or (regions and parts[1] in regions | {'all'}))):
+                    cache.pop(key, None)
+                    timestamps.pop(key, None)
+                    removed += 1
+
+        if removed:
+            logger.info(f"🧹 Dropped {removed} in-memory cache entries for tags {sorted(tags)[:5]}")
+        return removed
+
     async def get_recommendations(
         self,
         user_id: Optional[str],
@@ -1232,7 +1283,8 @@ class UnifiedRecommendationEngine:
                     pr.longitude,
                     pr.overview as description,
                     pr.image_urls,
-                    pr.bookmark_cnt
+                    pr.bookmark_cnt,
+                    COALESCE(pr.trending_score, 0) as trending_score
                 FROM place_recommendations pr
                 WHERE
                     pr.vector IS NOT NULL
@@ -1255,8 +1307,8 @@ class UnifiedRecommendationEngine:
                 query += f" AND pr.table_name = ${param_count}::text"
                 params.append(category)
 
-            # 성능을 위한 제한 및 정렬 (북마크 카운트 기준)
-            query += " ORDER BY COALESCE(pr.bookmark_cnt, 0) DESC"
+            # 성능을 위한 제한 및 정렬 (북마크 카운트 + 최근 조회수 트렌딩 점수 기준)
+            query += f" ORDER BY {popular_order_sql()} DESC"
             param_count += 1
             query += f" LIMIT ${param_count}"
             params.append(CONFIG.candidate_limit)
@@ -1285,7 +1337,7 @@ class UnifiedRecommendationEngine:
         limit: int,
         fast_mode: bool = False
     ) -> List[Dict]:
-        """인기 기반 추천 (단순 북마크 카운트 정렬)"""
+        """인기 기반 추천 (북마크 수 + 최근 조회수 트렌딩 점수 정렬)"""
         # fast_mode에 따라 다른 후보 조회
         if fast_mode:
             places = await self._get_fast_place_candidates(region, category, limit * 2)
@@ -1295,11 +1347,10 @@ class UnifiedRecommendationEngine:
         if not places:
             return []
 
-        # 단순 북마크 카운트 기반 정렬
+        # 북마크 수 + 트렌딩 점수 기반 정렬
         for place in places:
             try:
-                bookmark_count = place.get('bookmark_cnt', 0)
-                place['final_score'] = bookmark_count
+                place['final_score'] = popular_score(place)
                 place['recommendation_type'] = 'popular_fast' if fast_mode else 'popular'
                 place['source'] = 'popular'  # 소스 태그 추가
                 place['similarity_score'] = 0.8  # 인기 추천용 기본값
@@ -1307,8 +1358,8 @@ class UnifiedRecommendationEngine:
                 logger.error(f"❌ Popular score calculation failed for place {place.get('place_id')}: {e}")
                 place['final_score'] = 0
 
-        # 북마크 카운트순 정렬 (내림차순)
-        places.sort(key=lambda x: x.get('bookmark_cnt', 0), reverse=True)
+        # 인기 점수순 정렬 (내림차순)
+        places.sort(key=lambda x: x.get('final_score', 0), reverse=True)
         
         # numpy 배열을 리스트로 변환 (JSON 직렬화를 위해)
         for place in places[:limit]:
@@ -2181,6 +2232,17 @@ class UnifiedRecommendationEngine:
             logger.error(f"❌ Failed to get user priority tag for {user_id}: {e}")
             return None
 
+    async def get_user_preference_tags(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """사용자의 여행 취향 태그 조회 (priority/accommodation/exploration/persona 한 번에)"""
+        async with self.db_manager.get_connection() as conn:
+            query = """
+                SELECT priority, accommodation, exploration, persona
+                FROM user_preferences
+                WHERE user_id = $1
+            """
+            row = await conn.fetchrow(query, user_id)
+            return dict(row) if row else None
+
     async def _calculate_preference_scores(
         self,
         user_preferences: Dict[str, Any],
@@ -2766,13 +2828,14 @@ class UnifiedRecommendationEngine:
                     COALESCE(pr.bookmark_cnt, 0) as total_bookmarks,
                     COALESCE(pr.bookmark_cnt, 0) as total_clicks,
                     COALESCE(pr.bookmark_cnt, 0)::float as popularity_score,
-                    COALESCE(pr.bookmark_cnt, 0)::float as engagement_score
+                    COALESCE(pr.bookmark_cnt, 0)::float as engagement_score,
+                    COALESCE(pr.trending_score, 0) as trending_score
                 FROM place_recommendations pr
                 WHERE
                     pr.vector IS NOT NULL
                     AND pr.name IS NOT NULL
                     AND pr.bookmark_cnt IS NOT NULL
-                    AND pr.bookmark_cnt > 0
+                    AND (pr.bookmark_cnt > 0 OR pr.trending_score > 0)
             """
 
             params = []
@@ -2790,8 +2853,8 @@ class UnifiedRecommendationEngine:
                 query += f" AND pr.table_name = ${param_count}::text"
                 params.append(category)
 
-            # 성능 최적화: 북마크 기준 정렬로 상위만 조회
-            query += " ORDER BY COALESCE(pr.bookmark_cnt, 0) DESC"
+            # 성능 최적화: 북마크 + 트렌딩 점수 기준 정렬로 상위만 조회
+            query += f" ORDER BY {popular_order_sql()} DESC"
             param_count += 1
             query += f" LIMIT ${param_count}"
             params.append(limit)
@@ -3809,6 +3872,10 @@ async def get_engine() -> UnifiedRecommendationEngine:
 
     return _engine_instance
 
+def get_engine_if_initialized() -> Optional[UnifiedRecommendationEngine]:
+    """이미 생성된 전역 엔진 반환 (없으면 새로 만들지 않고 None)"""
+    return _engine_instance
+
 async def close_engine():
     """전역 엔진 인스턴스 정리"""
     global _engine_instance
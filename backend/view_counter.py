@@ -0,0 +1,311 @@
+"""
+관광지 조회수 집계 및 트렌딩 점수
+- 상세 조회 시 워커 메모리의 카운터만 증가 (요청 경로에서 Redis 호출 없음)
+- VIEW_FLUSH_INTERVAL마다 파이프라인 한 번으로 누적/시간별/일별 카운터에 일괄 반영 (INCRBY / HINCRBY)
+- TRENDING_FOLD_INTERVAL마다 시간 감쇠를 적용한 최근 조회수를 place_recommendations.trending_score에 반영
+  (여러 워커 중 하나만 수행 - Redis 락, 컬럼은 migrate_trending.sql로만 추가)
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from cache_utils import AsyncRedisCache, async_cache
+from database import SessionLocal
+from services.place_resolver import PLACE_TABLES
+
+logger = logging.getLogger(__name__)
+
+# 누적 조회수 키 (기존 increment_view_count/get_view_count와 동일)
+TOTAL_VIEWS_PREFIX = "views:attraction:"
+HOURLY_VIEWS_PREFIX = "views:hourly:"
+DAILY_VIEWS_PREFIX = "views:daily:"
+HOURLY_BUCKET_TTL = 3 * 86400
+DAILY_BUCKET_TTL = 35 * 86400
+
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "5"))
+TRENDING_FOLD_INTERVAL = int(os.getenv("TRENDING_FOLD_INTERVAL", "900"))
+# 조회수 가중치가 절반이 되는 시간 / 일별 버킷을 포함하는 최대 기간
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+TRENDING_WINDOW_DAYS = int(os.getenv("TRENDING_WINDOW_DAYS", "7"))
+TRENDING_LOCK_KEY = "trending_fold"
+
+SessionFactory = Callable[[], object]
+
+
+def hourly_bucket(moment: datetime) -> str:
+    return f"{HOURLY_VIEWS_PREFIX}{moment.strftime('%Y%m%d%H')}"
+
+
+def daily_bucket(moment: datetime) -> str:
+    return f"{DAILY_VIEWS_PREFIX}{moment.strftime('%Y%m%d')}"
+
+
+def parse_attraction_id(attraction_id: str) -> Optional[Tuple[str, int]]:
+    """'table_name_123' 형식의 관광지 ID → (테이블명, 장소 ID) (숫자만 있는 레거시 ID는 None)"""
+    table_name, _, place_id = attraction_id.rpartition("_")
+    if table_name in PLACE_TABLES and place_id.isdigit():
+        return table_name, int(place_id)
+    return None
+
+
+class ViewCounter:
+    """
+    조회수 배치 카운터
+
+    record()는 메모리 카운터만 증가시키며, flush()가 누적된 값을 Redis에 한 번에 반영합니다.
+    flush 실패 시 카운트는 다음 주기에 다시 시도됩니다.
+    """
+
+    def __init__(self, cache: AsyncRedisCache = async_cache, flush_interval: float = VIEW_FLUSH_INTERVAL):
+        self.cache = cache
+        self.flush_interval = flush_interval
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"recorded": 0, "flushes": 0, "flushed_views": 0}
+
+    def record(self, attraction_id: str, count: int = 1):
+        """조회 1회 기록 (I/O 없음)"""
+        with self._lock:
+            self._pending[str(attraction_id)] += count
+            self.stats["recorded"] += count
+
+    def pending(self, attraction_id: str) -> int:
+        with self._lock:
+            return self._pending.get(str(attraction_id), 0)
+
+    async def get_count(self, attraction_id: str) -> int:
+        """누적 조회수 (아직 반영되지 않은 이 워커의 조회수 포함)"""
+        value = await self.cache.redis.get(f"{TOTAL_VIEWS_PREFIX}{attraction_id}")
+        return (int(value) if value else 0) + self.pending(attraction_id)
+
+    async def flush(self) -> int:
+        """대기 중인 조회수를 누적/시간별/일별 카운터에 일괄 반영"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, Counter()
+
+        now = datetime.now()
+        hour_key, day_key = hourly_bucket(now), daily_bucket(now)
+        try:
+            pipe = self.cache.redis.pipeline(transaction=False)
+            for attraction_id, count in batch.items():
+                pipe.incrby(f"{TOTAL_VIEWS_PREFIX}{attraction_id}", count)
+                pipe.hincrby(hour_key, attraction_id, count)
+                pipe.hincrby(day_key, attraction_id, count)
+            pipe.expire(hour_key, HOURLY_BUCKET_TTL)
+            pipe.expire(day_key, DAILY_BUCKET_TTL)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"View counter flush failed, will retry ({len(batch)} places): {e}")
+            with self._lock:
+                self._pending.update(batch)
+            return 0
+
+        total = sum(batch.values())
+        self.stats["flushes"] += 1
+        self.stats["flushed_views"] += total
+        return total
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"View counter flush loop error: {e}")
+
+    async def start(self):
+        """주기적 flush 태스크 시작 (앱 시작 시)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """flush 태스크 종료 후 남은 조회수 반영 (앱 종료 시)"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+
+class TrendingScoreJob:
+    """
+    최근 조회수 → place_recommendations.trending_score 반영 작업
+
+    점수 = Σ 버킷 조회수 × 0.5^(버킷 경과 시간 / 반감기)
+    오늘/어제는 시간별 버킷, 그 이전(TRENDING_WINDOW_DAYS까지)은 일별 버킷을 사용합니다.
+    """
+
+    def __init__(self, session_factory: SessionFactory, cache: AsyncRedisCache = async_cache,
+                 interval: int = TRENDING_FOLD_INTERVAL, half_life_hours: float = TRENDING_HALF_LIFE_HOURS,
+                 window_days: int = TRENDING_WINDOW_DAYS):
+        self.session_factory = session_factory
+        self.cache = cache
+        self.interval = interval
+        self.half_life_hours = half_life_hours
+        self.window_days = window_days
+        self._task: Optional[asyncio.Task] = None
+        self._schema_ready = False
+
+    def _decay(self, age_hours: float) -> float:
+        return 0.5 ** (max(age_hours, 0.0) / self.half_life_hours)
+
+    def _buckets(self, now: datetime):
+        """(버킷 키, 버킷 중간 시각) 목록 - 시간별/일별 구간이 겹치지 않도록 구성"""
+        yesterday = (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        buckets = []
+        moment = yesterday
+        while moment <= now:
+            buckets.append((hourly_bucket(moment), moment + timedelta(minutes=30)))
+            moment += timedelta(hours=1)
+        for days_ago in range(2, self.window_days + 1):
+            day = yesterday - timedelta(days=days_ago - 1)
+            buckets.append((daily_bucket(day), day + timedelta(hours=12)))
+        return buckets
+
+    async def compute_scores(self, now: Optional[datetime] = None) -> Dict[str, float]:
+        """관광지 ID별 감쇠 조회수 점수"""
+        now = now or datetime.now()
+        buckets = self._buckets(now)
+        pipe = self.cache.redis.pipeline(transaction=False)
+        for key, _ in buckets:
+            pipe.hgetall(key)
+        results = await pipe.execute()
+
+        scores: Dict[str, float] = Counter()
+        for (_, midpoint), counts in zip(buckets, results):
+            if not counts:
+                continue
+            weight = self._decay((now - midpoint).total_seconds() / 3600)
+            for attraction_id, count in counts.items():
+                if isinstance(attraction_id, bytes):
+                    attraction_id = attraction_id.decode("utf-8")
+                scores[attraction_id] += int(count) * weight
+        return scores
+
+    def check_schema(self):
+        """
+        trending_score 컬럼 확인 (최초 1회)
+
+        DDL은 migrate_trending.sql로만 적용하며, 컬럼이 없으면 점수 반영 전에 바로 실패합니다.
+        """
+        if self._schema_ready:
+            return
+        db = self.session_factory()
+        try:
+            exists = db.execute(text("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'place_recommendations' AND column_name = 'trending_score'
+            """)).first() is not None
+        finally:
+            db.close()
+        if not exists:
+            raise RuntimeError(
+                "Missing column place_recommendations.trending_score "
+                "(apply backend/migrate_trending.sql before starting the trending job)"
+            )
+        self._schema_ready = True
+
+    def _store_scores(self, scores: Dict[str, float]) -> int:
+        """점수 일괄 반영 - 집계 구간에서 빠진 장소만 0으로 초기화하고 값이 바뀐 장소만 갱신 (한 트랜잭션)"""
+        tables, place_ids, values = [], [], []
+        for attraction_id, score in scores.items():
+            parsed = parse_attraction_id(attraction_id)
+            if parsed is None or score <= 0:
+                continue
+            tables.append(parsed[0])
+            place_ids.append(parsed[1])
+            values.append(round(score, 4))
+
+        db = self.session_factory()
+        try:
+            params = {"tables": tables, "place_ids": place_ids, "scores": values}
+            db.execute(text("""
+                UPDATE place_recommendations AS pr
+                SET trending_score = 0
+                WHERE pr.trending_score <> 0
+                  AND NOT EXISTS (
+                      SELECT 1 FROM unnest(CAST(:tables AS text[]), CAST(:place_ids AS integer[]))
+                          AS v(table_name, place_id)
+                      WHERE v.table_name = pr.table_name AND v.place_id = pr.place_id
+                  )
+            """), params)
+            if tables:
+                db.execute(text("""
+                    UPDATE place_recommendations AS pr
+                    SET trending_score = v.score
+                    FROM unnest(
+                        CAST(:tables AS text[]), CAST(:place_ids AS integer[]), CAST(:scores AS double precision[])
+                    ) AS v(table_name, place_id, score)
+                    WHERE pr.table_name = v.table_name AND pr.place_id = v.place_id
+                      AND pr.trending_score IS DISTINCT FROM v.score
+                """), params)
+            db.commit()
+            return len(tables)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def run_once(self) -> int:
+        """점수 계산 후 DB 반영 (반영된 장소 수)"""
+        start_time = time.perf_counter()
+        await asyncio.to_thread(self.check_schema)
+        scores = await self.compute_scores()
+        updated = await asyncio.to_thread(self._store_scores, scores)
+        logger.info(f"🔥 Trending scores folded: {updated} places ({time.perf_counter() - start_time:.2f}s)")
+        return updated
+
+    async def _loop(self):
+        # 마이그레이션이 적용되지 않았으면 매 주기 실패를 반복하지 않고 작업을 중단
+        try:
+            await asyncio.to_thread(self.check_schema)
+        except RuntimeError as e:
+            logger.error(f"❌ Trending score job disabled: {e}")
+            return
+        except Exception as e:
+            logger.error(f"❌ trending_score column check failed: {e}")
+        while True:
+            try:
+                # 주기당 한 워커만 수행 (락은 주기 동안 유지)
+                if await self.cache.try_lock(TRENDING_LOCK_KEY, expire=max(self.interval - 5, 1)):
+                    await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Trending score fold failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 전역 조회수 카운터 / 트렌딩 점수 작업 인스턴스
+view_counter = ViewCounter()
+trending_score_job = TrendingScoreJob(SessionLocal)
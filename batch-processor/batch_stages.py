@@ -0,0 +1,365 @@
+"""
+재개 가능한 단계별 배치 실행 (ingest → aggregate → embed → persist)
+- 실행마다 {BATCH_RUNS_DIR}/{batch_id}/ 작업 디렉토리에 단계 산출물과 manifest.json(완료 단계 목록) 기록
+- ingest: 파싱한 액션을 사용자 ID 해시 기준 파티션별 gzip JSONL로 분배
+- aggregate: 파티션별 사용자/장소 집계 (BATCH_WORKERS개 프로세스로 병렬 처리)
+- embed: 장소/사용자 벡터 (레코드는 gzip JSON, 벡터는 NPY)
+- 사용자는 한 파티션에만 속하므로 장소 카운터/고유 사용자 수는 파티션별 부분 집계의 합과 같음
+- 중단 후 --resume으로 실행하면 완료된 단계(및 완료된 파티션)는 산출물을 읽어 건너뜀
+"""
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_cache import BATCH_CACHE_DIR
+from hll import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+BATCH_RUNS_DIR = os.getenv('BATCH_RUNS_DIR', os.path.join(BATCH_CACHE_DIR, 'runs'))
+BATCH_PARTITIONS = int(os.getenv('BATCH_PARTITIONS', '8'))
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '1'))
+
+STAGES = ('ingest', 'aggregate', 'embed', 'persist')
+# 집계/벡터화에 사용하는 액션 필드 (파티션 파일에는 이 필드만 기록)
+ACTION_FIELDS = ('user_id', 'place_id', 'place_category', 'action_type', 'action_time')
+PLACE_COUNTERS = ('total_likes', 'total_bookmarks', 'total_clicks')
+
+
+def user_partition(user_id: Any, partitions: int) -> int:
+    """사용자 ID의 파티션 번호 (프로세스마다 달라지는 내장 hash() 대신 고정 해시 사용)"""
+    digest = hashlib.blake2b(str(user_id).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % partitions
+
+
+# ----------------------------------------------------------------------
+# 집계
+# ----------------------------------------------------------------------
+def aggregate_actions(actions: Iterable[Dict[str, Any]]) -> Tuple[Dict[Any, Dict[str, Any]], Dict[str, Dict[str, Any]], int]:
+    """
+    사용자별/장소별 행동 집계
+
+    Returns:
+        (user_data, place_data, 읽은 액션 수) - place_data의 unique_users는 사용자 ID 집합
+    """
+    user_data = {}
+    place_data = {}
+    action_count = 0
+
+    for action in actions:
+        action_count += 1
+        user_id = action.get('user_id')
+        place_id = action.get('place_id')
+        place_category = action.get('place_category')
+        action_type = action.get('action_type')
+
+        if not all([user_id, place_id, place_category, action_type]):
+            continue
+
+        # 사용자 데이터 집계
+        if user_id not in user_data:
+            user_data[user_id] = {
+                'actions': [],
+                'total_likes': 0,
+                'total_bookmarks': 0,
+                'total_clicks': 0,
+                'places_visited': set(),
+                'categories_visited': set()
+            }
+
+        user_data[user_id]['actions'].append(action)
+        user_data[user_id]['places_visited'].add(f"{place_category}:{place_id}")
+        user_data[user_id]['categories_visited'].add(place_category)
+
+        if action_type == 'like':
+            user_data[user_id]['total_likes'] += 1
+        elif action_type == 'bookmark':
+            user_data[user_id]['total_bookmarks'] += 1
+        elif action_type == 'click':
+            user_data[user_id]['total_clicks'] += 1
+
+        # 장소 데이터 집계
+        place_key = f"{place_category}:{place_id}"
+        if place_key not in place_data:
+            place_data[place_key] = {
+                'place_id': place_id,
+                'place_category': place_category,
+                'total_likes': 0,
+                'total_bookmarks': 0,
+                'total_clicks': 0,
+                'unique_users': set()
+            }
+
+        place_data[place_key]['unique_users'].add(user_id)
+
+        if action_type == 'like':
+            place_data[place_key]['total_likes'] += 1
+        elif action_type == 'bookmark':
+            place_data[place_key]['total_bookmarks'] += 1
+        elif action_type == 'click':
+            place_data[place_key]['total_clicks'] += 1
+
+    return user_data, place_data, action_count
+
+
+def finalize_place_data(place_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """고유 사용자 집합 → (고유 사용자 수, HLL 스케치)"""
+    for data in place_data.values():
+        users = data['unique_users']
+        if isinstance(users, set):
+            data['unique_users'] = len(users)
+            data['unique_users_sketch'] = HyperLogLog().update(users)
+    return place_data
+
+
+def merge_place_partials(partials: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """파티션별 장소 부분 집계 합치기 (파티션 간 사용자가 겹치지 않으므로 고유 사용자 수도 합산)"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for partial in partials:
+        for place_key, data in partial.items():
+            current = merged.get(place_key)
+            if current is None:
+                merged[place_key] = dict(data)
+                continue
+            for counter in PLACE_COUNTERS + ('unique_users',):
+                current[counter] += data[counter]
+            current['unique_users_sketch'] = current['unique_users_sketch'].merge(data['unique_users_sketch'])
+    return merged
+
+
+def aggregate_partition(actions_path: str, users_path: str, places_path: str) -> int:
+    """
+    파티션 파일 하나를 집계해 사용자/장소 부분 집계 파일로 저장 (워커 프로세스에서 실행)
+
+    Returns:
+        집계한 사용자 수
+    """
+    with gzip.open(actions_path, 'rt', encoding='utf-8') as f:
+        user_data, place_data, _ = aggregate_actions(json.loads(line) for line in f)
+    finalize_place_data(place_data)
+    write_json(users_path, [[user_id, encode_user(data)] for user_id, data in user_data.items()])
+    write_json(places_path, [encode_place(data) for data in place_data.values()])
+    return len(user_data)
+
+
+# ----------------------------------------------------------------------
+# 직렬화
+# ----------------------------------------------------------------------
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_json(path: str, payload: Any):
+    """gzip JSON 원자적 저장 (임시 파일에 쓴 뒤 이름 변경 → 중단되어도 반쯤 쓴 파일이 남지 않음)"""
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, default=_json_default)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str) -> Any:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def encode_user(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'actions': [{field: action.get(field) for field in ACTION_FIELDS} for action in data['actions']],
+        'total_likes': data['total_likes'],
+        'total_bookmarks': data['total_bookmarks'],
+        'total_clicks': data['total_clicks'],
+        'places_visited': data['places_visited'],
+        'categories_visited': data['categories_visited']
+    }
+
+
+def decode_user(data: Dict[str, Any]) -> Dict[str, Any]:
+    data['places_visited'] = set(data['places_visited'])
+    data['categories_visited'] = set(data['categories_visited'])
+    return data
+
+
+def decode_user_vector(data: Dict[str, Any]) -> Dict[str, Any]:
+    if data.get('last_action_date'):
+        data['last_action_date'] = datetime.fromisoformat(data['last_action_date'])
+    return data
+
+
+def encode_place(data: Dict[str, Any]) -> Dict[str, Any]:
+    encoded = {key: value for key, value in data.items() if key != 'unique_users_sketch'}
+    encoded['unique_users_sketch'] = base64.b64encode(data['unique_users_sketch'].to_bytes()).decode('ascii')
+    return encoded
+
+
+def decode_place(data: Dict[str, Any]) -> Dict[str, Any]:
+    data['unique_users_sketch'] = HyperLogLog.from_bytes(base64.b64decode(data['unique_users_sketch']))
+    return data
+
+
+# ----------------------------------------------------------------------
+# 체크포인트
+# ----------------------------------------------------------------------
+class RunCheckpoint:
+    """
+    실행 작업 디렉토리와 manifest.json
+
+    manifest에는 파티션 수, 처리 대상 S3 파일 목록, 완료 단계와 단계별 정보(액션 수 등)가 기록됩니다.
+    """
+
+    def __init__(self, run_dir: Path, manifest: Dict[str, Any]):
+        self.run_dir = run_dir
+        self.manifest = manifest
+
+    @property
+    def batch_id(self) -> str:
+        return self.manifest['batch_id']
+
+    @property
+    def partitions(self) -> int:
+        return self.manifest['partitions']
+
+    @classmethod
+    def create(cls, batch_id: str, partitions: int = BATCH_PARTITIONS, root: str = BATCH_RUNS_DIR) -> "RunCheckpoint":
+        run_dir = Path(root) / batch_id
+        if run_dir.exists():
+            shutil.rmtree(run_dir)
+        run_dir.mkdir(parents=True)
+        checkpoint = cls(run_dir, {
+            'batch_id': batch_id,
+            'partitions': max(1, partitions),
+            'created_at': datetime.now().isoformat(),
+            'completed_stages': [],
+            'stage_info': {},
+            'files': []
+        })
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, batch_id: Optional[str] = None, root: str = BATCH_RUNS_DIR) -> Optional["RunCheckpoint"]:
+        """지정한 실행 (batch_id 생략 시 persist까지 끝나지 않은 가장 최근 실행)"""
+        if batch_id:
+            candidates = [Path(root) / batch_id]
+        elif Path(root).is_dir():
+            candidates = sorted((path for path in Path(root).iterdir() if path.is_dir()),
+                                key=lambda path: path.stat().st_mtime, reverse=True)
+        else:
+            candidates = []
+        for run_dir in candidates:
+            manifest_path = run_dir / 'manifest.json'
+            if not manifest_path.is_file():
+                continue
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                checkpoint = cls(run_dir, json.load(f))
+            if batch_id or not checkpoint.is_done('persist'):
+                return checkpoint
+        return None
+
+    def save(self):
+        self.manifest['updated_at'] = datetime.now().isoformat()
+        tmp_path = self.run_dir / 'manifest.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2, default=_json_default)
+        os.replace(tmp_path, self.run_dir / 'manifest.json')
+
+    def is_done(self, stage: str) -> bool:
+        return stage in self.manifest['completed_stages']
+
+    def mark_done(self, stage: str, **info):
+        if stage not in self.manifest['completed_stages']:
+            self.manifest['completed_stages'].append(stage)
+        self.manifest['stage_info'][stage] = info
+        self.save()
+        logger.info(f"📌 Stage '{stage}' checkpointed in {self.run_dir}")
+
+    def reset(self, *stages: str):
+        """단계 산출물과 완료 기록 삭제 (해당 단계부터 다시 실행)"""
+        for stage in stages:
+            shutil.rmtree(self.run_dir / stage, ignore_errors=True)
+            if stage in self.manifest['completed_stages']:
+                self.manifest['completed_stages'].remove(stage)
+            self.manifest['stage_info'].pop(stage, None)
+        self.save()
+
+    def stage_info(self, stage: str) -> Dict[str, Any]:
+        return self.manifest['stage_info'].get(stage, {})
+
+    def stage_dir(self, stage: str, reset: bool = False) -> Path:
+        path = self.run_dir / stage
+        if reset and path.exists():
+            shutil.rmtree(path)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def partition_path(self, stage: str, name: str, partition: int, suffix: str = '.json.gz') -> str:
+        return str(self.stage_dir(stage) / f"{name}-{partition:04d}{suffix}")
+
+    # S3 파일 정보 (원장 기록용, LastModified는 ISO 문자열로 보관)
+    def set_files(self, files: Sequence[Dict[str, Any]]):
+        self.manifest['files'] = [
+            dict(file_info, last_modified=file_info['last_modified'].isoformat()) for file_info in files
+        ]
+
+    def files(self) -> List[Dict[str, Any]]:
+        return [
+            dict(file_info, last_modified=datetime.fromisoformat(file_info['last_modified']))
+            for file_info in self.manifest['files']
+        ]
+
+    # 벡터 레코드 (벡터 필드는 NPY, 나머지는 gzip JSON)
+    def write_vector_records(self, path: str, records: Dict[Any, Dict[str, Any]], vector_fields: Sequence[str],
+                             encode=lambda data: data):
+        keys = list(records)
+        missing = {}
+        for field in vector_fields:
+            vectors = [records[key].get(field) for key in keys]
+            dim = next((len(vector) for vector in vectors if vector is not None), 0)
+            matrix = np.full((len(keys), dim), np.nan)
+            missing[field] = []
+            for row, vector in enumerate(vectors):
+                if vector is None:
+                    missing[field].append(row)
+                else:
+                    matrix[row] = vector
+            tmp_path = f"{path}.{field}.tmp.npy"
+            np.save(tmp_path, matrix)
+            os.replace(tmp_path, f"{path}.{field}.npy")
+        write_json(path, {
+            'keys': keys,
+            'missing': missing,
+            'records': [encode({k: v for k, v in records[key].items() if k not in vector_fields}) for key in keys]
+        })
+
+    @staticmethod
+    def read_vector_records(path: str, vector_fields: Sequence[str], decode=lambda data: data) -> Dict[Any, Dict[str, Any]]:
+        payload = read_json(path)
+        records = {key: decode(data) for key, data in zip(payload['keys'], payload['records'])}
+        for field in vector_fields:
+            matrix = np.load(f"{path}.{field}.npy")
+            missing = set(payload['missing'].get(field, []))
+            for row, data in enumerate(records.values()):
+                data[field] = None if row in missing else matrix[row].tolist()
+        return records
+
+    def cleanup(self):
+        """persist 완료 후 단계 산출물 삭제 (manifest는 실행 기록으로 유지)"""
+        for stage in STAGES:
+            shutil.rmtree(self.run_dir / stage, ignore_errors=True)
+
+    def discard(self):
+        shutil.rmtree(self.run_dir, ignore_errors=True)
@@ -0,0 +1,72 @@
+"""
+PostgreSQL 대량 쓰기 헬퍼
+- 임시 스테이징 테이블에 COPY (CSV)로 행을 스트리밍 → 대상 테이블에는 INSERT ... SELECT ... ON CONFLICT 한 번
+- COPY는 한 행만 잘못되어도 전체가 실패하므로, 적재 전에 행 단위로 검증하여 거부 행을 따로 보고
+"""
+import csv
+import io
+import math
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# COPY 한 번에 보내는 행 수 (메모리 버퍼 크기 제한)
+BULK_COPY_PAGE_SIZE = int(os.getenv('BULK_COPY_PAGE_SIZE', '5000'))
+
+
+def format_copy_value(value: Any) -> Any:
+    """Python 값 → COPY CSV 필드 (None은 빈 필드 = NULL)"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return '{' + ','.join(repr(float(item)) for item in value) + '}'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return '\\x' + bytes(value).hex()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, float):
+        return repr(value)
+    return value
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+              page_size: int = BULK_COPY_PAGE_SIZE) -> int:
+    """행들을 page_size 단위 CSV 버퍼로 나누어 COPY (psycopg2 커서)"""
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    copied = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+
+    def flush():
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    for row in rows:
+        writer.writerow([format_copy_value(value) for value in row])
+        pending += 1
+        if pending >= page_size:
+            flush()
+            copied += pending
+            pending = 0
+    if pending:
+        flush()
+        copied += pending
+    return copied
+
+
+def vector_reject_reason(vector: Optional[List[float]], dim: int) -> Optional[str]:
+    """벡터가 저장할 수 없는 값이면 거부 사유 (정상이면 None)"""
+    if vector is None:
+        return "missing vector"
+    if len(vector) != dim:
+        return f"vector dimension {len(vector)} != {dim}"
+    if not all(math.isfinite(float(value)) for value in vector):
+        return "vector contains NaN/Inf"
+    return None
+
+
+def reject(record_key: str, table: str, reason: str) -> Dict[str, str]:
+    return {'key': str(record_key), 'table': table, 'reason': reason}
@@ -0,0 +1,96 @@
+"""
+디스크 임베딩 캐시 (SQLite)
+- (네임스페이스, 항목 키, 내용 해시) 단위로 벡터 보관 → 내용이 바뀌지 않은 항목은 다음 실행에서 재인코딩 없이 재사용
+- 네임스페이스에 모델 이름을 포함하여 모델 변경 시 자동으로 무효화
+- 항목 키당 최신 내용 해시의 벡터 하나만 유지 (내용이 바뀌면 덮어씀)
+"""
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 배치 작업 로컬 캐시 디렉토리 (Batch 작업 정의에서 EFS 등 영구 볼륨을 마운트하면 실행 간 유지)
+BATCH_CACHE_DIR = os.getenv('BATCH_CACHE_DIR', '/tmp/witple-batch-cache')
+EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', os.path.join(BATCH_CACHE_DIR, 'embeddings.sqlite'))
+
+
+class DiskEmbeddingCache:
+    """
+    내용 해시 기반 벡터 캐시
+
+    벡터는 float32 바이트로 저장됩니다. 여러 스레드에서 호출될 수 있으므로 연결 사용은 락으로 직렬화합니다.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0}
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    namespace TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (namespace, item_key)
+                )
+            """)
+
+    def get_many(self, namespace: str, content_hashes: Dict[str, str]) -> Dict[str, List[float]]:
+        """{항목 키: 내용 해시} 중 같은 해시로 저장된 항목의 벡터"""
+        if not content_hashes:
+            return {}
+        result = {}
+        items = list(content_hashes.items())
+        with self._lock:
+            for offset in range(0, len(items), 500):
+                chunk = items[offset:offset + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT item_key, content_hash, vector FROM embeddings "
+                    f"WHERE namespace = ? AND item_key IN ({placeholders})",
+                    [namespace] + [item_key for item_key, _ in chunk]
+                ).fetchall()
+                for item_key, content_hash, vector in rows:
+                    if content_hashes.get(item_key) == content_hash:
+                        result[item_key] = np.frombuffer(vector, dtype=np.float32).tolist()
+        self.stats['hits'] += len(result)
+        self.stats['misses'] += len(content_hashes) - len(result)
+        return result
+
+    def put_many(self, namespace: str, entries: Iterable[Tuple[str, str, List[float]]]):
+        """(항목 키, 내용 해시, 벡터) 저장"""
+        rows = [
+            (namespace, item_key, content_hash, np.asarray(vector, dtype=np.float32).tobytes())
+            for item_key, content_hash, vector in entries
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (namespace, item_key, content_hash, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        self.stats['writes'] += len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_embedding_cache(path: str = EMBEDDING_CACHE_PATH) -> Optional[DiskEmbeddingCache]:
+    """캐시 열기 (디렉토리 권한 등으로 실패하면 None - 캐시 없이 진행)"""
+    try:
+        return DiskEmbeddingCache(path)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"⚠️ Embedding cache unavailable at {path}, continuing without it: {e}")
+        return None
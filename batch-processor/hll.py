@@ -0,0 +1,71 @@
+"""
+HyperLogLog 고유 사용자 수 추정 스케치
+- 장소별 고유 사용자 집합을 고정 크기(2^p 바이트) 레지스터로 보관 → 배치 간 합집합(레지스터별 max)으로 누적
+- place_vectors.unique_users_hll(BYTEA)에 저장되며, unique_users 컬럼에는 추정값을 기록
+- p=12 기준 4KB, 표준 오차 약 1.6%
+"""
+import hashlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+HLL_PRECISION = 12
+HLL_VERSION = 1
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = HLL_PRECISION, registers: Optional[np.ndarray] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 16: {precision}")
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else np.zeros(self.size, dtype=np.uint8)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def add(self, value) -> None:
+        hashed = self._hash(str(value))
+        index = hashed >> (64 - self.precision)
+        remainder_bits = 64 - self.precision
+        remainder = hashed & ((1 << remainder_bits) - 1)
+        # 나머지 비트에서 첫 1의 위치 (모두 0이면 remainder_bits + 1)
+        rank = remainder_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable) -> "HyperLogLog":
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """합집합 스케치 (정밀도가 같아야 함)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self) -> int:
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.power(2.0, -self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # 작은 범위는 선형 카운팅으로 보정
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    def to_bytes(self) -> bytes:
+        return bytes([HLL_VERSION, self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> Optional["HyperLogLog"]:
+        """저장된 스케치 복원 (없거나 형식이 다르면 None)"""
+        if not data or len(data) < 2 or data[0] != HLL_VERSION:
+            return None
+        precision = data[1]
+        registers = np.frombuffer(bytes(data[2:]), dtype=np.uint8).copy()
+        if len(registers) != (1 << precision):
+            return None
+        return cls(precision, registers)
@@ -0,0 +1,196 @@
+"""
+장소 이미지 임베딩 (OpenCLIP 비전 인코더)
+- 이미지 URL을 스레드 풀로 동시에 가져오면서 OpenCLIP 전처리(transform)까지 수행
+- 전처리된 텐서를 IMAGE_EMBED_BATCH_SIZE개씩 묶어 CPU에서 encode_image 배치 추론 (L2 정규화, 512차원)
+- 결과는 이미지 URL 해시 단위로 디스크 캐시 → 같은 이미지는 실행이 바뀌어도 한 번만 임베딩
+- 이미지 출처: IMAGE_LOCAL_DIR(테스트용 로컬 디렉토리) / S3 URL(S3 클라이언트, S3_LOCAL_DIR 대체 포함) / HTTP(S)
+"""
+import hashlib
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import requests
+
+from embedding_cache import DiskEmbeddingCache
+
+# 선택적 의존성 (설치되지 않은 경우 이미지 임베딩 단계 생략)
+try:
+    import torch
+    import open_clip
+    from PIL import Image
+    OPEN_CLIP_AVAILABLE = True
+except ImportError:
+    OPEN_CLIP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+OPENCLIP_IMAGE_MODEL_NAME = "ViT-B-32"
+OPENCLIP_IMAGE_CHECKPOINT = "laion2b_s34b_b79k"
+IMAGE_VECTOR_DIM = 512
+IMAGE_CACHE_NAMESPACE = f"image:{OPENCLIP_IMAGE_MODEL_NAME}:{OPENCLIP_IMAGE_CHECKPOINT}"
+
+IMAGE_FETCH_CONCURRENCY = int(os.getenv('IMAGE_FETCH_CONCURRENCY', '8'))
+IMAGE_EMBED_BATCH_SIZE = int(os.getenv('IMAGE_EMBED_BATCH_SIZE', '32'))
+IMAGE_FETCH_TIMEOUT = float(os.getenv('IMAGE_FETCH_TIMEOUT', '15'))
+# 지정 시 이미지 URL의 (호스트/경로 또는 파일명)을 이 디렉토리에서 찾음 (픽스처 이미지 테스트용)
+IMAGE_LOCAL_DIR = os.getenv('IMAGE_LOCAL_DIR')
+
+
+def image_url_hash(url: str) -> str:
+    """이미지 URL 해시 (디스크 캐시의 내용 해시로 사용)"""
+    return hashlib.sha1(url.strip().encode('utf-8')).hexdigest()
+
+
+def parse_s3_url(url: str) -> Optional[Tuple[str, str]]:
+    """s3://bucket/key 또는 https://bucket.s3.region.amazonaws.com/key → (bucket, key)"""
+    parsed = urlparse(url)
+    if parsed.scheme == 's3':
+        return parsed.netloc, parsed.path.lstrip('/')
+    host = parsed.netloc
+    if parsed.scheme in ('http', 'https') and '.s3.' in host and host.endswith('.amazonaws.com'):
+        return host.split('.s3.', 1)[0], unquote(parsed.path.lstrip('/'))
+    return None
+
+
+class PlaceImageEmbedder:
+    """
+    이미지 URL → OpenCLIP 이미지 벡터
+
+    모델은 처음 임베딩할 이미지가 생겼을 때 로드됩니다. 가져오기/디코딩에 실패한 URL은 결과에서 제외됩니다.
+    """
+
+    def __init__(self, s3_client=None, cache: Optional[DiskEmbeddingCache] = None,
+                 batch_size: int = IMAGE_EMBED_BATCH_SIZE, concurrency: int = IMAGE_FETCH_CONCURRENCY,
+                 local_dir: Optional[str] = IMAGE_LOCAL_DIR):
+        self.s3_client = s3_client
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.local_dir = Path(local_dir) if local_dir else None
+        self._model = None
+        self._preprocess = None
+        self.stats = {'cache_hits': 0, 'fetched': 0, 'fetch_failures': 0, 'embedded': 0}
+
+    def _load_model(self):
+        if self._model is None:
+            logger.info(f"📥 Loading OpenCLIP image model: {OPENCLIP_IMAGE_MODEL_NAME} ({OPENCLIP_IMAGE_CHECKPOINT})")
+            self._model, _, self._preprocess = open_clip.create_model_and_transforms(
+                OPENCLIP_IMAGE_MODEL_NAME, pretrained=OPENCLIP_IMAGE_CHECKPOINT
+            )
+            self._model = self._model.to('cpu').eval()
+        return self._model, self._preprocess
+
+    # ------------------------------------------------------------------
+    # 가져오기 + 전처리 (스레드 풀)
+    # ------------------------------------------------------------------
+    def _local_path(self, url: str) -> Optional[Path]:
+        parsed = urlparse(url)
+        relative = (parsed.netloc + unquote(parsed.path)).lstrip('/') if parsed.scheme else url.lstrip('/')
+        for candidate in (self.local_dir / relative, self.local_dir / Path(relative).name):
+            if candidate.is_file():
+                return candidate
+        return None
+
+    def fetch_image_bytes(self, url: str) -> bytes:
+        if self.local_dir is not None:
+            path = self._local_path(url)
+            if path is None:
+                raise FileNotFoundError(f"fixture image not found for {url}")
+            return path.read_bytes()
+
+        s3_location = parse_s3_url(url)
+        if s3_location is not None and self.s3_client is not None:
+            bucket, key = s3_location
+            body = self.s3_client.get_object(Bucket=bucket, Key=key)['Body']
+            try:
+                return body.read()
+            finally:
+                body.close()
+
+        response = requests.get(url, timeout=IMAGE_FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+
+    def _fetch_and_preprocess(self, url: str):
+        """이미지 다운로드 → RGB 디코딩 → OpenCLIP transform (실패 시 None)"""
+        try:
+            content = self.fetch_image_bytes(url)
+            if not content:
+                raise ValueError("empty image")
+            image = Image.open(io.BytesIO(content)).convert('RGB')
+            return self._preprocess(image)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to fetch/decode image {url[:100]}: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # 임베딩
+    # ------------------------------------------------------------------
+    def _encode_batch(self, tensors: List[Any]) -> List[List[float]]:
+        model, _ = self._load_model()
+        with torch.no_grad():
+            features = model.encode_image(torch.stack(tensors))
+            features = features / features.norm(dim=-1, keepdim=True)  # L2 정규화
+        return features.cpu().numpy().astype('float32').tolist()
+
+    def embed_urls(self, urls: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        이미지 URL들의 벡터 (캐시 적중 URL은 다운로드/추론 생략, 실패한 URL은 제외)
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return {}
+
+        cached = self.cache.get_many(IMAGE_CACHE_NAMESPACE, {url: image_url_hash(url) for url in urls}) if self.cache else {}
+        self.stats['cache_hits'] += len(cached)
+        missing = [url for url in urls if url not in cached]
+        if not missing or not OPEN_CLIP_AVAILABLE:
+            if missing:
+                logger.warning(f"⚠️ open_clip/torch not installed, skipping {len(missing)} images")
+            return dict(cached)
+
+        start_time = time.perf_counter()
+        self._load_model()
+        vectors: Dict[str, List[float]] = {}
+        pending_urls: List[str] = []
+        pending_tensors: List[Any] = []
+
+        def flush():
+            for url, vector in zip(pending_urls, self._encode_batch(pending_tensors)):
+                vectors[url] = vector
+            if self.cache:
+                self.cache.put_many(IMAGE_CACHE_NAMESPACE,
+                                    ((url, image_url_hash(url), vectors[url]) for url in pending_urls))
+            self.stats['embedded'] += len(pending_urls)
+            pending_urls.clear()
+            pending_tensors.clear()
+
+        # 가져오기/전처리는 스레드 풀에서, 추론은 이 스레드에서 배치 단위로
+        # (메모리에 올라가는 전처리 텐서 수를 제한하기 위해 URL을 구간별로 나누어 처리)
+        chunk_size = self.batch_size * 4
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='image-fetch') as pool:
+            for offset in range(0, len(missing), chunk_size):
+                chunk = missing[offset:offset + chunk_size]
+                for url, tensor in zip(chunk, pool.map(self._fetch_and_preprocess, chunk)):
+                    if tensor is None:
+                        self.stats['fetch_failures'] += 1
+                        continue
+                    self.stats['fetched'] += 1
+                    pending_urls.append(url)
+                    pending_tensors.append(tensor)
+                    if len(pending_tensors) >= self.batch_size:
+                        flush()
+            if pending_tensors:
+                flush()
+
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"🖼️ Embedded {len(vectors)} images in {elapsed:.2f}s "
+                    f"({len(cached)} from cache, {self.stats['fetch_failures']} failed)")
+        vectors.update(cached)
+        return vectors
@@ -8,21 +8,45 @@ import sys
 import json
 import logging
 import traceback
+import argparse
+import time
+import hashlib
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import gzip
+import itertools
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 
-import boto3
 import pandas as pd
 import numpy as np
-from langchain_experimental.open_clip import OpenCLIPEmbeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 import requests
 from dotenv import load_dotenv
 
+from batch_stages import (
+    ACTION_FIELDS, BATCH_PARTITIONS, BATCH_WORKERS, RunCheckpoint, aggregate_partition, decode_place,
+    decode_user, decode_user_vector, encode_place, merge_place_partials, read_json, user_partition
+)
+from bulk_writer import copy_rows, reject, vector_reject_reason
+from embedding_cache import BATCH_CACHE_DIR, open_embedding_cache
+from hll import HyperLogLog
+from image_embedding import IMAGE_VECTOR_DIM, PlaceImageEmbedder
+from run_report import RunMetrics, write_prometheus_textfile, write_run_report
+from s3_ingestion import create_ingestion_ledger, create_s3_client
+from user_vectors import compute_time_weighted_user_vectors
+
+# 선택적 의존성 (설치되지 않은 경우 json.load로 파일 단위 파싱)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 env_path = Path(__file__).parent.parent / '.env'
 if env_path.exists():
     load_dotenv(env_path)
@@ -50,18 +74,41 @@ WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # Main EC2 webhook URL
 BATCH_ID = os.getenv('BATCH_ID', f'batch_{int(datetime.now().timestamp())}')
 JOB_NAME = os.getenv('AWS_BATCH_JOB_NAME', 'witple-vectorization-job')
 JOB_ID = os.getenv('AWS_BATCH_JOB_ID', 'unknown')
+# 한 번의 실행에서 처리할 최대 신규 S3 객체 수 (나머지는 다음 실행에서 이어서 처리)
+INGESTION_MAX_FILES = int(os.getenv('INGESTION_MAX_FILES', '500'))
+# 동시에 내려받는 S3 파일 수 (파싱이 끝나 집계를 기다리는 파일도 이 수의 2배로 제한)
+S3_DOWNLOAD_CONCURRENCY = int(os.getenv('S3_DOWNLOAD_CONCURRENCY', '8'))
 
 # 시간 가중치 설정 (외부화)
 TIME_DECAY_LAMBDA = float(os.getenv('TIME_DECAY_LAMBDA', '0.0231'))  # 30일 후 50% 감쇠
+# 좋아요/북마크 없이 행동 텍스트로 만든 사용자 벡터의 가중치 (0이면 저장된 벡터가 있을 때 유지)
+USER_FALLBACK_VECTOR_WEIGHT = float(os.getenv('USER_FALLBACK_VECTOR_WEIGHT', '0.0'))
+
+# 스테이징 테이블로 COPY하는 컬럼 (user_vectors / place_vectors 항목의 키와 동일)
+USER_VECTOR_COLUMNS = (
+    'user_id', 'behavior_vector', 'vector_weight', 'like_score', 'bookmark_score', 'click_score',
+    'dwell_time_score', 'total_actions', 'total_likes', 'total_bookmarks', 'total_clicks', 'last_action_date'
+)
+PLACE_VECTOR_COLUMNS = (
+    'place_id', 'place_category', 'behavior_vector', 'combined_vector', 'total_likes', 'total_bookmarks',
+    'total_clicks', 'unique_users', 'unique_users_hll', 'popularity_score', 'engagement_score'
+)
+# 누적 집계에 필요한 컬럼 (backend/migrate_incremental_stats.sql로 추가)
+INCREMENTAL_SCHEMA_COLUMNS = {
+    'user_behavior_vectors': ('vector_weight',),
+    'place_vectors': ('unique_users_hll',),
+}
+# 체크포인트에 NPY로 저장하는 벡터 필드
+USER_VECTOR_FIELDS = ('behavior_vector',)
+PLACE_VECTOR_FIELDS = ('behavior_vector', 'combined_vector')
 
 # 텍스트 벡터화 모델 설정 (HuggingFace MiniLM)
 TEXT_MODEL_NAME = "sentence-transformers/all-MiniLM-L12-v2"
 TEXT_VECTOR_DIM = 384
-
-# 이미지 벡터화 모델 설정 (OpenCLIP)
-OPENCLIP_IMAGE_MODEL_NAME = "ViT-B-32"  # 이미지용 (512차원)
-OPENCLIP_IMAGE_CHECKPOINT = "laion2b_s34b_b79k"
-IMAGE_VECTOR_DIM = 512
+# 한 번의 forward pass에 넣는 텍스트 수
+TEXT_ENCODE_BATCH_SIZE = int(os.getenv('TEXT_ENCODE_BATCH_SIZE', '64'))
+# 장소 overview 벡터 디스크 캐시 네임스페이스 (모델이 바뀌면 캐시도 새로 생성)
+PLACE_TEXT_CACHE_NAMESPACE = f"place_text:{TEXT_MODEL_NAME}"
 
 # 로드된 환경변수 확인
 logger = logging.getLogger(__name__)
@@ -74,58 +121,98 @@ print(f"  WEBHOOK_URL: {WEBHOOK_URL}")
 print(f"  AWS_ACCESS_KEY_ID: {'***' if os.getenv('AWS_ACCESS_KEY_ID') else 'NOT SET'}")
 print(f"  TIME_DECAY_LAMBDA: {TIME_DECAY_LAMBDA} (30-day decay: {np.exp(-TIME_DECAY_LAMBDA * 30):.2f})")
 
-# OpenCLIP 모델 설정
-OPENCLIP_MODEL_NAME = "ViT-B-32"
-OPENCLIP_CHECKPOINT = "laion2b_s34b_b79k"
-
 print(f"  TEXT_VECTOR_DIM: {TEXT_VECTOR_DIM} (MiniLM 텍스트 벡터 차원)")
 print(f"  IMAGE_VECTOR_DIM: {IMAGE_VECTOR_DIM} (CLIP 이미지 벡터 차원)")
 
+def merge_decayed_mean(stored_vector: Optional[List[float]], stored_weight: Optional[float],
+                       stored_at: Optional[datetime], new_vector: List[float], new_weight: float,
+                       now: datetime) -> Tuple[List[float], float]:
+    """
+    저장된 벡터와 이번 배치 벡터의 시간 감쇠 가중 평균
+
+    저장된 가중치는 마지막 갱신 이후 경과 일수만큼 exp(-TIME_DECAY_LAMBDA * days)로 감쇠됩니다.
+    이번 배치에 가중치가 없으면(텍스트 fallback) 저장된 벡터를 유지합니다.
+
+    Returns:
+        (누적 벡터, 누적 가중치)
+    """
+    if not stored_vector or len(stored_vector) != len(new_vector):
+        return new_vector, new_weight
+
+    decayed_weight = float(stored_weight or 0.0)
+    if stored_at is not None:
+        if stored_at.tzinfo is None:
+            stored_at = stored_at.replace(tzinfo=timezone.utc)
+        age_days = max((now - stored_at).total_seconds() / 86400, 0)
+        decayed_weight *= float(np.exp(-TIME_DECAY_LAMBDA * age_days))
+
+    if new_weight <= 0:
+        return list(stored_vector), decayed_weight
+    if decayed_weight <= 0:
+        return new_vector, new_weight
+
+    total_weight = decayed_weight + new_weight
+    merged = (np.asarray(stored_vector) * decayed_weight + np.asarray(new_vector) * new_weight) / total_weight
+    return merged.tolist(), total_weight
+
 class BatchProcessor:
-    def __init__(self):
+    def __init__(self, partitions: int = BATCH_PARTITIONS, workers: int = BATCH_WORKERS):
         logger.info("🚀 Initializing Batch Processor")
+
+        # 사용자 ID 해시 파티션 수 / 파티션 집계 워커 프로세스 수
+        self.partitions = max(1, partitions)
+        self.workers = max(1, workers)
         
-        # AWS 클라이언트 초기화
-        self.s3_client = boto3.client('s3', region_name=AWS_REGION)
+        # AWS 클라이언트 초기화 (S3_LOCAL_DIR 지정 시 로컬 디렉토리)
+        self.s3_client = create_s3_client(AWS_REGION)
         
+        # 데이터베이스 연결 (누적 집계 컬럼이 없으면 모델 로드 전에 실패)
+        if DATABASE_URL:
+            self.engine = create_engine(DATABASE_URL)
+            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+            self.check_incremental_schema()
+            logger.info("✅ Database connection established")
+        else:
+            logger.warning("⚠️ DATABASE_URL not provided, database operations will be skipped")
+            self.engine = None
+            self.SessionLocal = None
+
         # 텍스트 벡터화 모델 로드 (HuggingFace MiniLM)
         logger.info(f"📥 Loading HuggingFace text model: {TEXT_MODEL_NAME}")
         self.text_embedding_model = HuggingFaceEmbeddings(
-            model_name=TEXT_MODEL_NAME
-        )
-
-        # 이미지 벡터화 모델 로드 (OpenCLIP)
-        logger.info(f"📥 Loading OpenCLIP image model: {OPENCLIP_IMAGE_MODEL_NAME}")
-        self.image_embedding_model = OpenCLIPEmbeddings(
-            model_name=OPENCLIP_IMAGE_MODEL_NAME,
-            checkpoint=OPENCLIP_IMAGE_CHECKPOINT
+            model_name=TEXT_MODEL_NAME,
+            encode_kwargs={'batch_size': TEXT_ENCODE_BATCH_SIZE, 'normalize_embeddings': True}
         )
 
-        # 벡터 차원 설정
+        # 벡터 차원 설정 (OpenCLIP 이미지 모델은 임베딩할 이미지가 생겼을 때 로드)
         self.text_vector_dimension = TEXT_VECTOR_DIM
         self.image_vector_dimension = IMAGE_VECTOR_DIM
-        logger.info(f"✅ Text and image models loaded successfully.")
+        logger.info(f"✅ Text model loaded successfully.")
         logger.info(f"🎯 Text vectors (MiniLM): {self.text_vector_dimension} dimensions")
         logger.info(f"🎯 Image vectors (CLIP): {self.image_vector_dimension} dimensions")
         
-        # 데이터베이스 연결
-        if DATABASE_URL:
-            self.engine = create_engine(DATABASE_URL)
-            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-            logger.info("✅ Database connection established")
-        else:
-            logger.warning("⚠️ DATABASE_URL not provided, database operations will be skipped")
-            self.engine = None
-            self.SessionLocal = None
+        # 처리 완료 S3 객체 원장 (신규 객체만 처리)
+        self.ledger = create_ingestion_ledger(DATABASE_URL)
+        self.download_errors: Dict[str, str] = {}  # 다운로드/파싱 실패 파일의 오류 메시지 (원장 기록용)
+        # 원장이 같은 DB면 벡터 UPSERT와 같은 트랜잭션으로 기록 (커밋과 원장 기록 사이 중단으로 다시 더해지지 않음)
+        self.ledger_in_transaction = bool(self.SessionLocal and self.ledger and self.ledger.shares_database(DATABASE_URL))
         
-        # NEW: DB 조회 결과를 캐싱하여 성능 향상
-        self.place_overview_cache = {}
+        # 장소 overview 임베딩 디스크 캐시 ((테이블, ID, 내용 해시) 단위, 실행 간 재사용)
+        self.embedding_cache = open_embedding_cache()
 
-        # NEW: OpenCLIP 인코딩 결과 캐싱하여 중복 연산 방지
+        # 장소 대표 이미지 임베딩 (OpenCLIP 비전 인코더, 이미지 URL 단위 디스크 캐시)
+        self.image_embedder = PlaceImageEmbedder(self.s3_client, self.embedding_cache)
+
+        # MiniLM 인코딩 결과 캐싱하여 중복 연산 방지
         self.bert_encoding_cache = {}
         self._cache_hits = 0
         self._cache_attempts = 0
 
+        # 실행 ID (--resume 시 이어서 실행하는 배치의 ID로 바뀜)
+        self.batch_id = BATCH_ID
+        # 단계별 소요 시간/카운터 (실행 리포트)
+        self.metrics = RunMetrics(self.batch_id)
+
         # 통계 정보 초기화
         self.stats = {
             'processed_files': 0,
@@ -133,201 +220,171 @@ class BatchProcessor:
             'processed_users': 0,
             'processed_places': 0,
             'errors': 0,
+            'failed_files': 0,         # 다운로드/파싱에 실패해 원장에 실패로 기록한 파일 수
             'time_weighted_users': 0,  # 시간 가중치 적용된 사용자 수
             'fallback_users': 0,       # 텍스트 기반 fallback 사용자 수
+            'rejected_rows': 0,        # 검증/외래 키로 저장되지 않은 행 수
+            'embedded_images': 0,      # image_vector를 새로 저장한 장소 수
+            'encoded_texts': 0,        # MiniLM으로 새로 인코딩한 텍스트 수
+            'saved_rows': 0,           # DB에 저장된 사용자/장소 행 수
             'start_time': datetime.now(),
             'end_time': None
         }
 
-    # NEW: place_id와 category로 DB에서 overview를 조회하는 함수
-    def _get_overview_from_db(self, numeric_id: int, category: str) -> Optional[str]:
-        """주어진 숫자 ID와 카테고리로 DB에서 overview를 조회하고 캐시에 저장합니다."""
-        cache_key = f"{numeric_id}:{category}"
-        if cache_key in self.place_overview_cache:
-            return self.place_overview_cache[cache_key]
+    @staticmethod
+    def _parse_numeric_place_id(place_full_id: str) -> Optional[int]:
+        """'nature_123', 'leisure_sports_45' 형식의 장소 ID에서 숫자 ID 추출"""
+        _, _, numeric_part = str(place_full_id).rpartition('_')
+        return int(numeric_part) if numeric_part.isdigit() else None
 
-        if not self.SessionLocal:
-            return None
+    def prefetch_place_overviews(self, place_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        배치에 등장한 장소의 overview를 카테고리 테이블별로 일괄 조회
 
-        db = self.SessionLocal()
-        try:
-            # place_recommendations 테이블을 조회한다고 가정
-            query = text("""
-                SELECT overview FROM place_recommendations
-                WHERE place_id = :numeric_id AND table_name = :category
-                LIMIT 1
-            """)
-            result = db.execute(query, {'numeric_id': numeric_id, 'category': category}).scalar_one_or_none()
-            
-            self.place_overview_cache[cache_key] = result
-            return result
-        except Exception as e:
-            logger.error(f"❌ DB lookup failed for ID={numeric_id}, Category={category}: {e}")
-            self.place_overview_cache[cache_key] = None  # 실패한 조회도 캐싱하여 반복 방지
-            return None
-        finally:
-            db.close()
+        1. 테이블별 한 번의 쿼리로 overview 내용 해시(md5)만 조회
+        2. 디스크 캐시에 같은 (테이블, ID, 내용 해시)의 벡터가 있으면 overview 조회와 인코딩 모두 생략
+        3. 캐시에 없는 장소만 테이블별 한 번의 쿼리로 overview 본문 조회
 
-    def _encode_text_with_cache(self, text: str) -> List[float]:
-        """텍스트를 OpenCLIP으로 인코딩하되 캐시를 활용하여 중복 연산 방지"""
-        # 통계 업데이트
-        self._cache_attempts += 1
-
-        # 텍스트를 정규화하여 캐시 키로 사용
-        cache_key = text.strip()[:500]  # 너무 긴 텍스트는 잘라서 사용
-
-        if cache_key in self.bert_encoding_cache:
-            self._cache_hits += 1
-            logger.debug(f"🔥 Cache hit for text encoding: {cache_key[:50]}...")
-            return self.bert_encoding_cache[cache_key]
-
-        # 캐시 미스 시 MiniLM 텍스트 인코딩 수행 (384차원)
-        vector = self.text_embedding_model.embed_query(text)
-        # 벡터 차원 검증 및 패딩/트리밍
-        if len(vector) > TEXT_VECTOR_DIM:
-            vector = vector[:TEXT_VECTOR_DIM]  # 트리밍
-        elif len(vector) < TEXT_VECTOR_DIM:
-            vector = vector + [0.0] * (TEXT_VECTOR_DIM - len(vector))  # 제로 패딩
-        self.bert_encoding_cache[cache_key] = vector
-        logger.debug(f"🧠 Generated new encoding for: {cache_key[:50]}...")
-
-        return vector
-
-    def _encode_image_rgb(self, image_path_or_url: str) -> List[float]:
-        """이미지를 RGB 기준 512차원 벡터로 인코딩"""
-        cache_key = f"image:{image_path_or_url}"
-        self._cache_attempts += 1
-
-        # 캐시 조회
-        if cache_key in self.bert_encoding_cache:
-            self._cache_hits += 1
-            logger.debug(f"🔥 Cache hit for image encoding: {cache_key[:50]}...")
-            return self.bert_encoding_cache[cache_key]
+        Returns:
+            {장소 키: {'item_key', 'content_hash', 'overview', 'vector'}} - overview가 있는 장소만 포함,
+            vector는 디스크 캐시 적중 시에만 채워짐
+        """
+        ids_by_table: Dict[str, set] = defaultdict(set)
+        place_keys_by_ref = {}
+        for place_key, data in place_data.items():
+            numeric_id = self._parse_numeric_place_id(data['place_id'])
+            if numeric_id is None:
+                logger.warning(f"Could not parse numeric ID from {data['place_id']}. Skipping overview lookup.")
+                continue
+            ids_by_table[data['place_category']].add(numeric_id)
+            place_keys_by_ref[(data['place_category'], numeric_id)] = place_key
 
-        try:
-            # CLIP을 통한 이미지 인코딩 (512차원)
-            # 실제 이미지 파일이나 URL을 처리하는 경우 embed_image 메서드 사용
-            # 현재는 이미지 설명 텍스트를 이미지 모델로 인코딩
-            vector = self.image_embedding_model.embed_query(f"image: {image_path_or_url}")
+        if not ids_by_table or not self.SessionLocal:
+            return {}
 
-            # 벡터 차원 검증 및 패딩/트리밍 (512차원)
-            if len(vector) > IMAGE_VECTOR_DIM:
-                vector = vector[:IMAGE_VECTOR_DIM]  # 트리밍
-            elif len(vector) < IMAGE_VECTOR_DIM:
-                vector = vector + [0.0] * (IMAGE_VECTOR_DIM - len(vector))  # 제로 패딩
+        overviews = {}
+        db = self.SessionLocal()
+        try:
+            for category, numeric_ids in ids_by_table.items():
+                try:
+                    # place_recommendations에서 해당 카테고리 장소들의 overview 해시 일괄 조회
+                    rows = db.execute(text("""
+                        SELECT DISTINCT ON (place_id) place_id, md5(overview)
+                        FROM place_recommendations
+                        WHERE table_name = :category AND place_id = ANY(:ids) AND overview IS NOT NULL
+                        ORDER BY place_id
+                    """), {'category': category, 'ids': sorted(numeric_ids)}).fetchall()
 
-            self.bert_encoding_cache[cache_key] = vector
-            logger.debug(f"🖼️ Generated new CLIP image encoding for: {cache_key[:50]}...")
-            return vector
+                    content_hashes = {f"{category}:{place_id}": content_hash for place_id, content_hash in rows}
+                    cached = self.embedding_cache.get_many(PLACE_TEXT_CACHE_NAMESPACE, content_hashes) if self.embedding_cache else {}
 
-        except Exception as e:
-            logger.error(f"❌ Error encoding image {image_path_or_url}: {e}")
-            # 에러 시 제로 벡터 반환
-            return [0.0] * IMAGE_VECTOR_DIM
+                    missing_ids = [place_id for place_id, _ in rows if f"{category}:{place_id}" not in cached]
+                    texts = {}
+                    if missing_ids:
+                        texts = dict(db.execute(text("""
+                            SELECT DISTINCT ON (place_id) place_id, overview
+                            FROM place_recommendations
+                            WHERE table_name = :category AND place_id = ANY(:ids) AND overview IS NOT NULL
+                            ORDER BY place_id
+                        """), {'category': category, 'ids': missing_ids}).fetchall())
 
-    def _generate_time_weighted_user_vector(self, user_id: str, data: Dict[str, Any], place_vectors: Dict[str, Any]) -> List[float]:
-        """시간 가중치를 적용한 사용자 벡터 생성 (안전성 강화)"""
-        try:
-            positive_actions_info = []
-            current_time_utc = datetime.now(timezone.utc)
-
-            # 1. 긍정적 행동(좋아요/북마크)에서 시간 정보와 벡터 수집
-            for action in data['actions']:
-                if action.get('action_type') in ['like', 'bookmark']:
-                    place_key = f"{action.get('place_category')}:{action.get('place_id')}"
-                    action_time = action.get('action_time')
-
-                    # 시간 정보와 장소 벡터가 모두 있는 경우만 처리
-                    if action_time and place_key in place_vectors:
-                        try:
-                            # 안전한 시간 파싱 (다양한 형식 지원)
-                            timestamp_str = str(action_time)
-                            if timestamp_str.endswith('Z'):
-                                timestamp_str = timestamp_str.replace('Z', '+00:00')
-
-                            timestamp = datetime.fromisoformat(timestamp_str)
-
-                            # naive datetime을 UTC로 처리
-                            if timestamp.tzinfo is None:
-                                timestamp = timestamp.replace(tzinfo=timezone.utc)
-
-                            vector = place_vectors[place_key]['behavior_vector']
-                            positive_actions_info.append({
-                                'vector': vector,
-                                'timestamp': timestamp,
-                                'action_type': action.get('action_type')
-                            })
-
-                        except (ValueError, TypeError, AttributeError) as e:
-                            logger.debug(f"Failed to parse timestamp '{action_time}' for user {user_id}: {e}")
+                    for place_id, content_hash in rows:
+                        item_key = f"{category}:{place_id}"
+                        if item_key not in cached and not texts.get(place_id):
                             continue
+                        overviews[place_keys_by_ref[(category, place_id)]] = {
+                            'item_key': item_key,
+                            'content_hash': content_hash,
+                            'overview': texts.get(place_id),
+                            'vector': cached.get(item_key)
+                        }
+                except Exception as e:
+                    # 해당 카테고리 장소는 overview 없이 기본 텍스트로 벡터화
+                    logger.error(f"❌ Overview prefetch failed for category={category}: {e}")
+                    db.rollback()
+                    self.stats['errors'] += 1
+        finally:
+            db.close()
 
-            # 2. 시간 가중치 적용한 벡터 평균 계산
-            if positive_actions_info:
-                vectors = np.array([item['vector'] for item in positive_actions_info])
+        cached_count = sum(1 for info in overviews.values() if info['vector'] is not None)
+        logger.info(f"📚 Prefetched overviews for {len(overviews)}/{len(place_data)} places "
+                    f"({cached_count} embeddings from disk cache)")
+        return overviews
 
-                # 시간 가중치 계산 (지수 감쇠 모델)
-                weights = []
-                total_weight = 0
+    @staticmethod
+    def _text_cache_key(text: str) -> str:
+        """텍스트 전체 내용 해시 캐시 키 (앞부분만 같은 긴 텍스트도 구분)"""
+        return "text:" + hashlib.sha1(text.strip().encode('utf-8')).hexdigest()
 
-                for item in positive_actions_info:
-                    time_diff_days = (current_time_utc - item['timestamp']).total_seconds() / 86400
-                    time_weight = np.exp(-TIME_DECAY_LAMBDA * max(0, time_diff_days))  # 음수 방지
+    def encode_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 텍스트를 MiniLM으로 일괄 인코딩 (384차원, 정규화)
 
-                    # 행동 유형별 추가 가중치 (북마크 > 좋아요)
-                    action_weight = 1.5 if item['action_type'] == 'bookmark' else 1.0
+        캐시에 없는 고유 텍스트만 모아 한 번의 embed_documents 호출로 배치 인코딩한 뒤
+        입력 순서대로 벡터를 돌려줍니다.
+        """
+        keys = [self._text_cache_key(text) for text in texts]
+        self._cache_attempts += len(keys)
 
-                    final_weight = time_weight * action_weight
-                    weights.append(final_weight)
-                    total_weight += final_weight
+        uncached = {}
+        for key, text in zip(keys, texts):
+            if key in self.bert_encoding_cache:
+                self._cache_hits += 1
+            elif key not in uncached:
+                uncached[key] = text.strip()
 
-                if total_weight > 0:
-                    # 가중 평균 계산
-                    vector = np.average(vectors, axis=0, weights=weights).tolist()
-                    logger.info(f"Generated time-weighted vector for user {user_id} from {len(vectors)} actions (total_weight: {total_weight:.3f})")
-                    self.stats['time_weighted_users'] += 1
-                    return vector
+        if uncached:
+            start_time = time.perf_counter()
+            vectors = self.text_embedding_model.embed_documents(list(uncached.values()))
+            for key, vector in zip(uncached, vectors):
+                # 벡터 차원 검증 및 패딩/트리밍
+                if len(vector) > TEXT_VECTOR_DIM:
+                    vector = vector[:TEXT_VECTOR_DIM]  # 트리밍
+                elif len(vector) < TEXT_VECTOR_DIM:
+                    vector = vector + [0.0] * (TEXT_VECTOR_DIM - len(vector))  # 제로 패딩
+                self.bert_encoding_cache[key] = vector
+            self.stats['encoded_texts'] += len(uncached)
+            logger.info(f"🧠 Encoded {len(uncached)} new texts in {time.perf_counter() - start_time:.2f}s "
+                        f"({len(texts) - len(uncached)} from cache)")
 
-            # 3. Fallback: 시간 정보가 없거나 긍정적 행동이 없는 경우
-            logger.info(f"User {user_id}: No time-weighted actions available, using behavior text fallback")
-            behavior_text = self.create_user_behavior_text(data)
-            self.stats['fallback_users'] += 1
-            return self._encode_text_with_cache(behavior_text)
-
-        except Exception as e:
-            # 4. 완전한 예외 처리: 모든 실패 시 기본 텍스트 기반 벡터 사용
-            logger.error(f"Time-weighted vector generation failed for user {user_id}: {e}")
-            behavior_text = self.create_user_behavior_text(data)
-            self.stats['fallback_users'] += 1
-            return self._encode_text_with_cache(behavior_text)
+        return [self.bert_encoding_cache[key] for key in keys]
 
     def list_s3_files(self, max_files: int = 100) -> List[Dict[str, Any]]:
-        """S3에서 처리할 파일 목록 조회"""
-        logger.info(f"🔍 Searching for files in s3://{S3_BUCKET}/{S3_PREFIX}")
+        """
+        S3에서 아직 처리하지 않은 파일 목록 조회
+
+        원장의 최고 수위 파티션부터(StartAfter) 키 순서(= 업로드 시간 순서)로 조회하고,
+        원장에 같은 ETag로 기록된 객체는 제외합니다. max_files를 넘는 신규 객체는 다음 실행에서 처리됩니다.
+        """
+        start_after = self.ledger.start_after(S3_PREFIX) if self.ledger else ''
+        logger.info(f"🔍 Searching for new files in s3://{S3_BUCKET}/{S3_PREFIX} (start after: '{start_after}')")
         
         files = []
+        listed = 0
         paginator = self.s3_client.get_paginator('list_objects_v2')
         
         try:
             for page in paginator.paginate(
                 Bucket=S3_BUCKET,
                 Prefix=S3_PREFIX,
+                StartAfter=start_after,
                 MaxKeys=1000
             ):
                 if 'Contents' not in page:
                     continue
                     
-                for obj in page['Contents']:
-                    # .json 파일만 처리 (batch- 접두사가 있는 파일들)
-                    if obj['Key'].endswith('.json') and 'batch-' in obj['Key']:
-                        files.append({
-                            'key': obj['Key'],
-                            'size': obj['Size'],
-                            'last_modified': obj['LastModified']
-                        })
-                        
-                        if len(files) >= max_files:
-                            break
+                # .json 파일만 처리 (batch- 접두사가 있는 파일들)
+                candidates = [{
+                    'key': obj['Key'],
+                    'etag': obj['ETag'],
+                    'size': obj['Size'],
+                    'last_modified': obj['LastModified']
+                } for obj in page['Contents'] if obj['Key'].endswith('.json') and 'batch-' in obj['Key']]
+                listed += len(candidates)
+
+                if self.ledger:
+                    candidates = self.ledger.filter_new(candidates)
+                files.extend(candidates[:max_files - len(files)])
                             
                 if len(files) >= max_files:
                     break
@@ -336,127 +393,155 @@ class BatchProcessor:
             logger.error(f"❌ Failed to list S3 files: {str(e)}")
             raise
             
-        logger.info(f"📋 Found {len(files)} files to process")
-        return sorted(files, key=lambda x: x['last_modified'], reverse=True)
+        logger.info(f"📋 Found {len(files)} new files to process ({listed} listed)")
+        return files
     
-    def download_and_parse_s3_file(self, s3_key: str) -> List[Dict[str, Any]]:
-        """S3 파일을 다운로드하고 파싱"""
-        logger.info(f"📥 Downloading {s3_key}")
+    @staticmethod
+    def _iter_actions(stream) -> Iterator[Dict[str, Any]]:
+        """
+        JSON 스트림에서 액션을 하나씩 디코딩하여 반환 (파일 전체나 액션 배열 전체를 메모리에 올리지 않음)
+
+        배치 파일({"actions": [...]}), 액션 배열, 단일 액션 객체를 모두 지원합니다.
+        """
+        if not IJSON_AVAILABLE:
+            data = json.load(stream)
+            if isinstance(data, dict):
+                data = data['actions'] if 'actions' in data else [data]
+            yield from data
+            return
+
+        events = ijson.parse(stream, use_float=True)
+        first = next(events, None)
+        if first is None:
+            return
+        if first[1] == 'start_array':
+            yield from ijson.items(itertools.chain([first], events), 'item')
+            return
+
+        # 최상위 객체: "actions" 배열은 원소 단위로 내보내고, 나머지 키는 단일 액션 객체로 조립
+        single_action = ijson.ObjectBuilder()
+        has_actions = False
+
+        def batch_events():
+            nonlocal has_actions
+            for prefix, event, value in itertools.chain([first], events):
+                if prefix == 'actions' or prefix.startswith('actions.'):
+                    has_actions = True
+                    yield prefix, event, value
+                elif not (prefix == '' and event == 'map_key' and value == 'actions'):
+                    single_action.event(event, value)
+
+        yield from ijson.items(batch_events(), 'actions.item')
+        if not has_actions:
+            yield single_action.value
+
+    def spool_s3_file(self, s3_key: str, spool_path: Path) -> Optional[int]:
+        """
+        S3 파일을 스트리밍으로 다운로드하며 액션을 스풀 파일(JSONL)에 한 줄씩 기록 후 액션 수 반환
+        (실패 시 None - 스풀 파일을 지우고 원장에 실패로 기록되어 다음 실행에서 재시도)
+
+        파일 하나를 끝까지 파싱한 뒤에만 스풀이 파티션으로 분배되므로, 중간에 실패한 파일이 일부만 집계되지 않습니다.
+        """
+        logger.debug(f"📥 Downloading {s3_key}")
         
         try:
-            # S3 객체 다운로드
+            # S3 객체 다운로드 (본문은 스트림으로 읽음)
             response = self.s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key)
-            content = response['Body'].read()
-            
-            # GZIP 압축 여부 확인
-            if response.get('ContentEncoding') == 'gzip':
-                content = gzip.decompress(content)
-            
-            # JSON 파싱
-            data = json.loads(content.decode('utf-8'))
-            
-            # 배치 데이터 구조에서 actions 추출
-            if 'actions' in data:
-                actions = data['actions']
-            else:
-                # 단일 액션 파일인 경우
-                actions = [data] if isinstance(data, dict) else data
+            body = response['Body']
+            count = 0
+            try:
+                # GZIP 압축 여부 확인 (압축 해제도 스트리밍)
+                if response.get('ContentEncoding') == 'gzip':
+                    stream = gzip.GzipFile(fileobj=body)
+                else:
+                    stream = body
+                with open(spool_path, 'w', encoding='utf-8') as spool:
+                    for action in self._iter_actions(stream):
+                        record = {field: action.get(field) for field in ACTION_FIELDS}
+                        spool.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                        count += 1
+            finally:
+                body.close()
                 
-            logger.info(f"✅ Parsed {len(actions)} actions from {s3_key}")
-            return actions
+            logger.info(f"✅ Parsed {count} actions from {s3_key}")
+            return count
             
         except Exception as e:
             logger.error(f"❌ Failed to download/parse {s3_key}: {str(e)}")
             self.stats['errors'] += 1
-            return []
-    
-    def process_user_actions(self, actions: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
-        """사용자별 행동 데이터를 처리하고 벡터 생성"""
-        logger.info(f"🧠 Processing {len(actions)} actions for vectorization")
-        
-        user_data = {}
-        place_data = {}
-        
-        # 1. 사용자별/장소별 행동 집계
-        for action in actions:
-            user_id = action.get('user_id')
-            place_id = action.get('place_id')
-            place_category = action.get('place_category')
-            action_type = action.get('action_type')
-            
-            if not all([user_id, place_id, place_category, action_type]):
+            self.download_errors[s3_key] = str(e)
+            spool_path.unlink(missing_ok=True)
+            return None
+
+    def iter_spooled_files(self, files: List[Dict[str, Any]],
+                           spool_dir: Path) -> Iterator[Tuple[Dict[str, Any], Path, Optional[int]]]:
+        """
+        스레드 풀로 여러 파일을 동시에 스풀링하여 완료되는 순서대로 (파일 정보, 스풀 경로, 액션 수) 반환
+
+        진행 중인 파일 수를 S3_DOWNLOAD_CONCURRENCY의 2배로 제한하여,
+        집계가 다운로드보다 느려도 디스크에 쌓이는 스풀 파일 수는 일정하게 유지됩니다.
+        """
+        concurrency = max(1, S3_DOWNLOAD_CONCURRENCY)
+        remaining = enumerate(files)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='s3-download') as pool:
+            in_flight = {}
+
+            def submit_next() -> bool:
+                index, file_info = next(remaining, (None, None))
+                if file_info is None:
+                    return False
+                spool_path = spool_dir / f"{index:06d}.jsonl"
+                in_flight[pool.submit(self.spool_s3_file, file_info['key'], spool_path)] = (file_info, spool_path)
+                return True
+
+            while len(in_flight) < concurrency * 2 and submit_next():
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_info, spool_path = in_flight.pop(future)
+                    submit_next()
+                    yield file_info, spool_path, future.result()
+
+    def iter_actions(self, files: List[Dict[str, Any]], spool_dir: Path, parsed_files: List[Dict[str, Any]],
+                     failed_files: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """스풀링이 끝난 파일의 액션을 한 줄씩 읽어 바로 전달 (파싱 성공/실패 파일을 각 목록에 추가, 다 읽은 스풀은 삭제)"""
+        for file_info, spool_path, count in self.iter_spooled_files(files, spool_dir):
+            if count is None:
+                failed_files.append(dict(file_info, error=self.download_errors.get(file_info['key'])))
                 continue
-                
-            # 사용자 데이터 집계
-            if user_id not in user_data:
-                user_data[user_id] = {
-                    'actions': [],
-                    'total_likes': 0,
-                    'total_bookmarks': 0,
-                    'total_clicks': 0,
-                    'places_visited': set(),
-                    'categories_visited': set()
-                }
-            
-            user_data[user_id]['actions'].append(action)
-            user_data[user_id]['places_visited'].add(f"{place_category}:{place_id}")
-            user_data[user_id]['categories_visited'].add(place_category)
-            
-            if action_type == 'like':
-                user_data[user_id]['total_likes'] += 1
-            elif action_type == 'bookmark':
-                user_data[user_id]['total_bookmarks'] += 1
-            elif action_type == 'click':
-                user_data[user_id]['total_clicks'] += 1
-            
-            # 장소 데이터 집계
-            place_key = f"{place_category}:{place_id}"
-            if place_key not in place_data:
-                place_data[place_key] = {
-                    'place_id': place_id,
-                    'place_category': place_category,
-                    'total_likes': 0,
-                    'total_bookmarks': 0,
-                    'total_clicks': 0,
-                    'unique_users': set()
-                }
-            
-            place_data[place_key]['unique_users'].add(user_id)
-            
-            if action_type == 'like':
-                place_data[place_key]['total_likes'] += 1
-            elif action_type == 'bookmark':
-                place_data[place_key]['total_bookmarks'] += 1
-            elif action_type == 'click':
-                place_data[place_key]['total_clicks'] += 1
-        
-        # 2. 장소별 벡터 생성 (완전히 먼저 생성하여 사용자 벡터에서 참조)
+            parsed_files.append(file_info)
+            try:
+                if count:
+                    self.stats['processed_files'] += 1
+                    with open(spool_path, encoding='utf-8') as spool:
+                        for line in spool:
+                            yield json.loads(line)
+            finally:
+                spool_path.unlink(missing_ok=True)
+    
+    def build_place_vectors(self, place_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        장소별 벡터와 점수 생성 (place_data는 finalize_place_data로 고유 사용자 수/스케치가 계산된 집계)
+        """
+        # 텍스트를 모두 모은 뒤 한 번에 배치 인코딩
         place_vectors = {}
+        place_texts = {}
         logger.info(f"🏢 Generating vectors for {len(place_data)} places")
 
+        # overview는 테이블별로 일괄 조회 (디스크 캐시에 벡터가 있는 장소는 본문 조회/인코딩 생략)
+        overviews = self.prefetch_place_overviews(place_data)
+
         for place_key, data in place_data.items():
             try:
-                # MODIFIED START
-                place_full_id = data['place_id']
                 place_category = data['place_category']
+                overview_info = overviews.get(place_key)
 
-                try:
-                    numeric_id = int(place_full_id.split('_')[1])
-                except (IndexError, ValueError):
-                    logger.warning(f"Could not parse numeric ID from {place_full_id}. Skipping overview lookup.")
-                    numeric_id = None
-
-                overview = None
-                if numeric_id and self.SessionLocal:
-                    overview = self._get_overview_from_db(numeric_id, place_category)
-
-                if overview:
-                    place_text = overview
-                else:
-                    place_text = f"Place category: {place_category} with {len(data['unique_users'])} visitors"
-
-                # MiniLM 텍스트 벡터 생성 (캐시 활용하여 중복 연산 방지)
-                vector = self._encode_text_with_cache(place_text)
+                if overview_info is None:
+                    place_texts[place_key] = f"Place category: {place_category} with {data['unique_users']} visitors"
+                elif overview_info['vector'] is None:
+                    place_texts[place_key] = overview_info['overview']
                 
                 # 인기도 점수 계산
                 total_interactions = data['total_likes'] + data['total_bookmarks'] + data['total_clicks']
@@ -504,12 +589,13 @@ class BatchProcessor:
                 place_vectors[place_key] = {
                     'place_id': data['place_id'],
                     'place_category': data['place_category'],
-                    'behavior_vector': vector,
-                    'combined_vector': vector,  # 동일한 벡터 사용
+                    'behavior_vector': None,
+                    'combined_vector': None,
                     'total_likes': data['total_likes'],
                     'total_bookmarks': data['total_bookmarks'],
                     'total_clicks': data['total_clicks'],
-                    'unique_users': len(data['unique_users']),
+                    'unique_users': data['unique_users'],
+                    'unique_users_sketch': data['unique_users_sketch'],
                     'popularity_score': round(popularity_score, 2),
                     'engagement_score': round(engagement_score, 2)
                 }
@@ -519,15 +605,56 @@ class BatchProcessor:
                 self.stats['errors'] += 1
                 continue
 
+        # MiniLM 텍스트 벡터 일괄 생성 (캐시 활용하여 중복 연산 방지)
+        encoded = dict(zip(place_texts, self.encode_texts(list(place_texts.values()))))
+        new_cache_entries = []
+        for place_key in place_vectors:
+            overview_info = overviews.get(place_key)
+            if place_key in encoded:
+                vector = encoded[place_key]
+                if overview_info is not None:
+                    new_cache_entries.append((overview_info['item_key'], overview_info['content_hash'], vector))
+            else:
+                vector = overview_info['vector']
+            place_vectors[place_key]['behavior_vector'] = vector
+            place_vectors[place_key]['combined_vector'] = vector  # 동일한 벡터 사용
+
+        if self.embedding_cache and new_cache_entries:
+            self.embedding_cache.put_many(PLACE_TEXT_CACHE_NAMESPACE, new_cache_entries)
+
         logger.info(f"✅ Completed place vector generation for {len(place_vectors)} places")
+        self.stats['processed_places'] = len(place_vectors)
+        return place_vectors
 
-        # 3. 사용자별 벡터 생성 (장소 벡터 완성 후)
+    def build_user_vectors(self, user_data: Dict[Any, Dict[str, Any]],
+                           place_vectors: Dict[str, Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """사용자별 벡터와 점수 생성 (장소 벡터 완성 후, 파티션 단위로 호출 가능)"""
         user_vectors = {}
+        fallback_texts = {}
         logger.info(f"👤 Generating vectors for {len(user_data)} users")
+
+        # 시간 가중치 벡터는 전달된 사용자 전체(파티션)를 희소 행렬 곱 한 번으로 계산
+        # (불가능한 사용자는 행동 텍스트를 모아 아래에서 일괄 인코딩)
+        start_time = time.perf_counter()
+        try:
+            weighted_vectors = compute_time_weighted_user_vectors(
+                user_data, place_vectors, TIME_DECAY_LAMBDA, datetime.now(timezone.utc)
+            )
+        except Exception as e:
+            logger.error(f"Time-weighted vector generation failed, using behavior text fallback: {e}")
+            weighted_vectors = {}
+        self.stats['time_weighted_users'] += len(weighted_vectors)
+        logger.info(f"⏰ Computed {len(weighted_vectors)} time-weighted user vectors "
+                    f"in {time.perf_counter() - start_time:.2f}s")
+
         for user_id, data in user_data.items():
             try:
-                # 개선된 시간 가중치 벡터 생성
-                vector = self._generate_time_weighted_user_vector(user_id, data, place_vectors)
+                weighted = weighted_vectors.get(user_id)
+                if weighted is not None:
+                    vector, vector_weight = weighted
+                else:
+                    fallback_texts[user_id] = self.create_user_behavior_text(data)
+                    vector, vector_weight = None, USER_FALLBACK_VECTOR_WEIGHT
 
                 # 행동 점수 계산 (0-100 스케일)
                 total_actions = len(data['actions'])
@@ -541,6 +668,7 @@ class BatchProcessor:
                 user_vectors[user_id] = {
                     'user_id': user_id,
                     'behavior_vector': vector,
+                    'vector_weight': vector_weight,
                     'like_score': round(like_score, 2),
                     'bookmark_score': round(bookmark_score, 2),
                     'click_score': round(click_score, 2),
@@ -557,23 +685,24 @@ class BatchProcessor:
                 self.stats['errors'] += 1
                 continue
 
+        # Fallback 사용자 행동 텍스트 일괄 인코딩
+        fallback_texts = {user_id: text for user_id, text in fallback_texts.items() if user_id in user_vectors}
+        for user_id, vector in zip(fallback_texts, self.encode_texts(list(fallback_texts.values()))):
+            user_vectors[user_id]['behavior_vector'] = vector
+        self.stats['fallback_users'] += len(fallback_texts)
+
         # 캐시 효율성 통계
         total_cache_entries = len(self.bert_encoding_cache)
         cache_hit_ratio = 0
         if hasattr(self, '_cache_hits') and hasattr(self, '_cache_attempts'):
             cache_hit_ratio = (self._cache_hits / max(self._cache_attempts, 1)) * 100
 
-        logger.info(f"✅ Generated vectors for {len(user_vectors)} users and {len(place_vectors)} places")
+        logger.info(f"✅ Generated vectors for {len(user_vectors)} users")
         logger.info(f"🔥 Text encoding cache: {total_cache_entries} entries, {cache_hit_ratio:.1f}% hit ratio")
         logger.info(f"⏰ Time-weighted vectors: {self.stats['time_weighted_users']} users, Fallback: {self.stats['fallback_users']} users")
 
-        self.stats['processed_users'] = len(user_vectors)
-        self.stats['processed_places'] = len(place_vectors)
-        
-        return {
-            'user_vectors': user_vectors,
-            'place_vectors': place_vectors
-        }
+        self.stats['processed_users'] += len(user_vectors)
+        return user_vectors
     
     def create_user_behavior_text(self, user_data: Dict[str, Any]) -> str:
         """사용자 행동 데이터를 MiniLM 입력용 텍스트로 변환"""
@@ -596,143 +725,258 @@ class BatchProcessor:
         
         return behavior_text[:512]  # MiniLM 텍스트 입력 길이 제한
     
-    def save_to_database(self, vectors_data: Dict[str, Dict[str, Any]]) -> bool:
-        """벡터 데이터를 데이터베이스에 저장"""
+    def check_incremental_schema(self):
+        """
+        누적 집계용 컬럼 확인 (사용자 벡터 누적 가중치 / 장소별 고유 사용자 HLL 스케치)
+
+        DDL은 backend/migrate_incremental_stats.sql로만 적용하며, 컬럼이 없으면 처리 전에 바로 실패합니다.
+        """
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT table_name, column_name FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = ANY(:tables)
+            """), {'tables': list(INCREMENTAL_SCHEMA_COLUMNS)}).fetchall()
+        existing = {(table, column) for table, column in rows}
+        missing = [
+            f"{table}.{column}"
+            for table, columns in INCREMENTAL_SCHEMA_COLUMNS.items() for column in columns
+            if (table, column) not in existing
+        ]
+        if missing:
+            raise RuntimeError(
+                f"Missing columns for incremental aggregation: {', '.join(missing)} "
+                f"(apply backend/migrate_incremental_stats.sql before running the batch job)"
+            )
+
+    def merge_with_stored_state(self, db, vectors_data: Dict[str, Dict[str, Any]]):
+        """
+        이번 배치 결과를 저장된 누적 상태와 합침 (배치에 등장한 사용자/장소만 조회)
+
+        - 사용자 벡터: 저장된 벡터(경과 시간만큼 가중치 감쇠)와 이번 배치 벡터의 가중 평균
+        - 장소 고유 사용자: 저장된 HLL 스케치와 합집합 후 추정값 계산
+        카운터/점수는 UPSERT 쿼리에서 기존 값에 더해집니다.
+        """
+        user_vectors = vectors_data['user_vectors']
+        place_vectors = vectors_data['place_vectors']
+        now = datetime.now(timezone.utc)
+
+        if user_vectors:
+            rows = db.execute(text("""
+                SELECT user_id, behavior_vector, vector_weight, vector_updated_at
+                FROM user_behavior_vectors
+                WHERE user_id = ANY(:user_ids)
+            """), {'user_ids': list(user_vectors)}).fetchall()
+            for user_id, stored_vector, stored_weight, stored_at in rows:
+                data = user_vectors.get(user_id)
+                if data is None:
+                    continue
+                data['behavior_vector'], data['vector_weight'] = merge_decayed_mean(
+                    stored_vector, stored_weight, stored_at, data['behavior_vector'], data['vector_weight'], now
+                )
+
+        if place_vectors:
+            rows = db.execute(text("""
+                SELECT pv.place_id, pv.place_category, pv.unique_users_hll
+                FROM place_vectors pv
+                JOIN unnest(CAST(:place_ids AS text[]), CAST(:categories AS text[])) AS v(place_id, place_category)
+                  ON pv.place_id = v.place_id AND pv.place_category = v.place_category
+                WHERE pv.unique_users_hll IS NOT NULL
+            """), {
+                'place_ids': [data['place_id'] for data in place_vectors.values()],
+                'categories': [data['place_category'] for data in place_vectors.values()]
+            }).fetchall()
+            for place_id, place_category, stored_sketch in rows:
+                data = place_vectors.get(f"{place_category}:{place_id}")
+                sketch = HyperLogLog.from_bytes(stored_sketch)
+                if data is not None and sketch is not None:
+                    data['unique_users_sketch'] = data['unique_users_sketch'].merge(sketch)
+
+        for data in place_vectors.values():
+            data['unique_users'] = data['unique_users_sketch'].estimate()
+            data['unique_users_hll'] = data['unique_users_sketch'].to_bytes()
+
+    def _stage_vectors(self, cursor, vectors_data: Dict[str, Dict[str, Any]]) -> List[Dict[str, str]]:
+        """검증을 통과한 사용자/장소 벡터를 임시 스테이징 테이블에 COPY (거부 행 목록 반환)"""
+        rejects = []
+        cursor.execute("""
+            CREATE TEMP TABLE stage_user_vectors (
+                user_id TEXT, behavior_vector DOUBLE PRECISION[], vector_weight DOUBLE PRECISION,
+                like_score DOUBLE PRECISION, bookmark_score DOUBLE PRECISION, click_score DOUBLE PRECISION,
+                dwell_time_score DOUBLE PRECISION, total_actions INTEGER, total_likes INTEGER,
+                total_bookmarks INTEGER, total_clicks INTEGER, last_action_date TIMESTAMPTZ
+            ) ON COMMIT DROP;
+            CREATE TEMP TABLE stage_place_vectors (
+                place_id TEXT, place_category TEXT, behavior_vector DOUBLE PRECISION[],
+                combined_vector DOUBLE PRECISION[], total_likes INTEGER, total_bookmarks INTEGER,
+                total_clicks INTEGER, unique_users INTEGER, unique_users_hll BYTEA,
+                popularity_score DOUBLE PRECISION, engagement_score DOUBLE PRECISION
+            ) ON COMMIT DROP;
+        """)
+
+        user_rows = []
+        for user_id, data in vectors_data['user_vectors'].items():
+            reason = vector_reject_reason(data['behavior_vector'], TEXT_VECTOR_DIM)
+            if reason:
+                rejects.append(reject(user_id, 'user_behavior_vectors', reason))
+                continue
+            user_rows.append([data[column] for column in USER_VECTOR_COLUMNS])
+
+        place_rows = []
+        for place_key, data in vectors_data['place_vectors'].items():
+            reason = vector_reject_reason(data['behavior_vector'], TEXT_VECTOR_DIM)
+            if reason:
+                rejects.append(reject(place_key, 'place_vectors', reason))
+                continue
+            place_rows.append([data[column] for column in PLACE_VECTOR_COLUMNS])
+
+        copy_rows(cursor, 'stage_user_vectors', USER_VECTOR_COLUMNS, user_rows)
+        copy_rows(cursor, 'stage_place_vectors', PLACE_VECTOR_COLUMNS, place_rows)
+
+        # 존재하지 않는 사용자는 외래 키 오류로 전체 INSERT를 실패시키므로 미리 거부 처리
+        cursor.execute("""
+            SELECT s.user_id FROM stage_user_vectors s
+            LEFT JOIN users u ON u.user_id = s.user_id
+            WHERE u.user_id IS NULL
+        """)
+        rejects.extend(reject(row[0], 'user_behavior_vectors', 'unknown user_id') for row in cursor.fetchall())
+        return rejects
+
+    def _write_reject_report(self, rejects: List[Dict[str, str]]):
+        """거부 행 보고서 저장 ({BATCH_CACHE_DIR}/rejects/{batch_id}.jsonl)"""
+        if not rejects:
+            return
+        logger.warning(f"⚠️ Rejected rows: {len(rejects)}")
+        for item in rejects[:5]:  # 최대 5개만 로그
+            logger.warning(f"  - {item['table']} {item['key']}: {item['reason']}")
+        if len(rejects) > 5:
+            logger.warning(f"  - ... and {len(rejects) - 5} more rejects")
+        try:
+            report_path = Path(BATCH_CACHE_DIR) / 'rejects' / f"{self.batch_id}.jsonl"
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                for item in rejects:
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            logger.info(f"📝 Reject report written to {report_path}")
+        except OSError as e:
+            logger.error(f"❌ Failed to write reject report: {e}")
+
+    def save_to_database(self, vectors_data: Dict[str, Dict[str, Any]],
+                         files: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """
+        벡터 데이터를 데이터베이스에 누적 저장 (스테이징 COPY + 테이블당 한 번의 집합 UPSERT)
+
+        카운터는 기존 값에 더해지고 점수는 누적 카운터로 다시 계산됩니다.
+        검증/외래 키에 걸리는 행은 거부 행으로 따로 보고되고 나머지는 한 트랜잭션으로 저장됩니다.
+        더하기는 멱등하지 않으므로 성공 기준을 넘지 못하면 전체를 롤백하여,
+        같은 파일을 다시 처리해도 일부 행만 두 번 더해지지 않도록 합니다.
+        원장이 같은 DB면 files도 같은 트랜잭션에서 원장에 기록됩니다 (저장과 기록이 함께 커밋/롤백).
+        """
         if not self.SessionLocal:
             logger.warning("⚠️ Database not available, skipping database save")
             return False
             
         logger.info("💾 Saving vectors to database")
+        start_time = time.perf_counter()
         
         db = self.SessionLocal()
-        user_success_count = 0
-        place_success_count = 0
-        user_failures = []
-        place_failures = []
-        
         try:
             user_vectors = vectors_data['user_vectors']
             place_vectors = vectors_data['place_vectors']
             
             logger.info(f"📊 Processing {len(user_vectors)} user vectors and {len(place_vectors)} place vectors")
-            
-            # 사용자 벡터 업데이트/삽입
-            for user_id, data in user_vectors.items():
-                try:
-                    # UPSERT 쿼리 실행
-                    result = db.execute(text("""
-                        INSERT INTO user_behavior_vectors 
-                        (user_id, behavior_vector, like_score, bookmark_score, click_score, dwell_time_score,
-                         total_actions, total_likes, total_bookmarks, total_clicks, last_action_date, vector_updated_at)
-                        VALUES (:user_id, :behavior_vector, :like_score, :bookmark_score, :click_score, :dwell_time_score,
-                                :total_actions, :total_likes, :total_bookmarks, :total_clicks, :last_action_date, NOW())
-                        ON CONFLICT (user_id) DO UPDATE SET
-                            behavior_vector = EXCLUDED.behavior_vector,
-                            like_score = EXCLUDED.like_score,
-                            bookmark_score = EXCLUDED.bookmark_score,
-                            click_score = EXCLUDED.click_score,
-                            dwell_time_score = EXCLUDED.dwell_time_score,
-                            total_actions = EXCLUDED.total_actions,
-                            total_likes = EXCLUDED.total_likes,
-                            total_bookmarks = EXCLUDED.total_bookmarks,
-                            total_clicks = EXCLUDED.total_clicks,
-                            last_action_date = EXCLUDED.last_action_date,
-                            vector_updated_at = NOW()
-                    """), {
-                        'user_id': user_id,
-                        'behavior_vector': data['behavior_vector'],
-                        'like_score': data['like_score'],
-                        'bookmark_score': data['bookmark_score'],
-                        'click_score': data['click_score'],
-                        'dwell_time_score': data['dwell_time_score'],
-                        'total_actions': data['total_actions'],
-                        'total_likes': data['total_likes'],
-                        'total_bookmarks': data['total_bookmarks'],
-                        'total_clicks': data['total_clicks'],
-                        'last_action_date': data['last_action_date']
-                    })
-                    user_success_count += 1
-                    logger.debug(f"✅ User vector {user_id} saved successfully")
-                except Exception as e:
-                    user_failures.append(f"{user_id}: {str(e)}")
-                    logger.error(f"❌ Failed to save user vector {user_id}: {str(e)}")
-                    db.rollback()  # 트랜잭션 복구
-                    continue
-            
-            # 장소 벡터 업데이트/삽입
-            for place_key, data in place_vectors.items():
-                try:
-                    result = db.execute(text("""
-                        INSERT INTO place_vectors 
-                        (place_id, place_category, behavior_vector, combined_vector,
-                         total_likes, total_bookmarks, total_clicks, unique_users,
-                         popularity_score, engagement_score, vector_updated_at, stats_updated_at)
-                        VALUES (:place_id, :place_category, :behavior_vector, :combined_vector,
-                                :total_likes, :total_bookmarks, :total_clicks, :unique_users,
-                                :popularity_score, :engagement_score, NOW(), NOW())
-                        ON CONFLICT (place_id, place_category) DO UPDATE SET
-                            behavior_vector = EXCLUDED.behavior_vector,
-                            combined_vector = EXCLUDED.combined_vector,
-                            total_likes = EXCLUDED.total_likes,
-                            total_bookmarks = EXCLUDED.total_bookmarks,
-                            total_clicks = EXCLUDED.total_clicks,
-                            unique_users = EXCLUDED.unique_users,
-                            popularity_score = EXCLUDED.popularity_score,
-                            engagement_score = EXCLUDED.engagement_score,
-                            vector_updated_at = NOW(),
-                            stats_updated_at = NOW()
-                    """), {
-                        'place_id': data['place_id'],
-                        'place_category': data['place_category'],
-                        'behavior_vector': data['behavior_vector'],
-                        'combined_vector': data['combined_vector'],
-                        'total_likes': data['total_likes'],
-                        'total_bookmarks': data['total_bookmarks'],
-                        'total_clicks': data['total_clicks'],
-                        'unique_users': data['unique_users'],
-                        'popularity_score': data['popularity_score'],
-                        'engagement_score': data['engagement_score']
-                    })
-                    place_success_count += 1
-                    logger.debug(f"✅ Place vector {place_key} saved successfully")
-                except Exception as e:
-                    place_failures.append(f"{place_key}: {str(e)}")
-                    logger.error(f"❌ Failed to save place vector {place_key}: {str(e)}")
-                    db.rollback()  # 트랜잭션 복구
-                    continue
-            
-            # 트랜잭션 커밋
-            db.commit()
+
+            self.merge_with_stored_state(db, vectors_data)
+
+            # 세션과 같은 트랜잭션의 DBAPI 커서로 스테이징 테이블에 COPY
+            cursor = db.connection().connection.cursor()
+            try:
+                rejects = self._stage_vectors(cursor, vectors_data)
+
+                # 사용자 벡터 업데이트/삽입
+                cursor.execute("""
+                    INSERT INTO user_behavior_vectors 
+                    (user_id, behavior_vector, vector_weight, like_score, bookmark_score, click_score, dwell_time_score,
+                     total_actions, total_likes, total_bookmarks, total_clicks, last_action_date, vector_updated_at)
+                    SELECT s.user_id, s.behavior_vector, s.vector_weight, s.like_score, s.bookmark_score, s.click_score,
+                           s.dwell_time_score, s.total_actions, s.total_likes, s.total_bookmarks, s.total_clicks,
+                           s.last_action_date, NOW()
+                    FROM stage_user_vectors s
+                    JOIN users u ON u.user_id = s.user_id
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        behavior_vector = EXCLUDED.behavior_vector,
+                        vector_weight = EXCLUDED.vector_weight,
+                        like_score = LEAST(100.0 * (user_behavior_vectors.total_likes + EXCLUDED.total_likes)
+                            / GREATEST(user_behavior_vectors.total_actions + EXCLUDED.total_actions, 1), 100),
+                        bookmark_score = LEAST(100.0 * (user_behavior_vectors.total_bookmarks + EXCLUDED.total_bookmarks)
+                            / GREATEST(user_behavior_vectors.total_actions + EXCLUDED.total_actions, 1), 100),
+                        click_score = LEAST(100.0 * (user_behavior_vectors.total_clicks + EXCLUDED.total_clicks)
+                            / GREATEST(user_behavior_vectors.total_actions + EXCLUDED.total_actions, 1), 100),
+                        dwell_time_score = EXCLUDED.dwell_time_score,
+                        total_actions = user_behavior_vectors.total_actions + EXCLUDED.total_actions,
+                        total_likes = user_behavior_vectors.total_likes + EXCLUDED.total_likes,
+                        total_bookmarks = user_behavior_vectors.total_bookmarks + EXCLUDED.total_bookmarks,
+                        total_clicks = user_behavior_vectors.total_clicks + EXCLUDED.total_clicks,
+                        last_action_date = GREATEST(user_behavior_vectors.last_action_date, EXCLUDED.last_action_date),
+                        vector_updated_at = NOW()
+                """)
+                user_success_count = cursor.rowcount
+
+                # 장소 벡터 업데이트/삽입
+                cursor.execute("""
+                    INSERT INTO place_vectors 
+                    (place_id, place_category, behavior_vector, combined_vector,
+                     total_likes, total_bookmarks, total_clicks, unique_users, unique_users_hll,
+                     popularity_score, engagement_score, vector_updated_at, stats_updated_at)
+                    SELECT s.place_id, s.place_category, s.behavior_vector, s.combined_vector,
+                           s.total_likes, s.total_bookmarks, s.total_clicks, s.unique_users, s.unique_users_hll,
+                           s.popularity_score, s.engagement_score, NOW(), NOW()
+                    FROM stage_place_vectors s
+                    ON CONFLICT (place_id, place_category) DO UPDATE SET
+                        behavior_vector = EXCLUDED.behavior_vector,
+                        combined_vector = EXCLUDED.combined_vector,
+                        total_likes = place_vectors.total_likes + EXCLUDED.total_likes,
+                        total_bookmarks = place_vectors.total_bookmarks + EXCLUDED.total_bookmarks,
+                        total_clicks = place_vectors.total_clicks + EXCLUDED.total_clicks,
+                        unique_users = GREATEST(place_vectors.unique_users, EXCLUDED.unique_users),
+                        unique_users_hll = EXCLUDED.unique_users_hll,
+                        popularity_score = LEAST(2 * (
+                            place_vectors.total_likes + EXCLUDED.total_likes
+                            + place_vectors.total_bookmarks + EXCLUDED.total_bookmarks
+                            + place_vectors.total_clicks + EXCLUDED.total_clicks), 100),
+                        engagement_score = LEAST(5 * (
+                            place_vectors.total_likes + EXCLUDED.total_likes
+                            + place_vectors.total_bookmarks + EXCLUDED.total_bookmarks), 100),
+                        vector_updated_at = NOW(),
+                        stats_updated_at = NOW()
+                """)
+                place_success_count = cursor.rowcount
+            finally:
+                cursor.close()
             
             # 상세한 결과 로깅
-            logger.info(f"📊 Database save results:")
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"📊 Database save results ({elapsed:.2f}s):")
             logger.info(f"  - User vectors: {user_success_count}/{len(user_vectors)} saved successfully")
             logger.info(f"  - Place vectors: {place_success_count}/{len(place_vectors)} saved successfully")
+            self.stats['rejected_rows'] = len(rejects)
+            self._write_reject_report(rejects)
             
-            if user_failures:
-                logger.warning(f"⚠️ User vector failures: {len(user_failures)}")
-                for failure in user_failures[:5]:  # 최대 5개만 로그
-                    logger.warning(f"  - {failure}")
-                if len(user_failures) > 5:
-                    logger.warning(f"  - ... and {len(user_failures) - 5} more failures")
-            
-            if place_failures:
-                logger.warning(f"⚠️ Place vector failures: {len(place_failures)}")
-                for failure in place_failures[:5]:  # 최대 5개만 로그
-                    logger.warning(f"  - {failure}")
-                if len(place_failures) > 5:
-                    logger.warning(f"  - ... and {len(place_failures) - 5} more failures")
-            
-            # 성공 기준: 전체의 80% 이상이 성공해야 함
+            # 성공 기준: 전체의 80% 이상이 성공해야 함 (미달 시 전체 롤백 후 다음 실행에서 재처리)
             total_expected = len(user_vectors) + len(place_vectors)
             total_success = user_success_count + place_success_count
+            self.stats['saved_rows'] = total_success
             success_rate = total_success / total_expected if total_expected > 0 else 0
             
             if success_rate >= 0.8:
-                logger.info(f"✅ Database save completed successfully (success rate: {success_rate:.1%})")
+                if self.ledger_in_transaction and files:
+                    self.ledger.mark_processed(files, self.batch_id, connection=db.connection())
+                db.commit()
+                logger.info(f"✅ Database save completed successfully (success rate: {success_rate:.1%}, "
+                            f"{total_success / max(elapsed, 1e-6):.0f} rows/s)")
                 return True
             else:
-                logger.error(f"❌ Database save failed (success rate: {success_rate:.1%} < 80%)")
+                db.rollback()
+                logger.error(f"❌ Database save failed (success rate: {success_rate:.1%} < 80%), rolled back")
                 return False
             
         except Exception as e:
@@ -742,6 +986,86 @@ class BatchProcessor:
         finally:
             db.close()
     
+    @staticmethod
+    def _first_image_url(image_urls: Any) -> Optional[str]:
+        """image_urls(JSON 배열/문자열)의 첫 번째 이미지 URL"""
+        if isinstance(image_urls, str):
+            try:
+                image_urls = json.loads(image_urls)
+            except ValueError:
+                return image_urls.strip() or None
+        if isinstance(image_urls, list):
+            return next((url for url in image_urls if isinstance(url, str) and url.strip()), None)
+        return None
+
+    def update_place_image_vectors(self, place_vectors: Dict[str, Dict[str, Any]]) -> int:
+        """
+        배치에 등장한 장소 중 image_vector가 없는 장소의 대표 이미지를 임베딩해 place_recommendations에 저장
+
+        추천 엔진의 이미지 채널(장소 이미지 ↔ 포스팅/북마크 이미지)이 읽는 컬럼입니다.
+        실패해도 배치 전체를 실패시키지 않습니다 (다음 실행에서 다시 시도).
+        """
+        if not self.SessionLocal or not place_vectors:
+            return 0
+
+        ids_by_table: Dict[str, set] = defaultdict(set)
+        for data in place_vectors.values():
+            numeric_id = self._parse_numeric_place_id(data['place_id'])
+            if numeric_id is not None:
+                ids_by_table[data['place_category']].add(numeric_id)
+
+        db = self.SessionLocal()
+        try:
+            targets = {}
+            for category, numeric_ids in ids_by_table.items():
+                rows = db.execute(text("""
+                    SELECT id, image_urls FROM place_recommendations
+                    WHERE table_name = :category AND place_id = ANY(:ids)
+                      AND image_vector IS NULL AND image_urls IS NOT NULL
+                """), {'category': category, 'ids': sorted(numeric_ids)}).fetchall()
+                for row_id, image_urls in rows:
+                    url = self._first_image_url(image_urls)
+                    if url:
+                        targets[row_id] = url
+
+            if not targets:
+                return 0
+
+            vectors = self.image_embedder.embed_urls(targets.values())
+            updates = [(row_id, vectors[url]) for row_id, url in targets.items() if url in vectors]
+            if updates:
+                db.execute(text("""
+                    UPDATE place_recommendations AS pr
+                    SET image_vector = CAST(v.vector AS vector(512))
+                    FROM unnest(CAST(:ids AS integer[]), CAST(:vectors AS text[])) AS v(id, vector)
+                    WHERE pr.id = v.id
+                """), {
+                    'ids': [row_id for row_id, _ in updates],
+                    'vectors': ["[" + ",".join(f"{x:.6f}" for x in vector) + "]" for _, vector in updates]
+                })
+                db.commit()
+
+            self.stats['embedded_images'] += len(updates)
+            logger.info(f"🖼️ Stored image vectors for {len(updates)}/{len(targets)} places")
+            return len(updates)
+        except Exception as e:
+            logger.error(f"❌ Place image vector update failed: {e}")
+            db.rollback()
+            self.stats['errors'] += 1
+            return 0
+        finally:
+            db.close()
+
+    def mark_files_processed(self, files: List[Dict[str, Any]]):
+        """
+        DB 저장까지 끝난 파일을 원장에 기록 (다음 실행부터 제외)
+
+        원장이 별도 DB(INGESTION_LEDGER_URL)인 경우에만 저장 커밋 후 따로 기록하며,
+        커밋과 이 기록 사이에 중단되면 그 파일들은 다음 실행에서 다시 더해집니다.
+        """
+        if self.ledger and files:
+            self.ledger.mark_processed(files, self.batch_id)
+
     def send_webhook_notification(self, success: bool, error_message: Optional[str] = None):
         """Main EC2에 처리 완료 알림 전송"""
         if not WEBHOOK_URL:
@@ -755,16 +1079,20 @@ class BatchProcessor:
                 'job_id': JOB_ID,
                 'job_name': JOB_NAME,
                 'job_status': 'SUCCEEDED' if success else 'FAILED',
-                'batch_id': BATCH_ID,
+                'batch_id': self.batch_id,
                 'processed_records': self.stats['processed_actions'],
                 'processing_time_seconds': (self.stats['end_time'] - self.stats['start_time']).total_seconds(),
                 's3_input_path': f's3://{S3_BUCKET}/{S3_PREFIX}',
                 'error_message': error_message,
                 'metadata': {
                     'processed_files': self.stats['processed_files'],
+                    'failed_files': self.stats['failed_files'],
                     'processed_users': self.stats['processed_users'],
                     'processed_places': self.stats['processed_places'],
-                    'errors': self.stats['errors']
+                    'rejected_rows': self.stats['rejected_rows'],
+                    'embedded_images': self.stats['embedded_images'],
+                    'errors': self.stats['errors'],
+                    'stage_seconds': {name: stage['seconds'] for name, stage in self.metrics.stages.items()}
                 }
             }
             
@@ -783,62 +1111,316 @@ class BatchProcessor:
         except Exception as e:
             logger.error(f"❌ Failed to send webhook: {str(e)}")
     
-    def run(self):
-        """메인 처리 로직 실행"""
+    # ------------------------------------------------------------------
+    # 단계별 실행 (ingest → aggregate → embed → persist)
+    # ------------------------------------------------------------------
+    def stage_ingest(self, checkpoint: RunCheckpoint, files: List[Dict[str, Any]]):
+        """파일을 동시에 내려받으며 액션을 사용자 ID 해시 기준 파티션 파일로 분배"""
+        spool_dir = checkpoint.stage_dir('ingest', reset=True) / 'spool'
+        spool_dir.mkdir()
+        parsed_files = []
+        failed_files = []
+        writers = [
+            gzip.open(checkpoint.partition_path('ingest', 'actions', partition, '.jsonl.gz'), 'wt', encoding='utf-8')
+            for partition in range(checkpoint.partitions)
+        ]
+        try:
+            for action in self.iter_actions(files, spool_dir, parsed_files, failed_files):
+                self.stats['processed_actions'] += 1
+                user_id = action.get('user_id')
+                if not user_id:
+                    continue
+                writers[user_partition(user_id, checkpoint.partitions)].write(
+                    json.dumps(action, ensure_ascii=False) + '\n'
+                )
+        finally:
+            for writer in writers:
+                writer.close()
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+        logger.info(f"📊 Ingested {self.stats['processed_actions']} actions into {checkpoint.partitions} partitions")
+        # 실패한 파일은 원장에 실패로 기록 (집계에 포함되지 않았으므로 저장과 별도로 바로 기록)
+        self.stats['failed_files'] = len(failed_files)
+        if failed_files and self.ledger:
+            self.ledger.mark_failed(failed_files, self.batch_id)
+        checkpoint.set_files(parsed_files)
+        self.metrics.add('ingest', files=len(parsed_files), failed_files=len(failed_files),
+                         actions=self.stats['processed_actions'],
+                         bytes=sum(file_info.get('size', 0) for file_info in parsed_files))
+        checkpoint.mark_done('ingest', files=len(parsed_files), processed_files=self.stats['processed_files'],
+                             failed_files=len(failed_files), actions=self.stats['processed_actions'])
+
+    def stage_aggregate(self, checkpoint: RunCheckpoint):
+        """파티션별 사용자/장소 집계 (이미 집계된 파티션은 건너뜀, workers > 1이면 프로세스 병렬)"""
+        pending = []
+        for partition in range(checkpoint.partitions):
+            users_path = checkpoint.partition_path('aggregate', 'users', partition)
+            places_path = checkpoint.partition_path('aggregate', 'places', partition)
+            if Path(users_path).is_file() and Path(places_path).is_file():
+                continue
+            pending.append((checkpoint.partition_path('ingest', 'actions', partition, '.jsonl.gz'),
+                            users_path, places_path))
+
+        logger.info(f"🧠 Aggregating {len(pending)}/{checkpoint.partitions} partitions with {self.workers} workers")
+        if self.workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                user_counts = list(pool.map(aggregate_partition, *zip(*pending)))
+        else:
+            user_counts = [aggregate_partition(*paths) for paths in pending]
+        self.metrics.add('aggregate', partitions=len(pending), users=sum(user_counts))
+        checkpoint.mark_done('aggregate', users=sum(user_counts))
+
+    def stage_embed(self, checkpoint: RunCheckpoint):
+        """장소 벡터(전체 파티션 합산) 생성 후 파티션별 사용자 벡터 생성 (완료된 산출물은 다시 읽음)"""
+        encoded_before = self.stats['encoded_texts']
+        users_before = self.stats['processed_users']
+        places_path = str(checkpoint.stage_dir('embed') / 'places.json.gz')
+        if Path(places_path).is_file():
+            place_vectors = RunCheckpoint.read_vector_records(places_path, PLACE_VECTOR_FIELDS, decode_place)
+        else:
+            place_data = merge_place_partials(
+                {
+                    f"{data['place_category']}:{data['place_id']}": decode_place(data)
+                    for data in read_json(checkpoint.partition_path('aggregate', 'places', partition))
+                }
+                for partition in range(checkpoint.partitions)
+            )
+            place_vectors = self.build_place_vectors(place_data)
+            checkpoint.write_vector_records(places_path, place_vectors, PLACE_VECTOR_FIELDS, encode_place)
+
+        for partition in range(checkpoint.partitions):
+            users_path = checkpoint.partition_path('embed', 'user_vectors', partition)
+            if Path(users_path).is_file():
+                continue
+            user_data = {
+                user_id: decode_user(data)
+                for user_id, data in read_json(checkpoint.partition_path('aggregate', 'users', partition))
+            }
+            user_vectors = self.build_user_vectors(user_data, place_vectors)
+            checkpoint.write_vector_records(users_path, user_vectors, USER_VECTOR_FIELDS)
+
+        self.metrics.add('embed', places=len(place_vectors), users=self.stats['processed_users'] - users_before,
+                         embeddings=self.stats['encoded_texts'] - encoded_before,
+                         time_weighted_users=self.stats['time_weighted_users'],
+                         fallback_users=self.stats['fallback_users'])
+        checkpoint.mark_done('embed', places=len(place_vectors),
+                             time_weighted_users=self.stats['time_weighted_users'],
+                             fallback_users=self.stats['fallback_users'])
+
+    def _read_place_vector_records(self, checkpoint: RunCheckpoint) -> Dict[str, Dict[str, Any]]:
+        return RunCheckpoint.read_vector_records(
+            str(checkpoint.stage_dir('embed') / 'places.json.gz'), PLACE_VECTOR_FIELDS, decode_place
+        )
+
+    def exclude_recorded_files(self, checkpoint: RunCheckpoint) -> bool:
+        """
+        persist 전에 원장에 이미 기록된 파일 제외
+
+        - 모두 기록됨: 이 실행의 저장이 커밋된 뒤 manifest 기록 전에 중단된 경우 → 저장하지 않음
+        - 일부 기록됨: 다른 실행이 같은 파일을 먼저 저장한 경우 → 집계된 값에서 파일 단위로 뺄 수 없으므로
+          남은 파일만으로 ingest부터 다시 실행
+
+        Returns:
+            저장할 파일이 남아 있는지
+        """
+        files = checkpoint.files()
+        if not self.ledger or not files:
+            return True
+        pending = self.ledger.filter_new(files)
+        if len(pending) == len(files):
+            return True
+        if not pending:
+            logger.info("✅ All files of this run are already in the ledger, skipping database save")
+            return False
+
+        logger.warning(f"⚠️ {len(files) - len(pending)}/{len(files)} files of this run were already saved by "
+                       f"another run, rebuilding from the remaining {len(pending)} files")
+        checkpoint.reset('ingest', 'aggregate', 'embed')
+        self.stats['processed_files'] = self.stats['processed_actions'] = 0
+        with self.metrics.stage('ingest'):
+            self.stage_ingest(checkpoint, pending)
+        with self.metrics.stage('aggregate'):
+            self.stage_aggregate(checkpoint)
+        with self.metrics.stage('embed'):
+            self.stage_embed(checkpoint)
+        return True
+
+    def stage_persist(self, checkpoint: RunCheckpoint) -> bool:
+        """
+        체크포인트의 벡터를 한 트랜잭션으로 저장하고 파일을 원장에 기록
+
+        원장이 같은 DB면 원장 기록도 저장 트랜잭션에 포함되어, 커밋된 파일은 반드시 원장에 있고
+        재실행/--resume에서 exclude_recorded_files로 제외됩니다.
+        """
+        place_vectors = self._read_place_vector_records(checkpoint)
+        user_vectors = {}
+        for partition in range(checkpoint.partitions):
+            user_vectors.update(RunCheckpoint.read_vector_records(
+                checkpoint.partition_path('embed', 'user_vectors', partition), USER_VECTOR_FIELDS, decode_user_vector
+            ))
+        self.stats['processed_users'] = len(user_vectors)
+        self.stats['processed_places'] = len(place_vectors)
+
+        files = checkpoint.files()
+        if not user_vectors and not place_vectors:
+            logger.info("✅ No vectors to save")
+            db_success = True
+            self.mark_files_processed(files)
+        else:
+            db_success = self.save_to_database({'user_vectors': user_vectors, 'place_vectors': place_vectors}, files)
+            if db_success and not self.ledger_in_transaction:
+                self.mark_files_processed(files)
+
+        self.metrics.add('persist', rows=self.stats['saved_rows'], rejected_rows=self.stats['rejected_rows'])
+        if db_success:
+            checkpoint.mark_done('persist', users=len(user_vectors), places=len(place_vectors))
+        return db_success
+
+    def stage_images(self, checkpoint: RunCheckpoint):
+        """저장이 끝난 장소의 대표 이미지 임베딩 후 단계 산출물 정리"""
+        self.update_place_image_vectors(self._read_place_vector_records(checkpoint))
+        image_stats = self.image_embedder.stats
+        self.metrics.add('images', images=image_stats['embedded'], stored=self.stats['embedded_images'],
+                         fetched=image_stats['fetched'], fetch_failures=image_stats['fetch_failures'])
+        checkpoint.cleanup()
+
+    def save_run_report(self, success: bool, error_message: Optional[str] = None):
+        """실행 리포트 저장 (JSON, PROMETHEUS_TEXTFILE_PATH 지정 시 Prometheus textfile도 기록)"""
+        caches = {
+            'text_encoding': {'hits': self._cache_hits, 'misses': self._cache_attempts - self._cache_hits},
+            'image_embedding': {'hits': self.image_embedder.stats['cache_hits'],
+                                'misses': self.image_embedder.stats['fetched'] + self.image_embedder.stats['fetch_failures']},
+        }
+        if self.embedding_cache:
+            caches['disk_embedding'] = dict(self.embedding_cache.stats)
+        report = self.metrics.build_report(
+            success, self.stats, caches, error_message,
+            job_id=JOB_ID, job_name=JOB_NAME, partitions=self.partitions, workers=self.workers
+        )
+        try:
+            report_path = write_run_report(report)
+            logger.info(f"📝 Run report written to {report_path}")
+            prometheus_path = write_prometheus_textfile(report)
+            if prometheus_path:
+                logger.info(f"📈 Prometheus metrics written to {prometheus_path}")
+        except OSError as e:
+            logger.error(f"❌ Failed to write run report: {e}")
+
+        for name, stage in report['stages'].items():
+            throughput = ', '.join(f"{value:,.1f} {unit}" for unit, value in stage.get('throughput', {}).items())
+            logger.info(f"⏱️ {name}: {stage['status']} in {stage['seconds']:.2f}s" + (f" ({throughput})" if throughput else ''))
+
+    def finish(self, success: bool, error_message: Optional[str] = None):
+        """실행 리포트 기록 후 처리 완료 알림"""
+        self.stats['end_time'] = datetime.now()
+        self.save_run_report(success, error_message)
+        self.send_webhook_notification(success=success, error_message=error_message)
+
+    def run(self, resume: Optional[str] = None):
+        """
+        메인 처리 로직 실행 (단계가 끝날 때마다 체크포인트 기록, 단계별 소요 시간은 실행 리포트로 저장)
+
+        Args:
+            resume: 이어서 실행할 배치 ID ('latest'면 persist까지 끝나지 않은 가장 최근 실행)
+        """
         logger.info("🎯 Starting batch processing")
         
         try:
-            # 1. S3 파일 목록 조회
-            files = self.list_s3_files(max_files=500)  # 한번에 최대 500개 파일 처리
-            
-            if not files:
-                logger.info("✅ No files to process")
-                self.send_webhook_notification(success=True)
+            checkpoint = RunCheckpoint.load(None if resume == 'latest' else resume) if resume else None
+            if checkpoint is not None:
+                self.batch_id = self.metrics.batch_id = checkpoint.batch_id
+                logger.info(f"♻️ Resuming {self.batch_id} (completed stages: {checkpoint.manifest['completed_stages']})")
+            elif resume:
+                logger.warning(f"⚠️ No resumable run found for '{resume}', starting a new run")
+
+            if checkpoint is not None and checkpoint.is_done('persist'):
+                logger.info("✅ Run already completed")
+                self.finish(success=True)
                 return
+
+            # 1. ingest: S3 파일 목록 조회 후 동시에 내려받으며 파티션 파일로 분배
+            if checkpoint is not None and checkpoint.is_done('ingest'):
+                ingest_info = checkpoint.stage_info('ingest')
+                self.stats['processed_files'] = ingest_info.get('processed_files', 0)
+                self.stats['processed_actions'] = ingest_info.get('actions', 0)
+                self.stats['failed_files'] = ingest_info.get('failed_files', 0)
+                self.metrics.skip('ingest')
+            else:
+                with self.metrics.stage('ingest'):
+                    files = self.list_s3_files(max_files=INGESTION_MAX_FILES)
+                    if files:
+                        checkpoint = checkpoint or RunCheckpoint.create(self.batch_id, self.partitions)
+                        self.stage_ingest(checkpoint, files)
+
+                if not files:
+                    logger.info("✅ No files to process")
+                    if checkpoint is not None:
+                        checkpoint.discard()
+                    self.finish(success=True)
+                    return
             
-            # 2. 파일별로 처리
-            all_actions = []
-            
-            for file_info in files:
-                actions = self.download_and_parse_s3_file(file_info['key'])
-                if actions:
-                    all_actions.extend(actions)
-                    self.stats['processed_files'] += 1
-            
-            if not all_actions:
+            if not self.stats['processed_actions']:
                 logger.info("✅ No actions to process")
-                self.send_webhook_notification(success=True)
+                self.mark_files_processed(checkpoint.files())
+                checkpoint.discard()
+                self.finish(success=True)
                 return
-                
-            self.stats['processed_actions'] = len(all_actions)
-            logger.info(f"📊 Total actions to process: {len(all_actions)}")
-            
-            # 3. 벡터화 처리
-            vectors_data = self.process_user_actions(all_actions)
+
+            # 2. aggregate: 파티션별 집계 (프로세스 병렬)
+            if checkpoint.is_done('aggregate'):
+                self.metrics.skip('aggregate')
+            else:
+                with self.metrics.stage('aggregate'):
+                    self.stage_aggregate(checkpoint)
+
+            # 3. embed: 장소/사용자 벡터화
+            if checkpoint.is_done('embed'):
+                self.metrics.skip('embed')
+            else:
+                with self.metrics.stage('embed'):
+                    self.stage_embed(checkpoint)
             
-            # 4. 데이터베이스에 저장
-            db_success = self.save_to_database(vectors_data)
+            # 4. persist: 원장에 이미 기록된 파일 제외 → 데이터베이스에 저장 → 대표 이미지 임베딩
+            if self.exclude_recorded_files(checkpoint):
+                with self.metrics.stage('persist'):
+                    db_success = self.stage_persist(checkpoint)
+            else:
+                self.metrics.skip('persist', reason='ledger')
+                checkpoint.mark_done('persist', skipped='already recorded in ledger')
+                db_success = True
+            if db_success:
+                with self.metrics.stage('images'):
+                    self.stage_images(checkpoint)
             
             # 5. 처리 완료 알림
-            self.stats['end_time'] = datetime.now()
-            
             if db_success:
                 logger.info("🎉 Batch processing completed successfully")
-                self.send_webhook_notification(success=True)
+                self.finish(success=True)
             else:
-                logger.error("❌ Database save failed")
-                self.send_webhook_notification(success=False, error_message="Database save failed")
+                logger.error(f"❌ Database save failed (resume with --resume {self.batch_id})")
+                self.finish(success=False, error_message="Database save failed")
                 
         except Exception as e:
             logger.error(f"❌ Batch processing failed: {str(e)}")
             logger.error(traceback.format_exc())
+            logger.error(f"♻️ Completed stages are checkpointed, resume with --resume {self.batch_id}")
             
-            self.stats['end_time'] = datetime.now()
-            self.send_webhook_notification(success=False, error_message=str(e))
+            self.finish(success=False, error_message=str(e))
             raise
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Witple 사용자 행동 벡터화 배치")
+    parser.add_argument('--resume', nargs='?', const='latest', default=os.getenv('BATCH_RESUME'), metavar='BATCH_ID',
+                        help="중단된 실행을 마지막 완료 단계부터 이어서 실행 (BATCH_ID 생략 시 가장 최근 미완료 실행)")
+    parser.add_argument('--partitions', type=int, default=BATCH_PARTITIONS,
+                        help="사용자 ID 해시 파티션 수 (새 실행에만 적용)")
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS,
+                        help="파티션 집계 워커 프로세스 수")
+    return parser.parse_args(argv)
+
 def main():
     """메인 엔트리 포인트"""
+    args = parse_args()
     logger.info("🚀 Witple Batch Processor Starting")
     
     # 환경 변수 검증
@@ -850,8 +1432,8 @@ def main():
         sys.exit(1)
     
     try:
-        processor = BatchProcessor()
-        processor.run()
+        processor = BatchProcessor(partitions=args.partitions, workers=args.workers)
+        processor.run(resume=args.resume)
         logger.info("🎉 Batch processing completed successfully")
         
     except Exception as e:
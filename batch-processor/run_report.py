@@ -0,0 +1,248 @@
+"""
+배치 실행 리포트 (단계별 소요 시간 / 처리량 / 캐시 적중률)
+- 실행마다 {RUN_REPORT_DIR}/{batch_id}.json 리포트 저장 (실행 이력)
+- PROMETHEUS_TEXTFILE_PATH 지정 시 node_exporter textfile collector 형식(.prom)으로도 기록
+- 두 실행 비교: python run_report.py compare <배치 ID 또는 리포트 경로> <배치 ID 또는 리포트 경로>
+  (소요 시간 증가/처리량 감소가 --threshold 비율을 넘는 단계가 있으면 종료 코드 1)
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from embedding_cache import BATCH_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+RUN_REPORT_DIR = os.getenv('RUN_REPORT_DIR', os.path.join(BATCH_CACHE_DIR, 'reports'))
+PROMETHEUS_TEXTFILE_PATH = os.getenv('PROMETHEUS_TEXTFILE_PATH')
+REPORT_VERSION = 1
+
+# 단계별 처리량 계산에 사용하는 카운터 (카운터 / 단계 소요 시간)
+STAGE_THROUGHPUT = {
+    'ingest': ('actions', 'actions_per_second'),
+    'aggregate': ('users', 'users_per_second'),
+    'embed': ('embeddings', 'embeddings_per_second'),
+    'persist': ('rows', 'rows_per_second'),
+    'images': ('images', 'images_per_second'),
+}
+
+
+class RunMetrics:
+    """단계별 소요 시간과 카운터 수집"""
+
+    def __init__(self, batch_id: str):
+        self.batch_id = batch_id
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        return self.stages.setdefault(name, {'status': 'pending', 'seconds': 0.0, 'counters': {}})
+
+    @contextmanager
+    def stage(self, name: str):
+        entry = self._entry(name)
+        start = time.perf_counter()
+        try:
+            yield entry
+            entry['status'] = 'completed'
+        except BaseException:
+            entry['status'] = 'failed'
+            raise
+        finally:
+            entry['seconds'] = round(entry['seconds'] + time.perf_counter() - start, 3)
+
+    def skip(self, name: str, reason: str = 'checkpoint'):
+        """체크포인트에서 재개하여 실행하지 않은 단계"""
+        self._entry(name).update(status='skipped', reason=reason)
+
+    def add(self, name: str, **counters):
+        self._entry(name)['counters'].update(counters)
+
+    def build_report(self, success: bool, stats: Dict[str, Any], caches: Dict[str, Dict[str, int]],
+                     error_message: Optional[str] = None, **extra) -> Dict[str, Any]:
+        stages = {}
+        for name, entry in self.stages.items():
+            stage = dict(entry, counters=dict(entry['counters']))
+            counter, unit = STAGE_THROUGHPUT.get(name, (None, None))
+            if counter in stage['counters'] and stage['seconds'] > 0:
+                stage['throughput'] = {unit: round(stage['counters'][counter] / stage['seconds'], 2)}
+            stages[name] = stage
+
+        return {
+            'version': REPORT_VERSION,
+            'batch_id': self.batch_id,
+            'status': 'succeeded' if success else 'failed',
+            'error_message': error_message,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now().isoformat(),
+            'duration_seconds': round(time.perf_counter() - self._started, 3),
+            'stages': stages,
+            'counters': {
+                key: value for key, value in stats.items() if isinstance(value, (int, float)) and not isinstance(value, bool)
+            },
+            'caches': {name: dict(values, hit_ratio=cache_hit_ratio(values)) for name, values in caches.items()},
+            **extra
+        }
+
+
+def cache_hit_ratio(values: Dict[str, int]) -> Optional[float]:
+    lookups = values.get('hits', 0) + values.get('misses', 0)
+    return round(values.get('hits', 0) / lookups, 4) if lookups else None
+
+
+# ----------------------------------------------------------------------
+# 출력
+# ----------------------------------------------------------------------
+def _atomic_write(path: Path, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(content, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def write_run_report(report: Dict[str, Any], report_dir: str = RUN_REPORT_DIR) -> Path:
+    path = Path(report_dir) / f"{report['batch_id']}.json"
+    _atomic_write(path, json.dumps(report, ensure_ascii=False, indent=2))
+    return path
+
+
+def _label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(report: Dict[str, Any]) -> str:
+    """리포트 → Prometheus 텍스트 노출 형식"""
+    metrics: List[Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]] = [
+        ('witple_batch_last_run_success', 'gauge', '마지막 실행 성공 여부 (1/0)',
+         [({}, 1 if report['status'] == 'succeeded' else 0)]),
+        ('witple_batch_last_run_timestamp_seconds', 'gauge', '마지막 실행 종료 시각',
+         [({}, datetime.fromisoformat(report['finished_at']).timestamp())]),
+        ('witple_batch_run_duration_seconds', 'gauge', '실행 전체 소요 시간',
+         [({}, report['duration_seconds'])]),
+        ('witple_batch_stage_duration_seconds', 'gauge', '단계별 소요 시간',
+         [({'stage': name}, stage['seconds']) for name, stage in report['stages'].items()
+          if stage['status'] != 'skipped']),
+        ('witple_batch_stage_throughput', 'gauge', '단계별 처리량 (초당)',
+         [({'stage': name, 'unit': unit}, value)
+          for name, stage in report['stages'].items() for unit, value in stage.get('throughput', {}).items()]),
+        ('witple_batch_counter', 'gauge', '실행 카운터',
+         [({'name': name}, value) for name, value in report['counters'].items()]),
+        ('witple_batch_cache_hit_ratio', 'gauge', '캐시 적중률',
+         [({'cache': name}, values['hit_ratio']) for name, values in report['caches'].items()
+          if values.get('hit_ratio') is not None]),
+    ]
+
+    lines = []
+    for name, metric_type, help_text, samples in metrics:
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            label_text = ','.join(f'{key}="{_label(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{label_text}}} {float(value)}" if label_text else f"{name} {float(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus_textfile(report: Dict[str, Any], path: str = PROMETHEUS_TEXTFILE_PATH) -> Optional[Path]:
+    """textfile collector는 .prom 파일을 통째로 읽으므로 임시 파일에 쓴 뒤 이름 변경"""
+    if not path:
+        return None
+    _atomic_write(Path(path), prometheus_text(report))
+    return Path(path)
+
+
+# ----------------------------------------------------------------------
+# 비교
+# ----------------------------------------------------------------------
+def load_report(ref: str, report_dir: str = RUN_REPORT_DIR) -> Dict[str, Any]:
+    """리포트 파일 경로 또는 배치 ID로 리포트 로드"""
+    path = Path(ref)
+    if not path.is_file():
+        path = Path(report_dir) / f"{ref}.json"
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _change(base: Optional[float], current: Optional[float]) -> Optional[float]:
+    if base is None or current is None or base == 0:
+        return None
+    return (current - base) / base
+
+
+def compare_reports(base: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.2) -> Tuple[List[str], List[str]]:
+    """
+    두 실행 리포트 비교
+
+    Returns:
+        (출력 줄 목록, 회귀 항목 목록) - 회귀는 단계 소요 시간 증가 또는 처리량 감소가 threshold를 넘은 경우
+    """
+    lines = [f"{'':28} {base['batch_id']:>20} {current['batch_id']:>20} {'change':>9}"]
+    regressions = []
+
+    def row(label: str, base_value: Optional[float], current_value: Optional[float], higher_is_worse: bool):
+        change = _change(base_value, current_value)
+        flag = ''
+        if change is not None and (change > threshold if higher_is_worse else change < -threshold):
+            flag = '  ⚠️ regression'
+            regressions.append(f"{label}: {base_value} → {current_value} ({change:+.1%})")
+        fmt = lambda value: '-' if value is None else f"{value:,.2f}"
+        change_text = '-' if change is None else f"{change:+.1%}"
+        lines.append(f"{label:28} {fmt(base_value):>20} {fmt(current_value):>20} {change_text:>9}{flag}")
+
+    row('duration_seconds', base['duration_seconds'], current['duration_seconds'], True)
+    for name in dict.fromkeys(list(base['stages']) + list(current['stages'])):
+        base_stage = base['stages'].get(name, {})
+        current_stage = current['stages'].get(name, {})
+        skipped = 'skipped' in (base_stage.get('status'), current_stage.get('status'))
+        if not skipped:
+            row(f"{name}.seconds", base_stage.get('seconds'), current_stage.get('seconds'), True)
+        units = dict.fromkeys(list(base_stage.get('throughput', {})) + list(current_stage.get('throughput', {})))
+        for unit in units:
+            row(f"{name}.{unit}", base_stage.get('throughput', {}).get(unit),
+                current_stage.get('throughput', {}).get(unit), False)
+
+    for name in dict.fromkeys(list(base['caches']) + list(current['caches'])):
+        row(f"cache.{name}.hit_ratio", base['caches'].get(name, {}).get('hit_ratio'),
+            current['caches'].get(name, {}).get('hit_ratio'), False)
+
+    for name in dict.fromkeys(list(base['counters']) + list(current['counters'])):
+        lines.append(f"{name:28} {base['counters'].get(name, '-'):>20} {current['counters'].get(name, '-'):>20}")
+
+    return lines, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Witple 배치 실행 리포트")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compare = subparsers.add_parser('compare', help="두 실행의 단계별 소요 시간/처리량 비교")
+    compare.add_argument('base', help="기준 실행 (배치 ID 또는 리포트 경로)")
+    compare.add_argument('current', help="비교할 실행 (배치 ID 또는 리포트 경로)")
+    compare.add_argument('--threshold', type=float, default=0.2, help="회귀로 판단하는 변화 비율 (기본값: 0.2)")
+    compare.add_argument('--report-dir', default=RUN_REPORT_DIR)
+    args = parser.parse_args(argv)
+
+    lines, regressions = compare_reports(
+        load_report(args.base, args.report_dir), load_report(args.current, args.report_dir), args.threshold
+    )
+    print('\n'.join(lines))
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regressions above {args.threshold:.0%}:")
+        for item in regressions:
+            print(f"  - {item}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""
+S3 수집 원장 (ingestion ledger)
+- 처리 완료한 S3 객체의 키/ETag/LastModified를 테이블에 기록 → 같은 객체를 다시 집계하지 않음
+- LastModified 최고 수위(high-water mark)에서 파티션 경로 기준 StartAfter로 목록 조회
+  → 실행 시간이 버킷 전체 크기가 아니라 새로 들어온 객체 수에 비례
+- 같은 키라도 ETag가 바뀐 경우(덮어쓰기)는 새 객체로 보고 다시 처리
+  (저장은 누적이므로 덮어쓴 객체의 내용 전체가 한 번 더 더해짐)
+- 다운로드/파싱에 실패한 객체는 실패 상태로 기록하고, 재시도 대상 중 가장 오래된 객체가
+  조회 범위에 남도록 StartAfter를 그 앞으로 유지 (INGESTION_MAX_ATTEMPTS회 실패하면 영구 실패로 건너뜀)
+- S3_LOCAL_DIR 지정 시 로컬 디렉토리를 S3 대신 사용 (테스트/로컬 실행용)
+"""
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine, inspect, text
+
+logger = logging.getLogger(__name__)
+
+LEDGER_TABLE = "s3_ingestion_ledger"
+# 업로드 지연/시계 차이를 고려해 최고 수위보다 이만큼 이전 파티션부터 다시 조회 (원장으로 중복 제외)
+INGESTION_LOOKBACK_MINUTES = int(os.getenv('INGESTION_LOOKBACK_MINUTES', '120'))
+# 최고 수위 기준 이보다 오래된 원장 기록은 더 이상 조회 범위에 들지 않으므로 정리
+INGESTION_LEDGER_RETENTION_DAYS = int(os.getenv('INGESTION_LEDGER_RETENTION_DAYS', '7'))
+# 다운로드/파싱 실패 객체를 다시 시도하는 최대 횟수 (넘으면 영구 실패로 기록만 남기고 건너뜀)
+INGESTION_MAX_ATTEMPTS = int(os.getenv('INGESTION_MAX_ATTEMPTS', '3'))
+
+STATUS_PROCESSED = 'processed'
+STATUS_FAILED = 'failed'
+# 이전 버전 원장 테이블에 추가하는 컬럼
+LEDGER_STATUS_COLUMNS = {
+    'status': f"TEXT NOT NULL DEFAULT '{STATUS_PROCESSED}'",
+    'attempts': "INTEGER NOT NULL DEFAULT 1",
+    'error': "TEXT",
+}
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def partition_start_after(prefix: str, moment: datetime) -> str:
+    """
+    collection-server의 파티션 키 구조(user-actions/year=YYYY/month=MM/day=DD/hour=HH/batch-*.json)에서
+    해당 시각의 시간 파티션 바로 앞을 가리키는 StartAfter 값
+    """
+    return f"{prefix}year={moment.year}/month={moment.month:02d}/day={moment.day:02d}/hour={moment.hour:02d}"
+
+
+class LocalS3Client:
+    """
+    파일시스템 기반 S3 대체 클라이언트 ({root}/{bucket}/{key})
+
+    BatchProcessor가 사용하는 list_objects_v2 페이지네이터와 get_object만 구현합니다.
+    ETag는 파일 내용의 MD5, ContentEncoding은 gzip 매직 바이트로 판단합니다.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _object_path(self, bucket: str, key: str) -> Path:
+        return self.root / bucket / key
+
+    @staticmethod
+    def _etag(path: Path) -> str:
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return f'"{digest.hexdigest()}"'
+
+    def _describe(self, bucket: str, key: str) -> Dict[str, Any]:
+        path = self._object_path(bucket, key)
+        stat = path.stat()
+        return {
+            'Key': key,
+            'Size': stat.st_size,
+            'ETag': self._etag(path),
+            'LastModified': datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        }
+
+    def get_paginator(self, operation_name: str) -> "LocalS3Client":
+        if operation_name != 'list_objects_v2':
+            raise NotImplementedError(f"LocalS3Client does not support {operation_name}")
+        return self
+
+    def paginate(self, Bucket: str, Prefix: str = '', StartAfter: str = '',
+                 MaxKeys: int = 1000, **_) -> Iterator[Dict[str, Any]]:
+        """list_objects_v2와 같이 키 사전순으로 StartAfter 이후의 객체를 페이지 단위로 반환"""
+        bucket_root = self.root / Bucket
+        keys = sorted(
+            path.relative_to(bucket_root).as_posix()
+            for path in bucket_root.rglob('*') if path.is_file()
+        ) if bucket_root.exists() else []
+        keys = [key for key in keys if key.startswith(Prefix) and key > StartAfter]
+
+        if not keys:
+            yield {'KeyCount': 0}
+            return
+        for offset in range(0, len(keys), MaxKeys):
+            page = [self._describe(Bucket, key) for key in keys[offset:offset + MaxKeys]]
+            yield {'Contents': page, 'KeyCount': len(page)}
+
+    def get_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        path = self._object_path(Bucket, Key)
+        body = open(path, 'rb')
+        response = self._describe(Bucket, Key)
+        response['Body'] = body
+        response['ContentLength'] = response.pop('Size')
+        if body.peek(2)[:2] == GZIP_MAGIC:
+            response['ContentEncoding'] = 'gzip'
+        return response
+
+
+class IngestionLedger:
+    """
+    처리 완료 S3 객체 원장
+
+    INGESTION_LEDGER_URL(기본값: DATABASE_URL)의 테이블에 기록하므로 Batch 컨테이너가 바뀌어도 유지되며,
+    로컬 테스트에서는 sqlite:///ledger.db 같은 파일 DB를 사용할 수 있습니다.
+    객체는 DB 저장까지 성공한 뒤에만 기록되어, 실패한 실행의 객체는 다음 실행에서 다시 처리됩니다.
+    원장이 DATABASE_URL과 같은 DB면 벡터 UPSERT와 같은 트랜잭션으로 기록됩니다 (mark_processed의 connection).
+    다운로드/파싱에 실패한 객체는 status='failed'로 기록되어 max_attempts회까지 다음 실행에서 다시 시도됩니다.
+    """
+
+    def __init__(self, url: str, lookback_minutes: int = INGESTION_LOOKBACK_MINUTES,
+                 retention_days: int = INGESTION_LEDGER_RETENTION_DAYS, max_attempts: int = INGESTION_MAX_ATTEMPTS):
+        self.url = url
+        self.engine = create_engine(url)
+        self.lookback = timedelta(minutes=lookback_minutes)
+        self.retention = timedelta(days=retention_days)
+        self.max_attempts = max(1, max_attempts)
+        self._ensure_table()
+
+    def _ensure_table(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+                    s3_key TEXT PRIMARY KEY,
+                    etag TEXT NOT NULL,
+                    last_modified DOUBLE PRECISION NOT NULL,
+                    size BIGINT,
+                    batch_id TEXT,
+                    processed_at DOUBLE PRECISION NOT NULL,
+                    {', '.join(f"{name} {ddl}" for name, ddl in LEDGER_STATUS_COLUMNS.items())}
+                )
+            """))
+            columns = {column['name'] for column in inspect(conn).get_columns(LEDGER_TABLE)}
+            for name, ddl in LEDGER_STATUS_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(text(f"ALTER TABLE {LEDGER_TABLE} ADD COLUMN {name} {ddl}"))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_{LEDGER_TABLE}_last_modified ON {LEDGER_TABLE} (last_modified)"
+            ))
+
+    def shares_database(self, url: Optional[str]) -> bool:
+        """원장이 주어진 DB URL과 같은 DB에 있는지 (같으면 저장 트랜잭션 안에서 기록 가능)"""
+        return bool(url) and self.url == url
+
+    def high_water_mark(self) -> Optional[datetime]:
+        """처리 완료 객체 중 가장 최근 LastModified (기록이 없으면 None)"""
+        with self.engine.connect() as conn:
+            value = conn.execute(text(f"SELECT MAX(last_modified) FROM {LEDGER_TABLE}")).scalar()
+        return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+    def oldest_retryable_failure(self) -> Optional[datetime]:
+        """다시 시도할 실패 객체 중 가장 오래된 LastModified (없으면 None)"""
+        with self.engine.connect() as conn:
+            value = conn.execute(text(
+                f"SELECT MIN(last_modified) FROM {LEDGER_TABLE} WHERE status = :failed AND attempts < :max_attempts"
+            ), {'failed': STATUS_FAILED, 'max_attempts': self.max_attempts}).scalar()
+        return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+    def start_after(self, prefix: str) -> str:
+        """
+        목록 조회 시작 위치 (기록이 없으면 처음부터)
+
+        최고 수위와 재시도할 실패 객체 중 더 이른 시각에서 lookback만큼 앞선 시간 파티션이므로,
+        실패한 객체는 최고 수위가 앞서 나가도 조회 범위에서 빠지지 않습니다.
+        """
+        high_water_mark = self.high_water_mark()
+        if high_water_mark is None:
+            return ''
+        oldest_failure = self.oldest_retryable_failure()
+        start = min(high_water_mark, oldest_failure) if oldest_failure is not None else high_water_mark
+        return partition_start_after(prefix, start - self.lookback)
+
+    def recorded(self, keys: Iterable[str]) -> Dict[str, Tuple[str, str, int]]:
+        """주어진 키들 중 원장에 있는 키의 (ETag, 상태, 시도 횟수)"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        result = {}
+        with self.engine.connect() as conn:
+            # IN 목록 크기를 제한하기 위해 나누어 조회 (SQLite 바인드 변수 제한 포함)
+            for offset in range(0, len(keys), 500):
+                chunk = keys[offset:offset + 500]
+                params = {f"k{i}": key for i, key in enumerate(chunk)}
+                placeholders = ", ".join(f":k{i}" for i in range(len(chunk)))
+                rows = conn.execute(text(
+                    f"SELECT s3_key, etag, status, attempts FROM {LEDGER_TABLE} WHERE s3_key IN ({placeholders})"
+                ), params).fetchall()
+                result.update({row[0]: (row[1], row[2], row[3]) for row in rows})
+        return result
+
+    def filter_new(self, objects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        원장에 같은 ETag로 처리 완료(또는 영구 실패) 기록된 객체 제외
+
+        재시도 횟수가 남은 실패 객체는 유지합니다. ETag가 바뀐 덮어쓰기 객체도 새 객체로 유지하며,
+        이전 내용을 빼지 않으므로 덮어쓴 객체의 내용은 전체가 다시 더해집니다.
+        """
+        recorded = self.recorded(obj['key'] for obj in objects)
+        new_objects = []
+        overwritten = retried = 0
+        for obj in objects:
+            if obj['key'] not in recorded:
+                new_objects.append(obj)
+                continue
+            etag, status, attempts = recorded[obj['key']]
+            if etag != obj['etag']:
+                if status == STATUS_PROCESSED:
+                    overwritten += 1
+                new_objects.append(obj)
+            elif status == STATUS_FAILED and attempts < self.max_attempts:
+                retried += 1
+                new_objects.append(obj)
+
+        if overwritten:
+            logger.warning(f"⚠️ {overwritten} objects were overwritten since they were recorded, "
+                           f"their full contents will be counted again")
+        if retried:
+            logger.info(f"🔁 Retrying {retried} objects that failed in previous runs")
+        return new_objects
+
+    def mark_processed(self, objects: List[Dict[str, Any]], batch_id: str, connection=None):
+        """
+        처리 완료 객체 기록 후 조회 범위를 벗어난 오래된 기록 정리
+
+        connection을 주면 그 연결의 진행 중인 트랜잭션에서 기록하고 커밋은 호출한 쪽에 맡깁니다.
+        """
+        if not objects:
+            return
+        now = datetime.now(timezone.utc).timestamp()
+        rows = [{
+            'key': obj['key'],
+            'etag': obj['etag'],
+            'last_modified': obj['last_modified'].timestamp(),
+            'size': obj.get('size'),
+            'batch_id': batch_id,
+            'processed_at': now
+        } for obj in objects]
+
+        if connection is not None:
+            pruned = self._record(connection, rows)
+        else:
+            with self.engine.begin() as conn:
+                pruned = self._record(conn, rows)
+        logger.info(f"📒 Ingestion ledger: recorded {len(rows)} objects, pruned {pruned} old entries")
+
+    def _record(self, conn, rows: List[Dict[str, Any]]) -> int:
+        conn.execute(text(f"""
+            INSERT INTO {LEDGER_TABLE} (s3_key, etag, last_modified, size, batch_id, processed_at, status)
+            VALUES (:key, :etag, :last_modified, :size, :batch_id, :processed_at, '{STATUS_PROCESSED}')
+            ON CONFLICT (s3_key) DO UPDATE SET
+                etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified,
+                size = EXCLUDED.size,
+                batch_id = EXCLUDED.batch_id,
+                processed_at = EXCLUDED.processed_at,
+                status = EXCLUDED.status,
+                error = NULL
+        """), rows)
+
+        # 재시도할 실패 기록은 최고 수위와 관계없이 유지
+        high_water_mark = conn.execute(text(f"SELECT MAX(last_modified) FROM {LEDGER_TABLE}")).scalar()
+        cutoff = high_water_mark - (self.lookback + self.retention).total_seconds()
+        return conn.execute(text(f"""
+            DELETE FROM {LEDGER_TABLE}
+            WHERE last_modified < :cutoff AND NOT (status = :failed AND attempts < :max_attempts)
+        """), {'cutoff': cutoff, 'failed': STATUS_FAILED, 'max_attempts': self.max_attempts}).rowcount
+
+    def mark_failed(self, objects: List[Dict[str, Any]], batch_id: str) -> List[str]:
+        """
+        다운로드/파싱에 실패한 객체 기록 (같은 ETag로 다시 실패하면 시도 횟수 증가)
+
+        Returns:
+            이번 기록으로 max_attempts에 도달해 더 이상 시도하지 않는 객체 키 목록
+        """
+        if not objects:
+            return []
+        now = datetime.now(timezone.utc).timestamp()
+        rows = [{
+            'key': obj['key'],
+            'etag': obj['etag'],
+            'last_modified': obj['last_modified'].timestamp(),
+            'size': obj.get('size'),
+            'batch_id': batch_id,
+            'processed_at': now,
+            'error': obj.get('error')
+        } for obj in objects]
+
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                INSERT INTO {LEDGER_TABLE} (s3_key, etag, last_modified, size, batch_id, processed_at,
+                                            status, attempts, error)
+                VALUES (:key, :etag, :last_modified, :size, :batch_id, :processed_at, '{STATUS_FAILED}', 1, :error)
+                ON CONFLICT (s3_key) DO UPDATE SET
+                    attempts = CASE
+                        WHEN {LEDGER_TABLE}.etag = EXCLUDED.etag AND {LEDGER_TABLE}.status = EXCLUDED.status
+                        THEN {LEDGER_TABLE}.attempts + 1 ELSE 1 END,
+                    etag = EXCLUDED.etag,
+                    last_modified = EXCLUDED.last_modified,
+                    size = EXCLUDED.size,
+                    batch_id = EXCLUDED.batch_id,
+                    processed_at = EXCLUDED.processed_at,
+                    status = EXCLUDED.status,
+                    error = EXCLUDED.error
+            """), rows)
+
+        recorded = self.recorded(row['key'] for row in rows)
+        given_up = [key for key, (_, _, attempts) in recorded.items() if attempts >= self.max_attempts]
+        logger.warning(f"📒 Ingestion ledger: recorded {len(rows)} failed objects "
+                       f"({len(rows) - len(given_up)} will be retried)")
+        errors = {row['key']: row['error'] for row in rows}
+        for key in given_up:
+            logger.error(f"❌ Giving up on {key} after {self.max_attempts} attempts: {errors[key]}")
+        return given_up
+
+
+def create_s3_client(region: str):
+    """S3_LOCAL_DIR이 지정되면 로컬 디렉토리, 아니면 boto3 S3 클라이언트"""
+    local_dir = os.getenv('S3_LOCAL_DIR')
+    if local_dir:
+        logger.info(f"📂 Using local S3 stand-in at {local_dir}")
+        return LocalS3Client(local_dir)
+    import boto3  # 로컬 대체 클라이언트만 사용하는 테스트 환경에서는 불필요
+    return boto3.client('s3', region_name=region)
+
+
+def create_ingestion_ledger(default_url: Optional[str]) -> Optional[IngestionLedger]:
+    """INGESTION_LEDGER_URL(없으면 DATABASE_URL)로 원장 생성 (둘 다 없으면 None - 매번 전체 조회)"""
+    url = os.getenv('INGESTION_LEDGER_URL', default_url)
+    if not url:
+        logger.warning("⚠️ No ingestion ledger configured, every run will re-list and re-process all objects")
+        return None
+    return IngestionLedger(url)
@@ -0,0 +1,41 @@
+import gzip
+import io
+import json
+
+import pytest
+
+import process_batch
+from process_batch import BatchProcessor
+
+ACTIONS = [
+    {'user_id': 'u1', 'place_id': 'p1', 'action_type': 'click', 'score': 1.5},
+    {'user_id': 'u2', 'place_id': 'p2', 'action_type': 'like'},
+]
+
+
+def parse(body: bytes):
+    return list(BatchProcessor._iter_actions(io.BytesIO(body)))
+
+
+@pytest.mark.parametrize('ijson_available', [True, False])
+def test_iter_actions_supports_batch_array_and_single_formats(monkeypatch, ijson_available):
+    monkeypatch.setattr(process_batch, 'IJSON_AVAILABLE', ijson_available)
+    batch = {'batch_id': 'b1', 'actions': ACTIONS, 'count': 2}
+
+    assert parse(json.dumps(batch).encode()) == ACTIONS
+    assert parse(json.dumps(ACTIONS).encode()) == ACTIONS
+    assert parse(json.dumps(ACTIONS[0]).encode()) == [ACTIONS[0]]
+    assert parse(b'{"actions": []}') == []
+
+
+def test_iter_actions_decodes_lazily():
+    actions = BatchProcessor._iter_actions(io.BytesIO(b'{"actions": [{"user_id": "u1"}, {"user_id": '))
+    # 앞쪽 액션은 파일 끝까지 읽기 전에 디코딩되고, 잘린 부분에서만 오류
+    assert next(actions) == {'user_id': 'u1'}
+    with pytest.raises(Exception):
+        next(actions)
+
+
+def test_iter_actions_streams_gzip_body():
+    body = gzip.GzipFile(fileobj=io.BytesIO(gzip.compress(json.dumps({'actions': ACTIONS}).encode())))
+    assert list(BatchProcessor._iter_actions(body)) == ACTIONS
@@ -0,0 +1,83 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+from batch_stages import (
+    RunCheckpoint, aggregate_partition, decode_place, merge_place_partials, read_json, user_partition
+)
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def write_actions(path, actions):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for action in actions:
+            f.write(json.dumps(action) + '\n')
+
+
+def action(user_id, place_id, action_type='like'):
+    return {'user_id': user_id, 'place_id': place_id, 'place_category': 'restaurants',
+            'action_type': action_type, 'action_time': NOW.isoformat()}
+
+
+def test_user_partition_is_stable_and_in_range():
+    partitions = [user_partition(f"user-{i}", 8) for i in range(200)]
+    assert partitions == [user_partition(f"user-{i}", 8) for i in range(200)]
+    assert set(partitions) <= set(range(8))
+    assert len(set(partitions)) > 1
+
+
+def test_partition_aggregates_add_up(tmp_path):
+    # 사용자는 한 파티션에만 속하므로 장소 카운터/고유 사용자 수는 부분 집계의 합
+    partials = []
+    for partition, actions in enumerate([
+        [action('u1', 1), action('u1', 1, 'click'), action('u2', 1, 'bookmark')],
+        [action('u3', 1), action('u3', 2, 'click'), {'user_id': 'u3'}],
+    ]):
+        paths = [str(tmp_path / f"{name}-{partition}.json.gz") for name in ('actions', 'users', 'places')]
+        write_actions(paths[0], actions)
+        assert aggregate_partition(*paths) == (2 if partition == 0 else 1)
+        partials.append({
+            f"{data['place_category']}:{data['place_id']}": decode_place(data) for data in read_json(paths[2])
+        })
+
+    places = merge_place_partials(partials)
+    assert places['restaurants:1']['total_likes'] == 2
+    assert places['restaurants:1']['total_bookmarks'] == 1
+    assert places['restaurants:1']['total_clicks'] == 1
+    assert places['restaurants:1']['unique_users'] == 3
+    assert places['restaurants:1']['unique_users_sketch'].estimate() == 3
+    assert places['restaurants:2']['unique_users'] == 1
+
+
+def test_run_checkpoint_round_trip(tmp_path):
+    files = [{'key': 'user-actions/year=2026/month=10/day=18/hour=12/batch-1.json', 'etag': '"abc"', 'size': 10,
+              'last_modified': NOW}]
+    checkpoint = RunCheckpoint.create('batch_1', partitions=2, root=str(tmp_path))
+    checkpoint.set_files(files)
+    checkpoint.mark_done('ingest', actions=3)
+
+    loaded = RunCheckpoint.load('batch_1', root=str(tmp_path))
+    assert loaded.partitions == 2
+    assert loaded.files() == files
+    assert loaded.is_done('ingest') and not loaded.is_done('aggregate')
+    assert loaded.stage_info('ingest') == {'actions': 3}
+    # batch_id 생략 시 persist까지 끝나지 않은 가장 최근 실행
+    assert RunCheckpoint.load(root=str(tmp_path)).batch_id == 'batch_1'
+
+    loaded.reset('ingest')
+    assert not RunCheckpoint.load('batch_1', root=str(tmp_path)).is_done('ingest')
+
+    loaded.mark_done('persist')
+    assert RunCheckpoint.load(root=str(tmp_path)) is None
+
+
+def test_run_checkpoint_vector_records(tmp_path):
+    checkpoint = RunCheckpoint.create('batch_1', root=str(tmp_path))
+    records = {
+        'u1': {'behavior_vector': [0.25, 0.75], 'total_actions': 3},
+        'u2': {'behavior_vector': None, 'total_actions': 1},
+    }
+    path = checkpoint.partition_path('embed', 'user_vectors', 0)
+    checkpoint.write_vector_records(path, records, ('behavior_vector',))
+    assert RunCheckpoint.read_vector_records(path, ('behavior_vector',)) == records
@@ -0,0 +1,37 @@
+import pytest
+
+from embedding_cache import DiskEmbeddingCache
+from image_embedding import IMAGE_CACHE_NAMESPACE, PlaceImageEmbedder, image_url_hash, parse_s3_url
+
+
+def test_fixture_images_resolve_by_host_path_and_file_name(tmp_path):
+    (tmp_path / 'cdn.example.com' / 'places').mkdir(parents=True)
+    (tmp_path / 'cdn.example.com' / 'places' / '1.jpg').write_bytes(b'host-path')
+    (tmp_path / '2.jpg').write_bytes(b'file-name')
+    embedder = PlaceImageEmbedder(local_dir=str(tmp_path))
+
+    assert embedder.fetch_image_bytes('https://cdn.example.com/places/1.jpg') == b'host-path'
+    assert embedder.fetch_image_bytes('https://other.example.com/images/2.jpg') == b'file-name'
+    with pytest.raises(FileNotFoundError):
+        embedder.fetch_image_bytes('https://cdn.example.com/places/missing.jpg')
+
+
+def test_parse_s3_url():
+    assert parse_s3_url('s3://images/places/1.jpg') == ('images', 'places/1.jpg')
+    assert parse_s3_url('https://images.s3.ap-northeast-2.amazonaws.com/places/%EC%84%9C.jpg') == \
+        ('images', 'places/서.jpg')
+    assert parse_s3_url('https://cdn.example.com/places/1.jpg') is None
+
+
+def test_cached_images_skip_fetch_and_model(tmp_path):
+    cache = DiskEmbeddingCache(str(tmp_path / 'embeddings.sqlite'))
+    url = 'https://cdn.example.com/places/1.jpg'
+    cache.put_many(IMAGE_CACHE_NAMESPACE, [(url, image_url_hash(url), [0.5, 0.5])])
+    # 픽스처 디렉토리가 비어 있어도 캐시 적중이면 가져오지 않음
+    embedder = PlaceImageEmbedder(cache=cache, local_dir=str(tmp_path / 'fixtures'))
+
+    assert embedder.embed_urls([url, url, '']) == {url: [0.5, 0.5]}
+    assert embedder.stats['cache_hits'] == 1
+    assert embedder.stats['fetched'] == 0
+    assert embedder._model is None
+    cache.close()
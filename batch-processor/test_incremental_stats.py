@@ -0,0 +1,58 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import process_batch
+from hll import HyperLogLog
+from process_batch import merge_decayed_mean
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def half_life_30_days(monkeypatch):
+    monkeypatch.setattr(process_batch, 'TIME_DECAY_LAMBDA', math.log(2) / 30)
+
+
+def test_hll_estimate_and_merge():
+    first = HyperLogLog().update(f"user-{i}" for i in range(10000))
+    second = HyperLogLog().update(f"user-{i}" for i in range(5000, 15000))
+
+    assert first.estimate() == pytest.approx(10000, rel=0.05)
+    merged = first.merge(second)
+    assert merged.estimate() == pytest.approx(15000, rel=0.05)
+    assert merged.estimate() == second.merge(first).estimate()
+    # 같은 사용자를 다시 더해도 추정값은 그대로
+    assert merged.merge(first).estimate() == merged.estimate()
+
+
+def test_hll_small_cardinality_and_serialization():
+    sketch = HyperLogLog().update(['u1', 'u2', 'u3', 'u1'])
+    assert sketch.estimate() == 3
+
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.estimate() == sketch.estimate()
+    assert HyperLogLog.from_bytes(None) is None
+    assert HyperLogLog.from_bytes(b'\x00\x0c') is None
+    with pytest.raises(ValueError):
+        sketch.merge(HyperLogLog(precision=10))
+
+
+def test_merge_decayed_mean_decays_stored_weight(half_life_30_days):
+    vector, weight = merge_decayed_mean([1.0, 0.0], 2.0, NOW - timedelta(days=30), [0.0, 1.0], 1.0, NOW)
+    # 30일 경과 → 저장된 가중치 2.0이 1.0으로 감쇠되어 이번 배치와 같은 비중
+    assert weight == pytest.approx(2.0)
+    assert vector == pytest.approx([0.5, 0.5])
+
+
+def test_merge_decayed_mean_edge_cases(half_life_30_days):
+    # 저장된 벡터가 없거나 차원이 다르면 이번 배치 벡터
+    assert merge_decayed_mean(None, None, None, [0.0, 1.0], 1.0, NOW) == ([0.0, 1.0], 1.0)
+    assert merge_decayed_mean([1.0], 3.0, NOW, [0.0, 1.0], 1.0, NOW) == ([0.0, 1.0], 1.0)
+
+    # 이번 배치 가중치가 0(텍스트 fallback)이면 저장된 벡터 유지, naive 시각은 UTC로 간주
+    stored_at = (NOW - timedelta(days=30)).replace(tzinfo=None)
+    vector, weight = merge_decayed_mean([1.0, 0.0], 2.0, stored_at, [0.0, 1.0], 0.0, NOW)
+    assert vector == [1.0, 0.0]
+    assert weight == pytest.approx(1.0)
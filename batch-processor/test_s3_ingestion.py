@@ -0,0 +1,119 @@
+import gzip
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from s3_ingestion import IngestionLedger, LocalS3Client, partition_start_after
+
+BUCKET = 'user-actions-data'
+PREFIX = 'user-actions/'
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def put_object(root, key, body: bytes, modified: datetime):
+    path = root / BUCKET / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    os.utime(path, (modified.timestamp(), modified.timestamp()))
+
+
+def list_objects(client, start_after=''):
+    """list_s3_files와 같은 형태의 객체 목록"""
+    return [{
+        'key': obj['Key'],
+        'etag': obj['ETag'],
+        'size': obj['Size'],
+        'last_modified': obj['LastModified']
+    } for page in client.get_paginator('list_objects_v2').paginate(Bucket=BUCKET, Prefix=PREFIX, StartAfter=start_after)
+        for obj in page.get('Contents', [])]
+
+
+def partition_key(moment: datetime, name: str) -> str:
+    return f"{PREFIX}year={moment.year}/month={moment.month:02d}/day={moment.day:02d}/hour={moment.hour:02d}/{name}"
+
+
+@pytest.fixture
+def s3_root(tmp_path):
+    root = tmp_path / 's3'
+    put_object(root, partition_key(NOW - timedelta(hours=5), 'batch-1.json'), b'{"actions": []}',
+               NOW - timedelta(hours=5))
+    put_object(root, partition_key(NOW - timedelta(hours=1), 'batch-2.json'), gzip.compress(b'[]'),
+               NOW - timedelta(hours=1))
+    put_object(root, partition_key(NOW, 'batch-3.json'), b'[]', NOW)
+    return root
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return IngestionLedger(f"sqlite:///{tmp_path / 'ledger.db'}", lookback_minutes=120, max_attempts=2)
+
+
+def test_local_s3_lists_in_key_order_and_detects_gzip(s3_root):
+    client = LocalS3Client(str(s3_root))
+    objects = list_objects(client)
+    assert [obj['key'].rsplit('/', 1)[-1] for obj in objects] == ['batch-1.json', 'batch-2.json', 'batch-3.json']
+    assert list_objects(client, start_after=objects[0]['key']) == objects[1:]
+
+    response = client.get_object(Bucket=BUCKET, Key=objects[1]['key'])
+    assert response['ContentEncoding'] == 'gzip'
+    response['Body'].close()
+
+
+def test_ledger_skips_processed_objects_and_lists_from_high_water_mark(s3_root, ledger):
+    client = LocalS3Client(str(s3_root))
+    objects = list_objects(client)
+    assert ledger.start_after(PREFIX) == ''
+    assert ledger.filter_new(objects) == objects
+
+    ledger.mark_processed(objects[:2], 'batch_1')
+    assert ledger.filter_new(objects) == objects[2:]
+    # 최고 수위(1시간 전) - lookback(2시간)의 시간 파티션부터 조회
+    assert ledger.start_after(PREFIX) == partition_start_after(PREFIX, NOW - timedelta(hours=3))
+    assert [obj['key'] for obj in list_objects(client, ledger.start_after(PREFIX))] == \
+        [obj['key'] for obj in objects[1:]]
+
+
+def test_ledger_reprocesses_overwritten_objects(s3_root, ledger):
+    client = LocalS3Client(str(s3_root))
+    objects = list_objects(client)
+    ledger.mark_processed(objects, 'batch_1')
+    assert ledger.filter_new(objects) == []
+
+    put_object(s3_root, objects[0]['key'], b'{"actions": [{"user_id": "u1"}]}', NOW)
+    assert [obj['key'] for obj in ledger.filter_new(list_objects(client))] == [objects[0]['key']]
+
+
+def test_ledger_rows_follow_caller_transaction(s3_root, ledger):
+    objects = list_objects(LocalS3Client(str(s3_root)))
+    with ledger.engine.connect() as conn:
+        transaction = conn.begin()
+        ledger.mark_processed(objects, 'batch_1', connection=conn)
+        transaction.rollback()
+    # 저장 트랜잭션이 롤백되면 원장 기록도 함께 취소되어 다음 실행에서 다시 처리
+    assert ledger.filter_new(objects) == objects
+
+
+def test_ledger_keeps_failed_objects_in_listing_window(s3_root, ledger):
+    client = LocalS3Client(str(s3_root))
+    objects = list_objects(client)
+    failed = dict(objects[0], error='invalid JSON')
+
+    assert ledger.mark_failed([failed], 'batch_1') == []
+    ledger.mark_processed(objects[1:], 'batch_1')
+    # 최고 수위가 앞서 나가도 재시도할 실패 객체의 파티션부터 조회
+    assert ledger.start_after(PREFIX) == partition_start_after(PREFIX, NOW - timedelta(hours=7))
+    assert ledger.filter_new(list_objects(client, ledger.start_after(PREFIX))) == objects[:1]
+
+    # max_attempts(2)회 실패하면 더 이상 시도하지 않고 조회 범위도 최고 수위 기준으로 돌아감
+    assert ledger.mark_failed([failed], 'batch_2') == [objects[0]['key']]
+    assert ledger.filter_new(objects) == []
+    assert ledger.start_after(PREFIX) == partition_start_after(PREFIX, NOW - timedelta(hours=2))
+
+
+def test_ledger_records_failed_object_once_it_succeeds(s3_root, ledger):
+    objects = list_objects(LocalS3Client(str(s3_root)))
+    ledger.mark_failed([dict(objects[0], error='timeout')], 'batch_1')
+    ledger.mark_processed(objects[:1], 'batch_2')
+    assert ledger.recorded([objects[0]['key']])[objects[0]['key']][1] == 'processed'
+    assert ledger.filter_new(objects[:1]) == []
@@ -0,0 +1,62 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import user_vectors
+from user_vectors import compute_time_weighted_user_vectors
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+HALF_LIFE_30_DAYS = math.log(2) / 30
+
+
+def action(action_type, place_id, moment):
+    return {'action_type': action_type, 'place_category': 'restaurants', 'place_id': place_id,
+            'action_time': moment.isoformat()}
+
+
+@pytest.fixture
+def place_vectors():
+    return {
+        'restaurants:1': {'behavior_vector': [1.0, 0.0]},
+        'restaurants:2': {'behavior_vector': [0.0, 1.0]},
+        'restaurants:3': {'behavior_vector': None},
+    }
+
+
+def test_time_weighted_user_vectors(place_vectors):
+    user_data = {
+        'u1': {'actions': [action('like', 1, NOW), action('bookmark', 2, NOW), action('click', 1, NOW)]},
+        'u2': {'actions': [action('like', 1, NOW - timedelta(days=30)), action('like', 2, NOW)]},
+        'u3': {'actions': [action('click', 1, NOW), action('like', 3, NOW)]},
+    }
+    result = compute_time_weighted_user_vectors(user_data, place_vectors, HALF_LIFE_30_DAYS, NOW)
+
+    # 좋아요 1.0 / 북마크 1.5, 클릭과 벡터 없는 장소는 제외 → 남는 행동이 없는 사용자는 결과에 없음
+    assert set(result) == {'u1', 'u2'}
+    assert result['u1'][0] == pytest.approx([0.4, 0.6])
+    assert result['u1'][1] == pytest.approx(2.5)
+    # 30일 지난 좋아요는 절반 가중치
+    assert result['u2'][0] == pytest.approx([1 / 3, 2 / 3])
+    assert result['u2'][1] == pytest.approx(1.5)
+
+
+def test_unparseable_action_time_is_skipped(place_vectors):
+    user_data = {'u1': {'actions': [action('like', 1, NOW), dict(action('like', 2, NOW), action_time='yesterday')]}}
+    result = compute_time_weighted_user_vectors(user_data, place_vectors, HALF_LIFE_30_DAYS, NOW)
+    assert result['u1'][0] == pytest.approx([1.0, 0.0])
+    assert result['u1'][1] == pytest.approx(1.0)
+
+
+def test_sparse_and_dense_paths_agree(monkeypatch, place_vectors):
+    user_data = {
+        'u1': {'actions': [action('like', 1, NOW), action('bookmark', 2, NOW - timedelta(days=10))]},
+        'u2': {'actions': [action('like', 2, NOW - timedelta(days=3)), action('like', 2, NOW)]},
+    }
+    expected = compute_time_weighted_user_vectors(user_data, place_vectors, HALF_LIFE_30_DAYS, NOW)
+    monkeypatch.setattr(user_vectors, 'SCIPY_AVAILABLE', not user_vectors.SCIPY_AVAILABLE)
+    result = compute_time_weighted_user_vectors(user_data, place_vectors, HALF_LIFE_30_DAYS, NOW)
+    assert set(result) == set(expected)
+    for user_id, (vector, weight) in expected.items():
+        assert result[user_id][0] == pytest.approx(vector)
+        assert result[user_id][1] == pytest.approx(weight)
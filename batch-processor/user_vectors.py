@@ -0,0 +1,145 @@
+"""
+시간 가중치 사용자 벡터 일괄 계산
+- 배치 전체의 긍정 행동(좋아요/북마크)을 사용자×장소 희소 가중치 행렬 W로 구성
+  (가중치 = exp(-λ·경과 일수) × 행동 가중치, 같은 사용자/장소의 여러 행동은 합산)
+- 사용자 벡터 = (W @ 장소 벡터 행렬) / W의 행 합 → 한 번의 희소-밀집 행렬 곱과 행 정규화로 전체 사용자 계산
+- 사용자 수가 USER_VECTOR_SHARD_THRESHOLD 이상이고 USER_VECTOR_WORKERS > 1이면 행 구간별로 프로세스 분할
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 선택적 의존성 (scikit-learn 설치 시 함께 설치됨, 없으면 np.add.at 누적으로 계산)
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 행동 유형별 추가 가중치 (북마크 > 좋아요)
+POSITIVE_ACTION_WEIGHTS = {'like': 1.0, 'bookmark': 1.5}
+USER_VECTOR_WORKERS = int(os.getenv('USER_VECTOR_WORKERS', '1'))
+USER_VECTOR_SHARD_THRESHOLD = int(os.getenv('USER_VECTOR_SHARD_THRESHOLD', '200000'))
+
+
+class PositiveActions:
+    """긍정 행동 좌표 목록 (사용자 행 번호, 장소 열 번호, 행동 시각 문자열, 행동 가중치)"""
+
+    def __init__(self):
+        self.user_rows: List[int] = []
+        self.place_cols: List[int] = []
+        self.times: List[str] = []
+        self.action_weights: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.user_rows)
+
+
+def collect_positive_actions(user_ids: Sequence[Any], user_data: Dict[Any, Dict[str, Any]],
+                             place_index: Dict[str, int]) -> PositiveActions:
+    """시간 정보와 장소 벡터가 모두 있는 좋아요/북마크 행동만 수집"""
+    collected = PositiveActions()
+    for row, user_id in enumerate(user_ids):
+        for action in user_data[user_id]['actions']:
+            action_weight = POSITIVE_ACTION_WEIGHTS.get(action.get('action_type'))
+            action_time = action.get('action_time')
+            if action_weight is None or not action_time:
+                continue
+            col = place_index.get(f"{action.get('place_category')}:{action.get('place_id')}")
+            if col is None:
+                continue
+            collected.user_rows.append(row)
+            collected.place_cols.append(col)
+            collected.times.append(str(action_time))
+            collected.action_weights.append(action_weight)
+    return collected
+
+
+def action_weights(actions: PositiveActions, decay_lambda: float, now: datetime) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    행동별 최종 가중치 (시간 파싱 실패 행동은 제외)
+
+    Returns:
+        (유효 행동 마스크, 유효 행동의 가중치)
+    """
+    # ISO 8601 일괄 파싱 ('Z' 포함, naive 시각은 UTC로 간주)
+    timestamps = pd.to_datetime(pd.Series(actions.times, dtype=object), utc=True, errors='coerce', format='ISO8601')
+    valid = timestamps.notna().to_numpy()
+    age_days = (pd.Timestamp(now) - timestamps[valid]).dt.total_seconds().to_numpy() / 86400
+    time_weights = np.exp(-decay_lambda * np.maximum(age_days, 0))  # 음수 방지
+    return valid, time_weights * np.asarray(actions.action_weights, dtype=np.float64)[valid]
+
+
+def _weighted_sums(weights, place_matrix: np.ndarray) -> np.ndarray:
+    return np.asarray(weights @ place_matrix)
+
+
+def weighted_mean_vectors(weights, place_matrix: np.ndarray, workers: int = USER_VECTOR_WORKERS,
+                          shard_threshold: int = USER_VECTOR_SHARD_THRESHOLD) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    사용자별 가중 평균 벡터 (W @ P를 W의 행 합으로 나눔)
+
+    Returns:
+        (사용자 벡터 행렬, 사용자별 가중치 합) - 가중치 합이 0인 행의 벡터는 0
+    """
+    n_users = weights.shape[0]
+    if workers > 1 and n_users >= shard_threshold:
+        bounds = np.linspace(0, n_users, workers + 1, dtype=int)
+        shards = [weights[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+        logger.info(f"🧮 Sharding user vector computation across {len(shards)} processes")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            sums = np.vstack(list(pool.map(_weighted_sums, shards, [place_matrix] * len(shards))))
+    else:
+        sums = _weighted_sums(weights, place_matrix)
+
+    totals = np.asarray(weights.sum(axis=1)).ravel()
+    vectors = np.divide(sums, totals[:, None], out=np.zeros_like(sums), where=totals[:, None] > 0)
+    return vectors, totals
+
+
+def compute_time_weighted_user_vectors(user_data: Dict[Any, Dict[str, Any]], place_vectors: Dict[str, Dict[str, Any]],
+                                       decay_lambda: float, now: datetime,
+                                       vector_key: str = 'behavior_vector') -> Dict[Any, Tuple[List[float], float]]:
+    """
+    배치 전체 사용자의 시간 가중치 벡터
+
+    Returns:
+        {user_id: (벡터, 가중치 합)} - 시간 가중치를 적용할 행동이 없는 사용자는 포함되지 않음
+    """
+    place_keys = [key for key, data in place_vectors.items() if data.get(vector_key) is not None]
+    if not place_keys or not user_data:
+        return {}
+    place_index = {key: col for col, key in enumerate(place_keys)}
+    place_matrix = np.asarray([place_vectors[key][vector_key] for key in place_keys], dtype=np.float32)
+
+    user_ids = list(user_data)
+    actions = collect_positive_actions(user_ids, user_data, place_index)
+    if not len(actions):
+        return {}
+
+    valid, values = action_weights(actions, decay_lambda, now)
+    rows = np.asarray(actions.user_rows)[valid]
+    cols = np.asarray(actions.place_cols)[valid]
+    shape = (len(user_ids), len(place_keys))
+
+    if SCIPY_AVAILABLE:
+        # 같은 (사용자, 장소) 좌표의 가중치는 합산됨
+        weights = sparse.csr_matrix((values, (rows, cols)), shape=shape)
+        vectors, totals = weighted_mean_vectors(weights, place_matrix)
+    else:
+        sums = np.zeros((shape[0], place_matrix.shape[1]), dtype=np.float64)
+        np.add.at(sums, rows, place_matrix[cols] * values[:, None])
+        totals = np.bincount(rows, weights=values, minlength=shape[0])
+        vectors = np.divide(sums, totals[:, None], out=np.zeros_like(sums), where=totals[:, None] > 0)
+
+    return {
+        user_ids[row]: (vectors[row].tolist(), float(totals[row]))
+        for row in np.flatnonzero(totals > 0)
+    }